@@ -0,0 +1,467 @@
+"""End-to-end performance benchmarks for the pipeline and the renderers.
+
+Runs fully offline against the mock LLM backend (src.llm.mock) and
+measures:
+
+- graph.node.*         per-node latency through the audit graph
+- reducer.*            state-merge cost of a fan-out step as findings grow
+                       (10k, 100k): operator.add fold vs AppendLog channel,
+                       and per-step cost of a run of many super-steps as
+                       the log grows (reducer.log_steps_*)
+- checkpoint.*         serialization cost of the state the checkpointer stores
+- parse_output.*       AgentOutput validation throughput (50- and 1000-item
+                       payloads, as replayed from the LLM cache)
+- prompt.*             prompt-context build time and size (estimated tokens)
+- render.*             render_exec_summary / render_roadmap / render_slides
+                       time and peak memory
+
+Results are written as JSON and compared against a stored baseline:
+
+    python -m benchmarks.run_benchmarks                  # full run
+    python -m benchmarks.run_benchmarks --quick          # small sizes, for CI
+    python -m benchmarks.run_benchmarks --save-baseline  # store as baseline
+
+The exit code is 1 when a metric regressed by more than --tolerance.
+
+benchmarks/baseline.json holds --quick results of the tree the suite was
+added in (commit "[user-010] Add an offline benchmark suite..."), i.e.
+before the later optimizations. Regenerate it from that commit with:
+
+    git worktree add /tmp/bench-baseline <commit>
+    (cd /tmp/bench-baseline && python -m benchmarks.run_benchmarks --quick \
+        --save-baseline --baseline "$OLDPWD/benchmarks/baseline.json")
+    git worktree remove /tmp/bench-baseline
+
+Compare with `--quick` (metric names carry the sizes). graph.node.*
+timings include the mock LLM's simulated latency, which is seeded from
+the prompt, so prompt changes move them too.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import operator
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.agents.base import BaseAgent
+from src.agents.context import AGENT_VIEWS, build_context
+from src.config import settings
+from src.llm import pool as pool_module
+from src.llm.pool import estimate_tokens
+from src.llm.mock import MockChatModel
+from src.orchestrator.state import AppendLog, build_initial_state, merge_dicts
+from src.reports.exec_summary import render_exec_summary
+from src.reports.roadmap import render_roadmap
+from src.reports.slides import render_slides
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = ".tmp/benchmarks/latest.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+# Metrics compared against the baseline (lower is better)
+COMPARED_METRICS = ("seconds", "peak_kib", "prompt_tokens")
+# Differences below these absolute values are noise, never regressions
+NOISE_FLOOR = {"seconds": 0.001, "peak_kib": 64.0, "prompt_tokens": 50}
+
+Results = Dict[str, Dict[str, float]]
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────
+
+def _time(func: Callable[[], Any], repeat: int) -> float:
+    """Best-of-`repeat` wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings), 6)
+
+
+def _peak_kib(func: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+@contextmanager
+def mock_llm(latency_ms: float) -> Iterator[None]:
+    """Route every LLM call to the mock backend, with no cache or network."""
+    saved = {
+        name: getattr(settings, name)
+        for name in ("llm_provider", "mock_llm_latency_ms", "llm_cache_enabled",
+                     "llm_requests_per_minute", "llm_input_tokens_per_minute",
+                     "llm_output_tokens_per_minute")
+    }
+    saved_pool, saved_stitch_key = pool_module._pool_instance, os.environ.pop("STITCH_API_KEY", None)
+    settings.llm_provider = "mock"
+    settings.mock_llm_latency_ms = latency_ms
+    settings.llm_cache_enabled = False
+    # Measure the pipeline, not the provider quota
+    settings.llm_requests_per_minute = 0
+    settings.llm_input_tokens_per_minute = 0
+    settings.llm_output_tokens_per_minute = 0
+    pool_module._pool_instance = None
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+        pool_module._pool_instance = saved_pool
+        if saved_stitch_key is not None:
+            os.environ["STITCH_API_KEY"] = saved_stitch_key
+
+
+def synthetic_state(n_findings: int, seed: int = 0) -> Dict[str, Any]:
+    """An audit state with `n_findings` findings and proportional other items."""
+    rng = random.Random(seed)
+    model = MockChatModel(
+        seed=seed, findings=n_findings, risks=max(1, n_findings // 10),
+        recommendations=max(1, n_findings // 10), maturity_scores=max(1, n_findings // 100),
+        latency_ms=0,
+    )
+    payload = model.agent_payload(rng, "BENCH")
+    for key in ("findings", "risks", "recommendations"):
+        for item in payload[key]:
+            item["agent_id"] = rng.choice(["data_scanner", "process_mapper", "benchmark"])
+
+    state = build_initial_state(
+        audit_id="AUDIT-BENCH", audit_type="ia_readiness",
+        client_context={"name": "Bench Corp", "industry": "Manufacturing",
+                        "objectives": "Mesurer la performance du pipeline."},
+    )
+    state.update(
+        findings=payload["findings"],
+        risks=payload["risks"],
+        recommendations=payload["recommendations"],
+        maturity_scores={
+            ms.pop("dimension"): ms for ms in payload["maturity_scores"]
+        },
+        quick_wins=[
+            {"id": f"QW-{i}", "title": f"Quick win {i}", "description": "d",
+             "estimated_weeks": 2, "expected_impact": "fort"}
+            for i in range(max(1, n_findings // 100))
+        ],
+        roadmap=[
+            {"id": f"RM-{i}", "title": f"Action {i}", "description": "d",
+             "phase": rng.choice(["3_MONTHS", "6_MONTHS", "12_MONTHS"]),
+             "dependencies": [f"RM-{i - 1}"] if i else [], "kpis": ["kpi"]}
+            for i in range(max(1, n_findings // 10))
+        ],
+        roi_model=MockChatModel.roi_model(rng).model_dump(mode="json"),
+    )
+    return state
+
+
+# ─── Benchmarks ───────────────────────────────────────────────────────────
+
+class _NodeTimer(BaseCallbackHandler):
+    """Records wall time of every graph node run (fan-out tasks included)."""
+
+    def __init__(self):
+        self.started: Dict[Any, tuple] = {}
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and kwargs.get("name") == node:
+            self.started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        if run_id in self.started:
+            node, started = self.started.pop(run_id)
+            self.durations[node].append(time.perf_counter() - started)
+
+
+def bench_graph(audits: int, latency_ms: float) -> Results:
+    from src.orchestrator.graph import build_audit_graph
+
+    results: Results = {}
+    with mock_llm(latency_ms):
+        graph = build_audit_graph()
+        timer = _NodeTimer()
+        totals = []
+        for i in range(audits):
+            state = build_initial_state(
+                audit_id=f"AUDIT-BENCH-{i}", audit_type="ia_readiness",
+                client_context={"name": "Bench Corp", "industry": "Manufacturing"},
+            )
+            started = time.perf_counter()
+            with redirect_stdout(StringIO()):  # nodes print progress
+                graph.invoke(state, {"callbacks": [timer]})
+            totals.append(time.perf_counter() - started)
+
+    results["graph.audit_total"] = {"seconds": round(statistics.median(totals), 6), "runs": audits}
+    for node, durations in sorted(timer.durations.items()):
+        results[f"graph.node.{node}"] = {
+            "seconds": round(statistics.median(durations), 6),
+            "max_seconds": round(max(durations), 6),
+            "runs": len(durations),
+        }
+    return results
+
+
+def bench_log_steps(items: List[Any], items_per_step: int) -> Results:
+    """Per-step cost of a run whose log grows from 0 to len(items) entries.
+
+    Each super-step appends `items_per_step` entries and checkpoints the
+    channel, as the Pregel loop does with a checkpointer. `seconds` is the
+    median step of the last tenth of the run, `first_seconds` that of the
+    first tenth: they match when the cost per step does not grow with the
+    log. `copy` is the list-copying merge AppendLog used to do.
+    """
+    writes = [items[i:i + items_per_step] for i in range(0, len(items), items_per_step)]
+    tenth = max(1, len(writes) // 10)
+
+    def append_log_step(log: AppendLog, write: List[Any]) -> AppendLog:
+        log.update([write])
+        log.checkpoint()
+        return log
+
+    def copy_step(log: List[Any], write: List[Any]) -> List[Any]:
+        merged = list(log)
+        merged.extend(write)
+        return merged
+
+    results: Results = {}
+    for name, step, log in (("append_log", append_log_step, AppendLog()), ("copy", copy_step, [])):
+        durations = []
+        for write in writes:
+            started = time.perf_counter()
+            log = step(log, write)
+            durations.append(time.perf_counter() - started)
+        results[f"reducer.log_steps_{name}.{len(items)}"] = {
+            "seconds": round(statistics.median(durations[-tenth:]), 7),
+            "first_seconds": round(statistics.median(durations[:tenth]), 7),
+            "steps": len(writes),
+        }
+    return results
+
+
+def bench_reducers(sizes: List[int], repeat: int, items_per_write: int = 100) -> Results:
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    results: Results = {}
+    serde = JsonPlusSerializer()
+    for n in sizes:
+        state = synthetic_state(n)
+        findings = state["findings"]
+        # One super-step in which each fan-out task appends `items_per_write` findings
+        writes = [findings[i:i + items_per_write] for i in range(0, n, items_per_write)]
+        scores = [{f"dim_{i}_{j}": {"score": 3} for j in range(10)} for i in range(len(writes))]
+
+        def add_findings():
+            merged: List[Dict[str, Any]] = []
+            for write in writes:
+                merged = operator.add(merged, write)
+            return merged
+
+        def append_findings():
+            log = AppendLog()
+            log.update(writes)
+            return log.get()
+
+        def merge_scores():
+            merged: Dict[str, Any] = {}
+            for write in scores:
+                merged = merge_dicts(merged, write)
+            return merged
+
+        results[f"reducer.findings_add.{n}"] = {
+            "seconds": _time(add_findings, repeat), "peak_kib": _peak_kib(add_findings),
+            "writes": len(writes),
+        }
+        results[f"reducer.findings_append_log.{n}"] = {
+            "seconds": _time(append_findings, repeat), "peak_kib": _peak_kib(append_findings),
+            "writes": len(writes),
+        }
+        results[f"reducer.maturity_merge.{n}"] = {"seconds": _time(merge_scores, repeat)}
+        results.update(bench_log_steps(findings, items_per_write))
+        payload_bytes = len(serde.dumps_typed(state)[1])
+        results[f"checkpoint.serialize.{n}"] = {
+            "seconds": _time(lambda: serde.dumps_typed(state), repeat),
+            "bytes": payload_bytes,
+        }
+    return results
+
+
+class _BenchAgent(BaseAgent):
+    def build_user_message(self, state):
+        return ""
+
+
+def bench_parse_output(items_per_payload: int, payloads: int) -> Results:
+    agent = _BenchAgent("bench", "Bench", "")
+    model = MockChatModel(seed=1, findings=items_per_payload, risks=items_per_payload // 5,
+                          recommendations=items_per_payload // 5, latency_ms=0)
+    raws = [
+        json.dumps(model.agent_payload(random.Random(i), f"P{i}"), ensure_ascii=False)
+        for i in range(payloads)
+    ]
+    items = payloads * (items_per_payload + 2 * (items_per_payload // 5))
+
+    def parse_all():
+        for raw in raws:
+            agent.parse_output(raw)
+
+    def decode_all():
+        for raw in raws:
+            json.loads(raw)
+
+    seconds = _time(parse_all, 3)
+    return {
+        f"parse_output.{items_per_payload}": {
+            "seconds": seconds,
+            "items_per_sec": round(items / seconds),
+            "payload_kib": round(sum(map(len, raws)) / 1024 / payloads, 1),
+            # json.loads alone, the floor of any validation path
+            "json_decode_seconds": _time(decode_all, 3),
+        }
+    }
+
+
+def bench_renderers(sizes: List[int], repeat: int) -> Results:
+    results: Results = {}
+    renderers = {
+        "exec_summary": render_exec_summary,
+        "roadmap": render_roadmap,
+        "slides": render_slides,
+    }
+    for n in sizes:
+        state = synthetic_state(n)
+        for name, render in renderers.items():
+            results[f"render.{name}.{n}"] = {
+                "seconds": _time(lambda: render(state), repeat),
+                "peak_kib": _peak_kib(lambda: render(state)),
+            }
+    return results
+
+
+def bench_prompt_context(sizes: List[int], repeat: int) -> Results:
+    results: Results = {}
+    for n in sizes:
+        state = synthetic_state(n)
+        for agent_id in AGENT_VIEWS:
+            results[f"prompt.{agent_id}.{n}"] = {
+                "seconds": _time(lambda: build_context(state, agent_id), repeat),
+                "prompt_tokens": estimate_tokens(build_context(state, agent_id)),
+            }
+    return results
+
+
+def run_suite(sizes: List[int], audits: int, latency_ms: float, repeat: int) -> Dict[str, Any]:
+    results: Results = {}
+    for name, bench in (
+        ("graph", lambda: bench_graph(audits, latency_ms)),
+        ("reducers", lambda: bench_reducers(sizes, repeat)),
+        ("parse_output", lambda: {**bench_parse_output(50, 20), **bench_parse_output(1000, 4)}),
+        ("renderers", lambda: bench_renderers(sizes, repeat)),
+        ("prompt_context", lambda: bench_prompt_context(sizes, repeat)),
+    ):
+        logger.info(f"Running {name} benchmarks...")
+        results.update(bench())
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "audits": audits,
+            "mock_latency_ms": latency_ms,
+        },
+        "results": results,
+    }
+
+
+# ─── Baseline comparison ──────────────────────────────────────────────────
+
+def compare(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    """Metrics that got worse than baseline × (1 + tolerance)."""
+    regressions = []
+    for name, metrics in sorted(results.items()):
+        for metric in COMPARED_METRICS:
+            current = metrics.get(metric)
+            previous = baseline.get(name, {}).get(metric)
+            if current is None or not previous:
+                continue
+            if current - previous <= NOISE_FLOOR[metric]:
+                continue
+            if current > previous * (1 + tolerance):
+                regressions.append(
+                    f"{name}.{metric}: {previous:.4g} → {current:.4g} (+{current / previous - 1:.0%})"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline performance benchmarks.")
+    parser.add_argument("--sizes", default="10000,100000",
+                        help="Comma-separated finding counts for reducer / render benchmarks.")
+    parser.add_argument("--audits", type=int, default=3, help="Audits run through the graph.")
+    parser.add_argument("--mock-latency-ms", type=float, default=20.0,
+                        help="Median simulated LLM latency.")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing repeats.")
+    parser.add_argument("--quick", action="store_true", help="Small sizes, one audit (CI smoke).")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results JSON.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare to.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before a metric counts as a regression.")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    sizes = [1000] if args.quick else [int(s) for s in args.sizes.split(",")]
+    audits = 1 if args.quick else args.audits
+    report = run_suite(sizes, audits, args.mock_latency_ms, args.repeat)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    for name, metrics in report["results"].items():
+        print(f"  {name:40s} " + "  ".join(f"{k}={v}" for k, v in metrics.items()))
+    print(f"\nResults written to {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path} — run with --save-baseline to create one.")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = compare(report["results"], baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\nNo regression beyond {args.tolerance:.0%} against {baseline_path}.")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    sys.exit(main())
@@ -1,62 +1,50 @@
 """Base class for all Audit Factory agents.
 
-Every agent (core or plugin) inherits from BaseAgent and must implement
-`run()`. The base class handles:
-- LLM invocation (Anthropic Claude or OpenAI GPT)
+Every agent (core or plugin) inherits from BaseAgent and implements
+`build_user_message()`; it may also override `run()` and `arun()`
+entirely. The base class provides matching sync (`run`) and async
+(`arun`) execution paths and handles:
+- LLM invocation (Anthropic Claude or OpenAI GPT), sync and async,
+  through the shared rate-limited client pool (src.llm.pool)
 - JSON structured output enforcement
 - Output validation against AgentOutput schema
-- Token tracking
-- Retry on parse failure
+- Token tracking and a tracing span per LLM call (src.observability)
+- Cost accounting and budget enforcement per audit (src.llm.ledger)
+- Persistent response cache (identical prompts are served from disk)
+- Retry with jittered backoff on transport errors (src.llm.retry)
+- Streamed responses, whose items are published on the graph's custom
+  stream as soon as they close (src.agents.streaming)
+- Partial salvage of broken JSON (src.agents.salvage), then a repair
+  reprompt (error + offending output only) when nothing is recoverable
 - Graceful fallback to mock when no API key is configured
 """
 
 from __future__ import annotations
 
-import json
 import logging
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Any, Dict
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
 
+from langchain_core.messages import AIMessage
+from langgraph.errors import GraphBubbleUp
+
+from src.agents.salvage import salvage_output
+from src.agents.streaming import ItemPublisher, acollect_stream, collect_stream, item_publisher
 from src.config import settings
+from src.llm.cache import LLMResponseCache, get_llm_cache
+from src.llm.pool import get_chat_model
+from src.llm.retry import acall_with_retries, call_with_retries
+from src.observability.tracing import trace_span
 from src.schemas.models import AgentOutput
 
 logger = logging.getLogger(__name__)
 
-# Lazy-loaded LLM instance (shared across agents)
-_llm_instance = None
-
-
-def _get_llm():
-    """Build the LLM client once, reuse across all agents."""
-    global _llm_instance
-    if _llm_instance is not None:
-        return _llm_instance
-
-    if settings.llm_provider == "anthropic" and settings.anthropic_api_key:
-        from langchain_anthropic import ChatAnthropic
-        _llm_instance = ChatAnthropic(
-            model=settings.llm_model,
-            temperature=settings.llm_temperature,
-            max_tokens=settings.token_budget_per_agent,
-            api_key=settings.anthropic_api_key,
-        )
-    elif settings.llm_provider == "openai" and settings.openai_api_key:
-        from langchain_openai import ChatOpenAI
-        _llm_instance = ChatOpenAI(
-            model=settings.llm_model,
-            temperature=settings.llm_temperature,
-            max_tokens=settings.token_budget_per_agent,
-            api_key=settings.openai_api_key,
-        )
-    else:
-        logger.warning(
-            "No LLM API key configured — running in MOCK mode. "
-            "Set ANTHROPIC_API_KEY or OPENAI_API_KEY in .env"
-        )
-        return None
 
-    return _llm_instance
+class AgentCancelledError(Exception):
+    """Raised in an agent run that was abandoned (e.g. a plugin timeout)."""
 
 
 class BaseAgent(ABC):
@@ -65,96 +53,358 @@ class BaseAgent(ABC):
     agent_id: str
     agent_name: str
     system_prompt: str
+    # Whether the prompt embeds the sources index (document hashes): such an
+    # agent must re-run whenever any document changes (incremental re-audit)
+    reads_sources_index: bool = False
 
     def __init__(self, agent_id: str, agent_name: str, system_prompt: str):
         self.agent_id = agent_id
         self.agent_name = agent_name
         self.system_prompt = system_prompt
         self._last_token_usage = 0
+        self._attempts: List[Dict[str, Any]] = []
+        self._repairs = 0
+        # Map-reduce agents run several LLM calls at once (src.agents.map_reduce)
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
 
     @abstractmethod
-    def run(self, state: Dict[str, Any]) -> AgentOutput:
-        """Execute the agent's analysis and return structured output."""
+    def build_user_message(self, state: Dict[str, Any]) -> str:
+        """Build the user message for this agent from the audit state."""
         ...
 
-    def invoke_llm(self, user_message: str) -> str:
-        """Call the configured LLM with system prompt + user message.
+    def build_system_prompt(self, state: Dict[str, Any]) -> str:
+        """System prompt for this run — override to fill per-audit slots."""
+        return self.system_prompt
 
-        Returns raw JSON string from the LLM.
-        Falls back to mock if no API key is set.
+    def build_repair_messages(self, raw: str, error: str) -> Tuple[str, str]:
+        """Repair reprompt (user message, system prompt).
+
+        Only the validation error and the offending output are sent back,
+        not the audit context.
         """
-        llm = _get_llm()
+        # Lazy import: src.agents.core imports this module
+        from src.agents.core.prompts import JSON_REPAIR_PROMPT, JSON_REPAIR_TEMPLATE
 
-        if llm is None:
-            logger.info(f"[{self.agent_id}] LLM invocation (MOCK — no API key)")
-            return "{}"
+        return JSON_REPAIR_TEMPLATE.format(error=error, output=raw), JSON_REPAIR_PROMPT
+
+    def _start_run(self) -> datetime:
+        self._last_token_usage = 0
+        self._attempts = []
+        self._repairs = 0
+        logger.info(f"[{self.agent_id}] Starting analysis")
+        return datetime.now(timezone.utc)
 
+    def cancel(self) -> None:
+        """Stop this run before its next LLM call.
+
+        A call already in flight still completes (and is charged to the
+        audit ledger); no further call or repair reprompt is made.
+        """
+        self._cancelled.set()
+
+    def _check_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise AgentCancelledError(f"{self.agent_name} cancelled")
+
+    def _needs_repair(self, output: AgentOutput) -> bool:
+        if "parse_error" not in output.metadata:
+            return False
+        with self._lock:
+            if self._repairs >= settings.max_repair_attempts:
+                return False
+            self._repairs += 1
+        logger.warning(
+            f"[{self.agent_id}] Invalid output — repair reprompt "
+            f"{self._repairs}/{settings.max_repair_attempts}"
+        )
+        return True
+
+    def _complete(self, user_message: str, system_prompt: str, publish: bool = True) -> AgentOutput:
+        """One LLM call parsed into an AgentOutput, with repair reprompts.
+
+        With `publish`, the call's items are published on the graph's
+        stream as they close (see src.agents.streaming); they are
+        retracted if the call ends without a usable output.
+        """
+        publisher = self._item_publisher() if publish else None
+        try:
+            self._check_cancelled()
+            raw = self.invoke_llm(user_message, system_prompt=system_prompt, publisher=publisher)
+            output = self.parse_output(raw)
+            while self._needs_repair(output):
+                message, repair_prompt = self.build_repair_messages(raw, output.metadata["parse_error"])
+                self._check_cancelled()
+                raw = self.invoke_llm(message, system_prompt=repair_prompt, publisher=publisher)
+                output = self.parse_output(raw)
+        except BaseException:
+            if publisher is not None:
+                publisher.discard()
+            raise
+        if publisher is not None and "parse_error" in output.metadata:
+            publisher.discard()
+        return output
+
+    async def _acomplete(self, user_message: str, system_prompt: str, publish: bool = True) -> AgentOutput:
+        """Async `_complete`."""
+        publisher = self._item_publisher() if publish else None
+        try:
+            self._check_cancelled()
+            raw = await self.ainvoke_llm(user_message, system_prompt=system_prompt, publisher=publisher)
+            output = self.parse_output(raw)
+            while self._needs_repair(output):
+                message, repair_prompt = self.build_repair_messages(raw, output.metadata["parse_error"])
+                self._check_cancelled()
+                raw = await self.ainvoke_llm(message, system_prompt=repair_prompt, publisher=publisher)
+                output = self.parse_output(raw)
+        except BaseException:
+            if publisher is not None:
+                publisher.discard()
+            raise
+        if publisher is not None and "parse_error" in output.metadata:
+            publisher.discard()
+        return output
+
+    def run(self, state: Dict[str, Any]) -> AgentOutput:
+        """Execute the agent's analysis and return structured output."""
+        started = self._start_run()
+        output = self._complete(self.build_user_message(state), self.build_system_prompt(state))
+        output.metadata["timeline"] = self.build_timeline_entry(started)
+        return output
+
+    async def arun(self, state: Dict[str, Any]) -> AgentOutput:
+        """Async counterpart of `run()` — awaits the LLM instead of blocking."""
+        started = self._start_run()
+        output = await self._acomplete(self.build_user_message(state), self.build_system_prompt(state))
+        output.metadata["timeline"] = self.build_timeline_entry(started)
+        return output
+
+    def _build_messages(self, user_message: str, system_prompt: Optional[str] = None) -> List[Any]:
         from langchain_core.messages import HumanMessage, SystemMessage
 
         # Force JSON output in the system prompt
         system_content = (
-            self.system_prompt + "\n\n"
+            (system_prompt or self.system_prompt) + "\n\n"
             "IMPORTANT: Tu DOIS répondre UNIQUEMENT avec du JSON valide, "
             "sans aucun texte avant ou après le JSON. "
             "Pas de markdown, pas de ```json```, juste le JSON brut."
         )
 
-        messages = [
+        return [
             SystemMessage(content=system_content),
             HumanMessage(content=user_message),
         ]
 
-        logger.info(f"[{self.agent_id}] Calling LLM ({settings.llm_model})...")
+    def _handle_response(self, response: Any) -> str:
+        """Track token usage and strip markdown fences from an LLM response."""
+        raw = response.content
+
+        # Track token usage if available
+        if hasattr(response, "usage_metadata") and response.usage_metadata:
+            usage = response.usage_metadata
+            with self._lock:
+                self._last_token_usage += usage.get("total_tokens", 0)
+            logger.info(
+                f"[{self.agent_id}] Tokens: "
+                f"in={usage.get('input_tokens', '?')} "
+                f"out={usage.get('output_tokens', '?')} "
+                f"total={usage.get('total_tokens', '?')}"
+            )
+
+        # Clean response: strip markdown code fences if LLM wrapped it
+        raw = raw.strip()
+        if raw.startswith("```json"):
+            raw = raw[7:]
+        if raw.startswith("```"):
+            raw = raw[3:]
+        if raw.endswith("```"):
+            raw = raw[:-3]
+        raw = raw.strip()
+
+        return raw
+
+    def _lookup_cache(
+        self, messages: List[Any], llm: Any
+    ) -> Tuple[Optional[LLMResponseCache], str, Optional[str]]:
+        """Return (cache, key, cached response) — cache is None when bypassed."""
+        cache = get_llm_cache()
+        if cache is None:
+            return None, "", None
+        key = LLMResponseCache.make_key(
+            settings.llm_provider,
+            llm.model,
+            settings.llm_temperature,
+            llm.max_tokens,
+            messages[0].content,
+            messages[1].content,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"[{self.agent_id}] LLM cache hit ({key[:12]})")
+        return cache, key, cached
+
+    def _cacheable(self, raw: str) -> bool:
+        """Whether `raw` parses into an AgentOutput, salvaged or not.
 
+        A response that needs a repair reprompt (truncated, off-schema)
+        would trigger the same repair on every cache hit.
+        """
         try:
-            response = llm.invoke(messages)
-            raw = response.content
-
-            # Track token usage if available
-            if hasattr(response, "usage_metadata") and response.usage_metadata:
-                usage = response.usage_metadata
-                self._last_token_usage = usage.get("total_tokens", 0)
-                logger.info(
-                    f"[{self.agent_id}] Tokens: "
-                    f"in={usage.get('input_tokens', '?')} "
-                    f"out={usage.get('output_tokens', '?')} "
-                    f"total={self._last_token_usage}"
-                )
-
-            # Clean response: strip markdown code fences if LLM wrapped it
-            raw = raw.strip()
-            if raw.startswith("```json"):
-                raw = raw[7:]
-            if raw.startswith("```"):
-                raw = raw[3:]
-            if raw.endswith("```"):
-                raw = raw[:-3]
-            raw = raw.strip()
+            AgentOutput.model_validate_json(
+                raw, context={"agent_id": self.agent_id, "agent_name": self.agent_name}
+            )
+            return True
+        except ValueError:
+            return salvage_output(raw, self.agent_id, self.agent_name) is not None
+
+    def _llm_span(self, messages: List[Any], model: str):
+        return trace_span(
+            self.agent_id,
+            "llm",
+            agent_id=self.agent_id,
+            model=model,
+            prompt_bytes=sum(len(str(m.content).encode()) for m in messages),
+        )
 
-            return raw
+    def _item_publisher(self) -> Optional[ItemPublisher]:
+        """Publisher of streamed items, when streaming inside a graph run."""
+        if not settings.llm_streaming:
+            return None
+        return item_publisher(self.agent_id, self.agent_name)
+
+    def _stream_response(self, llm: Any, messages: List[Any], publisher: ItemPublisher) -> AIMessage:
+        """Stream the response (one attempt), publishing its items as they close."""
+        publisher.start_attempt()
+
+        def on_text(text: str) -> None:
+            self._check_cancelled()           # stop reading: the provider stops generating
+            publisher.feed(text)
+
+        return collect_stream(llm.stream(messages), on_text)
+
+    async def _astream_response(self, llm: Any, messages: List[Any], publisher: ItemPublisher) -> AIMessage:
+        """Async `_stream_response`."""
+        publisher.start_attempt()
+        return await acollect_stream(llm.astream(messages), publisher.feed)
+
+    def invoke_llm(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        publisher: Optional[ItemPublisher] = None,
+    ) -> str:
+        """Call the configured LLM with system prompt + user message.
 
-        except Exception as e:
-            logger.error(f"[{self.agent_id}] LLM call failed: {e}")
+        Returns raw JSON string from the LLM.
+        With a `publisher`, the response is streamed and its items are
+        published as they close.
+        Identical calls are answered from the response cache; only
+        responses that parse are stored, so a broken one is not replayed.
+        Transient failures are retried with backoff (settings.max_retries);
+        the last error is raised once retries are exhausted.
+        Falls back to mock if no API key is set.
+        """
+        llm = get_chat_model()
+
+        if llm is None:
+            logger.info(f"[{self.agent_id}] LLM invocation (MOCK — no API key)")
             return "{}"
 
-    def parse_output(self, raw_json: str) -> AgentOutput:
-        """Parse LLM response into validated AgentOutput."""
-        try:
-            data = json.loads(raw_json)
-            data["agent_id"] = self.agent_id
-            data["agent_name"] = self.agent_name
+        messages = self._build_messages(user_message, system_prompt)
+        with self._llm_span(messages, llm.model) as span:
+            cache, cache_key, cached = self._lookup_cache(messages, llm)
+            span.record(cache_hit=cached is not None)
+            if cached is not None:
+                if publisher is not None:
+                    publisher.start_attempt()
+                    publisher.feed(cached)
+                return cached
+
+            logger.info(f"[{self.agent_id}] Calling LLM ({llm.model})...")
+
+            first_attempt = len(self._attempts)
+            call = (
+                partial(self._stream_response, llm, messages, publisher) if publisher is not None
+                else partial(llm.invoke, messages)
+            )
+            try:
+                response = call_with_retries(call, label=self.agent_id, attempts=self._attempts)
+            except GraphBubbleUp:
+                raise                          # batch mode: paused until results are in
+            except Exception as e:
+                logger.error(f"[{self.agent_id}] LLM call failed: {e}")
+                raise
+            finally:
+                span.record(retries=max(0, len(self._attempts) - first_attempt - 1))
+            raw = self._handle_response(response)
+
+            if cache is not None and self._cacheable(raw):
+                cache.put(cache_key, raw)
+            return raw
 
-            # Ensure nested models have required agent_id fields
-            for finding in data.get("findings", []):
-                finding.setdefault("agent_id", self.agent_id)
-            for risk in data.get("risks", []):
-                risk.setdefault("agent_id", self.agent_id)
-            for rec in data.get("recommendations", []):
-                rec.setdefault("agent_id", self.agent_id)
+    async def ainvoke_llm(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        publisher: Optional[ItemPublisher] = None,
+    ) -> str:
+        """Async `invoke_llm` — uses the LangChain async client (`ainvoke`)."""
+        llm = get_chat_model()
 
-            return AgentOutput(**data)
+        if llm is None:
+            logger.info(f"[{self.agent_id}] LLM invocation (MOCK — no API key)")
+            return "{}"
 
-        except (json.JSONDecodeError, ValueError) as e:
+        messages = self._build_messages(user_message, system_prompt)
+        with self._llm_span(messages, llm.model) as span:
+            cache, cache_key, cached = self._lookup_cache(messages, llm)
+            span.record(cache_hit=cached is not None)
+            if cached is not None:
+                if publisher is not None:
+                    publisher.start_attempt()
+                    publisher.feed(cached)
+                return cached
+
+            logger.info(f"[{self.agent_id}] Calling LLM async ({llm.model})...")
+
+            first_attempt = len(self._attempts)
+            call = (
+                partial(self._astream_response, llm, messages, publisher) if publisher is not None
+                else partial(llm.ainvoke, messages)
+            )
+            try:
+                response = await acall_with_retries(call, label=self.agent_id, attempts=self._attempts)
+            except GraphBubbleUp:
+                raise                          # batch mode: paused until results are in
+            except Exception as e:
+                logger.error(f"[{self.agent_id}] LLM call failed: {e}")
+                raise
+            finally:
+                span.record(retries=max(0, len(self._attempts) - first_attempt - 1))
+            raw = self._handle_response(response)
+
+            if cache is not None and self._cacheable(raw):
+                cache.put(cache_key, raw)
+            return raw
+
+    def parse_output(self, raw_json: str) -> AgentOutput:
+        """Parse LLM response into validated AgentOutput.
+
+        The JSON is validated in one pass by pydantic-core; the agent's id
+        and name come in through the validation context (see
+        src.schemas.models). A response that fails validation is salvaged
+        item by item (src.agents.salvage); only when nothing is recoverable
+        does the output carry a `parse_error`, which triggers a repair
+        reprompt.
+        """
+        try:
+            return AgentOutput.model_validate_json(
+                raw_json, context={"agent_id": self.agent_id, "agent_name": self.agent_name}
+            )
+        except ValueError as e:
+            salvaged = salvage_output(raw_json, self.agent_id, self.agent_name)
+            if salvaged is not None:
+                return salvaged
             logger.error(f"[{self.agent_id}] Failed to parse output: {e}")
             logger.debug(f"[{self.agent_id}] Raw: {raw_json[:300]}")
             return AgentOutput(
@@ -173,4 +423,8 @@ class BaseAgent(ABC):
             "ended_at": datetime.now(timezone.utc).isoformat(),
             "status": status,
             "tokens": tokens or self._last_token_usage,
+            "attempts": len(self._attempts),
+            "attempt_latencies_ms": [a["latency_ms"] for a in self._attempts],
+            "attempt_outcomes": [a["outcome"] for a in self._attempts],
+            "repairs": self._repairs,
         }
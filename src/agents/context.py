@@ -0,0 +1,180 @@
+"""Prompt context builder — compact, bounded views of the audit state.
+
+Agents that work on the consolidated audit (ROI, prioritization, report)
+used to interpolate whole state lists as Python reprs, so their prompts
+grew with every finding and could overflow the context window. This
+module builds their context instead:
+
+- Projection: each agent sees only the sections it needs, and each item
+  only the fields that matter to it (no timestamps, snippets, agent ids)
+- Compact serialization: one minified JSON object per item, empty
+  fields dropped, long texts clipped, sources reduced to "doc p.N"
+- Ranked truncation: when the estimated size exceeds the token budget,
+  the lowest-ranked items (lowest severity / priority) are dropped
+  first, from the largest section, and each section header says how
+  many items are shown out of how many
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.llm.pool import estimate_tokens
+
+# Sections each consumer sees, in prompt order
+AGENT_VIEWS: Dict[str, Tuple[str, ...]] = {
+    "roi_modeler": ("recommendations", "risks", "findings"),
+    "prioritization": ("recommendations", "risks", "findings"),
+    "report_generator": (
+        "maturity_scores", "roi_model", "quick_wins", "roadmap", "scenarios",
+        "recommendations", "risks", "findings",
+    ),
+}
+
+SECTION_TITLES: Dict[str, str] = {
+    "findings": "Findings consolidés",
+    "risks": "Risques",
+    "recommendations": "Recommandations",
+    "maturity_scores": "Scores maturité",
+    "roi_model": "ROI Model",
+    "quick_wins": "Quick wins",
+    "roadmap": "Roadmap",
+    "scenarios": "Scénarios",
+}
+
+# Fields kept per section (projection)
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    "findings": ("id", "severity", "category", "description", "tags", "sources"),
+    "risks": ("id", "impact", "probability", "title", "description", "mitigations",
+              "dependencies", "sources"),
+    "recommendations": ("id", "priority_score", "impact", "effort", "timeframe", "title",
+                        "description", "dependencies", "sources"),
+    "maturity_scores": ("dimension", "score", "justification", "gaps"),
+    "roi_model": ("scenario_type", "capex_estimate", "opex_annual", "gains_annual",
+                  "payback_months", "assumptions"),
+    "quick_wins": ("id", "title", "estimated_weeks", "expected_impact", "prerequisites"),
+    "roadmap": ("id", "phase", "title", "dependencies", "kpis"),
+    "scenarios": (),                         # free-form: kept whole
+}
+
+_LEVELS = {"CRITICAL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1}
+_PHASES = {"QUICK_WIN": 0, "3_MONTHS": 1, "6_MONTHS": 2, "12_MONTHS": 3}
+
+# Sort keys, most important first
+RANKINGS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "findings": lambda f: -_LEVELS.get(f.get("severity"), 0),
+    "risks": lambda r: -_LEVELS.get(r.get("impact"), 0) * _LEVELS.get(r.get("probability"), 0),
+    "recommendations": lambda r: (
+        -(r.get("priority_score") or 0),
+        -_LEVELS.get(r.get("impact"), 0),
+        _LEVELS.get(r.get("effort"), 0),
+    ),
+    "maturity_scores": lambda m: m.get("score") or 0,
+    "quick_wins": lambda q: q.get("estimated_weeks") or 0,
+    "roadmap": lambda r: _PHASES.get(r.get("phase"), len(_PHASES)),
+}
+
+_RANK_LABELS = {
+    "findings": "tri par sévérité",
+    "risks": "tri par impact × probabilité",
+    "recommendations": "tri par priorité",
+}
+
+_MAX_TEXT_CHARS = 400
+_MAX_LIST_ITEMS = 5
+_HEADER_TOKENS = 16                          # reserved per section header
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > _MAX_TEXT_CHARS:
+        return value[:_MAX_TEXT_CHARS - 1] + "…"
+    if isinstance(value, list):
+        return [_clip(v) for v in value[:_MAX_LIST_ITEMS]]
+    return value
+
+
+def _source_label(source: Dict[str, Any]) -> str:
+    label = source.get("doc_id", "?")
+    if source.get("page") is not None:
+        label += f" p.{source['page']}"
+    elif source.get("section"):
+        label += f" §{source['section']}"
+    return label
+
+
+def project_item(section: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the fields `section` needs, drop empty ones, clip long texts."""
+    fields = FIELDS.get(section) or tuple(item)
+    projected: Dict[str, Any] = {}
+    for name in fields:
+        value = item.get(name)
+        if name == "sources" and value:
+            value = list(dict.fromkeys(_source_label(s) for s in value if isinstance(s, dict)))
+        if value is None or value == "" or value == [] or value == {}:
+            continue
+        projected[name] = _clip(value)
+    return projected
+
+
+def section_items(state: Dict[str, Any], section: str) -> List[Dict[str, Any]]:
+    """The section's items as a list of dicts, ranked most important first."""
+    value = state.get(section)
+    if not value:
+        return []
+    if section == "maturity_scores":
+        items = [{"dimension": dim, **(score or {})} for dim, score in value.items()]
+    elif section == "roi_model":
+        items = list(value.get("scenarios", []))
+    else:
+        items = [i for i in value if isinstance(i, dict)]
+    ranking = RANKINGS.get(section)
+    return sorted(items, key=ranking) if ranking else items
+
+
+def serialize(item: Dict[str, Any]) -> str:
+    """Minified JSON, one line per item."""
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def build_context(
+    state: Dict[str, Any], agent_id: str, max_tokens: Optional[int] = None
+) -> str:
+    """Compact context of `state` for `agent_id`.
+
+    Estimated size stays within `max_tokens` (settings.prompt_context_tokens
+    by default); unknown agent ids get the report generator's view.
+    """
+    sections = AGENT_VIEWS.get(agent_id, AGENT_VIEWS["report_generator"])
+    budget = settings.prompt_context_tokens if max_tokens is None else max_tokens
+    budget -= _HEADER_TOKENS * len(sections)
+
+    rendered: Dict[str, List[str]] = {}
+    totals: Dict[str, int] = {}
+    sizes: Dict[str, List[int]] = {}
+    for section in sections:
+        items = section_items(state, section)
+        rendered[section] = [serialize(project_item(section, item)) for item in items]
+        totals[section] = len(items)
+        sizes[section] = [estimate_tokens(line) for line in rendered[section]]
+
+    # Ranked truncation: drop the last (least important) item of the
+    # largest section until the context fits
+    used = {section: sum(sizes[section]) for section in sections}
+    while sum(used.values()) > budget:
+        largest = max(sections, key=lambda s: used[s])
+        if not rendered[largest]:
+            break
+        rendered[largest].pop()
+        used[largest] -= sizes[largest].pop()
+
+    blocks = []
+    for section in sections:
+        lines, total = rendered[section], totals[section]
+        if not total:
+            continue
+        count = f"{len(lines)}/{total}" if len(lines) < total else str(total)
+        label = f" — {_RANK_LABELS[section]}" if section in _RANK_LABELS and len(lines) < total else ""
+        blocks.append(f"### {SECTION_TITLES[section]} ({count}{label})\n" + "\n".join(lines))
+    return "\n\n".join(blocks)
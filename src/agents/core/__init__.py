@@ -5,3 +5,4 @@ from .risk_compliance import RiskComplianceAgent
 from .roi_modeler import ROIModelerAgent
 from .prioritization import PrioritizationAgent
 from .report_generator import ReportGeneratorAgent
+from .registry import get_core_agents
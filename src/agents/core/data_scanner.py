@@ -1,19 +1,36 @@
-"""Agent Data Scanner — cartographie technique et extraction d'entités."""
+"""Agent Data Scanner — cartographie technique et extraction d'entités.
+
+The documents' content is embedded in the prompt. When it no longer fits
+the model's context window, the documents are analysed in parallel lots
+and the partial outputs merged (src.agents.map_reduce).
+"""
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from src.agents.base import BaseAgent
 from src.agents.core.prompts import DATA_SCANNER_PROMPT
+from src.agents.map_reduce import (
+    DocumentPart,
+    amap_outputs,
+    fits_context,
+    load_documents,
+    map_outputs,
+    plan_lots,
+    reduce_outputs,
+    render_documents,
+)
+from src.config import settings
 from src.schemas.models import AgentOutput
 
 logger = logging.getLogger(__name__)
 
 
 class DataScannerAgent(BaseAgent):
+    reads_sources_index = True
+
     def __init__(self):
         super().__init__(
             agent_id="data_scanner",
@@ -21,24 +38,81 @@ class DataScannerAgent(BaseAgent):
             system_prompt=DATA_SCANNER_PROMPT,
         )
 
-    def run(self, state: Dict[str, Any]) -> AgentOutput:
-        started = datetime.now(timezone.utc)
-        logger.info(f"[{self.agent_id}] Starting analysis")
+    def _client_lines(self, state: Dict[str, Any]) -> str:
+        return (
+            f"Voici le contexte client :\n"
+            f"- Entreprise : {state['client_context'].get('name', 'N/A')}\n"
+            f"- Industrie : {state['client_context'].get('industry', 'N/A')}\n"
+        )
 
+    def _single_message(self, state: Dict[str, Any], documents: List[DocumentPart]) -> str:
         # Build context from state
         docs = state.get("client_context", {}).get("docs_provided", [])
         sources_index = state.get("sources_index", {})
 
-        user_message = (
-            f"Voici le contexte client :\n"
-            f"- Entreprise : {state['client_context'].get('name', 'N/A')}\n"
-            f"- Industrie : {state['client_context'].get('industry', 'N/A')}\n"
+        message = (
+            f"{self._client_lines(state)}"
             f"- Documents fournis : {docs}\n"
             f"- Index des sources : {sources_index}\n\n"
-            f"Analyse ces documents et produis ta cartographie technique."
         )
+        if documents:
+            message += f"Contenu des documents :\n\n{render_documents(documents)}\n\n"
+        return message + "Analyse ces documents et produis ta cartographie technique."
+
+    def build_lot_message(
+        self, state: Dict[str, Any], lot: List[DocumentPart], index: int, total: int
+    ) -> str:
+        """User message of one map call: the client context and the lot's documents."""
+        return (
+            f"{self._client_lines(state)}\n"
+            f"Lot {index}/{total} des documents du client. Analyse uniquement les documents "
+            f"ci-dessous et cite leur doc_id ; les autres lots sont analysés séparément.\n\n"
+            f"{render_documents(lot)}\n\n"
+            f"Produis ta cartographie technique pour ce lot."
+        )
+
+    def build_user_message(self, state: Dict[str, Any]) -> str:
+        return self._single_message(state, load_documents(state.get("sources_index", {})))
+
+    def _plan(self, state: Dict[str, Any], system_prompt: str):
+        """(single-call message, None), or (None, lot messages) when map-reduce is needed."""
+        documents = load_documents(state.get("sources_index", {}))
+        message = self._single_message(state, documents)
+        if fits_context(system_prompt, message):
+            return message, None
+        lots = plan_lots(documents, settings.map_reduce_lot_tokens)
+        logger.info(
+            f"[{self.agent_id}] Context exceeds the model window — "
+            f"map-reduce over {len(documents)} documents in {len(lots)} lots"
+        )
+        return None, [self.build_lot_message(state, lot, i, len(lots)) for i, lot in enumerate(lots, 1)]
+
+    def _publish_reduced(self, output: AgentOutput) -> None:
+        """Publish the reduced items once; the map calls published none."""
+        publisher = self._item_publisher()
+        if publisher is not None:
+            publisher.publish_output(output)
+
+    def run(self, state: Dict[str, Any]) -> AgentOutput:
+        started = self._start_run()
+        system_prompt = self.build_system_prompt(state)
+        message, lot_messages = self._plan(state, system_prompt)
+        if lot_messages is None:
+            output = self._complete(message, system_prompt)
+        else:
+            output = reduce_outputs(map_outputs(self, lot_messages, system_prompt))
+            self._publish_reduced(output)
+        output.metadata["timeline"] = self.build_timeline_entry(started)
+        return output
 
-        raw = self.invoke_llm(user_message)
-        output = self.parse_output(raw)
+    async def arun(self, state: Dict[str, Any]) -> AgentOutput:
+        started = self._start_run()
+        system_prompt = self.build_system_prompt(state)
+        message, lot_messages = self._plan(state, system_prompt)
+        if lot_messages is None:
+            output = await self._acomplete(message, system_prompt)
+        else:
+            output = reduce_outputs(await amap_outputs(self, lot_messages, system_prompt))
+            self._publish_reduced(output)
         output.metadata["timeline"] = self.build_timeline_entry(started)
         return output
@@ -3,12 +3,11 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
 from typing import Any, Dict
 
 from src.agents.base import BaseAgent
+from src.agents.context import build_context
 from src.agents.core.prompts import PRIORITIZATION_ENGINE_PROMPT
-from src.schemas.models import AgentOutput
 
 logger = logging.getLogger(__name__)
 
@@ -21,19 +20,9 @@ class PrioritizationAgent(BaseAgent):
             system_prompt=PRIORITIZATION_ENGINE_PROMPT,
         )
 
-    def run(self, state: Dict[str, Any]) -> AgentOutput:
-        started = datetime.now(timezone.utc)
-        logger.info(f"[{self.agent_id}] Starting prioritization")
-
-        user_message = (
-            f"Recommandations à prioriser :\n{state.get('recommendations', [])}\n\n"
-            f"Risques identifiés :\n{state.get('risks', [])}\n\n"
-            f"Findings :\n{state.get('findings', [])}\n\n"
+    def build_user_message(self, state: Dict[str, Any]) -> str:
+        return (
+            f"{build_context(state, self.agent_id)}\n\n"
             f"Score et classe chaque recommandation. "
             f"Identifie les quick wins et construis la roadmap 3/6/12 mois."
         )
-
-        raw = self.invoke_llm(user_message)
-        output = self.parse_output(raw)
-        output.metadata["timeline"] = self.build_timeline_entry(started)
-        return output
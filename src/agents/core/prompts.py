@@ -538,3 +538,27 @@ Le format est identique au schéma AgentOutput standard :
 - Utilise le prisme de ton expertise pointue, ne duplique pas le travail des agents core
 - Focus sur les insights que SEUL un spécialiste de {plugin_name} peut produire
 """
+
+# ═══════════════════════════════════════════════════════════════════════════
+# JSON REPAIR (reprompt après une sortie invalide)
+# ═══════════════════════════════════════════════════════════════════════════
+
+JSON_REPAIR_PROMPT = """\
+# Rôle
+Tu corriges une sortie JSON produite par un agent de l'IAG Audit Factory.
+
+# Mission
+La sortie ci-dessous n'a pas passé la validation du schéma AgentOutput.
+Corrige-la en tenant compte de l'erreur indiquée :
+- Conserve tout le contenu valide (findings, risques, recommandations, scores)
+- Corrige uniquement la syntaxe ou les champs en erreur
+- N'invente aucun nouveau constat
+"""
+
+JSON_REPAIR_TEMPLATE = """\
+Erreur de validation :
+{error}
+
+Sortie à corriger :
+{output}
+"""
@@ -0,0 +1,38 @@
+"""Core agent registry — maps core agent IDs to their agent classes.
+
+The IDs match `router.CORE_AGENT_IDS` and `router.POST_ANALYSIS_AGENT_IDS`
+so the orchestrator can fan out to any agent by ID.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Type
+
+from src.agents.base import BaseAgent
+
+
+def _lazy_registry() -> Dict[str, Type[BaseAgent]]:
+    """Lazy imports to avoid circular dependencies."""
+    from src.agents.core.data_scanner import DataScannerAgent
+    from src.agents.core.process_mapper import ProcessMapperAgent
+    from src.agents.core.benchmark import BenchmarkAgent
+    from src.agents.core.risk_compliance import RiskComplianceAgent
+    from src.agents.core.roi_modeler import ROIModelerAgent
+    from src.agents.core.prioritization import PrioritizationAgent
+    from src.agents.core.report_generator import ReportGeneratorAgent
+
+    return {
+        "data_scanner": DataScannerAgent,
+        "process_mapper": ProcessMapperAgent,
+        "benchmark": BenchmarkAgent,
+        "risk_compliance": RiskComplianceAgent,
+        "roi_modeler": ROIModelerAgent,
+        "prioritization": PrioritizationAgent,
+        "report_generator": ReportGeneratorAgent,
+    }
+
+
+def get_core_agents(agent_ids: List[str]) -> List[BaseAgent]:
+    """Instantiate the requested core agents, skipping unknown IDs."""
+    registry = _lazy_registry()
+    return [registry[aid]() for aid in agent_ids if aid in registry]
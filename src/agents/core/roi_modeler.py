@@ -3,12 +3,11 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
 from typing import Any, Dict
 
 from src.agents.base import BaseAgent
+from src.agents.context import build_context
 from src.agents.core.prompts import ROI_MODELER_PROMPT
-from src.schemas.models import AgentOutput
 
 logger = logging.getLogger(__name__)
 
@@ -21,21 +20,12 @@ class ROIModelerAgent(BaseAgent):
             system_prompt=ROI_MODELER_PROMPT,
         )
 
-    def run(self, state: Dict[str, Any]) -> AgentOutput:
-        started = datetime.now(timezone.utc)
-        logger.info(f"[{self.agent_id}] Starting ROI modeling")
-
+    def build_user_message(self, state: Dict[str, Any]) -> str:
         ctx = state.get("client_context", {})
-        user_message = (
+        return (
             f"Contexte client :\n"
             f"- Entreprise : {ctx.get('name', 'N/A')}\n"
             f"- Industrie : {ctx.get('industry', 'N/A')}\n\n"
-            f"Recommandations consolidées :\n{state.get('recommendations', [])}\n\n"
-            f"Risques consolidés :\n{state.get('risks', [])}\n\n"
+            f"{build_context(state, self.agent_id)}\n\n"
             f"Produis 3 scénarios ROI (conservateur / target / ambitieux)."
         )
-
-        raw = self.invoke_llm(user_message)
-        output = self.parse_output(raw)
-        output.metadata["timeline"] = self.build_timeline_entry(started)
-        return output
@@ -18,6 +18,9 @@ class StitchDesignerAgent:
         Calls Google Stitch via MCP to generate a premium React dashboard 
         based on the audit findings.
         """
+        if not self.api_key:
+            return {"status": "skipped", "message": "STITCH_API_KEY non configurée"}
+
         print(f"[{self.agent_name}] Generating premium UI for {audit_data.get('audit_type')}...")
         
         # Prepare the prompt for Stitch
@@ -61,8 +64,10 @@ class StitchDesignerAgent:
             return {"status": "error", "message": str(e)}
 
     def _build_stitch_prompt(self, data: Dict[str, Any]) -> str:
-        findings_summary = "\n".join([f"- {f.description}" for f in data.get("findings", [])[:3]])
+        findings_summary = "\n".join([f"- {f.get('description', '')}" for f in data.get("findings", [])[:3]])
         client_name = data.get("client_context", {}).get("name", "Client")
+        roi_scenarios = (data.get("roi_model") or {}).get("scenarios") or []
+        payback_months = roi_scenarios[0].get("payback_months", 12) if roi_scenarios else 12
         
         return f"""
         Crée un Cockpit d'Audit premium et "wow" pour le client {client_name}.
@@ -72,7 +77,7 @@ class StitchDesignerAgent:
         1. Résumé Exécutif avec de gros indicateurs clés.
         2. Top Findings :
         {findings_summary}
-        3. Un graphique de ROI (basé sur un payback de {data.get('roi_model', {}).payback_period_months if data.get('roi_model') else 12} mois).
+        3. Un graphique de ROI (basé sur un payback de {payback_months:.0f} mois).
         4. Une timeline interactive de 12 mois pour la roadmap.
         
         L'interface doit paraître extrêmement experte et technologique.
@@ -0,0 +1,358 @@
+"""Map-reduce analysis of large document sets.
+
+The data scanner embeds the client's documents in its prompt. For large
+audits (hundreds of documents) that prompt no longer fits the model's
+context window (settings.llm_context_window_tokens), so the documents are
+analysed in lots instead:
+
+1. Map: the documents are packed into lots of at most
+   settings.map_reduce_lot_tokens — a larger document is cut into parts —
+   and each lot gets its own LLM call. Lots run in parallel,
+   settings.max_parallel_agents at a time, through the shared pool.
+2. Reduce: the partial outputs are merged settings.map_reduce_fan_in at a
+   time, level by level, until one AgentOutput remains. Duplicates (same
+   finding, risk or recommendation title, maturity dimension) become one
+   item carrying the union of their SourceReferences.
+3. Ids are renumbered once at the end (DS-001, DS-002, ...), and
+   dependencies follow the merged and renumbered ids.
+
+The reduce is a deterministic merge, not an LLM call: it never drops a
+citation and costs no tokens. Lots that fail are reported in
+`metadata["map_reduce"]["failed_lots"]`; the other lots are kept.
+
+Map calls publish no streamed items: their ids are renumbered and their
+duplicates merged by the reduce. The agent publishes the reduced output
+instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langgraph.errors import GraphBubbleUp
+
+from src.agents.base import BaseAgent
+from src.config import settings
+from src.connectors.local_upload import read_document_text
+from src.llm.batch import batch_mode_enabled
+from src.llm.ledger import BudgetExceededError
+from src.llm.pool import _CHARS_PER_TOKEN, estimate_tokens
+from src.schemas.models import AgentOutput, SourceReference
+
+logger = logging.getLogger(__name__)
+
+_LEVELS = {"LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
+# Per-agent metadata that is bookkeeping, not analysis
+_RUN_METADATA = {"timeline", "salvage", "parse_error", "raw", "map_error", "map_reduce"}
+_TRAILING_NUMBER = re.compile(r"^(.*?)(\d+)$")
+
+
+# ─── Documents and lots ───────────────────────────────────────────────────
+
+@dataclass
+class DocumentPart:
+    """A document, or one part of a document too large for a lot."""
+
+    doc_id: str
+    name: str
+    text: Optional[str]                      # None: content not extracted (binary format)
+    part: int = 1
+    parts: int = 1
+
+    def render(self) -> str:
+        label = self.name if self.parts == 1 else f"{self.name} (partie {self.part}/{self.parts})"
+        body = self.text if self.text is not None else "(contenu non extrait)"
+        return f"### [{self.doc_id}] {label}\n{body}"
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+
+def load_documents(sources_index: Dict[str, Any]) -> List[DocumentPart]:
+    """One part per indexed document, with its text when it can be read."""
+    return [
+        DocumentPart(doc_id, meta.get("name", doc_id), read_document_text(meta))
+        for doc_id, meta in sources_index.items()
+    ]
+
+
+def render_documents(documents: Iterable[DocumentPart]) -> str:
+    return "\n\n".join(document.render() for document in documents)
+
+
+def fits_context(system_prompt: str, user_message: str) -> bool:
+    """Whether a single call (prompt + output budget) fits the context window."""
+    needed = estimate_tokens([system_prompt, user_message]) + settings.token_budget_per_agent
+    return needed <= settings.llm_context_window_tokens
+
+
+def _split(document: DocumentPart, max_tokens: int) -> List[DocumentPart]:
+    """Cut a document into parts of at most `max_tokens`, at line breaks when possible."""
+    if document.text is None or document.tokens <= max_tokens:
+        return [document]
+    header = estimate_tokens(f"### [{document.doc_id}] {document.name} (partie 999/999)\n")
+    size = max(1, max_tokens - header) * _CHARS_PER_TOKEN
+    texts: List[str] = []
+    text = document.text
+    while text:
+        cut = len(text) if len(text) <= size else text.rfind("\n", size // 2, size) + 1 or size
+        texts.append(text[:cut])
+        text = text[cut:]
+    return [
+        DocumentPart(document.doc_id, document.name, part_text, index, len(texts))
+        for index, part_text in enumerate(texts, 1)
+    ]
+
+
+def plan_lots(documents: List[DocumentPart], max_tokens: int) -> List[List[DocumentPart]]:
+    """Pack the documents, in order, into lots of at most `max_tokens`."""
+    lots: List[List[DocumentPart]] = []
+    used = max_tokens
+    for document in documents:
+        for part in _split(document, max_tokens):
+            if used + part.tokens > max_tokens:
+                lots.append([])
+                used = 0
+            lots[-1].append(part)
+            used += part.tokens
+    return lots
+
+
+# ─── Map ──────────────────────────────────────────────────────────────────
+
+def _failed(agent: BaseAgent, error: Exception) -> AgentOutput:
+    logger.error(f"[{agent.agent_id}] Map call failed: {error}")
+    return AgentOutput(agent_id=agent.agent_id, agent_name=agent.agent_name,
+                       metadata={"map_error": str(error)})
+
+
+def _map_width() -> int:
+    # Batch mode pauses the node on every call: lots run one at a time so
+    # the resumed calls replay in the same order
+    return 1 if batch_mode_enabled() else max(1, settings.max_parallel_agents)
+
+
+def map_outputs(agent: BaseAgent, messages: List[str], system_prompt: str) -> List[AgentOutput]:
+    """Run one `agent` call per lot message, in parallel worker threads."""
+
+    def call(message: str) -> AgentOutput:
+        try:
+            return agent._complete(message, system_prompt, publish=False)
+        except (BudgetExceededError, GraphBubbleUp):
+            raise
+        except Exception as e:
+            return _failed(agent, e)
+
+    width = min(_map_width(), len(messages))
+    if width <= 1:
+        return [call(message) for message in messages]
+    with ThreadPoolExecutor(max_workers=width, thread_name_prefix=agent.agent_id) as executor:
+        # Each worker carries the node's context (ledger scope, tracing span, stream writer)
+        futures = [executor.submit(contextvars.copy_context().run, call, message) for message in messages]
+        return [future.result() for future in futures]
+
+
+async def amap_outputs(agent: BaseAgent, messages: List[str], system_prompt: str) -> List[AgentOutput]:
+    """Async `map_outputs` — lots are awaited concurrently."""
+    slots = asyncio.Semaphore(_map_width())
+
+    async def call(message: str) -> AgentOutput:
+        async with slots:
+            try:
+                return await agent._acomplete(message, system_prompt, publish=False)
+            except (BudgetExceededError, GraphBubbleUp):
+                raise
+            except Exception as e:
+                return _failed(agent, e)
+
+    return list(await asyncio.gather(*(call(message) for message in messages)))
+
+
+# ─── Reduce ───────────────────────────────────────────────────────────────
+
+def _norm(text: str) -> str:
+    return " ".join(text.casefold().split()).rstrip(".")
+
+
+def _rank(value: Any) -> int:
+    return _LEVELS.get(getattr(value, "value", value), 0)
+
+
+def _union(*lists: List[Any]) -> List[Any]:
+    return list(dict.fromkeys(item for items in lists for item in items))
+
+
+def _union_sources(*lists: List[SourceReference]) -> List[SourceReference]:
+    merged: Dict[Tuple[Any, ...], SourceReference] = {}
+    for sources in lists:
+        for source in sources:
+            merged.setdefault((source.doc_id, source.section, source.page, source.snippet), source)
+    return list(merged.values())
+
+
+def _merge_item(field: str, kept: Any, other: Any) -> Any:
+    update: Dict[str, Any] = {"sources": _union_sources(kept.sources, other.sources)}
+    if field == "findings":
+        update["severity"] = max(kept.severity, other.severity, key=_rank)
+        update["tags"] = _union(kept.tags, other.tags)
+    elif field == "risks":
+        update["impact"] = max(kept.impact, other.impact, key=_rank)
+        update["probability"] = max(kept.probability, other.probability, key=_rank)
+        update["mitigations"] = _union(kept.mitigations, other.mitigations)
+        update["dependencies"] = _union(kept.dependencies, other.dependencies)
+    elif field == "recommendations":
+        update["impact"] = max(kept.impact, other.impact, key=_rank)
+        scores = [s for s in (kept.priority_score, other.priority_score) if s is not None]
+        update["priority_score"] = max(scores) if scores else None
+        update["dependencies"] = _union(kept.dependencies, other.dependencies)
+    else:
+        # Mean score weighted by evidence: merged scores weigh their pooled sources
+        weights = [max(1, len(kept.sources)), max(1, len(other.sources))]
+        mean = (kept.score * weights[0] + other.score * weights[1]) / sum(weights)
+        update["score"] = type(kept.score)(int(mean + 0.5))
+        update["gaps"] = _union(kept.gaps, other.gaps)
+    return kept.model_copy(update=update)
+
+
+def _merge_key(field: str, item: Any) -> Tuple[str, ...]:
+    if field == "findings":
+        return item.category.casefold(), _norm(item.description)
+    if field == "maturity_scores":
+        return (item.dimension,)
+    return (_norm(item.title),)
+
+
+def _merge_metadata(outputs: List[AgentOutput]) -> Dict[str, Any]:
+    """Counts add up, lists are joined, anything else keeps its first value."""
+    merged: Dict[str, Any] = {}
+    for output in outputs:
+        for key, value in output.metadata.items():
+            if key in _RUN_METADATA:
+                continue
+            current = merged.get(key)
+            if key not in merged:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) \
+                    and isinstance(current, (int, float)) and not isinstance(current, bool):
+                merged[key] = current + value
+            elif isinstance(value, list) and isinstance(current, list):
+                current.extend(v for v in value if v not in current)
+    salvages = [o.metadata["salvage"] for o in outputs if "salvage" in o.metadata]
+    if salvages:
+        merged["salvage"] = {
+            "repairs": _union(*(s.get("repairs", []) for s in salvages)),
+            "rejected": [r for s in salvages for r in s.get("rejected", [])],
+        }
+    return merged
+
+
+def merge_outputs(
+    outputs: List[AgentOutput], aliases: Dict[str, str], merged: Dict[str, int]
+) -> AgentOutput:
+    """One reduce step: merge `outputs` into one, deduplicating their items.
+
+    The id of every absorbed item is recorded in `aliases` (absorbed id →
+    kept id) and counted in `merged` per field.
+    """
+    fields: Dict[str, List[Any]] = {}
+    for field in ("findings", "risks", "recommendations", "maturity_scores"):
+        kept: Dict[Tuple[str, ...], Any] = {}
+        for output in outputs:
+            for item in getattr(output, field):
+                key = _merge_key(field, item)
+                if key not in kept:
+                    kept[key] = item
+                    continue
+                kept[key] = _merge_item(field, kept[key], item)
+                merged[field] = merged.get(field, 0) + 1
+                if field != "maturity_scores":
+                    aliases[item.id] = kept[key].id
+        fields[field] = list(kept.values())
+    return outputs[0].model_copy(update={**fields, "metadata": _merge_metadata(outputs)})
+
+
+def _scope(output: AgentOutput, lot: int) -> AgentOutput:
+    """Make the ids of a lot's items unique across lots (`L3:DS-001`)."""
+    ids = {item.id for field in ("findings", "risks", "recommendations") for item in getattr(output, field)}
+
+    def scoped(item: Any) -> Any:
+        update = {"id": f"L{lot}:{item.id}"}
+        if hasattr(item, "dependencies"):
+            update["dependencies"] = [f"L{lot}:{d}" if d in ids else d for d in item.dependencies]
+        return item.model_copy(update=update)
+
+    return output.model_copy(update={
+        field: [scoped(item) for item in getattr(output, field)]
+        for field in ("findings", "risks", "recommendations")
+    })
+
+
+def _renumber(output: AgentOutput, aliases: Dict[str, str]) -> AgentOutput:
+    """Replace the lot-scoped ids with sequential ones, keeping the model's prefixes."""
+    counters: Dict[str, int] = {}
+    renamed: Dict[str, str] = {}
+    items: Dict[str, List[Any]] = {}
+    for field in ("findings", "risks", "recommendations"):
+        items[field] = []
+        for item in getattr(output, field):
+            original = item.id.split(":", 1)[1]
+            match = _TRAILING_NUMBER.match(original)
+            prefix, width = (match.group(1), len(match.group(2))) if match else (f"{original}-", 3)
+            counters[prefix] = counters.get(prefix, 0) + 1
+            new_id = f"{prefix}{counters[prefix]:0{width}d}"
+            renamed.setdefault(item.id, new_id)
+            items[field].append((item, new_id))
+
+    def resolve(ref: str) -> str:
+        while ref in aliases:
+            ref = aliases[ref]
+        return renamed.get(ref, ref)
+
+    fields: Dict[str, List[Any]] = {}
+    for field, pairs in items.items():
+        fields[field] = []
+        for item, new_id in pairs:
+            update: Dict[str, Any] = {"id": new_id}
+            if hasattr(item, "dependencies"):
+                update["dependencies"] = [
+                    d for d in _union([resolve(d) for d in item.dependencies]) if d != new_id
+                ]
+            fields[field].append(item.model_copy(update=update))
+    return output.model_copy(update=fields)
+
+
+def reduce_outputs(outputs: List[AgentOutput], fan_in: Optional[int] = None) -> AgentOutput:
+    """Merge the lots' partial outputs, `fan_in` at a time, into one AgentOutput.
+
+    Adjacent lots (parts of the same document) are merged first.
+    """
+    fan_in = max(2, fan_in or settings.map_reduce_fan_in)
+    failed = [
+        {"lot": lot, "error": output.metadata.get("map_error") or output.metadata["parse_error"]}
+        for lot, output in enumerate(outputs, 1)
+        if "map_error" in output.metadata or "parse_error" in output.metadata
+    ]
+    aliases: Dict[str, str] = {}
+    merged: Dict[str, int] = {}
+    level = [_scope(output, lot) for lot, output in enumerate(outputs, 1)]
+    levels = 0
+    while len(level) > 1:
+        level = [merge_outputs(level[i:i + fan_in], aliases, merged) for i in range(0, len(level), fan_in)]
+        levels += 1
+    output = _renumber(level[0] if levels else merge_outputs(level, aliases, merged), aliases)
+    output.metadata["map_reduce"] = {
+        "lots": len(outputs), "levels": levels, "merged": merged, "failed_lots": failed,
+    }
+    logger.info(
+        f"[{output.agent_id}] Reduced {len(outputs)} lots in {levels} levels: "
+        f"{len(output.findings)} findings ({merged.get('findings', 0)} merged), "
+        f"{len(failed)} failed lots"
+    )
+    return output
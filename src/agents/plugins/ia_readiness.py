@@ -7,12 +7,10 @@ gouvernance data, cas d'usage IA, ROI potentiel, MLOps readiness.
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
 from typing import Any, Dict
 
 from src.agents.base import BaseAgent
 from src.agents.core.prompts import PLUGIN_AGENT_PROMPT_TEMPLATE
-from src.schemas.models import AgentOutput
 
 logger = logging.getLogger(__name__)
 
@@ -45,32 +43,19 @@ IA_READINESS_PROMPT = PLUGIN_AGENT_PROMPT_TEMPLATE.format(
 )
 
 
-class IAReadinessAgent:
+class IAReadinessPlugin(BaseAgent):
     def __init__(self):
-        self.plugin_name = "IA Readiness Evaluator"
-        self.directives = "Maturité data, cas d'usage IA, ROI potentiel, gouvernance IA"
-        # We can reuse the shared LLM if passed, but for now we'll initialize
-        self.llm = ChatAnthropic(model="claude-3-5-sonnet-latest", temperature=0)
+        super().__init__(
+            agent_id="ia_readiness",
+            agent_name="IA Readiness Evaluator",
+            system_prompt=IA_READINESS_PROMPT,
+        )
 
-    def analyze(self, context: dict):
-        print(f"[{self.plugin_name}] Analyzing via Claude...")
-        
-        # Use structured output for Findings
-        # Note: In a real complex agent, we might want a list of Findings.
-        # For this MVP, we'll ask for one prominent finding.
-        structured_llm = self.llm.with_structured_output(Finding)
-        
-        prompt = PLUGIN_PATTERN_PROMPT.format(
-            plugin_name=self.plugin_name,
-            directives=self.directives
+    def build_user_message(self, state: Dict[str, Any]) -> str:
+        ctx = state.get("client_context", {})
+        return (
+            f"Contexte client : {ctx.get('name', 'N/A')} — {ctx.get('industry', 'N/A')}\n"
+            f"Objectifs : {ctx.get('objectives', 'N/A')}\n"
+            f"Documents : {ctx.get('docs_provided', [])}\n\n"
+            f"Évalue la maturité IA sur les 6 axes."
         )
-        
-        try:
-            finding = structured_llm.invoke([
-                ("system", prompt),
-                ("human", f"Context: {context}")
-            ])
-            return {"findings": [finding]}
-        except Exception as e:
-            print(f"Error in {self.plugin_name}: {e}")
-            return {"findings": []}
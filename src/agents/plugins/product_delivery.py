@@ -3,12 +3,10 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
 from typing import Any, Dict
 
 from src.agents.base import BaseAgent
 from src.agents.core.prompts import PLUGIN_AGENT_PROMPT_TEMPLATE
-from src.schemas.models import AgentOutput
 
 logger = logging.getLogger(__name__)
 
@@ -46,18 +44,10 @@ class ProductDeliveryPlugin(BaseAgent):
             system_prompt=PRODUCT_DELIVERY_PROMPT,
         )
 
-    def run(self, state: Dict[str, Any]) -> AgentOutput:
-        started = datetime.now(timezone.utc)
-        logger.info(f"[{self.agent_id}] Starting Product & Delivery evaluation")
-
+    def build_user_message(self, state: Dict[str, Any]) -> str:
         ctx = state.get("client_context", {})
-        user_message = (
+        return (
             f"Contexte client : {ctx.get('name', 'N/A')} — {ctx.get('industry', 'N/A')}\n"
             f"Documents : {ctx.get('docs_provided', [])}\n\n"
             f"Évalue la maturité produit, le time-to-market et la delivery."
         )
-
-        raw = self.invoke_llm(user_message)
-        output = self.parse_output(raw)
-        output.metadata["timeline"] = self.build_timeline_entry(started)
-        return output
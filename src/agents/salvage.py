@@ -0,0 +1,191 @@
+"""Partial salvage of a broken agent response.
+
+When strict validation of an agent's JSON fails, the response is rarely
+worthless: one finding misses a field, the model appended a sentence
+after the JSON, or the output was cut at `max_tokens` in the middle of
+the last recommendation. Instead of discarding everything (and paying
+for a repair reprompt), this module:
+
+1. Repairs common syntax defects (`repair_json`):
+   - prose or code fences around the JSON object
+   - trailing commas before `}` / `]`
+   - unescaped double quotes inside strings
+   - truncation: the text is cut back to the last complete value and the
+     open strings, arrays and objects are closed
+2. Validates `findings`, `risks`, `recommendations` and `maturity_scores`
+   item by item (`salvage_output`), keeping every valid item and
+   reporting the rejected ones with their validation error.
+
+The salvaged AgentOutput carries `metadata["salvage"]`:
+
+    {"repairs": ["truncated", ...],
+     "rejected": [{"field": "findings", "index": 3, "id": "F-004", "error": "..."}]}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from src.schemas.models import AgentOutput, Finding, MaturityScore, Recommendation, Risk
+
+logger = logging.getLogger(__name__)
+
+# AgentOutput list fields validated item by item
+ITEM_MODELS: Dict[str, type[BaseModel]] = {
+    "findings": Finding,
+    "risks": Risk,
+    "recommendations": Recommendation,
+    "maturity_scores": MaturityScore,
+}
+
+_CLOSERS = {"{": "}", "[": "]"}
+# After a closing quote, the next significant character is one of these
+_AFTER_STRING = set(",:}]")
+# ... and after a comma, the next value or key starts with one of these
+_VALUE_STARTS = set('"{[]}-0123456789tfn')
+
+
+def _next_significant(text: str, start: int) -> Tuple[int, str]:
+    index = start
+    while index < len(text) and text[index].isspace():
+        index += 1
+    return index, text[index] if index < len(text) else ""
+
+
+def _closes_string(text: str, index: int) -> bool:
+    """Whether the quote at `index` ends the string (rather than being a stray quote inside it)."""
+    after, char = _next_significant(text, index + 1)
+    if char == "" or char in ":}]":
+        return True
+    if char == ",":
+        return _next_significant(text, after + 1)[1] in _VALUE_STARTS | {""}
+    return False
+
+
+def repair_json(raw: str) -> Tuple[Optional[Any], List[str]]:
+    """Best-effort decode of `raw` with the defects above repaired.
+
+    Returns (value, repairs applied), or (None, repairs) when no JSON
+    object could be recovered.
+    """
+    repairs: List[str] = []
+    start = raw.find("{")
+    if start < 0:
+        return None, repairs
+    if raw[:start].strip():
+        repairs.append("leading_text")
+
+    out: List[str] = []
+    stack: List[str] = []
+    # Last point where the text so far is a valid prefix: (output length, open containers)
+    safe: Tuple[int, Tuple[str, ...]] = (0, ())
+    in_string = escaped = False
+    index = start
+    end = len(raw)
+    while index < end:
+        char = raw[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                if _closes_string(raw, index):
+                    in_string = False
+                else:
+                    out.append("\\")
+                    if "unescaped_quote" not in repairs:
+                        repairs.append("unescaped_quote")
+            out.append(char)
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char in _CLOSERS:
+            stack.append(char)
+            out.append(char)
+            safe = (len(out), tuple(stack))
+        elif char in "}]":
+            while out and (out[-1].isspace() or out[-1] == ","):
+                if out.pop() == "," and "trailing_comma" not in repairs:
+                    repairs.append("trailing_comma")
+            if not stack or _CLOSERS[stack[-1]] != char:
+                break
+            stack.pop()
+            out.append(char)
+            safe = (len(out), tuple(stack))
+            if not stack:
+                break
+        elif char == ",":
+            safe = (len(out), tuple(stack))
+            out.append(char)
+        else:
+            out.append(char)
+        index += 1
+
+    if stack:
+        length, open_containers = safe
+        text = "".join(out[:length]).rstrip().rstrip(",")
+        text += "".join(_CLOSERS[c] for c in reversed(open_containers))
+        repairs.append("truncated")
+    else:
+        text = "".join(out)
+        if raw[index + 1:].strip():
+            repairs.append("trailing_text")
+
+    try:
+        return json.loads(text, strict=False), repairs
+    except ValueError:
+        return None, repairs
+
+
+def _item_key(item: Any) -> Optional[str]:
+    if isinstance(item, dict):
+        return item.get("id") or item.get("dimension")
+    return None
+
+
+def salvage_output(raw: str, agent_id: str, agent_name: str) -> Optional[AgentOutput]:
+    """AgentOutput made of the valid items of a broken response.
+
+    Returns None when nothing could be recovered (no JSON object, or no
+    valid item at all): the caller falls back to a repair reprompt.
+    """
+    data, repairs = repair_json(raw)
+    if not isinstance(data, dict):
+        return None
+    context = {"agent_id": agent_id, "agent_name": agent_name}
+    kept: Dict[str, List[BaseModel]] = {}
+    rejected: List[Dict[str, Any]] = []
+    for field, model in ITEM_MODELS.items():
+        items = data.get(field) or []
+        if not isinstance(items, list):
+            rejected.append({"field": field, "index": None, "id": None, "error": "expected a list"})
+            continue
+        kept[field] = []
+        for index, item in enumerate(items):
+            try:
+                kept[field].append(model.model_validate(item, context=context))
+            except ValidationError as e:
+                error = e.errors()[0]
+                rejected.append({
+                    "field": field, "index": index, "id": _item_key(item),
+                    "error": f"{'.'.join(map(str, error['loc']))}: {error['msg']}",
+                })
+    if not any(kept.values()):
+        return None
+
+    metadata = data.get("metadata") if isinstance(data.get("metadata"), dict) else {}
+    logger.warning(
+        f"[{agent_id}] Salvaged output ({', '.join(repairs) or 'no syntax repair'}): "
+        f"kept {sum(map(len, kept.values()))} items, rejected {len(rejected)}"
+    )
+    return AgentOutput.model_construct(
+        agent_id=agent_id,
+        agent_name=agent_name,
+        **kept,
+        metadata={**metadata, "salvage": {"repairs": repairs, "rejected": rejected}},
+    )
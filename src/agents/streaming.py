@@ -0,0 +1,288 @@
+"""Streamed agent responses — items published as soon as they close.
+
+An agent response is one JSON object whose `findings`, `risks`,
+`recommendations` and `maturity_scores` arrays hold the items. With
+settings.llm_streaming, BaseAgent reads the response as it streams in
+and feeds it to an `ItemStreamParser`, which returns each item the moment
+its closing brace arrives. Valid items are published on the graph's
+custom stream:
+
+    ("custom", {"type": "agent_item", "agent_id": "data_scanner", "attempt": 1,
+                "field": "findings", "index": 0, "item": {...}})
+
+so `stream_audit` consumers (CLI, Streamlit console) can render them
+long before the agent node returns. The node's state update is still
+built from the full response; the events are a preview of it, and items
+of a discarded response (retry, repair reprompt) are retracted. A
+map-reduced output is published once, after the reduce. The
+report generator streams its markdown the same way (`ReportStreamer`).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+from langchain_core.messages.ai import add_usage
+from langgraph.config import get_stream_writer
+from pydantic import BaseModel, ValidationError
+
+from src.agents.salvage import ITEM_MODELS
+from src.schemas.models import AgentOutput
+
+StreamedItem = Tuple[str, int, Any]  # (field, index in its array, decoded item)
+
+
+class ItemStreamParser:
+    """Incremental scanner returning the items of the response's arrays as they close.
+
+    Text is scanned once; consumed text outside the current item is
+    discarded, so memory stays bounded by the largest item.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None   # last string at the top level
+        self._field: Optional[str] = None      # top-level key being read
+        self._item_start: Optional[int] = None
+        self._counts = {field: 0 for field in ITEM_MODELS}
+
+    def feed(self, text: str) -> List[StreamedItem]:
+        self._buffer += text
+        buffer, items = self._buffer, []
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = buffer[self._string_start + 1:index]
+            elif not self._stack and char != "{":
+                continue                      # text before the JSON object
+            elif char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ":" and len(self._stack) == 1:
+                self._field = self._last_key
+            elif char in "{[":
+                if char == "{" and self._stack == ["{", "["] and self._field in self._counts:
+                    self._item_start = index
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if char == "}" and self._item_start is not None and self._stack == ["{", "["]:
+                    items += self._close_item(buffer[self._item_start:index + 1])
+                    self._item_start = None
+        self._pos = len(buffer)
+        self._compact()
+        return items
+
+    def _close_item(self, text: str) -> List[StreamedItem]:
+        field = self._field
+        index = self._counts[field]
+        self._counts[field] += 1
+        try:
+            return [(field, index, json.loads(text, strict=False))]
+        except ValueError:
+            return []
+
+    def _compact(self) -> None:
+        keep = self._pos
+        if self._item_start is not None:
+            keep = min(keep, self._item_start)
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if keep:
+            self._buffer = self._buffer[keep:]
+            self._pos -= keep
+            self._string_start -= keep
+            if self._item_start is not None:
+                self._item_start -= keep
+
+
+class ItemPublisher:
+    """Validates streamed items and writes them to the graph's custom stream.
+
+    One publisher serves a whole agent call (`BaseAgent._complete`: first
+    call and repair reprompts). Every LLM attempt — transport retry,
+    repair reprompt, cache hit — opens with `start_attempt()`. The items of
+    the previous attempt belong to a discarded response, so they are
+    retracted with one event:
+
+        ("custom", {"type": "agent_items_retracted", "agent_id": ..., "attempt": 1,
+                    "items": [{"field": "findings", "index": 0}, ...]})
+
+    `discard()` retracts the current attempt when the call ends without a
+    usable output.
+    """
+
+    def __init__(self, agent_id: str, agent_name: str, writer: Callable[[Any], None]):
+        self.agent_id = agent_id
+        self._context = {"agent_id": agent_id, "agent_name": agent_name}
+        self._writer = writer
+        self._parser = ItemStreamParser()
+        self._published: Dict[Tuple[str, int], None] = {}
+        self.attempt = 0
+
+    def start_attempt(self) -> None:
+        self.discard()
+        self._parser = ItemStreamParser()
+        self.attempt += 1
+
+    def discard(self) -> None:
+        """Retract the items published by the current attempt."""
+        if self._published:
+            self._writer({
+                "type": "agent_items_retracted", "agent_id": self.agent_id, "attempt": self.attempt,
+                "items": [{"field": field, "index": index} for field, index in self._published],
+            })
+        self._published = {}
+
+    def feed(self, text: str) -> None:
+        """Publish the items closed by the next piece of response text."""
+        self.publish(self._parser.feed(text))
+
+    def publish(self, items: List[StreamedItem]) -> None:
+        for field, index, item in items:
+            if (field, index) in self._published:
+                continue
+            try:
+                model = ITEM_MODELS[field].model_validate(item, context=self._context)
+            except ValidationError:
+                continue                      # reported by parse_output / salvage
+            self._write(field, index, model)
+
+    def publish_output(self, output: AgentOutput) -> None:
+        """Publish an output assembled without streaming (map-reduce), as one attempt."""
+        self.start_attempt()
+        for field in ITEM_MODELS:
+            for index, model in enumerate(getattr(output, field)):
+                self._write(field, index, model)
+
+    def _write(self, field: str, index: int, model: BaseModel) -> None:
+        self._published[(field, index)] = None
+        self._writer({
+            "type": "agent_item", "agent_id": self.agent_id, "attempt": self.attempt,
+            "field": field, "index": index, "item": model.model_dump(mode="json"),
+        })
+
+
+class ReportStreamer:
+    """Writes the report generator's markdown to the custom stream as it arrives.
+
+        ("custom", {"type": "report_chunk", "attempt": 1, "text": "..."})
+
+    A chunk of a new attempt (transport retry) starts the text over.
+    """
+
+    def __init__(self, writer: Callable[[Any], None]):
+        self._writer = writer
+        self.attempt = 0
+
+    def start_attempt(self) -> None:
+        self.attempt += 1
+
+    def feed(self, text: str) -> None:
+        if text:
+            self._writer({"type": "report_chunk", "attempt": self.attempt, "text": text})
+
+
+def is_item_event(mode: str, chunk: Any) -> bool:
+    """True for a ("custom", agent item) pair of an audit stream."""
+    return mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == "agent_item"
+
+
+def is_retraction(mode: str, chunk: Any) -> bool:
+    """True for a ("custom", retracted agent items) pair of an audit stream."""
+    return mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == "agent_items_retracted"
+
+
+def is_report_chunk(mode: str, chunk: Any) -> bool:
+    """True for a ("custom", report markdown chunk) pair of an audit stream."""
+    return mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == "report_chunk"
+
+
+def describe_item(event: Dict[str, Any], width: int = 90) -> str:
+    """One-line summary of an agent item event, for live consoles."""
+    item = event["item"]
+    if event["field"] == "findings":
+        text = f"constat [{item.get('severity')}] {item.get('description', '')}"
+    elif event["field"] == "risks":
+        text = f"risque [{item.get('impact')}] {item.get('title', '')}"
+    elif event["field"] == "recommendations":
+        text = f"recommandation [{item.get('impact')}] {item.get('title', '')}"
+    else:
+        text = f"maturité {item.get('dimension')} : {item.get('score')}/5"
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def describe_retraction(event: Dict[str, Any]) -> str:
+    """One-line summary of a retraction event, for live consoles."""
+    return f"{len(event['items'])} élément(s) retiré(s) (réponse abandonnée)"
+
+
+def _stream_writer() -> Optional[Callable[[Any], None]]:
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return None                            # not inside a graph run
+
+
+def item_publisher(agent_id: str, agent_name: str) -> Optional[ItemPublisher]:
+    """Publisher on the running graph's stream, or None outside a graph run."""
+    writer = _stream_writer()
+    return ItemPublisher(agent_id, agent_name, writer) if writer is not None else None
+
+
+def report_streamer() -> Optional[ReportStreamer]:
+    """Report streamer on the running graph's stream, or None outside a graph run."""
+    writer = _stream_writer()
+    return ReportStreamer(writer) if writer is not None else None
+
+
+def collect_stream(chunks: Iterable[Any], on_text: Callable[[str], None]) -> AIMessage:
+    """Join streamed message chunks into one AIMessage, passing each text to `on_text`."""
+    parts: List[str] = []
+    usage = None
+    for chunk in chunks:
+        text = chunk_text(chunk)
+        parts.append(text)
+        if getattr(chunk, "usage_metadata", None):
+            usage = add_usage(usage, chunk.usage_metadata)
+        on_text(text)
+    return AIMessage(content="".join(parts), usage_metadata=usage)
+
+
+async def acollect_stream(chunks: AsyncIterable[Any], on_text: Callable[[str], None]) -> AIMessage:
+    """Async `collect_stream`."""
+    parts: List[str] = []
+    usage = None
+    async for chunk in chunks:
+        text = chunk_text(chunk)
+        parts.append(text)
+        if getattr(chunk, "usage_metadata", None):
+            usage = add_usage(usage, chunk.usage_metadata)
+        on_text(text)
+    return AIMessage(content="".join(parts), usage_metadata=usage)
+
+
+def chunk_text(chunk: Any) -> str:
+    """Text of a streamed message chunk (plain string or content blocks)."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content or []
+        if not isinstance(block, dict) or block.get("type", "text") == "text"
+    )
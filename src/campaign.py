@@ -0,0 +1,106 @@
+"""Campaign CLI — run every audit of a JSONL / CSV manifest.
+
+    python -m src.campaign clients.jsonl --output results.jsonl
+    python -m src.campaign clients.csv --output-dir out/ --concurrency 8 --token-budget 2000000
+
+Audits run concurrently (see src.orchestrator.campaign for the manifest
+format); each one is written as soon as it finishes, and a throughput
+and failure summary is printed at the end. Set LLM_PROVIDER=mock to
+rehearse a campaign offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from src.llm.cache import bypass_llm_cache
+from src.orchestrator.campaign import (
+    AuditOutcome,
+    CampaignReport,
+    DirectoryOutput,
+    JsonlOutput,
+    read_manifest,
+    run_campaign,
+)
+
+logging.basicConfig(level=logging.WARNING, format="%(message)s", stream=sys.stderr)
+
+
+def _print_progress(outcome: AuditOutcome, done: list) -> None:
+    done.append(outcome)
+    detail = f"{outcome.duration_seconds:.1f}s, {outcome.tokens} tokens"
+    if outcome.errors:
+        detail += f", {len(outcome.errors)} erreur(s)"
+    print(f"  [{len(done):4d}] {outcome.audit_id:30s} {outcome.status:22s} {detail}")
+
+
+def _print_summary(report: CampaignReport) -> None:
+    print()
+    print("=" * 70)
+    print("  CAMPAGNE TERMINÉE")
+    print("=" * 70)
+    print(f"Audits                 : {len(report.outcomes)}")
+    print(f"  Terminés             : {report.count('completed')}")
+    print(f"  Terminés avec erreurs: {report.count('completed_with_errors')}")
+    print(f"  En échec             : {report.count('failed')}")
+    print(f"  Non lancés (budget)  : {report.count('skipped')}")
+    print(f"Durée                  : {report.elapsed_seconds:.1f}s")
+    print(f"Débit                  : {report.audits_per_hour:.1f} audits/heure")
+    print(f"Tokens LLM             : {report.tokens} (${report.cost_usd:.4f})")
+
+    failures = [o for o in report.outcomes if o.status in ("failed", "completed_with_errors")]
+    if failures:
+        print()
+        print("─" * 70)
+        print("ÉCHECS ET ERREURS:")
+        print("─" * 70)
+        for outcome in failures:
+            print(f"  [{outcome.audit_id}] {outcome.status}")
+            for error in outcome.errors[:3]:
+                print(f"      - {error}")
+            if len(outcome.errors) > 3:
+                print(f"      ... +{len(outcome.errors) - 3} autres")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run every audit of a JSONL / CSV manifest.")
+    parser.add_argument("manifest", help="Manifest file (.jsonl or .csv), one audit per row.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", metavar="FILE.jsonl",
+                        help="Append one JSON line per finished audit (state + deliverables).")
+    target.add_argument("--output-dir", metavar="DIR",
+                        help="Write one directory per audit (state, deliverables, status).")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Audits running at once (default: 4).")
+    parser.add_argument("--token-budget", type=int, default=0,
+                        help="Stop starting audits once the campaign has spent this many tokens.")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-run audits whose identical inputs were already audited.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the LLM response cache.")
+    args = parser.parse_args(argv)
+
+    output = JsonlOutput(args.output) if args.output else DirectoryOutput(args.output_dir)
+    done: list = []
+    print(f"Campagne : {args.manifest} (concurrence {args.concurrency})")
+    try:
+        with bypass_llm_cache(args.no_cache):
+            report = asyncio.run(run_campaign(
+                read_manifest(args.manifest),
+                output,
+                concurrency=args.concurrency,
+                token_budget=args.token_budget,
+                reuse_completed=not args.force,
+                on_outcome=lambda outcome: _print_progress(outcome, done),
+            ))
+    finally:
+        output.close()
+    _print_summary(report)
+    return 1 if report.count("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,7 +14,7 @@ load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 @dataclass
 class Settings:
-    llm_provider: str = "anthropic"          # "anthropic" | "openai"
+    llm_provider: str = "anthropic"          # "anthropic" | "openai" | "mock"
     llm_model: str = "claude-sonnet-4-5-20250929"
     llm_temperature: float = 0.2
 
@@ -23,13 +23,81 @@ class Settings:
 
     supabase_url: str = ""
     supabase_key: str = ""
+    supabase_db_url: str = ""                # Postgres URL, for the checkpoint backend
 
     vector_store_type: str = "pgvector"      # "pgvector" | "pinecone"
     pinecone_api_key: str = ""
 
     log_level: str = "INFO"
-    max_retries: int = 2
+    max_retries: int = 2                     # transport retries per LLM call
+    retry_backoff_seconds: float = 1.0       # base delay, doubled per attempt (jittered)
+    retry_backoff_max_seconds: float = 30.0
+    max_repair_attempts: int = 1             # repair reprompts after invalid JSON
+    llm_streaming: bool = True               # agents stream responses, items emitted as they close
     token_budget_per_agent: int = 8000
+    prompt_context_tokens: int = 12000       # cap on the audit data put in a prompt
+    llm_context_window_tokens: int = 200000  # beyond it, the data scanner runs map-reduce
+    map_reduce_lot_tokens: int = 40000       # document tokens per map call
+    map_reduce_fan_in: int = 4               # partial outputs merged per reduce step
+    max_parallel_agents: int = 4             # fan-out width of agent stages
+    max_parallel_plugins: int = 4            # concurrent plugin agents (process-wide)
+    plugin_timeout_seconds: float = 300.0
+
+    # Mock LLM backend (LLM_PROVIDER=mock) — seeded, schema-valid outputs
+    mock_llm_seed: int = 0
+    mock_llm_findings: int = 5               # items per agent call
+    mock_llm_risks: int = 3
+    mock_llm_recommendations: int = 3
+    mock_llm_maturity_scores: int = 2
+    mock_llm_latency_ms: float = 800.0       # median simulated latency (log-normal)
+    mock_llm_latency_sigma: float = 0.4
+
+    # Shared LLM rate limits (process-wide, 0 = unlimited)
+    llm_requests_per_minute: int = 50
+    llm_input_tokens_per_minute: int = 30000
+    llm_output_tokens_per_minute: int = 8000
+    llm_max_concurrency: int = 8             # upper bound; halved on every 429
+
+    # Per-audit LLM budget (0 = unlimited) — see src/llm/ledger.py
+    audit_budget_usd: float = 0.0
+    audit_budget_tokens: int = 0
+    budget_policy: str = "abort"             # "abort" | "degrade" | "skip_plugins"
+    budget_soft_limit: float = 0.8           # budget share at which degrade / skip_plugins apply
+    budget_degrade_model: str = ""           # default: cheaper model of the provider
+    llm_prices: str = ""                     # JSON {"model-prefix": {"input": $, "output": $}} per Mtok
+
+    prompt_caching_enabled: bool = True      # provider-side cache breakpoints (src/llm/prompt_cache.py)
+    prompt_cache_min_tokens: int = 1024      # shortest cacheable prefix (mock backend)
+
+    batch_dir: str = ".tmp/batches"          # local batch backend (src/llm/batch.py)
+    batch_poll_seconds: float = 60.0         # provider batch status polling interval
+
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = ".tmp/llm_cache.sqlite"
+    llm_cache_max_bytes: int = 256 * 1024 * 1024
+    llm_cache_ttl_seconds: float = 30 * 24 * 3600
+
+    audit_memo_enabled: bool = True          # reuse completed audits with identical inputs
+    audit_store_path: str = ".tmp/audits.sqlite"
+
+    checkpoint_enabled: bool = True          # persist state after every node (resume)
+    checkpoint_backend: str = "sqlite"       # "sqlite" | "supabase"
+    checkpoint_path: str = ".tmp/checkpoints.sqlite"
+    human_validation: str = "auto"           # "auto" | "required" (pause before ROI; needs checkpoints)
+
+    # Job queue + workers (python -m src.service)
+    queue_backend: str = "sqlite"            # "sqlite" | "supabase"
+    queue_path: str = ".tmp/jobs.sqlite"
+    job_lease_seconds: float = 120.0         # a job whose lease expires is handed to another worker
+    job_heartbeat_seconds: float = 15.0
+    job_max_attempts: int = 3
+    service_host: str = "127.0.0.1"
+    service_port: int = 8080
+    service_workers: int = 2
+
+    tracing_enabled: bool = True             # spans per node / LLM call
+    tracing_dir: str = ".tmp/traces"         # spans.jsonl + metrics.prom
+    otlp_endpoint: str = ""                  # optional OTLP/HTTP collector
 
     @classmethod
     def from_env(cls) -> Settings:
@@ -41,15 +109,71 @@ class Settings:
             openai_api_key=os.getenv("OPENAI_API_KEY", ""),
             supabase_url=os.getenv("SUPABASE_URL", ""),
             supabase_key=os.getenv("SUPABASE_KEY", ""),
+            supabase_db_url=os.getenv("SUPABASE_DB_URL", ""),
             vector_store_type=os.getenv("VECTOR_STORE_TYPE", "pgvector"),
             pinecone_api_key=os.getenv("PINECONE_API_KEY", ""),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             max_retries=int(os.getenv("MAX_RETRIES", "2")),
+            retry_backoff_seconds=float(os.getenv("RETRY_BACKOFF_SECONDS", "1.0")),
+            retry_backoff_max_seconds=float(os.getenv("RETRY_BACKOFF_MAX_SECONDS", "30")),
+            max_repair_attempts=int(os.getenv("MAX_REPAIR_ATTEMPTS", "1")),
+            llm_streaming=os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes"),
             token_budget_per_agent=int(os.getenv("TOKEN_BUDGET_PER_AGENT", "8000")),
+            prompt_context_tokens=int(os.getenv("PROMPT_CONTEXT_TOKENS", "12000")),
+            llm_context_window_tokens=int(os.getenv("LLM_CONTEXT_WINDOW_TOKENS", "200000")),
+            map_reduce_lot_tokens=int(os.getenv("MAP_REDUCE_LOT_TOKENS", "40000")),
+            map_reduce_fan_in=int(os.getenv("MAP_REDUCE_FAN_IN", "4")),
+            max_parallel_agents=int(os.getenv("MAX_PARALLEL_AGENTS", "4")),
+            max_parallel_plugins=int(os.getenv("MAX_PARALLEL_PLUGINS", "4")),
+            plugin_timeout_seconds=float(os.getenv("PLUGIN_TIMEOUT_SECONDS", "300")),
+            mock_llm_seed=int(os.getenv("MOCK_LLM_SEED", "0")),
+            mock_llm_findings=int(os.getenv("MOCK_LLM_FINDINGS", "5")),
+            mock_llm_risks=int(os.getenv("MOCK_LLM_RISKS", "3")),
+            mock_llm_recommendations=int(os.getenv("MOCK_LLM_RECOMMENDATIONS", "3")),
+            mock_llm_maturity_scores=int(os.getenv("MOCK_LLM_MATURITY_SCORES", "2")),
+            mock_llm_latency_ms=float(os.getenv("MOCK_LLM_LATENCY_MS", "800")),
+            mock_llm_latency_sigma=float(os.getenv("MOCK_LLM_LATENCY_SIGMA", "0.4")),
+            llm_requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "50")),
+            llm_input_tokens_per_minute=int(os.getenv("LLM_INPUT_TOKENS_PER_MINUTE", "30000")),
+            llm_output_tokens_per_minute=int(os.getenv("LLM_OUTPUT_TOKENS_PER_MINUTE", "8000")),
+            llm_max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            audit_budget_usd=float(os.getenv("AUDIT_BUDGET_USD", "0")),
+            audit_budget_tokens=int(os.getenv("AUDIT_BUDGET_TOKENS", "0")),
+            budget_policy=os.getenv("BUDGET_POLICY", "abort"),
+            budget_soft_limit=float(os.getenv("BUDGET_SOFT_LIMIT", "0.8")),
+            budget_degrade_model=os.getenv("BUDGET_DEGRADE_MODEL", ""),
+            llm_prices=os.getenv("LLM_PRICES", ""),
+            prompt_caching_enabled=os.getenv("PROMPT_CACHING_ENABLED", "true").lower() in ("1", "true", "yes"),
+            prompt_cache_min_tokens=int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024")),
+            batch_dir=os.getenv("BATCH_DIR", ".tmp/batches"),
+            batch_poll_seconds=float(os.getenv("BATCH_POLL_SECONDS", "60")),
+            llm_cache_enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+            llm_cache_path=os.getenv("LLM_CACHE_PATH", ".tmp/llm_cache.sqlite"),
+            llm_cache_max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            llm_cache_ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+            audit_memo_enabled=os.getenv("AUDIT_MEMO_ENABLED", "true").lower() in ("1", "true", "yes"),
+            audit_store_path=os.getenv("AUDIT_STORE_PATH", ".tmp/audits.sqlite"),
+            checkpoint_enabled=os.getenv("CHECKPOINT_ENABLED", "true").lower() in ("1", "true", "yes"),
+            checkpoint_backend=os.getenv("CHECKPOINT_BACKEND", "sqlite"),
+            checkpoint_path=os.getenv("CHECKPOINT_PATH", ".tmp/checkpoints.sqlite"),
+            human_validation=os.getenv("HUMAN_VALIDATION", "auto"),
+            queue_backend=os.getenv("QUEUE_BACKEND", "sqlite"),
+            queue_path=os.getenv("QUEUE_PATH", ".tmp/jobs.sqlite"),
+            job_lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "120")),
+            job_heartbeat_seconds=float(os.getenv("JOB_HEARTBEAT_SECONDS", "15")),
+            job_max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            service_host=os.getenv("SERVICE_HOST", "127.0.0.1"),
+            service_port=int(os.getenv("SERVICE_PORT", "8080")),
+            service_workers=int(os.getenv("SERVICE_WORKERS", "2")),
+            tracing_enabled=os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes"),
+            tracing_dir=os.getenv("TRACING_DIR", ".tmp/traces"),
+            otlp_endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", ""),
         )
 
     @property
     def has_llm_key(self) -> bool:
+        if self.llm_provider == "mock":
+            return True
         if self.llm_provider == "anthropic":
             return bool(self.anthropic_api_key)
         return bool(self.openai_api_key)
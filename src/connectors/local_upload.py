@@ -5,10 +5,13 @@ from __future__ import annotations
 import hashlib
 import logging
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Formats whose content is read as text (binary formats need an extractor)
+TEXT_TYPES = {"txt", "md", "csv", "tsv", "json", "xml", "yaml", "yml", "log", "sql", "html"}
+
 
 def ingest_local_files(file_paths: List[str]) -> Dict[str, Any]:
     """Read local files and build a sources index.
@@ -40,8 +43,28 @@ def ingest_local_files(file_paths: List[str]) -> Dict[str, Any]:
     return sources_index
 
 
+def read_document_text(meta: Dict[str, Any]) -> Optional[str]:
+    """Text content of an indexed document, or None when it cannot be read as text."""
+    if meta.get("type", "").lower() not in TEXT_TYPES or not meta.get("path"):
+        return None
+    try:
+        return Path(meta["path"]).read_text(encoding="utf-8", errors="replace")
+    except OSError as e:
+        logger.warning(f"Cannot read {meta['path']}: {e}")
+        return None
+
+
 def compute_input_hash(client_context: Dict[str, Any], file_paths: List[str]) -> str:
-    """Compute a deterministic hash of all inputs for idempotency."""
+    """Compute a deterministic hash of all inputs for idempotency.
+
+    Files that exist contribute their content hash, so an updated document
+    under the same path gives a new input hash.
+    """
     import json
-    payload = json.dumps(client_context, sort_keys=True) + "|".join(sorted(file_paths))
-    return hashlib.sha256(payload.encode()).hexdigest()
+    digest = hashlib.sha256((json.dumps(client_context, sort_keys=True)).encode())
+    for fp in sorted(file_paths):
+        path = Path(fp)
+        digest.update(f"|{fp}".encode())
+        if path.is_file():
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
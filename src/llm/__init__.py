@@ -0,0 +1,5 @@
+from .cache import LLMResponseCache, bypass_llm_cache, get_llm_cache
+from .batch import BatchBackend, batch_mode, get_batch_backend
+from .pool import LLMClientPool, RateLimiter, get_chat_model, get_llm_pool
+from .ledger import BudgetExceededError, TokenLedger, get_ledger
+from .mock import MockChatModel
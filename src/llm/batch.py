@@ -0,0 +1,342 @@
+"""Offline batch mode — LLM calls answered through provider batch APIs.
+
+Inside `batch_mode()`, a pooled chat client does not call the provider:
+it turns the call into a serializable `BatchRequest` and pauses the
+graph node with a LangGraph `interrupt()`. The batch runner
+(src.orchestrator.batch) collects the pending requests of every audit,
+submits them in one batch, polls until the results are in, and resumes
+each audit with its responses — the interrupted calls then return the
+provider's answer and the agents carry on exactly as in interactive
+mode. Agents, retries, the response cache and the ledger are unchanged.
+
+Backends share one small interface (`submit` / `poll`):
+
+- AnthropicBatchBackend: Message Batches API (`messages.batches`)
+- OpenAIBatchBackend: Batch API over /v1/chat/completions (JSONL files)
+- LocalBatchBackend: file-based stand-in under settings.batch_dir that
+  answers with the mock LLM, for tests and offline runs
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import io
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TypedDict
+
+from langchain_core.messages import AIMessage
+
+from src.config import settings
+from src.llm.prompt_cache import CACHE_CONTROL
+
+logger = logging.getLogger(__name__)
+
+# Anthropic and OpenAI both bill batch requests at half the standard price
+BATCH_PRICE_FACTOR = 0.5
+
+_batch_mode: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_batch_mode", default=False)
+
+
+class BatchRequest(TypedDict):
+    custom_id: str
+    model: str
+    temperature: float
+    max_tokens: int
+    system: str
+    user: str
+    schema_name: Optional[str]              # structured output (e.g. "ROIModel")
+    schema: Optional[Dict[str, Any]]        # its JSON schema
+
+
+class BatchResult(TypedDict, total=False):
+    content: str                            # text, or the JSON of a structured answer
+    usage: Dict[str, Any]                   # usage_metadata format
+    error: str
+
+
+@contextmanager
+def batch_mode(enabled: bool = True) -> Iterator[None]:
+    """Defer the LLM calls made in this block to the batch runner."""
+    token = _batch_mode.set(enabled)
+    try:
+        yield
+    finally:
+        _batch_mode.reset(token)
+
+
+def batch_mode_enabled() -> bool:
+    return _batch_mode.get()
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return str(content)
+
+
+def build_request(
+    messages: Any,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    schema: Any = None,
+) -> BatchRequest:
+    """Serializable request for a chat call (system + user messages)."""
+    system, user = "", []
+    for message in ([("human", messages)] if isinstance(messages, str) else messages):
+        role, content = message if isinstance(message, tuple) else (message.type, message.content)
+        if role == "system":
+            system = _text(content)
+        else:
+            user.append(_text(content))
+    request = BatchRequest(
+        custom_id="",
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        system=system,
+        user="\n\n".join(user),
+        schema_name=schema.__name__ if schema is not None else None,
+        schema=schema.model_json_schema() if schema is not None else None,
+    )
+    digest = hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+    request["custom_id"] = digest[:32]
+    return request
+
+
+def result_message(result: BatchResult) -> AIMessage:
+    """The AIMessage a chat client would have returned (raises on errors)."""
+    if result.get("error"):
+        raise RuntimeError(f"Batch request failed: {result['error']}")
+    return AIMessage(content=result.get("content", ""), usage_metadata=result.get("usage"))
+
+
+# ─── Backends ─────────────────────────────────────────────────────────────
+
+class BatchBackend(ABC):
+    """Submits requests as one batch; `poll` returns None until it has ended."""
+
+    @abstractmethod
+    def submit(self, requests: List[BatchRequest]) -> str:
+        """Send the requests; returns the batch id."""
+
+    @abstractmethod
+    def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        """Results by custom_id once the batch has ended, else None."""
+
+
+class AnthropicBatchBackend(BatchBackend):
+    def __init__(self, client: Any = None):
+        if client is None:
+            import anthropic
+            client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.client = client
+
+    @staticmethod
+    def params(request: BatchRequest) -> Dict[str, Any]:
+        system: Dict[str, Any] = {"type": "text", "text": request["system"]}
+        if settings.prompt_caching_enabled:
+            system["cache_control"] = CACHE_CONTROL
+        params: Dict[str, Any] = {
+            "model": request["model"],
+            "max_tokens": request["max_tokens"],
+            "temperature": request["temperature"],
+            "system": [system],
+            "messages": [{"role": "user", "content": request["user"]}],
+        }
+        if request["schema"] is not None:
+            params["tools"] = [{"name": request["schema_name"], "input_schema": request["schema"]}]
+            params["tool_choice"] = {"type": "tool", "name": request["schema_name"]}
+        return params
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        batch = self.client.messages.batches.create(
+            requests=[{"custom_id": r["custom_id"], "params": self.params(r)} for r in requests]
+        )
+        return batch.id
+
+    @staticmethod
+    def _result(message: Any) -> BatchResult:
+        content = ""
+        for block in message.content:
+            if block.type == "tool_use":
+                content = json.dumps(block.input, ensure_ascii=False)
+                break
+            if block.type == "text":
+                content += block.text
+        usage = message.usage
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        input_tokens = usage.input_tokens + cache_read + cache_write
+        return BatchResult(content=content, usage={
+            "input_tokens": input_tokens,
+            "output_tokens": usage.output_tokens,
+            "total_tokens": input_tokens + usage.output_tokens,
+            "input_token_details": {"cache_read": cache_read, "cache_creation": cache_write},
+        })
+
+    def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        if self.client.messages.batches.retrieve(batch_id).processing_status != "ended":
+            return None
+        results: Dict[str, BatchResult] = {}
+        for item in self.client.messages.batches.results(batch_id):
+            if item.result.type == "succeeded":
+                results[item.custom_id] = self._result(item.result.message)
+            else:
+                results[item.custom_id] = BatchResult(error=item.result.type)
+        return results
+
+
+class OpenAIBatchBackend(BatchBackend):
+    def __init__(self, client: Any = None):
+        if client is None:
+            import openai
+            client = openai.OpenAI(api_key=settings.openai_api_key)
+        self.client = client
+
+    @staticmethod
+    def body(request: BatchRequest) -> Dict[str, Any]:
+        # System message first and unchanged: OpenAI caches that prefix
+        body: Dict[str, Any] = {
+            "model": request["model"],
+            "max_tokens": request["max_tokens"],
+            "temperature": request["temperature"],
+            "messages": [
+                {"role": "system", "content": request["system"]},
+                {"role": "user", "content": request["user"]},
+            ],
+        }
+        if request["schema"] is not None:
+            body["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": request["schema_name"], "schema": request["schema"]},
+            }
+        return body
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        lines = [
+            json.dumps({
+                "custom_id": r["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self.body(r),
+            }, ensure_ascii=False)
+            for r in requests
+        ]
+        upload = self.client.files.create(
+            file=("batch.jsonl", io.BytesIO("\n".join(lines).encode())), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+            return None
+        results: Dict[str, BatchResult] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    results[item["custom_id"]] = BatchResult(
+                        error=str(item.get("error") or response.get("body"))
+                    )
+                    continue
+                body = response["body"]
+                usage = body.get("usage", {})
+                cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+                results[item["custom_id"]] = BatchResult(
+                    content=body["choices"][0]["message"]["content"] or "",
+                    usage={
+                        "input_tokens": usage.get("prompt_tokens", 0),
+                        "output_tokens": usage.get("completion_tokens", 0),
+                        "total_tokens": usage.get("total_tokens", 0),
+                        "input_token_details": {"cache_read": cached},
+                    },
+                )
+        if batch.status != "completed":
+            logger.warning(f"OpenAI batch {batch_id} ended with status {batch.status}")
+        return results
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in: requests / results as JSONL under `directory`.
+
+    A batch ends after `polls_before_done` polls; its requests are then
+    answered by `responder(request) -> BatchResult` (the mock LLM by
+    default).
+    """
+
+    def __init__(self, directory: Optional[str] = None, responder: Any = None,
+                 polls_before_done: int = 0):
+        self.directory = Path(directory or settings.batch_dir)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.responder = responder or mock_response
+        self.polls_before_done = polls_before_done
+        self._polls: Dict[str, int] = {}
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        path = self.directory / batch_id
+        path.mkdir()
+        with (path / "requests.jsonl").open("w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        return batch_id
+
+    def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        path = self.directory / batch_id
+        results_path = path / "results.jsonl"
+        if not results_path.exists():
+            self._polls[batch_id] = self._polls.get(batch_id, 0) + 1
+            if self._polls[batch_id] <= self.polls_before_done:
+                return None
+            with (path / "requests.jsonl").open(encoding="utf-8") as f:
+                requests = [json.loads(line) for line in f]
+            with results_path.open("w", encoding="utf-8") as f:
+                for request in requests:
+                    result = {"custom_id": request["custom_id"], **self.responder(request)}
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        with results_path.open(encoding="utf-8") as f:
+            return {
+                item.pop("custom_id"): BatchResult(**item)
+                for item in (json.loads(line) for line in f)
+            }
+
+
+def mock_response(request: BatchRequest) -> BatchResult:
+    """Answer a batch request with the mock LLM (src.llm.mock)."""
+    from src.llm.mock import MockChatModel
+    from src.schemas import models
+
+    model = MockChatModel(latency_ms=0)
+    messages = [("system", request["system"]), ("human", request["user"])]
+    if request["schema_name"]:
+        schema = getattr(models, request["schema_name"])
+        raw = model.with_structured_output(schema, include_raw=True).invoke(messages)["raw"]
+    else:
+        raw = model.invoke(messages)
+    return BatchResult(content=raw.content, usage=dict(raw.usage_metadata))
+
+
+def get_batch_backend(provider: Optional[str] = None) -> BatchBackend:
+    """Batch backend of the provider (the local stand-in for the mock)."""
+    provider = provider or settings.llm_provider
+    if provider == "anthropic":
+        return AnthropicBatchBackend()
+    if provider == "openai":
+        return OpenAIBatchBackend()
+    if provider == "mock":
+        return LocalBatchBackend()
+    raise ValueError(f"No batch backend for provider {provider!r}")
@@ -0,0 +1,203 @@
+"""Persistent, content-addressed cache for LLM responses.
+
+Responses are keyed on a SHA-256 of everything that determines the
+answer (provider, model, temperature, max_tokens, system prompt, user
+message) and
+stored in a local SQLite file, so re-running an audit with identical
+inputs — after a report-template tweak or a crash — is served from disk
+instead of re-paying every LLM call.
+
+- Size-bounded: least-recently-used entries are evicted past `max_bytes`.
+  The store is measured once per `max_bytes / 20` bytes written, not on
+  every put, so it may overshoot by that much
+- TTL: entries older than `ttl_seconds` are treated as misses
+- Hit / miss / eviction counters for the current process via `stats()`
+- Bypass per run with the `bypass_llm_cache()` context manager
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Set to True for the duration of a run that must not read or write the cache
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+# The store is measured once per max_bytes / _CHECK_FRACTION bytes written
+_CHECK_FRACTION = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key         TEXT PRIMARY KEY,
+    response    TEXT NOT NULL,
+    size_bytes  INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access);
+"""
+
+
+class LLMResponseCache:
+    """SQLite-backed LRU + TTL cache of raw LLM responses."""
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Bytes written since the store was last measured (see _evict)
+        self._unchecked_bytes = 0
+        self._check_bytes = max(1, max_bytes // _CHECK_FRACTION)
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        system_prompt: str,
+        user_message: str,
+    ) -> str:
+        # max_tokens: a response cut by a lower limit must not serve a higher one
+        payload = json.dumps(
+            [provider, model, temperature, max_tokens, system_prompt, user_message],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, response, size_bytes, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, response, size, now, now),
+            )
+            self._unchecked_bytes += size
+            if self._unchecked_bytes >= self._check_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the store fits max_bytes.
+
+        Measuring the store is a full scan, so it runs once per
+        `_check_bytes` written. The scan also counts what other processes
+        sharing the file (service workers) have written.
+        """
+        self._unchecked_bytes = 0
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM llm_cache"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size_bytes FROM llm_cache ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": total,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Lazy-loaded cache instance (shared across agents)
+_cache_instance: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the shared cache, or None if disabled globally or for this run."""
+    global _cache_instance
+    if not settings.llm_cache_enabled or _bypass.get():
+        return None
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = LLMResponseCache(
+                    path=settings.llm_cache_path,
+                    max_bytes=settings.llm_cache_max_bytes,
+                    ttl_seconds=settings.llm_cache_ttl_seconds,
+                )
+    return _cache_instance
+
+
+@contextmanager
+def bypass_llm_cache(bypass: bool = True) -> Iterator[None]:
+    """Skip the response cache for every LLM call made inside this block.
+
+    The flag is a context variable, so it follows the run into LangGraph's
+    worker threads and asyncio tasks without affecting concurrent runs.
+    """
+    token = _bypass.set(bypass)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
@@ -0,0 +1,370 @@
+"""Token and cost ledger with per-audit budgets.
+
+Every LLM call made inside a graph node is charged to its audit's ledger
+and attributed to the node and agent that made it. Costs come from a
+per-model price table (USD per million tokens, matched on the longest
+model-name prefix, overridable with LLM_PRICES as JSON).
+
+Budgets (AUDIT_BUDGET_USD / AUDIT_BUDGET_TOKENS, 0 = unlimited) are
+checked before every call:
+
+- The full budget is a hard stop whatever the policy: a call whose
+  estimated prompt would cross it raises BudgetExceededError, which
+  aborts the graph (the checkpoint keeps the work done so far)
+- BUDGET_POLICY decides what happens before that, once BUDGET_SOFT_LIMIT
+  of the budget is spent: "degrade" switches the remaining calls to a
+  cheaper model, "skip_plugins" drops the plugin agents not started yet,
+  "abort" only relies on the hard stop
+
+Usage is kept as nested counters (`total`, `agents`, `nodes`, `models`,
+each with calls / input_tokens / output_tokens / cache_read_tokens /
+cache_write_tokens / cost_usd) so that
+parallel nodes can return their own share and `merge_usage` sums them
+into `AuditGraphState.token_usage`.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from src.config import settings
+from src.llm.prompt_cache import cache_token_counts
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens — longest matching prefix wins. Cache reads /
+# writes default to the plain input price when a model has no entry.
+DEFAULT_PRICES: Dict[str, Dict[str, float]] = {
+    "claude-opus-4-5": {"input": 5.0, "output": 25.0, "cache_read": 0.5, "cache_write": 6.25},
+    "claude-opus-4": {"input": 15.0, "output": 75.0, "cache_read": 1.5, "cache_write": 18.75},
+    "claude-sonnet-4": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75},
+    "claude-3-7-sonnet": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75},
+    "claude-3-5-sonnet": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75},
+    "claude-haiku-4-5": {"input": 1.0, "output": 5.0, "cache_read": 0.1, "cache_write": 1.25},
+    "claude-3-5-haiku": {"input": 0.8, "output": 4.0, "cache_read": 0.08, "cache_write": 1.0},
+    "gpt-4.1-mini": {"input": 0.4, "output": 1.6, "cache_read": 0.1},
+    "gpt-4.1": {"input": 2.0, "output": 8.0, "cache_read": 0.5},
+    "gpt-4o-mini": {"input": 0.15, "output": 0.6, "cache_read": 0.075},
+    "gpt-4o": {"input": 2.5, "output": 10.0, "cache_read": 1.25},
+}
+
+# Cheaper model per provider for the "degrade" policy (BUDGET_DEGRADE_MODEL overrides)
+DEGRADE_MODELS: Dict[str, str] = {
+    "anthropic": "claude-haiku-4-5-20251001",
+    "openai": "gpt-4o-mini",
+    "mock": "claude-haiku-4-5-20251001",
+}
+
+BUDGET_POLICIES = ("abort", "degrade", "skip_plugins")
+
+class BudgetExceededError(RuntimeError):
+    """Raised before an LLM call that would cross the audit's budget."""
+
+
+def merge_usage(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for nested usage counters: numbers are summed, dicts merged."""
+    if not left:
+        return json.loads(json.dumps(right or {}))
+    if not right:
+        return left
+    merged = dict(left)
+    for key, value in right.items():
+        current = merged.get(key)
+        if isinstance(value, dict):
+            merged[key] = merge_usage(current if isinstance(current, dict) else {}, value)
+        elif isinstance(value, (int, float)) and isinstance(current, (int, float)):
+            merged[key] = round(current + value, 6)
+        else:
+            merged[key] = value
+    return merged
+
+
+@lru_cache(maxsize=8)
+def _price_table(overrides: str) -> Dict[str, Dict[str, float]]:
+    table = dict(DEFAULT_PRICES)
+    if overrides:
+        table.update(json.loads(overrides))
+    return table
+
+
+def model_price(model: str) -> Optional[Dict[str, float]]:
+    """Price entry for a model name, or None when it is not in the table."""
+    table = _price_table(settings.llm_prices)
+    matches = [prefix for prefix in table if model.startswith(prefix)]
+    return table[max(matches, key=len)] if matches else None
+
+
+_unpriced_models: set = set()
+
+
+def call_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int = 0,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """USD cost of a call (0 for models missing from the price table).
+
+    `input_tokens` is the provider's total, cached tokens included.
+    """
+    price = model_price(model)
+    if price is None:
+        if model not in _unpriced_models:
+            _unpriced_models.add(model)
+            logger.warning(f"No price for model {model!r} — its calls are counted at $0")
+        return 0.0
+    uncached = max(0, input_tokens - cache_read_tokens - cache_write_tokens)
+    return (
+        uncached * price["input"]
+        + cache_read_tokens * price.get("cache_read", price["input"])
+        + cache_write_tokens * price.get("cache_write", price["input"])
+        + output_tokens * price["output"]
+    ) / 1_000_000
+
+
+class TokenLedger:
+    """Usage, cost and budget state of one audit (thread-safe)."""
+
+    def __init__(
+        self,
+        audit_id: str,
+        budget_usd: Optional[float] = None,
+        budget_tokens: Optional[int] = None,
+        policy: Optional[str] = None,
+        soft_limit: Optional[float] = None,
+        usage: Optional[Dict[str, Any]] = None,
+    ):
+        self.audit_id = audit_id
+        self.budget_usd = settings.audit_budget_usd if budget_usd is None else budget_usd
+        self.budget_tokens = settings.audit_budget_tokens if budget_tokens is None else budget_tokens
+        self.policy = policy or settings.budget_policy
+        if self.policy not in BUDGET_POLICIES:
+            raise ValueError(f"Unknown budget policy {self.policy!r} (expected one of {BUDGET_POLICIES})")
+        self.soft_limit = settings.budget_soft_limit if soft_limit is None else soft_limit
+        self.usage: Dict[str, Any] = merge_usage({}, usage or {})
+        self.degraded = False
+        self.plugins_skipped = False
+        self._charged_requests: Set[str] = set()
+        self._lock = threading.Lock()
+        self._apply_policy()
+
+    @property
+    def spent_usd(self) -> float:
+        return self.usage.get("total", {}).get("cost_usd", 0.0)
+
+    @property
+    def spent_tokens(self) -> int:
+        total = self.usage.get("total", {})
+        return total.get("input_tokens", 0) + total.get("output_tokens", 0)
+
+    def _ratio(self, cost: float, tokens: int) -> float:
+        """Share of the tightest budget that `cost` / `tokens` represent."""
+        ratios = [0.0]
+        if self.budget_usd:
+            ratios.append(cost / self.budget_usd)
+        if self.budget_tokens:
+            ratios.append(tokens / self.budget_tokens)
+        return max(ratios)
+
+    def budget_ratio(self) -> float:
+        return self._ratio(self.spent_usd, self.spent_tokens)
+
+    def check(self, model: str, estimated_input_tokens: int) -> None:
+        """Raise BudgetExceededError if this prompt would cross the budget."""
+        with self._lock:
+            projected = self._ratio(
+                self.spent_usd + call_cost(model, estimated_input_tokens),
+                self.spent_tokens + estimated_input_tokens,
+            )
+        if projected > 1.0:
+            raise BudgetExceededError(
+                f"Audit {self.audit_id}: budget exhausted "
+                f"(${self.spent_usd:.4f} / {self.spent_tokens} tokens spent, "
+                f"next call ~{estimated_input_tokens} input tokens on {model})"
+            )
+
+    def record(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        node: str,
+        agent: str,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        request_id: Optional[str] = None,
+        price_factor: float = 1.0,
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Charge one call.
+
+        Returns its usage delta (nested format) and the notice of the
+        soft-limit policy it switched on, if any. A `request_id` already
+        charged (batch results replayed on resume) only returns the delta;
+        `price_factor` scales the cost (batch API discount).
+        """
+        entry = {
+            "calls": 1,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cache_read_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens,
+            "cost_usd": round(
+                call_cost(model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+                * price_factor, 6
+            ),
+        }
+        delta = {
+            "total": entry,
+            "agents": {agent: entry},
+            "nodes": {node: entry},
+            "models": {model: entry},
+        }
+        with self._lock:
+            if request_id is not None:
+                if request_id in self._charged_requests:
+                    return delta, None
+                self._charged_requests.add(request_id)
+            self.usage = merge_usage(self.usage, delta)
+            notice = self._apply_policy()
+        return delta, notice
+
+    def _apply_policy(self) -> Optional[str]:
+        """Switch on the soft-limit policy once reached; returns a notice."""
+        if self.budget_ratio() < self.soft_limit:
+            return None
+        if self.policy == "degrade" and not self.degraded:
+            self.degraded = True
+            return (
+                f"Budget: {self.soft_limit:.0%} reached — remaining calls use "
+                f"{self.degrade_model}"
+            )
+        if self.policy == "skip_plugins" and not self.plugins_skipped:
+            self.plugins_skipped = True
+            return f"Budget: {self.soft_limit:.0%} reached — plugin agents not started are skipped"
+        return None
+
+    @property
+    def degrade_model(self) -> str:
+        return settings.budget_degrade_model or DEGRADE_MODELS.get(
+            settings.llm_provider, settings.llm_model
+        )
+
+    def model_for(self, model: str) -> str:
+        """Model to actually call — the cheaper one once degraded."""
+        return self.degrade_model if self.degraded else model
+
+
+# ─── Current scope (audit ledger + node + agent) ─────────────────────────
+
+@dataclass
+class LedgerScope:
+    """Charges made while a graph node runs, kept for its state update."""
+    ledger: TokenLedger
+    node: str
+    agent: str
+    usage: Dict[str, Any] = field(default_factory=dict)
+    notices: List[str] = field(default_factory=list)
+
+
+_current_scope: contextvars.ContextVar[Optional[LedgerScope]] = contextvars.ContextVar(
+    "ledger_scope", default=None
+)
+
+
+@contextmanager
+def ledger_scope(ledger: TokenLedger, node: str, agent: Optional[str] = None) -> Iterator[LedgerScope]:
+    """Charge the LLM calls made in this block to `ledger` under node / agent."""
+    scope = LedgerScope(ledger=ledger, node=node, agent=agent or node)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_ledger() -> Optional[TokenLedger]:
+    scope = _current_scope.get()
+    return scope.ledger if scope is not None else None
+
+
+def check_budget(model: str, estimated_input_tokens: int) -> None:
+    """Pre-call budget check (no-op outside a ledger scope)."""
+    ledger = current_ledger()
+    if ledger is not None:
+        ledger.check(model, estimated_input_tokens)
+
+
+def charge(
+    model: str,
+    usage: Optional[Dict[str, Any]],
+    request_id: Optional[str] = None,
+    price_factor: float = 1.0,
+) -> None:
+    """Charge a finished call to the current scope (no-op outside one)."""
+    scope = _current_scope.get()
+    if scope is None or not usage:
+        return
+    cache_read, cache_write = cache_token_counts(usage)
+    delta, notice = scope.ledger.record(
+        model,
+        usage.get("input_tokens") or 0,
+        usage.get("output_tokens") or 0,
+        node=scope.node,
+        agent=scope.agent,
+        cache_read_tokens=cache_read,
+        cache_write_tokens=cache_write,
+        request_id=request_id,
+        price_factor=price_factor,
+    )
+    scope.usage = merge_usage(scope.usage, delta)
+    if notice:
+        logger.warning(f"[{scope.ledger.audit_id}] {notice}")
+        scope.notices.append(notice)
+
+
+def budget_model(model: str) -> str:
+    """`model`, or the degrade model once the current audit is degraded."""
+    ledger = current_ledger()
+    return ledger.model_for(model) if ledger is not None else model
+
+
+# ─── Per-audit registry ───────────────────────────────────────────────────
+
+_MAX_LEDGERS = 256
+_ledgers: "OrderedDict[str, TokenLedger]" = OrderedDict()
+_ledgers_lock = threading.Lock()
+
+
+def start_ledger(audit_id: str) -> TokenLedger:
+    """Fresh ledger for a new run of `audit_id` (drops any previous one)."""
+    with _ledgers_lock:
+        ledger = _ledgers[audit_id] = TokenLedger(audit_id)
+        _ledgers.move_to_end(audit_id)
+        while len(_ledgers) > _MAX_LEDGERS:
+            _ledgers.popitem(last=False)
+    return ledger
+
+
+def get_ledger(audit_id: str, usage: Optional[Dict[str, Any]] = None) -> TokenLedger:
+    """The live ledger of an audit.
+
+    When this process has not seen the audit yet (e.g. on resume), the
+    ledger is seeded from `usage`, the state's token_usage.
+    """
+    with _ledgers_lock:
+        ledger = _ledgers.get(audit_id)
+        if ledger is None:
+            ledger = _ledgers[audit_id] = TokenLedger(audit_id, usage=usage)
+            while len(_ledgers) > _MAX_LEDGERS:
+                _ledgers.popitem(last=False)
+        _ledgers.move_to_end(audit_id)
+        return ledger
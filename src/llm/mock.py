@@ -0,0 +1,315 @@
+"""Deterministic mock LLM backend (LLM_PROVIDER=mock).
+
+Produces realistic, schema-valid outputs so the whole pipeline can be
+load-tested and profiled offline at production volumes:
+
+- Agent calls get a seeded `AgentOutput` JSON payload whose number of
+  findings / risks / recommendations / maturity scores is configurable
+- `with_structured_output(ROIModel)` gets seeded ROI scenarios
+- Free-text calls (report generator) get a markdown executive summary
+- Latency follows a log-normal distribution around a configurable median
+- `stream` / `astream` deliver the same content in chunks spread over
+  that latency, with the usage on the last chunk
+- Token counts are reported in `usage_metadata` like a real provider,
+  including prompt-cache reads / writes for system prompts marked with a
+  `cache_control` breakpoint (src.llm.prompt_cache) that are at least
+  settings.prompt_cache_min_tokens long
+
+Every output is a pure function of (seed, prompt): the same prompt always
+yields the same payload, latency and token counts — except the cache
+read / write split, which depends on the prefixes seen by the process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.config import settings
+from src.schemas.enums import (
+    Effort,
+    Impact,
+    MaturityLevel,
+    Probability,
+    ScenarioType,
+    Severity,
+    Timeframe,
+)
+from src.schemas.models import ROIModel
+
+# The agents' JSON-only instruction (see BaseAgent._build_messages)
+_JSON_MARKER = "UNIQUEMENT avec du JSON"
+# Characters per streamed chunk
+_STREAM_CHUNK_CHARS = 256
+
+_CATEGORIES = ["data", "architecture", "gouvernance", "processus", "compétences", "sécurité"]
+_DOCS = ["architecture_si.pdf", "interview_cdo.docx", "export_erp.xlsx", "policy_data.pdf"]
+
+
+def _message_content(message: Any) -> Any:
+    return message[1] if isinstance(message, tuple) else getattr(message, "content", message)
+
+
+def _message_text(message: Any) -> str:
+    content = _message_content(message)
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return str(content)
+
+
+def _has_cache_breakpoint(messages: Any) -> bool:
+    if not isinstance(messages, list) or not messages:
+        return False
+    content = _message_content(messages[0])
+    return isinstance(content, list) and any(
+        isinstance(block, dict) and "cache_control" in block for block in content
+    )
+
+
+def _split_prompt(messages: Any) -> Tuple[str, str]:
+    """Return (system, user) text for any LangChain message input."""
+    if isinstance(messages, str):
+        return "", messages
+    texts = [_message_text(m) for m in messages]
+    return (texts[0], "\n".join(texts[1:])) if len(texts) > 1 else ("", "\n".join(texts))
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+# Simulated provider prompt cache: hashes of the cached prefixes
+_cached_prefixes: set = set()
+_cached_prefixes_lock = threading.Lock()
+
+
+def _prompt_cache_usage(messages: Any, system: str) -> Dict[str, int]:
+    """Cache read / creation tokens, like Anthropic's usage details."""
+    tokens = _estimate_tokens(system)
+    if not _has_cache_breakpoint(messages) or tokens < settings.prompt_cache_min_tokens:
+        return {}
+    key = hashlib.sha256(system.encode()).hexdigest()
+    with _cached_prefixes_lock:
+        if key in _cached_prefixes:
+            return {"cache_read": tokens, "cache_creation": 0}
+        _cached_prefixes.add(key)
+    return {"cache_read": 0, "cache_creation": tokens}
+
+
+class MockChatModel:
+    """Seeded stand-in for a LangChain chat model (invoke / ainvoke / structured)."""
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        findings: Optional[int] = None,
+        risks: Optional[int] = None,
+        recommendations: Optional[int] = None,
+        maturity_scores: Optional[int] = None,
+        latency_ms: Optional[float] = None,
+        latency_sigma: Optional[float] = None,
+        schema: Any = None,
+        include_raw: bool = False,
+    ):
+        self.seed = settings.mock_llm_seed if seed is None else seed
+        self.findings = settings.mock_llm_findings if findings is None else findings
+        self.risks = settings.mock_llm_risks if risks is None else risks
+        self.recommendations = (
+            settings.mock_llm_recommendations if recommendations is None else recommendations
+        )
+        self.maturity_scores = (
+            settings.mock_llm_maturity_scores if maturity_scores is None else maturity_scores
+        )
+        self.latency_ms = settings.mock_llm_latency_ms if latency_ms is None else latency_ms
+        self.latency_sigma = (
+            settings.mock_llm_latency_sigma if latency_sigma is None else latency_sigma
+        )
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def with_structured_output(self, schema: Any, include_raw: bool = False) -> MockChatModel:
+        return MockChatModel(
+            self.seed, self.findings, self.risks, self.recommendations,
+            self.maturity_scores, self.latency_ms, self.latency_sigma, schema, include_raw,
+        )
+
+    # ── Generation ────────────────────────────────────────────────────
+
+    def _rng(self, system: str, user: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}\0{system}\0{user}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _latency(self, rng: random.Random) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.latency_ms / 1000 * math.exp(rng.gauss(0, self.latency_sigma))
+
+    @staticmethod
+    def _sources(rng: random.Random, n: int = 1) -> List[Dict[str, Any]]:
+        return [
+            {
+                "doc_id": rng.choice(_DOCS),
+                "section": f"§{rng.randint(1, 12)}",
+                "page": rng.randint(1, 80),
+                "snippet": f"Extrait {rng.randint(100, 999)} du document source",
+                "confidence": round(rng.uniform(0.6, 1.0), 2),
+            }
+            for _ in range(n)
+        ]
+
+    def agent_payload(self, rng: random.Random, prefix: str) -> Dict[str, Any]:
+        """A schema-valid AgentOutput payload (agent_id is filled by the agent)."""
+        findings = [
+            {
+                "id": f"{prefix}-F-{i:03d}",
+                "category": rng.choice(_CATEGORIES),
+                "description": f"Constat {i} : écart identifié sur le périmètre "
+                               f"{rng.choice(_CATEGORIES)} (niveau {rng.randint(1, 5)}/5).",
+                "severity": rng.choice(list(Severity)).value,
+                "sources": self._sources(rng, rng.randint(1, 2)),
+                "tags": rng.sample(_CATEGORIES, 2),
+            }
+            for i in range(1, self.findings + 1)
+        ]
+        risks = [
+            {
+                "id": f"{prefix}-R-{i:03d}",
+                "title": f"Risque {i}",
+                "description": "Risque lié aux constats "
+                               + ", ".join(f["id"] for f in rng.sample(findings, min(2, len(findings)))),
+                "impact": rng.choice(list(Severity)).value,
+                "probability": rng.choice(list(Probability)).value,
+                "mitigations": [f"Mesure de mitigation {j}" for j in range(1, rng.randint(2, 3))],
+                "sources": self._sources(rng),
+            }
+            for i in range(1, self.risks + 1)
+        ]
+        recommendations = [
+            {
+                "id": f"{prefix}-REC-{i:03d}",
+                "title": f"Recommandation {i}",
+                "description": "Action proposée pour traiter les constats du périmètre "
+                               f"{rng.choice(_CATEGORIES)}.",
+                "effort": rng.choice(list(Effort)).value,
+                "impact": rng.choice(list(Impact)).value,
+                "timeframe": rng.choice(list(Timeframe)).value,
+                "priority_score": round(rng.uniform(0, 10), 1),
+                "sources": self._sources(rng),
+            }
+            for i in range(1, self.recommendations + 1)
+        ]
+        maturity_scores = [
+            {
+                "dimension": f"{prefix.lower()}_dimension_{i}",
+                "score": rng.choice(list(MaturityLevel)).value,
+                "justification": "Score établi à partir des entretiens et des documents fournis.",
+                "gaps": [f"Écart {j}" for j in range(1, rng.randint(2, 4))],
+            }
+            for i in range(1, self.maturity_scores + 1)
+        ]
+        return {
+            "findings": findings,
+            "risks": risks,
+            "recommendations": recommendations,
+            "maturity_scores": maturity_scores,
+        }
+
+    @staticmethod
+    def roi_model(rng: random.Random) -> ROIModel:
+        scenarios = []
+        for factor, scenario_type in zip((0.7, 1.0, 1.5), ScenarioType):
+            capex = round(rng.uniform(200_000, 1_500_000) * factor, -3)
+            gains = round(capex * rng.uniform(0.4, 1.2), -3)
+            scenarios.append({
+                "scenario_type": scenario_type.value,
+                "capex_estimate": capex,
+                "opex_annual": round(capex * rng.uniform(0.1, 0.3), -3),
+                "gains_annual": gains,
+                "payback_months": round(12 * capex / gains, 1),
+                "assumptions": ["Adoption progressive sur 12 mois"],
+            })
+        return ROIModel(scenarios=scenarios, key_hypotheses=["Hypothèses issues des findings"])
+
+    @staticmethod
+    def exec_summary(rng: random.Random) -> str:
+        lines = ["# Executive Summary", "", "## Constats clés"]
+        lines += [f"- Constat majeur {i} (score {rng.randint(1, 5)}/5)" for i in range(1, 6)]
+        lines += ["", "## Recommandations", "- Lancer les quick wins identifiés", ""]
+        return "\n".join(lines)
+
+    def _generate(self, messages: Any) -> Tuple[Any, float]:
+        """Return (result, simulated latency in seconds)."""
+        system, user = _split_prompt(messages)
+        rng = self._rng(system, user)
+        latency = self._latency(rng)
+
+        if self.schema is ROIModel:
+            parsed = self.roi_model(rng)
+            content = parsed.model_dump_json()
+        elif self.schema is not None:
+            raise NotImplementedError(f"MockChatModel cannot produce {self.schema!r}")
+        elif _JSON_MARKER in system:
+            prefix = "M" + hashlib.sha1(system.encode()).hexdigest()[:4].upper()
+            parsed = None
+            content = json.dumps(self.agent_payload(rng, prefix), ensure_ascii=False)
+        else:
+            parsed = None
+            content = self.exec_summary(rng)
+
+        input_tokens = _estimate_tokens(system) + _estimate_tokens(user)
+        output_tokens = _estimate_tokens(content)
+        usage: Dict[str, Any] = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        cache_usage = _prompt_cache_usage(messages, system)
+        if cache_usage:
+            usage["input_token_details"] = cache_usage
+        message = AIMessage(content=content, usage_metadata=usage)
+        if self.schema is None:
+            return message, latency
+        if self.include_raw:
+            return {"raw": message, "parsed": parsed, "parsing_error": None}, latency
+        return parsed, latency
+
+    def invoke(self, messages: Any) -> Any:
+        result, latency = self._generate(messages)
+        time.sleep(latency)
+        return result
+
+    async def ainvoke(self, messages: Any) -> Any:
+        result, latency = self._generate(messages)
+        await asyncio.sleep(latency)
+        return result
+
+    def _chunks(self, messages: Any) -> Tuple[List[AIMessageChunk], float]:
+        """(chunks of a plain response, delay before each chunk)."""
+        if self.schema is not None:
+            raise NotImplementedError("MockChatModel streams plain text responses only")
+        message, latency = self._generate(messages)
+        content = message.content
+        pieces = [content[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(content), _STREAM_CHUNK_CHARS)]
+        chunks = [AIMessageChunk(content=piece) for piece in pieces or [""]]
+        chunks[-1].usage_metadata = message.usage_metadata
+        return chunks, latency / len(chunks)
+
+    def stream(self, messages: Any) -> Iterator[AIMessageChunk]:
+        chunks, delay = self._chunks(messages)
+        for chunk in chunks:
+            time.sleep(delay)
+            yield chunk
+
+    async def astream(self, messages: Any) -> AsyncIterator[AIMessageChunk]:
+        chunks, delay = self._chunks(messages)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
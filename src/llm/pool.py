@@ -0,0 +1,464 @@
+"""Shared, rate-limited LLM client pool.
+
+Every LLM call in the pipeline — agents and graph nodes alike — goes
+through one process-wide pool, so concurrent agents and concurrent
+audits share a single view of the provider's limits:
+
+- One chat client per (provider, model, temperature, max_tokens), reused
+  so its HTTP connection pool is shared by every caller
+- Token buckets for requests, input tokens and output tokens per minute
+- Adaptive concurrency: a 429 halves the number of calls allowed in
+  flight and pauses new calls for the provider's `retry-after`; each
+  success lets one more call through again (AIMD)
+- Every call is checked against and charged to the audit's token /
+  cost ledger (src.llm.ledger), which may also swap in a cheaper model
+- The system prompt is marked as a provider cache breakpoint
+  (src.llm.prompt_cache)
+- In batch mode, calls are deferred to the provider batch APIs instead
+  of being sent (src.llm.batch)
+- Streamed calls (`stream` / `astream`) hold their slot until the last
+  chunk and are charged from the usage the chunks carry
+
+The limiter works for threads (sync `invoke`) and event loops (async
+`ainvoke`) at the same time: state lives behind a threading lock and
+only the waiting differs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from langgraph.types import interrupt
+
+from src.config import settings
+from src.llm.batch import BATCH_PRICE_FACTOR, batch_mode_enabled, build_request, result_message
+from src.llm.ledger import budget_model, charge, check_budget
+from src.llm.prompt_cache import cache_token_counts, with_cache_breakpoint
+from src.observability.tracing import record
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio used to estimate prompt size before a call
+_CHARS_PER_TOKEN = 4
+# How long a caller waits before re-checking a full concurrency window
+_SLOT_POLL_SECONDS = 0.05
+
+
+class _TokenBucket:
+    """Refills `per_minute` units per minute; 0 means unlimited.
+
+    The level may go negative: output tokens are only known after the
+    call, so they are charged as debt that later callers wait out.
+    """
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        rate = self.per_minute / 60.0
+        self.level = min(self.per_minute, self.level + (now - self._updated) * rate)
+        self._updated = now
+
+    def wait_time(self, amount: int, now: float) -> float:
+        if not self.per_minute:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.per_minute)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.per_minute
+
+    def consume(self, amount: int) -> None:
+        if self.per_minute:
+            self.level -= amount
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Seconds requested by the provider in a 429 response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for provider 429s (Anthropic and OpenAI SDK errors alike)."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return type(error).__name__ == "RateLimitError"
+
+
+class RateLimiter:
+    """Requests / input tokens / output tokens per minute + adaptive concurrency."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        input_tokens_per_minute: int = 0,
+        output_tokens_per_minute: int = 0,
+        max_concurrency: int = 8,
+        default_retry_after: float = 10.0,
+    ):
+        self._requests = _TokenBucket(requests_per_minute)
+        self._input_tokens = _TokenBucket(input_tokens_per_minute)
+        self._output_tokens = _TokenBucket(output_tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.concurrency_limit = max_concurrency
+        self.default_retry_after = default_retry_after
+        self.in_flight = 0
+        self.rate_limited = 0
+        self.waited_seconds = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, input_tokens: int) -> float:
+        """Take a slot and charge the buckets; else return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.in_flight >= self.concurrency_limit:
+                return _SLOT_POLL_SECONDS
+            wait = max(
+                self._requests.wait_time(1, now),
+                self._input_tokens.wait_time(input_tokens, now),
+                self._output_tokens.wait_time(0, now),
+            )
+            if wait > 0:
+                return wait
+            self._requests.consume(1)
+            self._input_tokens.consume(input_tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self, input_tokens: int) -> float:
+        """Block until the call may start; returns the time spent waiting."""
+        started = time.monotonic()
+        while (wait := self._try_acquire(input_tokens)) > 0:
+            time.sleep(wait)
+        return self._record_wait(started)
+
+    async def aacquire(self, input_tokens: int) -> float:
+        """Async `acquire` — yields to the event loop while waiting."""
+        started = time.monotonic()
+        while (wait := self._try_acquire(input_tokens)) > 0:
+            await asyncio.sleep(wait)
+        return self._record_wait(started)
+
+    def _record_wait(self, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._lock:
+            self.waited_seconds += waited
+        return waited
+
+    def release(
+        self,
+        estimated_input_tokens: int,
+        usage: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Free the slot, settle token usage and adapt concurrency."""
+        with self._lock:
+            self.in_flight -= 1
+            if usage:
+                actual_input = usage.get("input_tokens") or estimated_input_tokens
+                self._input_tokens.consume(actual_input - estimated_input_tokens)
+                self._output_tokens.consume(usage.get("output_tokens") or 0)
+
+            if error is not None and is_rate_limit_error(error):
+                self.rate_limited += 1
+                self.concurrency_limit = max(1, self.concurrency_limit // 2)
+                pause = retry_after_seconds(error) or self.default_retry_after
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                logger.warning(
+                    f"LLM rate limited — pausing {pause:.1f}s, "
+                    f"concurrency now {self.concurrency_limit}"
+                )
+            elif error is None and self.concurrency_limit < self.max_concurrency:
+                self.concurrency_limit += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "concurrency_limit": self.concurrency_limit,
+                "rate_limited": self.rate_limited,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+def estimate_tokens(messages: Any) -> int:
+    """Cheap prompt-size estimate (chars / 4) for budgeting before a call."""
+    if isinstance(messages, str):
+        return len(messages) // _CHARS_PER_TOKEN + 1
+    total = 0
+    for message in messages:
+        content = message[1] if isinstance(message, tuple) else getattr(message, "content", message)
+        total += len(str(content))
+    return total // _CHARS_PER_TOKEN + 1
+
+
+def _record_call(waited: float, usage: Optional[Dict[str, Any]]) -> None:
+    """Report limiter wait and token usage on the active tracing span."""
+    usage = usage or {}
+    cache_read, cache_write = cache_token_counts(usage)
+    record(
+        queue_wait_ms=round(waited * 1000, 3),
+        input_tokens=usage.get("input_tokens") or 0,
+        output_tokens=usage.get("output_tokens") or 0,
+        cache_read_tokens=cache_read,
+        cache_write_tokens=cache_write,
+    )
+
+
+class RateLimitedChatModel:
+    """A pooled chat client whose every call goes through the shared limiter.
+
+    Exposes the subset of the LangChain chat-model API the pipeline uses:
+    `invoke`, `ainvoke`, `stream`, `astream` and `with_structured_output`.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        limiter: RateLimiter,
+        schema: Any = None,
+        model: str = "",
+        provider: str = "",
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        self.client = client
+        self.limiter = limiter
+        self.schema = schema
+        self.model = model or settings.llm_model
+        self.provider = provider or settings.llm_provider
+        self.temperature = settings.llm_temperature if temperature is None else temperature
+        self.max_tokens = max_tokens or settings.token_budget_per_agent
+        self._runnable = (
+            client.with_structured_output(schema, include_raw=True) if schema is not None else client
+        )
+
+    def with_structured_output(self, schema: Any) -> RateLimitedChatModel:
+        return RateLimitedChatModel(
+            self.client, self.limiter, schema, self.model, self.provider,
+            self.temperature, self.max_tokens,
+        )
+
+    def _unwrap(self, result: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """Return (value, usage) for plain and structured responses."""
+        if self.schema is None:
+            return result, getattr(result, "usage_metadata", None)
+        raw = result.get("raw")
+        usage = getattr(raw, "usage_metadata", None)
+        if result.get("parsing_error") is not None:
+            raise result["parsing_error"]
+        return result["parsed"], usage
+
+    def _batch_call(self, messages: Any) -> Any:
+        """Defer the call to the batch runner (src.llm.batch).
+
+        The graph node pauses on `interrupt()` until the runner resumes it
+        with the batch result. A node that made several calls re-runs from
+        the start and gets its earlier answers replayed, so each request is
+        charged to the ledger once, by id — at the batch discount.
+        """
+        request = build_request(messages, self.model, self.temperature, self.max_tokens, self.schema)
+        message = result_message(interrupt({"llm_request": request}))
+        usage = message.usage_metadata
+        _record_call(0.0, usage)
+        charge(self.model, usage, request_id=request["custom_id"], price_factor=BATCH_PRICE_FACTOR)
+        if self.schema is None:
+            return message
+        return self.schema.model_validate_json(message.content)
+
+    def invoke(self, messages: Any) -> Any:
+        estimate = estimate_tokens(messages)
+        check_budget(self.model, estimate)
+        if batch_mode_enabled():
+            return self._batch_call(messages)
+        messages = with_cache_breakpoint(messages, self.provider)
+        waited = self.limiter.acquire(estimate)
+        usage, error = None, None
+        try:
+            value, usage = self._unwrap(self._runnable.invoke(messages))
+            return value
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.limiter.release(estimate, usage, error)
+            _record_call(waited, usage)
+            charge(self.model, usage)
+
+    async def ainvoke(self, messages: Any) -> Any:
+        estimate = estimate_tokens(messages)
+        check_budget(self.model, estimate)
+        if batch_mode_enabled():
+            return self._batch_call(messages)
+        messages = with_cache_breakpoint(messages, self.provider)
+        waited = await self.limiter.aacquire(estimate)
+        usage, error = None, None
+        try:
+            value, usage = self._unwrap(await self._runnable.ainvoke(messages))
+            return value
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.limiter.release(estimate, usage, error)
+            _record_call(waited, usage)
+            charge(self.model, usage)
+
+    def stream(self, messages: Any) -> Iterator[Any]:
+        """Yield the response's message chunks as they arrive (plain text calls only).
+
+        In batch mode, or with a structured-output schema, the whole
+        response is yielded as one chunk.
+        """
+        if self.schema is not None or batch_mode_enabled():
+            yield self.invoke(messages)
+            return
+        estimate = estimate_tokens(messages)
+        check_budget(self.model, estimate)
+        messages = with_cache_breakpoint(messages, self.provider)
+        waited = self.limiter.acquire(estimate)
+        message, error = None, None
+        try:
+            for chunk in self._runnable.stream(messages):
+                message = chunk if message is None else message + chunk
+                yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            usage = getattr(message, "usage_metadata", None)
+            self.limiter.release(estimate, usage, error)
+            _record_call(waited, usage)
+            charge(self.model, usage)
+
+    async def astream(self, messages: Any) -> AsyncIterator[Any]:
+        """Async `stream`."""
+        if self.schema is not None or batch_mode_enabled():
+            yield await self.ainvoke(messages)
+            return
+        estimate = estimate_tokens(messages)
+        check_budget(self.model, estimate)
+        messages = with_cache_breakpoint(messages, self.provider)
+        waited = await self.limiter.aacquire(estimate)
+        message, error = None, None
+        try:
+            async for chunk in self._runnable.astream(messages):
+                message = chunk if message is None else message + chunk
+                yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            usage = getattr(message, "usage_metadata", None)
+            self.limiter.release(estimate, usage, error)
+            _record_call(waited, usage)
+            charge(self.model, usage)
+
+
+def _build_client(provider: str, model: str, temperature: float, max_tokens: int) -> Any:
+    """Instantiate the provider's LangChain chat model, or None without a key."""
+    if provider == "mock":
+        from src.llm.mock import MockChatModel
+        return MockChatModel()
+    if provider == "anthropic" and settings.anthropic_api_key:
+        from langchain_anthropic import ChatAnthropic
+        return ChatAnthropic(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=settings.anthropic_api_key,
+            max_retries=0,  # 429s are handled by the shared limiter
+        )
+    if provider == "openai" and settings.openai_api_key:
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=settings.openai_api_key,
+            max_retries=0,
+            stream_usage=True,  # usage on the last streamed chunk, for the ledger
+        )
+    return None
+
+
+class LLMClientPool:
+    """Registry of chat clients sharing one rate limiter."""
+
+    def __init__(self, limiter: Optional[RateLimiter] = None):
+        self.limiter = limiter or RateLimiter(
+            requests_per_minute=settings.llm_requests_per_minute,
+            input_tokens_per_minute=settings.llm_input_tokens_per_minute,
+            output_tokens_per_minute=settings.llm_output_tokens_per_minute,
+            max_concurrency=settings.llm_max_concurrency,
+        )
+        self._clients: Dict[Tuple[str, str, float, int], Optional[RateLimitedChatModel]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Optional[RateLimitedChatModel]:
+        """Return the pooled client for these settings (None in mock mode).
+
+        Without an explicit `model`, the current audit's ledger may pick a
+        cheaper one once its budget policy degrades it.
+        """
+        key = (
+            settings.llm_provider,
+            model or budget_model(settings.llm_model),
+            settings.llm_temperature if temperature is None else temperature,
+            max_tokens or settings.token_budget_per_agent,
+        )
+        with self._lock:
+            if key not in self._clients:
+                client = _build_client(*key)
+                if client is None:
+                    logger.warning(
+                        "No LLM API key configured — running in MOCK mode. "
+                        "Set ANTHROPIC_API_KEY or OPENAI_API_KEY in .env"
+                    )
+                self._clients[key] = (
+                    RateLimitedChatModel(
+                        client, self.limiter, model=key[1], provider=key[0],
+                        temperature=key[2], max_tokens=key[3],
+                    )
+                    if client is not None else None
+                )
+            return self._clients[key]
+
+
+# Lazy-loaded pool instance (shared across agents, nodes and audits)
+_pool_instance: Optional[LLMClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMClientPool:
+    global _pool_instance
+    if _pool_instance is None:
+        with _pool_lock:
+            if _pool_instance is None:
+                _pool_instance = LLMClientPool()
+    return _pool_instance
+
+
+def get_chat_model(**kwargs: Any) -> Optional[RateLimitedChatModel]:
+    """Shortcut for `get_llm_pool().get(...)`."""
+    return get_llm_pool().get(**kwargs)
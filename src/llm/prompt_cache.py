@@ -0,0 +1,66 @@
+"""Provider-side prompt caching.
+
+Every request is laid out as a stable, cacheable prefix followed by the
+audit-specific tail:
+
+- prefix: the tool / output schema the SDK adds for structured output,
+  then the system message — the agent's static prompt and the JSON-only
+  instruction, identical for every audit of a given type
+- tail: the user message (client context, audit data, repair request)
+
+Anthropic only caches up to an explicit `cache_control` breakpoint, so
+`with_cache_breakpoint` marks the end of the system message. OpenAI
+caches stable prefixes automatically: keeping the system message first
+and byte-identical is all it needs. Both ignore prefixes shorter than
+their minimum cacheable length (1024 tokens on Claude Sonnet / Opus and
+GPT-4o class models), so short prompts are simply sent uncached.
+
+Cache reads and writes come back in `usage_metadata["input_token_details"]`
+and are charged by the ledger at their own rates (src.llm.ledger).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.messages import SystemMessage
+
+from src.config import settings
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Providers that need explicit breakpoints (the mock mimics Anthropic)
+_BREAKPOINT_PROVIDERS = ("anthropic", "mock")
+
+
+def _system_text(message: Any) -> Optional[str]:
+    """Text of a system message given as a tuple or a SystemMessage."""
+    if isinstance(message, tuple) and message[0] == "system" and isinstance(message[1], str):
+        return message[1]
+    if isinstance(message, SystemMessage) and isinstance(message.content, str):
+        return message.content
+    return None
+
+
+def with_cache_breakpoint(messages: Any, provider: str) -> Any:
+    """Mark the end of the leading system message as a cache breakpoint."""
+    if (
+        not settings.prompt_caching_enabled
+        or provider not in _BREAKPOINT_PROVIDERS
+        or not isinstance(messages, list)
+        or not messages
+    ):
+        return messages
+    text = _system_text(messages[0])
+    if text is None:
+        return messages
+    system = SystemMessage(
+        content=[{"type": "text", "text": text, "cache_control": CACHE_CONTROL}]
+    )
+    return [system, *messages[1:]]
+
+
+def cache_token_counts(usage: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    """(cache read, cache write) input tokens of a response's usage."""
+    details = (usage or {}).get("input_token_details") or {}
+    return details.get("cache_read") or 0, details.get("cache_creation") or 0
@@ -0,0 +1,124 @@
+"""Retry transient LLM failures with jittered exponential backoff.
+
+Only transport-level failures are retried — rate limits, timeouts,
+dropped connections and provider 5xx. Anything else (bad request, auth,
+a bug in our code) is raised on the first attempt.
+
+Every attempt is appended to a caller-supplied log as
+`{"latency_ms": ..., "outcome": "ok" | <exception name>}`, which agents
+copy into their execution-timeline entry.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from src.config import settings
+from src.llm.pool import is_rate_limit_error, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Exception class names (matched over the MRO) raised by the Anthropic /
+# OpenAI SDKs and httpx for network-level failures.
+_TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError",    # anthropic / openai (APITimeoutError subclasses it)
+    "InternalServerError",   # anthropic / openai 5xx
+    "TransportError",        # httpx timeouts and network errors
+}
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True if retrying the same call may succeed."""
+    if is_rate_limit_error(error):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status == 408
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def backoff_delay(attempt: int, error: Optional[BaseException] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a 429's retry-after."""
+    cap = min(settings.retry_backoff_max_seconds, settings.retry_backoff_seconds * 2 ** attempt)
+    delay = random.uniform(0, cap)
+    retry_after = retry_after_seconds(error) if error is not None else None
+    return max(delay, retry_after or 0.0)
+
+
+def _log_attempt(attempts: List[Dict[str, Any]], started: float, outcome: str) -> None:
+    attempts.append({
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "outcome": outcome,
+    })
+
+
+def _should_retry(error: Exception, attempt: int, retries: int, label: str) -> Optional[float]:
+    if attempt >= retries or not is_transient_error(error):
+        return None
+    delay = backoff_delay(attempt, error)
+    logger.warning(
+        f"[{label}] {type(error).__name__}: {error} — retry {attempt + 1}/{retries} in {delay:.1f}s"
+    )
+    return delay
+
+
+def call_with_retries(
+    call: Callable[[], T],
+    *,
+    label: str,
+    attempts: Optional[List[Dict[str, Any]]] = None,
+    max_retries: Optional[int] = None,
+) -> T:
+    """Run `call()`, retrying transient failures up to settings.max_retries times."""
+    retries = settings.max_retries if max_retries is None else max_retries
+    attempts = attempts if attempts is not None else []
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            _log_attempt(attempts, started, type(e).__name__)
+            delay = _should_retry(e, attempt, retries, label)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+        else:
+            _log_attempt(attempts, started, "ok")
+            return result
+
+
+async def acall_with_retries(
+    call: Callable[[], Awaitable[T]],
+    *,
+    label: str,
+    attempts: Optional[List[Dict[str, Any]]] = None,
+    max_retries: Optional[int] = None,
+) -> T:
+    """Async `call_with_retries` — `call` returns a fresh awaitable per attempt."""
+    retries = settings.max_retries if max_retries is None else max_retries
+    attempts = attempts if attempts is not None else []
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as e:
+            _log_attempt(attempts, started, type(e).__name__)
+            delay = _should_retry(e, attempt, retries, label)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+        else:
+            _log_attempt(attempts, started, "ok")
+            return result
@@ -5,16 +5,40 @@ This demonstrates the full pipeline end-to-end:
 2. Stream the LangGraph pipeline
 3. Print results at each phase
 4. Display final deliverables
+
+An interrupted run can be continued with `--resume AUDIT_ID`, including
+one stopped by the LLM budget (AUDIT_BUDGET_USD / AUDIT_BUDGET_TOKENS).
+With `--batch`, LLM calls go through the provider's batch API (about half
+price, results within hours) instead of being answered live.
+With HUMAN_VALIDATION=required the run stops at the validation step;
+`--resume AUDIT_ID --validate decision.json` applies the consultant's
+overrides and finishes the audit. On a finished audit,
+`--resume AUDIT_ID --overrides overrides.json` applies further edits and
+re-runs only the steps they affect.
+Set LLM_PROVIDER=mock to run fully offline with realistic, seeded outputs.
 """
 
 from __future__ import annotations
 
+import argparse
+import json
 import logging
 import sys
 from datetime import datetime, timezone
 
+from src.agents.streaming import (
+    describe_item,
+    describe_retraction,
+    is_item_event,
+    is_report_chunk,
+    is_retraction,
+)
 from src.connectors.local_upload import compute_input_hash
-from src.orchestrator.graph import audit_graph
+from src.llm.cache import bypass_llm_cache, get_llm_cache
+from src.llm.ledger import BudgetExceededError
+from src.orchestrator.batch import run_batch
+from src.orchestrator.recompute import recompute_with_overrides
+from src.orchestrator.runner import is_interrupt, stream_audit, stream_resume_audit
 from src.orchestrator.state import build_initial_state
 from src.schemas.enums import AuditType
 
@@ -49,8 +73,13 @@ MOCK_CLIENT_CONTEXT = {
 }
 
 
-def run_mock_audit():
-    """Run a full IA Readiness audit on mock data."""
+def run_mock_audit(reuse_completed: bool = True, batch: bool = False):
+    """Run a full IA Readiness audit on mock data.
+
+    If these exact inputs were already audited with the current pipeline
+    version, the stored result is shown without running any agent.
+    With `batch`, the LLM calls are sent through the provider batch API.
+    """
     print("=" * 70)
     print("  IAG AUDIT FACTORY — Audit IA Readiness (Mock Run)")
     print("=" * 70)
@@ -63,7 +92,7 @@ def run_mock_audit():
     )
 
     initial_state = build_initial_state(
-        audit_id=f"AUDIT-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M')}",
+        audit_id=f"AUDIT-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}",
         audit_type=AuditType.IA_READINESS.value,
         client_context=MOCK_CLIENT_CONTEXT,
         input_hash=input_hash,
@@ -75,11 +104,119 @@ def run_mock_audit():
     print(f"Input Hash : {input_hash[:16]}...")
     print()
 
+    if batch:
+        print("Mode batch : appels LLM via l'API batch du fournisseur (attente des résultats)...")
+        final_state = run_batch([initial_state], reuse_completed=reuse_completed)
+        _print_results(final_state[initial_state["audit_id"]])
+        return
+
     # Stream the pipeline
-    final_state = None
-    for event in audit_graph.stream(initial_state):
-        for node_name, state_update in event.items():
-            phase = state_update.get("current_phase", "?")
+    try:
+        final_state, paused = _print_stream(stream_audit(initial_state, reuse_completed=reuse_completed))
+    except BudgetExceededError as e:
+        _print_budget_stop(initial_state["audit_id"], e)
+        return
+    if paused:
+        _print_validation_stop(initial_state["audit_id"], final_state)
+        return
+    _print_results(final_state)
+
+
+def resume_mock_audit(audit_id: str, decision=None):
+    """Continue an interrupted audit from its last completed node.
+
+    `decision` ({"overrides": ..., "validated_by": ...}) completes a
+    pending human validation.
+    """
+    print("=" * 70)
+    print(f"  IAG AUDIT FACTORY — Reprise de l'audit {audit_id}")
+    print("=" * 70)
+    print()
+
+    try:
+        final_state, paused = _print_stream(stream_resume_audit(audit_id, decision=decision))
+    except KeyError:
+        print(f"Aucun checkpoint trouvé pour l'audit {audit_id}.")
+        return
+    except BudgetExceededError as e:
+        _print_budget_stop(audit_id, e)
+        return
+    if paused:
+        _print_validation_stop(audit_id, final_state)
+        return
+    _print_results(final_state)
+
+
+def override_mock_audit(audit_id: str, overrides):
+    """Apply consultant overrides to a finished audit, recomputing only what they affect."""
+    print("=" * 70)
+    print(f"  IAG AUDIT FACTORY — Overrides sur l'audit {audit_id}")
+    print("=" * 70)
+    print()
+
+    try:
+        result = recompute_with_overrides(audit_id, overrides)
+    except KeyError:
+        print(f"Aucun checkpoint trouvé pour l'audit {audit_id}.")
+        return
+    except ValueError as e:
+        print(f"Overrides refusés : {e}")
+        return
+    print(f"Champs modifiés      : {', '.join(result.changed) or 'aucun'}")
+    print(f"Étapes recalculées   : {', '.join(result.nodes) or 'aucune'}")
+    _print_results(result.state)
+
+
+def _print_budget_stop(audit_id: str, error: BudgetExceededError):
+    print()
+    print(f"Audit interrompu — budget LLM atteint : {error}")
+    print(f"Augmenter AUDIT_BUDGET_USD / AUDIT_BUDGET_TOKENS puis reprendre avec --resume {audit_id}")
+
+
+def _print_validation_stop(audit_id: str, state):
+    state = state or {}
+    print()
+    print(f"Audit en attente de validation humaine : {len(state.get('findings', []))} findings, "
+          f"{len(state.get('risks', []))} risques, {len(state.get('recommendations', []))} recommandations.")
+    print(f"Reprendre avec --resume {audit_id} --validate decision.json "
+          '({"overrides": {...}, "validated_by": "..."})')
+
+
+def _print_stream(chunks):
+    """Print one line per node update and per streamed agent item.
+
+    The executive summary is printed as it streams in. Returns
+    (final state, paused for validation).
+    """
+    # Nodes return partial updates; "values" carries the merged state.
+    final_state, paused = None, False
+    report_attempt = None
+    for mode, chunk in chunks:
+        if is_report_chunk(mode, chunk):
+            if chunk["attempt"] != report_attempt:
+                retry = f" (retry {chunk['attempt'] - 1})" if chunk["attempt"] > 1 else ""
+                print(f"\n  --- Executive Summary{retry} ---")
+                report_attempt = chunk["attempt"]
+            print(chunk["text"], end="", flush=True)
+            continue
+        if report_attempt is not None:
+            print()                            # end of the streamed summary
+            report_attempt = None
+        if mode == "values":
+            final_state = chunk
+            continue
+        if is_interrupt(mode, chunk):
+            paused = True
+            continue
+        if mode == "custom":
+            if is_item_event(mode, chunk):
+                print(f"  {'':20s}   · {chunk['agent_id']}: {describe_item(chunk)}")
+            elif is_retraction(mode, chunk):
+                print(f"  {'':20s}   × {chunk['agent_id']}: {describe_retraction(chunk)}")
+            continue
+        for node_name, state_update in chunk.items():
+            state_update = state_update or {}
+            phase = state_update.get("current_phase", (final_state or {}).get("current_phase", "?"))
             print(f"  [{node_name:20s}] → phase: {phase}")
 
             # Show counts for data-producing nodes
@@ -88,9 +225,10 @@ def run_mock_audit():
             rec_count = len(state_update.get("recommendations", []))
             if f_count or r_count or rec_count:
                 print(f"  {'':20s}   +{f_count} findings, +{r_count} risks, +{rec_count} recommendations")
+    return final_state, paused
 
-            final_state = state_update
 
+def _print_results(final_state):
     print()
     print("=" * 70)
     print("  PIPELINE COMPLETE")
@@ -143,8 +281,76 @@ def run_mock_audit():
                   f"status={entry.get('status', '?')}")
         print()
 
+    # ── LLM Usage & Cost ───────────────────────────────────────────────
+    usage = final_state.get("token_usage") or {}
+    if usage.get("total"):
+        total = usage["total"]
+        print("─" * 70)
+        print(f"LLM USAGE ({total['calls']} calls, "
+              f"{total['input_tokens']} in / {total['output_tokens']} out tokens, "
+              f"{total.get('cache_read_tokens', 0)} from prompt cache, "
+              f"${total['cost_usd']:.4f}):")
+        print("─" * 70)
+        for agent_id, entry in sorted(usage.get("agents", {}).items()):
+            print(f"  [{agent_id:20s}] calls={entry['calls']:<3d} "
+                  f"in={entry['input_tokens']:<7d} out={entry['output_tokens']:<7d} "
+                  f"${entry['cost_usd']:.4f}")
+        print()
+
+    # ── LLM Cache ──────────────────────────────────────────────────────
+    cache = get_llm_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"LLM cache : {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['entries']} entries, {stats['size_bytes'] / 1024:.0f} KiB)")
+        print()
+
     print("Done. Audit deliverables ready for export.")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Run the mock IA Readiness audit.")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Bypass the LLM response cache for this run (always call the provider).",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Re-run the pipeline even if identical inputs were already audited.",
+    )
+    parser.add_argument(
+        "--resume", metavar="AUDIT_ID",
+        help="Continue an interrupted audit from its last completed node.",
+    )
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Send LLM calls through the provider batch API (cheaper, slower).",
+    )
+    parser.add_argument(
+        "--validate", metavar="DECISION_JSON",
+        help='With --resume: complete the human validation with {"overrides": ..., "validated_by": ...}.',
+    )
+    parser.add_argument(
+        "--overrides", metavar="OVERRIDES_JSON",
+        help="With --resume on a finished audit: apply human_overrides and recompute what they affect.",
+    )
+    args = parser.parse_args()
+    if (args.validate or args.overrides) and not args.resume:
+        parser.error("--validate / --overrides require --resume AUDIT_ID")
+
+    with bypass_llm_cache(args.no_cache):
+        if args.resume and args.overrides:
+            with open(args.overrides, encoding="utf-8") as f:
+                override_mock_audit(args.resume, json.load(f))
+        elif args.resume:
+            decision = None
+            if args.validate:
+                with open(args.validate, encoding="utf-8") as f:
+                    decision = json.load(f)
+            resume_mock_audit(args.resume, decision)
+        else:
+            run_mock_audit(reuse_completed=not args.force, batch=args.batch)
+
+
 if __name__ == "__main__":
-    run_mock_audit()
+    main()
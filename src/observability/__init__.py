@@ -0,0 +1 @@
+from .tracing import Span, Tracer, get_tracer, record, trace_span
@@ -0,0 +1,155 @@
+"""Span exporters — JSONL, Prometheus text format and (optionally) OTLP.
+
+- JsonlSpanExporter: one JSON object per finished span, appended to
+  `<tracing_dir>/spans.jsonl`
+- PrometheusFileExporter: per (kind, name) counters and sums, rewritten
+  to `<tracing_dir>/metrics.prom` on flush (node_exporter textfile format)
+- OTLPExporter: forwards spans to an OTLP/HTTP collector when
+  OTEL_EXPORTER_OTLP_ENDPOINT is set; needs the optional
+  `opentelemetry-sdk` and `opentelemetry-exporter-otlp-proto-http` packages
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.config import settings
+from src.observability.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlSpanExporter:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str, ensure_ascii=False)
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# (metric name, help text, span attribute or None for the span count, scale)
+_PROM_METRICS = [
+    ("audit_spans_total", "Finished spans", None, 1),
+    ("audit_span_errors_total", "Spans that ended with an error", "error", 1),
+    ("audit_span_wall_seconds_total", "Wall time spent in spans", "wall_ms", 0.001),
+    ("audit_span_queue_wait_seconds_total", "Time spent waiting for a slot", "queue_wait_ms", 0.001),
+    ("audit_llm_input_tokens_total", "LLM input tokens", "input_tokens", 1),
+    ("audit_llm_output_tokens_total", "LLM output tokens", "output_tokens", 1),
+    ("audit_llm_cache_read_tokens_total", "Input tokens read from the provider prompt cache",
+     "cache_read_tokens", 1),
+    ("audit_llm_cache_write_tokens_total", "Input tokens written to the provider prompt cache",
+     "cache_write_tokens", 1),
+    ("audit_llm_prompt_bytes_total", "Bytes of prompt sent to the LLM", "prompt_bytes", 1),
+    ("audit_llm_retries_total", "LLM transport retries", "retries", 1),
+    ("audit_llm_cache_hits_total", "LLM responses served from the cache", "cache_hit", 1),
+]
+
+
+class PrometheusFileExporter:
+    """Aggregates spans per (kind, name) and writes a Prometheus text file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        values = {
+            "wall_ms": span.wall_ms,
+            "error": 1 if span.status == "error" else 0,
+            **{k: v for k, v in span.attributes.items() if isinstance(v, (int, float))},
+        }
+        with self._lock:
+            totals = self._totals[(span.kind, span.name)]
+            totals["count"] += 1
+            for _, _, attribute, _ in _PROM_METRICS:
+                if attribute is not None:
+                    totals[attribute] += float(values.get(attribute) or 0)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for metric, help_text, attribute, scale in _PROM_METRICS:
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for (kind, name), totals in sorted(self._totals.items()):
+                    value = totals["count"] if attribute is None else totals[attribute] * scale
+                    lines.append(f'{metric}{{kind="{kind}",name="{name}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        tmp = self.path.with_suffix(".prom.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class OTLPExporter:
+    """Re-emits finished spans through the OpenTelemetry SDK.
+
+    Span nesting is carried as `audit.trace_id` / `audit.parent_id`
+    attributes rather than OTel context, since spans are exported after
+    they end.
+    """
+
+    def __init__(self, endpoint: str):
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError as e:
+            raise ImportError(
+                "OTLP export needs `pip install opentelemetry-sdk "
+                "opentelemetry-exporter-otlp-proto-http`"
+            ) from e
+
+        self._provider = TracerProvider(resource=Resource.create({"service.name": "audit-factory"}))
+        self._provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        self._tracer = self._provider.get_tracer("src.observability")
+
+    def export(self, span: Span) -> None:
+        attributes: Dict[str, Any] = {
+            "audit.kind": span.kind,
+            "audit.trace_id": span.trace_id,
+            "audit.parent_id": span.parent_id or "",
+        }
+        for key, value in span.attributes.items():
+            attributes[f"audit.{key}"] = (
+                value if isinstance(value, (str, int, float, bool)) else json.dumps(value)
+            )
+        start_ns = int(span.start_time * 1e9)
+        otel_span = self._tracer.start_span(span.name, start_time=start_ns, attributes=attributes)
+        otel_span.end(end_time=start_ns + int(span.wall_ms * 1e6))
+
+    def flush(self) -> None:
+        self._provider.force_flush()
+
+
+def build_exporters() -> List[Any]:
+    """Exporters configured by settings (tracing_dir, otlp_endpoint)."""
+    directory = Path(settings.tracing_dir)
+    exporters: List[Any] = [
+        JsonlSpanExporter(str(directory / "spans.jsonl")),
+        PrometheusFileExporter(str(directory / "metrics.prom")),
+    ]
+    if settings.otlp_endpoint:
+        try:
+            exporters.append(OTLPExporter(settings.otlp_endpoint))
+        except ImportError as e:
+            logger.warning(f"OTLP export disabled: {e}")
+    for exporter in exporters:
+        if hasattr(exporter, "flush"):
+            atexit.register(exporter.flush)
+    return exporters
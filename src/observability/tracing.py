@@ -0,0 +1,163 @@
+"""Tracing spans for graph nodes and LLM calls.
+
+Every graph node and every agent LLM call runs inside a span. Spans nest
+through a context variable (which follows the run into LangGraph worker
+threads and asyncio tasks), share the audit_id as trace_id, and carry:
+
+- wall_ms                 wall time of the span
+- queue_wait_ms           time spent waiting for a plugin slot / the rate limiter
+- input_tokens / output_tokens
+- cache_read_tokens / cache_write_tokens   provider prompt-cache usage
+- prompt_bytes            size of the prompt sent to the provider
+- retries / cache_hit     transport retries and response-cache hits
+- state_sizes / update_sizes   item counts of the state fields read / written
+
+A span ends with status "ok", "error", or "interrupted" when the node
+paused on a LangGraph interrupt (batch-mode LLM call, human validation):
+a pause is not counted as an error.
+
+Finished spans go to every configured exporter (see exporters.py).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from langgraph.errors import GraphBubbleUp
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+# Numeric attributes summed when recorded several times on one span
+_ADDITIVE = (
+    "queue_wait_ms", "input_tokens", "output_tokens", "cache_read_tokens",
+    "cache_write_tokens", "prompt_bytes", "retries",
+)
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str                                  # "node" | "llm"
+    trace_id: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: Optional[str] = None
+    start_time: float = field(default_factory=time.time)
+    wall_ms: float = 0.0
+    status: str = "ok"                        # "ok" | "error" | "interrupted"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def record(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            if key in _ADDITIVE and isinstance(value, (int, float)):
+                self.attributes[key] = self.attributes.get(key, 0) + value
+            else:
+                self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporters."""
+
+    def __init__(self, exporters: Optional[List[Any]] = None):
+        self.exporters = exporters if exporters is not None else []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str, trace_id: Optional[str] = None,
+             **attributes: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            kind=kind,
+            trace_id=trace_id or (parent.trace_id if parent else ""),
+            parent_id=parent.span_id if parent else None,
+        )
+        span.record(**attributes)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except GraphBubbleUp:
+            span.status = "interrupted"
+            raise
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.wall_ms = round((time.perf_counter() - started) * 1000, 3)
+            _current_span.reset(token)
+            self._export(span)
+
+    def _export(self, span: Span) -> None:
+        with self._lock:
+            for exporter in self.exporters:
+                try:
+                    exporter.export(span)
+                except Exception as e:
+                    logger.warning(f"Span export failed ({type(exporter).__name__}): {e}")
+
+    def flush(self) -> None:
+        with self._lock:
+            for exporter in self.exporters:
+                flush = getattr(exporter, "flush", None)
+                if flush is not None:
+                    flush()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def record(**attributes: Any) -> None:
+    """Add attributes to the innermost active span (no-op outside a span)."""
+    span = _current_span.get()
+    if span is not None:
+        span.record(**attributes)
+
+
+def field_sizes(data: Dict[str, Any]) -> Dict[str, int]:
+    """Item counts of the non-empty list / dict fields of a state or update."""
+    return {
+        key: len(value)
+        for key, value in (data or {}).items()
+        if isinstance(value, (list, dict)) and value and key != "state"
+    }
+
+
+# Lazy-loaded tracer instance (shared across nodes, agents and audits)
+_tracer_instance: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the shared tracer; without exporters when tracing is disabled."""
+    global _tracer_instance
+    if _tracer_instance is None:
+        with _tracer_lock:
+            if _tracer_instance is None:
+                from src.observability.exporters import build_exporters
+                exporters = build_exporters() if settings.tracing_enabled else []
+                _tracer_instance = Tracer(exporters)
+    return _tracer_instance
+
+
+def trace_span(name: str, kind: str, trace_id: Optional[str] = None, **attributes: Any):
+    """Shortcut for `get_tracer().span(...)`."""
+    return get_tracer().span(name, kind, trace_id=trace_id, **attributes)
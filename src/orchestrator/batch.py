@@ -0,0 +1,140 @@
+"""Offline batch runner — audits whose LLM calls go through batch APIs.
+
+Non-interactive audits do not need answers within seconds, and provider
+batch APIs charge about half price for them. `run_batch` drives many
+audits in lock-step phases on the checkpointed graph:
+
+1. Every pending audit runs under `batch_mode()` until each of its LLM
+   calls has paused on an interrupt (src.llm.batch); the graph's state
+   up to that point is checkpointed as usual
+2. The requests of all audits are submitted as one provider batch
+   (identical requests are sent once) and polled until it has ended
+3. Each audit is resumed with `Command(resume=...)` carrying its
+   results, runs to its next LLM calls, and the cycle repeats
+
+A typical audit needs one batch per LLM stage: core agents, plugin
+agents, ROI, report — plus one per repair reprompt. Failed requests
+surface as agent errors, exactly like failed live calls.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from langgraph.types import Command
+
+from src.config import settings
+from src.llm.batch import BatchBackend, BatchRequest, BatchResult, batch_mode, get_batch_backend
+from src.observability.tracing import get_tracer
+from src.orchestrator.runner import (
+    _lookup,
+    _remember,
+    _thread_config,
+    get_default_graph,
+    get_result_store,
+)
+from src.orchestrator.state import AuditGraphState
+from src.storage.result_store import AuditResultStore
+
+logger = logging.getLogger(__name__)
+
+
+def wait_for_batch(
+    backend: BatchBackend, requests: List[BatchRequest], poll_seconds: Optional[float] = None
+) -> Dict[str, BatchResult]:
+    """Submit `requests` as one batch and block until its results are in."""
+    poll_seconds = settings.batch_poll_seconds if poll_seconds is None else poll_seconds
+    batch_id = backend.submit(requests)
+    logger.info(f"Batch {batch_id}: {len(requests)} requests submitted")
+    while (results := backend.poll(batch_id)) is None:
+        time.sleep(poll_seconds)
+    logger.info(f"Batch {batch_id}: ended with {len(results)} results")
+    return results
+
+
+def _llm_requests(snapshot) -> List[tuple]:
+    """(interrupt id, request) of the LLM calls an audit is paused on."""
+    return [
+        (intr.id, intr.value["llm_request"])
+        for intr in snapshot.interrupts
+        if isinstance(intr.value, dict) and "llm_request" in intr.value
+    ]
+
+
+def run_batch(
+    initial_states: Iterable[AuditGraphState],
+    *,
+    backend: Optional[BatchBackend] = None,
+    graph=None,
+    store: Optional[AuditResultStore] = None,
+    reuse_completed: bool = True,
+    poll_seconds: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Run audits with batched LLM calls; returns final states by audit_id.
+
+    Memo hits are returned without running. An audit that fails keeps its
+    last checkpointed state, with the failure added to its errors.
+    """
+    graph = graph or get_default_graph()
+    if graph.checkpointer is None:
+        raise ValueError("Batch mode needs a checkpointed graph (CHECKPOINT_ENABLED=true)")
+    store = store or get_result_store()
+    backend = backend or get_batch_backend()
+
+    final_states: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, Any] = {}
+    for state in initial_states:
+        stored = _lookup(state, reuse_completed, store)
+        if stored is not None:
+            final_states[state["audit_id"]] = stored
+            continue
+        graph.checkpointer.delete_thread(state["audit_id"])
+        pending[state["audit_id"]] = state
+
+    phase = 0
+    with batch_mode():
+        while pending:
+            paused: Dict[str, List[tuple]] = {}
+            for audit_id, graph_input in pending.items():
+                config = _thread_config(audit_id)
+                try:
+                    graph.invoke(graph_input, config)
+                except Exception as e:
+                    logger.error(f"Audit {audit_id} failed in batch mode: {e}")
+                    values = dict(graph.get_state(config).values)
+                    values["errors"] = list(values.get("errors", [])) + [f"Batch Error: {e}"]
+                    final_states[audit_id] = values
+                    continue
+                snapshot = graph.get_state(config)
+                requests = _llm_requests(snapshot)
+                if requests:
+                    paused[audit_id] = requests
+                    continue
+                final_states[audit_id] = snapshot.values
+                if snapshot.next:
+                    logger.info(f"Audit {audit_id} paused at {', '.join(snapshot.next)}")
+                else:
+                    _remember(snapshot.values, store)
+
+            if not paused:
+                break
+            phase += 1
+            unique = {r["custom_id"]: r for requests in paused.values() for _, r in requests}
+            logger.info(
+                f"Batch phase {phase}: {len(unique)} LLM requests from {len(paused)} audits"
+            )
+            results = wait_for_batch(backend, list(unique.values()), poll_seconds)
+            pending = {
+                audit_id: Command(resume={
+                    interrupt_id: results.get(
+                        request["custom_id"], BatchResult(error="missing from batch results")
+                    )
+                    for interrupt_id, request in requests
+                })
+                for audit_id, requests in paused.items()
+            }
+
+    get_tracer().flush()
+    return final_states
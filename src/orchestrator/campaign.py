@@ -0,0 +1,304 @@
+"""Audit campaigns — many audits from a manifest, run concurrently.
+
+A campaign manifest lists one audit per row, as JSONL or CSV:
+
+- JSONL: {"audit_id"?, "audit_type", "client_context": {...}, "documents": [paths],
+  "previous_audit_id"?}
+- CSV: columns audit_id (optional), audit_type, documents (paths separated
+  by ";"), previous_audit_id (optional), client_context (JSON) and/or any
+  other column, which becomes a client_context field (name, industry,
+  size, objectives, ...)
+
+A row with `previous_audit_id` is an incremental re-audit: only the
+agents touched by the documents changed since that audit are re-run
+(src.orchestrator.incremental).
+
+Rows are read lazily and run on one event loop through `astream_audit`,
+at most `concurrency` at a time, sharing the LLM pool's rate limits.
+Each audit's final state and deliverables are written as soon as it
+finishes. An optional global token budget stops new audits from being
+started once the tokens spent by finished and running audits reach it;
+audits already running complete (their own AUDIT_BUDGET_* still apply).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.connectors.local_upload import compute_input_hash, ingest_local_files
+from src.llm.ledger import get_ledger
+from src.orchestrator.incremental import with_previous_run
+from src.orchestrator.recompute import render_deliverables
+from src.orchestrator.runner import _afinal_state, astream_audit
+from src.orchestrator.state import build_initial_state
+from src.schemas.enums import AuditType
+
+logger = logging.getLogger(__name__)
+
+_RESERVED_COLUMNS = ("audit_id", "audit_type", "documents", "client_context", "previous_audit_id")
+
+
+@dataclass
+class ManifestEntry:
+    line: int
+    audit_id: str
+    audit_type: str
+    client_context: Dict[str, Any]
+    documents: List[str] = field(default_factory=list)
+    error: Optional[str] = None             # set for invalid rows (reported as failures)
+    previous_audit_id: Optional[str] = None  # incremental re-audit of this finished audit
+
+
+@dataclass
+class AuditOutcome:
+    audit_id: str
+    status: str                             # "completed" | "completed_with_errors" | "failed" | "skipped"
+    duration_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+    tokens: int = 0
+    cost_usd: float = 0.0
+
+
+@dataclass
+class CampaignReport:
+    outcomes: List[AuditOutcome] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for o in self.outcomes if o.status == status)
+
+    @property
+    def finished(self) -> int:
+        return self.count("completed") + self.count("completed_with_errors")
+
+    @property
+    def audits_per_hour(self) -> float:
+        return self.finished * 3600 / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def tokens(self) -> int:
+        return sum(o.tokens for o in self.outcomes)
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(o.cost_usd for o in self.outcomes)
+
+
+# ─── Manifest ─────────────────────────────────────────────────────────────
+
+def _documents(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [p.strip() for p in value.split(";") if p.strip()]
+    return [str(p) for p in value]
+
+
+def parse_entry(line: int, row: Dict[str, Any], campaign_id: str) -> ManifestEntry:
+    """Manifest entry of one row; invalid rows get `error` set."""
+    audit_id = str(row.get("audit_id") or f"{campaign_id}-{line:04d}")
+    try:
+        context = row.get("client_context") or {}
+        if isinstance(context, str):
+            context = json.loads(context)
+        extra = {k: v for k, v in row.items() if k not in _RESERVED_COLUMNS and v not in (None, "")}
+        context = {**extra, **context}
+        audit_type = AuditType(row.get("audit_type")).value
+    except (ValueError, TypeError) as e:
+        return ManifestEntry(line, audit_id, str(row.get("audit_type")), {}, error=str(e))
+    return ManifestEntry(
+        line, audit_id, audit_type, context, _documents(row.get("documents")),
+        previous_audit_id=row.get("previous_audit_id") or None,
+    )
+
+
+def read_manifest(path: str, campaign_id: Optional[str] = None) -> Iterator[ManifestEntry]:
+    """Yield manifest rows one at a time (JSONL, or CSV by extension)."""
+    campaign_id = campaign_id or f"CAMPAIGN-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
+    with open(path, encoding="utf-8", newline="") as f:
+        if Path(path).suffix.lower() == ".csv":
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                yield parse_entry(line, row, campaign_id)
+            return
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except json.JSONDecodeError as e:
+                yield ManifestEntry(line, f"{campaign_id}-{line:04d}", "", {}, error=str(e))
+                continue
+            yield parse_entry(line, row, campaign_id)
+
+
+def initial_state(entry: ManifestEntry, graph=None) -> Dict[str, Any]:
+    """Initial graph state of a manifest entry (documents ingested).
+
+    For an incremental entry, the state is seeded from the previous
+    audit's checkpoint on `graph`.
+    """
+    state = build_initial_state(
+        audit_id=entry.audit_id,
+        audit_type=entry.audit_type,
+        client_context=entry.client_context,
+        input_hash=compute_input_hash(entry.client_context, entry.documents),
+    )
+    state["sources_index"] = ingest_local_files(entry.documents)
+    if entry.previous_audit_id:
+        state = with_previous_run(state, entry.previous_audit_id, graph=graph)
+    return state
+
+
+# ─── Outputs ──────────────────────────────────────────────────────────────
+
+def deliverables(final_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Rendered deliverables of a finished audit."""
+    return render_deliverables(final_state)
+
+
+class JsonlOutput:
+    """One JSON line per audit, appended and flushed as each one finishes."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, outcome: AuditOutcome, final_state: Optional[Dict[str, Any]]) -> None:
+        record: Dict[str, Any] = {
+            "audit_id": outcome.audit_id,
+            "status": outcome.status,
+            "duration_seconds": outcome.duration_seconds,
+            "errors": outcome.errors,
+        }
+        if final_state:
+            record["final_state"] = final_state
+            record["deliverables"] = deliverables(final_state)
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class DirectoryOutput:
+    """One directory per audit: state.json, exec_summary.md, roadmap.md, slides.json."""
+
+    def __init__(self, path: str):
+        self.root = Path(path)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def write(self, outcome: AuditOutcome, final_state: Optional[Dict[str, Any]]) -> None:
+        directory = self.root / outcome.audit_id
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "status.json").write_text(
+            json.dumps(asdict(outcome), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        if not final_state:
+            return
+        rendered = deliverables(final_state)
+        (directory / "state.json").write_text(
+            json.dumps(final_state, ensure_ascii=False, indent=2, default=str), encoding="utf-8"
+        )
+        (directory / "exec_summary.md").write_text(rendered["exec_summary_md"], encoding="utf-8")
+        (directory / "roadmap.md").write_text(rendered["roadmap_md"], encoding="utf-8")
+        (directory / "slides.json").write_text(
+            json.dumps(rendered["slides"], ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    def close(self) -> None:
+        pass
+
+
+# ─── Runner ───────────────────────────────────────────────────────────────
+
+def _spent_tokens(usage: Optional[Dict[str, Any]]) -> int:
+    total = (usage or {}).get("total", {})
+    return total.get("input_tokens", 0) + total.get("output_tokens", 0)
+
+
+async def run_campaign(
+    entries: Iterator[ManifestEntry],
+    output: Any,
+    *,
+    concurrency: int = 4,
+    token_budget: int = 0,
+    reuse_completed: bool = True,
+    graph=None,
+    store=None,
+    on_outcome: Optional[Callable[[AuditOutcome], None]] = None,
+) -> CampaignReport:
+    """Run every manifest entry, `concurrency` audits at a time.
+
+    `output.write(outcome, final_state)` is called as each audit ends.
+    With `token_budget` > 0, no audit starts once finished + running
+    audits have spent that many tokens; the rest are reported as skipped.
+    """
+    report = CampaignReport()
+    started = time.perf_counter()
+    running: Dict[asyncio.Task, str] = {}
+    spent_finished = 0
+
+    def spent() -> int:
+        live = sum(_spent_tokens(get_ledger(audit_id).usage) for audit_id in running.values())
+        return spent_finished + live
+
+    def finish(outcome: AuditOutcome, final_state: Optional[Dict[str, Any]]) -> None:
+        report.outcomes.append(outcome)
+        output.write(outcome, final_state)
+        if on_outcome is not None:
+            on_outcome(outcome)
+
+    async def run_one(entry: ManifestEntry):
+        t0 = time.perf_counter()
+        try:
+            final_state = await _afinal_state(astream_audit(
+                initial_state(entry, graph), reuse_completed=reuse_completed, graph=graph, store=store,
+            ))
+        except Exception as e:
+            logger.error(f"Audit {entry.audit_id} failed: {e}")
+            return AuditOutcome(entry.audit_id, "failed", round(time.perf_counter() - t0, 3),
+                                [f"{type(e).__name__}: {e}"]), None
+        usage = final_state.get("token_usage") or {}
+        errors = list(final_state.get("errors") or [])
+        return AuditOutcome(
+            entry.audit_id,
+            "completed_with_errors" if errors else "completed",
+            round(time.perf_counter() - t0, 3),
+            errors,
+            _spent_tokens(usage),
+            round(usage.get("total", {}).get("cost_usd", 0.0), 6),
+        ), final_state
+
+    async def drain(return_when) -> None:
+        nonlocal spent_finished
+        done, _ = await asyncio.wait(running, return_when=return_when)
+        for task in done:
+            running.pop(task)
+            outcome, final_state = task.result()
+            spent_finished += outcome.tokens
+            finish(outcome, final_state)
+
+    for entry in entries:
+        if entry.error:
+            finish(AuditOutcome(entry.audit_id, "failed", errors=[f"Manifest line {entry.line}: {entry.error}"]), None)
+            continue
+        while len(running) >= concurrency:
+            await drain(asyncio.FIRST_COMPLETED)
+        if token_budget and spent() >= token_budget:
+            finish(AuditOutcome(entry.audit_id, "skipped",
+                                errors=[f"Campaign token budget reached ({token_budget})"]), None)
+            continue
+        running[asyncio.create_task(run_one(entry))] = entry.audit_id
+    if running:
+        await drain(asyncio.ALL_COMPLETED)
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return report
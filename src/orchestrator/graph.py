@@ -1,15 +1,33 @@
 import os
 import asyncio
-from typing import Dict, Any, List, Optional
+import contextvars
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime, timezone
 from dotenv import load_dotenv
+from langgraph.errors import GraphBubbleUp
 from langgraph.graph import StateGraph, END
-from langchain_anthropic import ChatAnthropic
-from src.orchestrator.state import AuditGraphState
-from src.schemas.models import Finding, Risk, Recommendation, ROIModel
+from langgraph.types import Overwrite, Send, interrupt
+from langchain_core.runnables import RunnableLambda
+from src.config import settings
+from src.llm.ledger import BudgetExceededError, get_ledger, ledger_scope, start_ledger
+from src.llm.pool import get_chat_model
+from src.llm.retry import acall_with_retries, call_with_retries
+from src.observability.tracing import field_sizes, record, trace_span
+from src.orchestrator.overrides import apply_overrides, validate_overrides
+from src.orchestrator.state import AuditGraphState, AgentTask
+from src.orchestrator.router import CORE_AGENT_IDS, resolve_agents_for_audit
+from src.schemas.models import AgentOutput, ROIModel
+from src.agents.base import BaseAgent
+from src.agents.context import build_context
+from src.agents.streaming import acollect_stream, collect_stream, report_streamer
+from src.agents.core.registry import get_core_agents
+from src.agents.plugins.registry import get_plugin_agents
 from src.agents.core.prompts import (
-    ORCHESTRATOR_PROMPT, 
-    DATA_SCANNER_PROMPT, 
+    ORCHESTRATOR_PROMPT,
     REPORT_GENERATOR_PROMPT,
     ROI_MODELER_PROMPT
 )
@@ -18,114 +36,537 @@ from src.agents.core.stitch_designer import StitchDesignerAgent
 # Load environment variables
 load_dotenv()
 
-# Initialize LLM
-llm = ChatAnthropic(model="claude-3-5-sonnet-latest", temperature=0)
+# Process-wide cap on plugin agents running at once (shared across audits).
+# The async path needs one asyncio.Semaphore per event loop.
+_plugin_slots = threading.BoundedSemaphore(settings.max_parallel_plugins)
+_async_plugin_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
 
-def node_intake_orchestrator(state: AuditGraphState):
-    print(f"[Intake] Processing context for {state['audit_type']}")
-    state["current_phase"] = "Intake"
-    if not state.get("findings"): state["findings"] = []
-    if not state.get("errors"): state["errors"] = []
-    if not state.get("risks"): state["risks"] = []
-    if not state.get("recommendations"): state["recommendations"] = []
-    if not state.get("scores"): state["scores"] = {}
-    return state
-
-def node_parallel_core_agents(state: AuditGraphState):
-    print("[Core Agents] Running Data Scanner via Claude...")
-    structured_llm = llm.with_structured_output(Finding)
+
+def _get_async_plugin_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _async_plugin_slots.get(loop)
+    if slots is None:
+        slots = _async_plugin_slots[loop] = asyncio.Semaphore(settings.max_parallel_plugins)
+    return slots
+
+
+def _run_coroutine_sync(coro):
+    """Run a coroutine from sync code, even if this thread already runs a loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+# ─── Agent output → state update ─────────────────────────────────────────
+
+def agent_output_to_update(output: AgentOutput) -> Dict[str, Any]:
+    """Convert an AgentOutput into a partial state update.
+
+    Only the agent's own contribution is returned: the `AppendLog` channels
+    and `merge_dicts` reducer of AuditGraphState merge it with the outputs of
+    the other agents running in the same fan-out.
+    """
+    update: Dict[str, Any] = {
+        "findings": [f.model_dump(mode="json") for f in output.findings],
+        "risks": [r.model_dump(mode="json") for r in output.risks],
+        "recommendations": [r.model_dump(mode="json") for r in output.recommendations],
+        "maturity_scores": {
+            ms.dimension: {**ms.model_dump(mode="json", exclude={"dimension"}), "agent_id": output.agent_id}
+            for ms in output.maturity_scores
+        },
+        "execution_timeline": (
+            [output.metadata["timeline"]] if "timeline" in output.metadata else []
+        ),
+    }
+    errors: List[str] = []
+    if "parse_error" in output.metadata:
+        errors.append(f"{output.agent_name} Parse Error: {output.metadata['parse_error']}")
+    errors += [
+        f"{output.agent_name} Rejected {item['field']}[{item['index']}] ({item['id']}): {item['error']}"
+        for item in output.metadata.get("salvage", {}).get("rejected", [])
+    ]
+    errors += [
+        f"{output.agent_name} Lot {lot['lot']} Error: {lot['error']}"
+        for lot in output.metadata.get("map_reduce", {}).get("failed_lots", [])
+    ]
+    if errors:
+        update["errors"] = errors
+    return update
+
+
+def _run_with_timeout(agent: BaseAgent, state: Dict[str, Any], timeout: float) -> AgentOutput:
+    """Run `agent` in a worker thread, abandoning it after `timeout` seconds.
+
+    A timed-out agent is cancelled: it makes no further LLM call or repair
+    reprompt, but the call in flight at the timeout still completes in the
+    background (outside its plugin slot) and its tokens are still charged
+    to the audit ledger.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=agent.agent_id)
+    try:
+        # Carry context variables (e.g. the LLM cache bypass) into the worker
+        ctx = contextvars.copy_context()
+        return executor.submit(ctx.run, agent.run, state).result(timeout=timeout)
+    except FutureTimeoutError:
+        agent.cancel()
+        raise
+    finally:
+        # Don't block on a timed-out call — its result is simply discarded.
+        executor.shutdown(wait=False)
+
+
+def run_agent(
+    agent: BaseAgent, state: Dict[str, Any], timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """Run one agent and return its partial state update.
+
+    Agent failures become `errors` entries; only BudgetExceededError is
+    raised, to abort the audit (and GraphBubbleUp, when a batch-mode LLM
+    call pauses the node).
+    """
+    started = datetime.now(timezone.utc)
     try:
-        finding = structured_llm.invoke([
-            ("system", DATA_SCANNER_PROMPT),
-            ("human", f"Context: {state['client_context']}")
-        ])
-        state["findings"].append(finding)
+        if timeout is None:
+            output = agent.run(state)
+        else:
+            output = _run_with_timeout(agent, state, timeout)
+    except (BudgetExceededError, GraphBubbleUp):
+        raise
+    except FutureTimeoutError:
+        return {
+            "errors": [f"{agent.agent_name} Timeout: no result after {timeout:.0f}s"],
+            "execution_timeline": [agent.build_timeline_entry(started, status="timeout")],
+        }
     except Exception as e:
-        state["errors"].append(f"DataScanner Error: {str(e)}")
-    state["current_phase"] = "Core Analysis"
-    return state
+        return {
+            "errors": [f"{agent.agent_name} Error: {str(e)}"],
+            "execution_timeline": [agent.build_timeline_entry(started, status="error")],
+        }
+    return agent_output_to_update(output)
+
+
+async def arun_agent(
+    agent: BaseAgent, state: Dict[str, Any], timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """Async `run_agent` — the timeout cancels the pending LLM call."""
+    started = datetime.now(timezone.utc)
+    try:
+        output = await asyncio.wait_for(agent.arun(state), timeout)
+    except (BudgetExceededError, GraphBubbleUp):
+        raise
+    except asyncio.TimeoutError:
+        return {
+            "errors": [f"{agent.agent_name} Timeout: no result after {timeout:.0f}s"],
+            "execution_timeline": [agent.build_timeline_entry(started, status="timeout")],
+        }
+    except Exception as e:
+        return {
+            "errors": [f"{agent.agent_name} Error: {str(e)}"],
+            "execution_timeline": [agent.build_timeline_entry(started, status="error")],
+        }
+    return agent_output_to_update(output)
+
+
+# ─── Nodes ────────────────────────────────────────────────────────────────
+
+def node_intake_orchestrator(state: AuditGraphState):
+    print(f"[Intake] Processing context for {state['audit_type']}")
+    start_ledger(state["audit_id"])
+    return {"current_phase": "Intake"}
+
+def _selected(state: Dict[str, Any], agent_id: str) -> bool:
+    """False for an agent an incremental re-audit reuses instead of running."""
+    rerun = state.get("rerun_agents")
+    return rerun is None or agent_id in rerun
+
+def _core_agent_ids(state: Dict[str, Any]) -> List[str]:
+    return [agent_id for agent_id in CORE_AGENT_IDS if _selected(state, agent_id)]
+
+def node_core_agents(state: AuditGraphState):
+    agent_ids = _core_agent_ids(state)
+    print(f"[Core Agents] Fanning out {len(agent_ids)} core agents...")
+    return {"current_phase": "Core Analysis", "active_agents": agent_ids}
+
+def dispatch_core_agents(state: AuditGraphState) -> Union[List[Send], str]:
+    """One Send per core agent — LangGraph runs them in the same superstep."""
+    agent_ids = _core_agent_ids(state)
+    if not agent_ids:
+        return "plugin_agents"
+    return [
+        Send("core_agent", AgentTask(agent_id=agent_id, state=state))
+        for agent_id in agent_ids
+    ]
+
+def node_core_agent(task: AgentTask):
+    agent = get_core_agents([task["agent_id"]])[0]
+    print(f"[Core Agents] Running {agent.agent_name}...")
+    return run_agent(agent, task["state"])
+
+async def anode_core_agent(task: AgentTask):
+    agent = get_core_agents([task["agent_id"]])[0]
+    print(f"[Core Agents] Running {agent.agent_name}...")
+    return await arun_agent(agent, task["state"])
+
+def _resolve_plugin_ids(audit_type: str, state: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Catalogue plugin IDs for this audit, one per distinct plugin agent.
+
+    With `state`, plugins an incremental re-audit reuses are left out.
+    """
+    _, plugin_ids = resolve_agents_for_audit(audit_type)
+    resolved, seen_agents = [], set()
+    for plugin_id in plugin_ids:
+        agents = get_plugin_agents([plugin_id])
+        if agents and agents[0].agent_id not in seen_agents:
+            seen_agents.add(agents[0].agent_id)
+            if state is None or _selected(state, agents[0].agent_id):
+                resolved.append(plugin_id)
+    return resolved
+
+def _plugins_skipped(state: Dict[str, Any]) -> bool:
+    """True once the audit's budget policy has dropped the plugin agents."""
+    return get_ledger(state["audit_id"], state.get("token_usage")).plugins_skipped
 
 def node_parallel_plugin_agents(state: AuditGraphState):
-    print(f"[Plugin Agents] Running plugins for {state['audit_type']}...")
-    state["current_phase"] = "Plugin Analysis"
-    return state
+    plugin_ids = _resolve_plugin_ids(state["audit_type"], state)
+    if _plugins_skipped(state):
+        print(f"[Plugin Agents] Budget reached — skipping {len(plugin_ids)} plugins")
+        return {
+            "current_phase": "Plugin Analysis",
+            "active_agents": [],
+            "errors": [f"Budget: plugins skipped ({', '.join(plugin_ids)})"] if plugin_ids else [],
+        }
+    print(f"[Plugin Agents] Fanning out {len(plugin_ids)} plugins for {state['audit_type']}...")
+    return {"current_phase": "Plugin Analysis", "active_agents": plugin_ids}
+
+def dispatch_plugin_agents(state: AuditGraphState) -> Union[List[Send], str]:
+    """One Send per plugin agent; skip straight to consolidation if none."""
+    plugin_ids = _resolve_plugin_ids(state["audit_type"], state)
+    if not plugin_ids or _plugins_skipped(state):
+        return "consolidation"
+    return [
+        Send("plugin_agent", AgentTask(agent_id=plugin_id, state=state))
+        for plugin_id in plugin_ids
+    ]
+
+def node_plugin_agent(task: AgentTask):
+    agent = get_plugin_agents([task["agent_id"]])[0]
+    waiting = time.perf_counter()
+    with _plugin_slots:
+        record(queue_wait_ms=round((time.perf_counter() - waiting) * 1000, 3))
+        if _plugins_skipped(task["state"]):
+            return {"errors": [f"Budget: plugin {agent.agent_name} skipped"]}
+        print(f"[Plugin Agents] Running {agent.agent_name}...")
+        return run_agent(agent, task["state"], timeout=settings.plugin_timeout_seconds)
+
+async def anode_plugin_agent(task: AgentTask):
+    agent = get_plugin_agents([task["agent_id"]])[0]
+    waiting = time.perf_counter()
+    async with _get_async_plugin_slots():
+        record(queue_wait_ms=round((time.perf_counter() - waiting) * 1000, 3))
+        if _plugins_skipped(task["state"]):
+            return {"errors": [f"Budget: plugin {agent.agent_name} skipped"]}
+        print(f"[Plugin Agents] Running {agent.agent_name}...")
+        return await arun_agent(agent, task["state"], timeout=settings.plugin_timeout_seconds)
 
 def node_consolidation_orchestrator(state: AuditGraphState):
     print("[Consolidation] Orchestrator merging findings...")
-    state["current_phase"] = "Consolidation"
-    return state
+    return {"current_phase": "Consolidation"}
+
+def _client_header(state: AuditGraphState) -> str:
+    ctx = state.get("client_context", {})
+    return (
+        f"Client : {ctx.get('name', 'N/A')} — {ctx.get('industry', 'N/A')}\n"
+        f"Type d'audit : {state.get('audit_type', 'N/A')}\n\n"
+    )
+
+def _roi_messages(state: AuditGraphState):
+    return [
+        ("system", ROI_MODELER_PROMPT),
+        ("human", _client_header(state) + build_context(state, "roi_modeler"))
+    ]
 
 def node_roi_prioritization(state: AuditGraphState):
     print("[ROI & Priority] Calculating impact and effort via Claude...")
-    structured_roi = llm.with_structured_output(ROIModel)
+    update: Dict[str, Any] = {"current_phase": "ROI & Priority"}
+    llm = get_chat_model()
+    if llm is None:
+        return update
+    try:
+        roi = call_with_retries(
+            lambda: llm.with_structured_output(ROIModel).invoke(_roi_messages(state)),
+            label="roi_priority",
+        )
+        update["roi_model"] = roi.model_dump(mode="json")
+    except (BudgetExceededError, GraphBubbleUp):
+        raise
+    except Exception as e:
+        update["errors"] = [f"ROI Modeler Error: {str(e)}"]
+    return update
+
+async def anode_roi_prioritization(state: AuditGraphState):
+    print("[ROI & Priority] Calculating impact and effort via Claude...")
+    update: Dict[str, Any] = {"current_phase": "ROI & Priority"}
+    llm = get_chat_model()
+    if llm is None:
+        return update
     try:
-        findings_text = "\n".join([f.description for f in state["findings"]])
-        roi = structured_roi.invoke([
-            ("system", ROI_MODELER_PROMPT),
-            ("human", f"Findings actuels:\n{findings_text}")
-        ])
-        state["roi_model"] = roi
+        roi = await acall_with_retries(
+            lambda: llm.with_structured_output(ROIModel).ainvoke(_roi_messages(state)),
+            label="roi_priority",
+        )
+        update["roi_model"] = roi.model_dump(mode="json")
+    except (BudgetExceededError, GraphBubbleUp):
+        raise
     except Exception as e:
-        state["errors"].append(f"ROI Modeler Error: {str(e)}")
-    state["current_phase"] = "ROI & Priority"
-    return state
+        update["errors"] = [f"ROI Modeler Error: {str(e)}"]
+    return update
+
+def _validation_request(state: AuditGraphState) -> Dict[str, Any]:
+    """What the consultant is asked to review (sent with the interrupt)."""
+    return {
+        "type": "human_validation",
+        "audit_id": state.get("audit_id"),
+        "findings": len(state.get("findings", [])),
+        "risks": len(state.get("risks", [])),
+        "recommendations": len(state.get("recommendations", [])),
+        "maturity_scores": sorted(state.get("maturity_scores", {})),
+    }
 
 def node_human_validation(state: AuditGraphState):
-    print("[Human Validation] Checkpoint reached.")
-    state["current_phase"] = "Validation"
-    return state
+    """Consultant review of the consolidated findings, before ROI and report.
+
+    With HUMAN_VALIDATION=required the node interrupts the graph: the state
+    is checkpointed and the worker released until `resume_validation`
+    brings the decision {"overrides": ..., "validated_by": ...}, on any
+    worker. Overrides are then written over the reducer-merged fields.
+    """
+    update: Dict[str, Any] = {"current_phase": "Validation"}
+    if settings.human_validation == "required":
+        print("[Human Validation] Waiting for the consultant's decision...")
+        decision = interrupt(_validation_request(state)) or {}
+        overrides = validate_overrides(decision.get("overrides"))
+        now = datetime.now(timezone.utc).isoformat()
+        update.update(
+            human_validated=True,
+            human_overrides=overrides,
+            execution_timeline=[{
+                "agent_id": "human", "node": "validation", "started_at": now, "ended_at": now,
+                "status": "validated", "validated_by": decision.get("validated_by"),
+            }],
+        )
+    else:
+        print("[Human Validation] Auto-approved.")
+        try:
+            overrides = validate_overrides(state.get("human_overrides"))
+        except ValueError as e:
+            # Submitted with the audit: reported, the audit goes on without them
+            update["errors"] = [f"Human Validation Error: {e}"]
+            overrides = {}
+    for field, value in apply_overrides(state, overrides).items():
+        update[field] = Overwrite(value)
+    return update
+
+def _report_messages(state: AuditGraphState):
+    return [
+        ("system", REPORT_GENERATOR_PROMPT),
+        ("human", _client_header(state) + build_context(state, "report_generator"))
+    ]
+
+def _report_call(llm, messages):
+    """One report attempt; with LLM_STREAMING the markdown is written to the custom stream."""
+    streamer = report_streamer() if settings.llm_streaming else None
+    if streamer is None:
+        return lambda: llm.invoke(messages)
+
+    def attempt():
+        streamer.start_attempt()
+        return collect_stream(llm.stream(messages), streamer.feed)
+    return attempt
+
+def _areport_call(llm, messages):
+    """Async `_report_call`."""
+    streamer = report_streamer() if settings.llm_streaming else None
+    if streamer is None:
+        return lambda: llm.ainvoke(messages)
+
+    async def attempt():
+        streamer.start_attempt()
+        return await acollect_stream(llm.astream(messages), streamer.feed)
+    return attempt
 
 def node_report_generator(state: AuditGraphState):
     print("[Report Generator] Compiling Executive Summary via Claude...")
+    update: Dict[str, Any] = {"current_phase": "Reporting"}
+    llm = get_chat_model()
+    if llm is None:
+        update["exec_summary"] = "# Executive Summary\n(MOCK — no API key)"
+        return update
     try:
-        response = llm.invoke([
-            ("system", REPORT_GENERATOR_PROMPT),
-            ("human", f"Data: {state}")
-        ])
-        state["exec_summary"] = response.content
+        update["exec_summary"] = call_with_retries(
+            _report_call(llm, _report_messages(state)), label="reporting"
+        ).content
+    except (BudgetExceededError, GraphBubbleUp):
+        raise
     except Exception as e:
-        state["errors"].append(f"Report Generator Error: {str(e)}")
-        state["exec_summary"] = "# Error in generation\nPlease check logs."
-    state["current_phase"] = "Reporting"
-    return state
+        update["errors"] = [f"Report Generator Error: {str(e)}"]
+        update["exec_summary"] = "# Error in generation\nPlease check logs."
+    return update
+
+async def anode_report_generator(state: AuditGraphState):
+    print("[Report Generator] Compiling Executive Summary via Claude...")
+    update: Dict[str, Any] = {"current_phase": "Reporting"}
+    llm = get_chat_model()
+    if llm is None:
+        update["exec_summary"] = "# Executive Summary\n(MOCK — no API key)"
+        return update
+    try:
+        response = await acall_with_retries(
+            _areport_call(llm, _report_messages(state)), label="reporting"
+        )
+        update["exec_summary"] = response.content
+    except (BudgetExceededError, GraphBubbleUp):
+        raise
+    except Exception as e:
+        update["errors"] = [f"Report Generator Error: {str(e)}"]
+        update["exec_summary"] = "# Error in generation\nPlease check logs."
+    return update
 
 # New Node for Google Stitch
-def node_stitch_ui_generator(state: AuditGraphState):
+async def anode_stitch_ui_generator(state: AuditGraphState):
     print("[Stitch Designer] Generating premium Web Cockpit via MCP...")
+    update: Dict[str, Any] = {"current_phase": "UI Generation"}
     designer = StitchDesignerAgent()
-    # Handle the async call in a synchronous node if necessary
-    # or make the whole graph async. For this MVP, we use asyncio.run
     try:
-        result = asyncio.run(designer.generate_cockpit(state))
-        state["stitch_ui_result"] = result
+        update["stitch_ui_result"] = await designer.generate_cockpit(state)
     except Exception as e:
-        state["errors"].append(f"Stitch Designer Error: {str(e)}")
-    state["current_phase"] = "UI Generation"
-    return state
+        update["errors"] = [f"Stitch Designer Error: {str(e)}"]
+    return update
+
+def node_stitch_ui_generator(state: AuditGraphState):
+    # The MCP client is async-only: run it on a private loop when the
+    # graph is driven synchronously.
+    return _run_coroutine_sync(anode_stitch_ui_generator(state))
+
+# LLM-calling nodes that are not fan-out agent tasks, charged to this agent
+_NODE_AGENTS = {"roi_priority": "roi_modeler", "reporting": "report_generator"}
+
+def _unwrap_task(state: Dict[str, Any]):
+    """(audit state, agent id) of a node input — fan-out tasks carry both."""
+    if "agent_id" in state and "state" in state:
+        return state["state"], state["agent_id"]
+    return state, None
+
+def _span_attributes(state: Dict[str, Any], agent_id: Optional[str]) -> Dict[str, Any]:
+    """Audit id + input sizes of a node (fan-out tasks carry the agent id)."""
+    attributes = {"state_sizes": field_sizes(state), "trace_id": state.get("audit_id")}
+    if agent_id is not None:
+        attributes["agent_id"] = agent_id
+    return attributes
+
+def _with_usage(update: Dict[str, Any], scope) -> Dict[str, Any]:
+    """Add the node's share of LLM usage (and budget notices) to its update."""
+    if not scope.usage and not scope.notices:
+        return update
+    update = dict(update or {})
+    if scope.usage:
+        update["token_usage"] = scope.usage
+    if scope.notices:
+        update["errors"] = list(update.get("errors", [])) + scope.notices
+    return update
+
+def _node(name: str, func, afunc=None) -> RunnableLambda:
+    """Register a node for both `invoke`/`stream` and `ainvoke`/`astream`.
+
+    Pure state-bookkeeping nodes have no I/O, so their async variant simply
+    calls the sync function on the event loop. Every run is wrapped in a
+    tracing span named after the graph node, and its LLM calls are charged
+    to the audit's token ledger.
+    """
+    if afunc is None:
+        async def afunc(state):
+            return func(state)
+
+    def scopes(state):
+        audit_state, agent_id = _unwrap_task(state)
+        ledger = get_ledger(audit_state.get("audit_id", ""), audit_state.get("token_usage"))
+        return (
+            trace_span(name, "node", **_span_attributes(audit_state, agent_id)),
+            ledger_scope(ledger, name, agent_id or _NODE_AGENTS.get(name)),
+        )
+
+    def traced(state):
+        span_scope, usage_scope = scopes(state)
+        with span_scope as span, usage_scope as usage:
+            update = func(state)
+            span.record(update_sizes=field_sizes(update))
+        return _with_usage(update, usage)
+
+    async def atraced(state):
+        span_scope, usage_scope = scopes(state)
+        with span_scope as span, usage_scope as usage:
+            update = await afunc(state)
+            span.record(update_sizes=field_sizes(update))
+        return _with_usage(update, usage)
+
+    return RunnableLambda(traced, afunc=atraced, name=func.__name__)
 
 # Graph Definition
-workflow = StateGraph(AuditGraphState)
-
-# Add Nodes
-workflow.add_node("intake", node_intake_orchestrator)
-workflow.add_node("core_agents", node_parallel_core_agents)
-workflow.add_node("plugin_agents", node_parallel_plugin_agents)
-workflow.add_node("consolidation", node_consolidation_orchestrator)
-workflow.add_node("roi_priority", node_roi_prioritization)
-workflow.add_node("validation", node_human_validation)
-workflow.add_node("reporting", node_report_generator)
-workflow.add_node("stitch_ui", node_stitch_ui_generator)
-
-# Add Edges
-workflow.set_entry_point("intake")
-workflow.add_edge("intake", "core_agents")
-workflow.add_edge("core_agents", "plugin_agents")
-workflow.add_edge("plugin_agents", "consolidation")
-workflow.add_edge("consolidation", "roi_priority")
-workflow.add_edge("roi_priority", "validation")
-workflow.add_edge("validation", "reporting")
-workflow.add_edge("reporting", "stitch_ui")
-workflow.add_edge("stitch_ui", END)
-
-# Compile
-audit_graph = workflow.compile()
+def build_audit_graph(checkpointer=None):
+    """Build and compile the audit pipeline.
+
+    The core stage fans out one `core_agent` task per entry of
+    CORE_AGENT_IDS; LangGraph runs them concurrently (bounded by
+    settings.max_parallel_agents) and joins before `plugin_agents`.
+    The plugin stage does the same with the audit type's plugins, each
+    under settings.plugin_timeout_seconds, and streams every plugin's
+    update as soon as it finishes.
+
+    Every node has a sync and an async implementation, so the same compiled
+    graph serves `invoke`/`stream` (CLI, Streamlit) and `ainvoke`/`astream`
+    (many audits sharing one event loop).
+
+    With a `checkpointer`, state is persisted after every step under
+    thread_id = audit_id, so an interrupted audit can be resumed — and
+    the human validation step can pause the audit for as long as needed.
+    """
+    workflow = StateGraph(AuditGraphState)
+
+    # Add Nodes
+    workflow.add_node("intake", _node("intake", node_intake_orchestrator))
+    workflow.add_node("core_agents", _node("core_agents", node_core_agents))
+    workflow.add_node("core_agent", _node("core_agent", node_core_agent, anode_core_agent))
+    workflow.add_node("plugin_agents", _node("plugin_agents", node_parallel_plugin_agents))
+    workflow.add_node("plugin_agent", _node("plugin_agent", node_plugin_agent, anode_plugin_agent))
+    workflow.add_node("consolidation", _node("consolidation", node_consolidation_orchestrator))
+    workflow.add_node("roi_priority", _node("roi_priority", node_roi_prioritization, anode_roi_prioritization))
+    workflow.add_node("validation", _node("validation", node_human_validation))
+    workflow.add_node("reporting", _node("reporting", node_report_generator, anode_report_generator))
+    workflow.add_node("stitch_ui", _node("stitch_ui", node_stitch_ui_generator, anode_stitch_ui_generator))
+
+    # Add Edges
+    workflow.set_entry_point("intake")
+    workflow.add_edge("intake", "core_agents")
+    workflow.add_conditional_edges("core_agents", dispatch_core_agents, ["core_agent", "plugin_agents"])
+    workflow.add_edge("core_agent", "plugin_agents")
+    workflow.add_conditional_edges(
+        "plugin_agents", dispatch_plugin_agents, ["plugin_agent", "consolidation"]
+    )
+    workflow.add_edge("plugin_agent", "consolidation")
+    workflow.add_edge("consolidation", "validation")
+    workflow.add_edge("validation", "roi_priority")
+    workflow.add_edge("roi_priority", "reporting")
+    workflow.add_edge("reporting", "stitch_ui")
+    workflow.add_edge("stitch_ui", END)
+
+    # Compile
+    return workflow.compile(checkpointer=checkpointer).with_config(
+        max_concurrency=settings.max_parallel_agents
+    )
+
+
+audit_graph = build_audit_graph()
@@ -0,0 +1,178 @@
+"""Incremental re-audit — re-run only the agents a document change touches.
+
+When a client sends an updated document mid-engagement, the new audit
+starts from the previous run instead of from scratch:
+
+1. `diff_sources` compares the previous and new `sources_index`:
+   documents are matched by path (by name as a fallback), so an updated
+   file shows up as changed (same path, new content hash)
+2. `affected_agents` picks the agents whose inputs touch the change:
+   - every agent if documents were added or removed, since all prompts
+     list the documents provided
+   - otherwise, the agents whose previous outputs cite a changed document,
+     plus those whose prompt embeds the sources index (data scanner)
+3. `incremental_state` seeds the new run with the outputs of the other
+   agents, drops the superseded ones (outputs of re-run agents, and
+   anything citing a changed or removed document) and sets
+   `rerun_agents`, which the fan-out nodes honour
+
+Consolidation, validation, ROI and report run as usual on the merged
+outputs. Document contents are not chunked or retrieved by this tree's
+agents (VectorStore is a stub), so the diff drives agent selection only.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from src.agents.core.registry import get_core_agents
+from src.agents.plugins.registry import get_plugin_agents
+from src.orchestrator.router import CORE_AGENT_IDS, resolve_agents_for_audit
+from src.orchestrator.state import AuditGraphState
+
+logger = logging.getLogger(__name__)
+
+_OUTPUT_LISTS = ("findings", "risks", "recommendations")
+
+
+@dataclass
+class SourceDiff:
+    added: List[str] = field(default_factory=list)            # new doc_ids
+    removed: List[str] = field(default_factory=list)          # previous doc_ids
+    changed: Dict[str, str] = field(default_factory=dict)     # previous doc_id -> new doc_id
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    @property
+    def stale(self) -> Set[str]:
+        """Previous doc_ids whose content is gone."""
+        return set(self.removed) | set(self.changed)
+
+
+def _document_key(meta: Dict[str, Any]) -> str:
+    return meta.get("path") or meta.get("name") or ""
+
+
+def diff_sources(previous: Dict[str, Any], current: Dict[str, Any]) -> SourceDiff:
+    """Documents added, removed, changed or unchanged between two sources indexes."""
+    diff = SourceDiff()
+    previous_by_key = {_document_key(meta): doc_id for doc_id, meta in (previous or {}).items()}
+    seen = set()
+    for doc_id, meta in (current or {}).items():
+        old_id = previous_by_key.get(_document_key(meta))
+        if old_id is None:
+            diff.added.append(doc_id)
+            continue
+        seen.add(old_id)
+        if previous[old_id].get("hash") == meta.get("hash"):
+            diff.unchanged.append(doc_id)
+        else:
+            diff.changed[old_id] = doc_id
+    diff.removed = [doc_id for doc_id in previous or {} if doc_id not in seen]
+    return diff
+
+
+def _audit_agents(audit_type: str) -> List[Any]:
+    _, plugin_ids = resolve_agents_for_audit(audit_type)
+    return get_core_agents(CORE_AGENT_IDS) + get_plugin_agents(plugin_ids)
+
+
+def _cites(item: Dict[str, Any], doc_ids: Set[str]) -> bool:
+    return any(source.get("doc_id") in doc_ids for source in item.get("sources") or [])
+
+
+def affected_agents(previous_state: Dict[str, Any], diff: SourceDiff) -> List[str]:
+    """Agent ids to re-run for `diff` (see module docstring)."""
+    agents = _audit_agents(previous_state["audit_type"])
+    if diff.added or diff.removed:
+        return [agent.agent_id for agent in agents]
+    stale = diff.stale
+    citing = {
+        item.get("agent_id")
+        for name in _OUTPUT_LISTS
+        for item in previous_state.get(name) or []
+        if _cites(item, stale)
+    }
+    citing |= {
+        score.get("agent_id")
+        for score in (previous_state.get("maturity_scores") or {}).values()
+        if _cites(score, stale)
+    }
+    return [
+        agent.agent_id for agent in agents
+        if stale and (agent.reads_sources_index or agent.agent_id in citing)
+    ]
+
+
+def incremental_state(
+    previous_state: Dict[str, Any], initial_state: AuditGraphState
+) -> AuditGraphState:
+    """`initial_state` seeded with the previous run's still-valid outputs.
+
+    `initial_state` carries the new `sources_index`; the returned state
+    re-runs only the affected agents.
+    """
+    diff = diff_sources(previous_state.get("sources_index") or {}, initial_state.get("sources_index") or {})
+    rerun = affected_agents(previous_state, diff)
+    stale = diff.stale
+
+    def keep(item: Dict[str, Any]) -> bool:
+        return item.get("agent_id") not in rerun and not _cites(item, stale)
+
+    state = dict(initial_state)
+    for name in _OUTPUT_LISTS:
+        state[name] = [item for item in previous_state.get(name) or [] if keep(item)]
+    state["maturity_scores"] = {
+        dimension: score
+        for dimension, score in (previous_state.get("maturity_scores") or {}).items()
+        if keep(score)
+    }
+    state["rerun_agents"] = rerun
+
+    superseded = {
+        name: len(previous_state.get(name) or []) - len(state[name])
+        for name in (*_OUTPUT_LISTS, "maturity_scores")
+    }
+    now = datetime.now(timezone.utc).isoformat()
+    state["execution_timeline"] = list(state.get("execution_timeline") or []) + [{
+        "agent_id": "incremental", "node": "intake", "started_at": now, "ended_at": now,
+        "status": "reused", "previous_audit_id": previous_state.get("audit_id"),
+        "rerun_agents": rerun, "superseded": superseded,
+    }]
+    logger.info(
+        f"Audit {initial_state['audit_id']}: {len(diff.added)} added, {len(diff.changed)} changed, "
+        f"{len(diff.removed)} removed documents since {previous_state.get('audit_id')} — "
+        f"re-running {rerun or 'no agent'}"
+    )
+    return state
+
+
+def with_previous_run(initial_state: AuditGraphState, previous_audit_id: str, *, graph=None) -> AuditGraphState:
+    """Seed `initial_state` from a finished audit's checkpoint.
+
+    Falls back to a full run (returns `initial_state`) when the previous
+    audit has no finished checkpoint.
+    """
+    from src.orchestrator.runner import _thread_config, get_default_graph
+
+    graph = graph or get_default_graph()
+    snapshot = graph.get_state(_thread_config(previous_audit_id)) if graph.checkpointer else None
+    if snapshot is None or not snapshot.values or snapshot.next:
+        logger.warning(
+            f"Audit {initial_state['audit_id']}: no finished run of {previous_audit_id} — full audit"
+        )
+        return initial_state
+    previous: Optional[Dict[str, Any]] = snapshot.values
+    if previous.get("audit_type") != initial_state["audit_type"]:
+        logger.warning(
+            f"Audit {initial_state['audit_id']}: {previous_audit_id} is a "
+            f"{previous.get('audit_type')} audit — full audit"
+        )
+        return initial_state
+    return incremental_state(previous, initial_state)
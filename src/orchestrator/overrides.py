@@ -0,0 +1,111 @@
+"""Consultant overrides applied at the human validation step.
+
+    human_overrides = {
+        "findings":        {"F-001": {"severity": "LOW"}, "F-007": None},
+        "risks":           {"R-002": {"impact": "HIGH"}},
+        "recommendations": {"REC-004": None},
+        "maturity_scores": {"data_governance": {"score": 2}},
+    }
+
+Items are addressed by id (by dimension for maturity scores): a dict is
+merged into the item, None rejects it. Edits are checked against the
+domain models before the audit resumes, so a bad override is refused up
+front instead of breaking the ROI or the report.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.schemas.models import Finding, MaturityScore, Recommendation, Risk
+
+logger = logging.getLogger(__name__)
+
+OVERRIDABLE_FIELDS: Dict[str, type[BaseModel]] = {
+    "findings": Finding,
+    "risks": Risk,
+    "recommendations": Recommendation,
+    "maturity_scores": MaturityScore,
+}
+
+# Keys that identify an item; they cannot be edited
+_FROZEN_KEYS = {"id", "agent_id", "dimension"}
+
+
+def _validate_patch(model: type[BaseModel], key: str, patch: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for name, value in patch.items():
+        field = model.model_fields.get(name)
+        if field is None or name in _FROZEN_KEYS:
+            raise ValueError(f"{key}: field {name!r} cannot be overridden")
+        adapter = TypeAdapter(field.annotation)
+        try:
+            normalized[name] = adapter.dump_python(adapter.validate_python(value), mode="json")
+        except ValidationError as e:
+            raise ValueError(f"{key}.{name}: {e.errors()[0]['msg']}") from e
+    return normalized
+
+
+def validate_overrides(overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Check the overrides' shape and values; returns them JSON-normalized.
+
+    Raises ValueError on an unknown field, a non-editable key or a value
+    that the domain model rejects.
+    """
+    if not overrides:
+        return {}
+    if not isinstance(overrides, dict):
+        raise ValueError("human_overrides must be an object")
+    normalized: Dict[str, Any] = {}
+    for field, edits in overrides.items():
+        model = OVERRIDABLE_FIELDS.get(field)
+        if model is None:
+            raise ValueError(
+                f"Unknown override field {field!r} (expected one of {', '.join(OVERRIDABLE_FIELDS)})"
+            )
+        if not isinstance(edits, dict):
+            raise ValueError(f"{field}: expected an object keyed by id")
+        normalized[field] = {}
+        for key, patch in edits.items():
+            if patch is not None and not isinstance(patch, dict):
+                raise ValueError(f"{field}.{key}: expected an object, or null to reject it")
+            normalized[field][str(key)] = (
+                None if patch is None else _validate_patch(model, f"{field}.{key}", patch)
+            )
+    return normalized
+
+
+def apply_overrides(state: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """New values of the fields touched by `overrides` (the state is not modified).
+
+    Ids that match no item are logged and ignored.
+    """
+    values: Dict[str, Any] = {}
+    for field, edits in overrides.items():
+        if not edits:
+            continue
+        if field == "maturity_scores":
+            current = dict(state.get(field) or {})
+            matched = set(current) & set(edits)
+            for dimension in matched:
+                if edits[dimension] is None:
+                    del current[dimension]
+                else:
+                    current[dimension] = {**current[dimension], **edits[dimension]}
+            values[field] = current
+        else:
+            items, matched = [], set()
+            for item in state.get(field) or []:
+                if item.get("id") in edits:
+                    matched.add(item["id"])
+                    if edits[item["id"]] is None:
+                        continue
+                    item = {**item, **edits[item["id"]]}
+                items.append(item)
+            values[field] = items
+        for key in set(edits) - matched:
+            logger.warning(f"Audit {state.get('audit_id')}: override {field}.{key} matches no item")
+    return values
@@ -0,0 +1,203 @@
+"""Partial recomputation of a finished audit after consultant overrides.
+
+An override edits the consolidated outputs of the analysis agents
+(findings, risks, recommendations, maturity scores). Only what derives
+from the edited fields has to change, so instead of re-running the
+pipeline this module follows a dependency table:
+
+    roi_priority  ← recommendations, risks, findings         → roi_model
+    reporting     ← all consolidated outputs + roi_model     → exec_summary
+    stitch_ui     ← findings, roi_model                      → stitch_ui_result
+
+    exec_summary_md ← findings, risks, recommendations, maturity_scores, quick_wins
+    roadmap_md      ← quick_wins, roadmap
+    slides          ← everything above + roi_model, scenarios
+
+The inputs of the LLM nodes are the sections of their prompt context
+(AGENT_VIEWS), so the table follows the prompts. Changes propagate in
+pipeline order: an edited recommendation re-runs the ROI node, whose new
+model in turn re-runs the report; an edited maturity score re-runs the
+report alone. The analysis agents are never re-run and unaffected
+deliverables are reused as rendered.
+
+The new state is written back to the audit's checkpoint as a completed
+run, so the next override starts from it.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from langgraph.types import Overwrite
+
+from src.agents.context import AGENT_VIEWS
+from src.llm.ledger import merge_usage
+from src.orchestrator import graph as graph_module
+from src.orchestrator.overrides import apply_overrides, validate_overrides
+from src.reports import render_exec_summary, render_roadmap, render_slides
+
+logger = logging.getLogger(__name__)
+
+# Graph nodes deriving outputs from the consolidated state, in pipeline order:
+# node -> (node function in src.orchestrator.graph, fields read, fields written)
+DERIVED_NODES: Dict[str, Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = {
+    "roi_priority": ("node_roi_prioritization", AGENT_VIEWS["roi_modeler"], ("roi_model",)),
+    "reporting": ("node_report_generator", AGENT_VIEWS["report_generator"], ("exec_summary",)),
+    "stitch_ui": ("node_stitch_ui_generator", ("findings", "roi_model"), ("stitch_ui_result",)),
+}
+
+# Rendered deliverables -> (renderer, fields read)
+DELIVERABLES: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Tuple[str, ...]]] = {
+    "exec_summary_md": (
+        render_exec_summary,
+        ("findings", "risks", "recommendations", "maturity_scores", "quick_wins"),
+    ),
+    "roadmap_md": (render_roadmap, ("quick_wins", "roadmap")),
+    "slides": (
+        render_slides,
+        ("findings", "risks", "recommendations", "maturity_scores", "quick_wins",
+         "scenarios", "roi_model"),
+    ),
+}
+
+
+@dataclass
+class RecomputePlan:
+    nodes: List[str]
+    deliverables: List[str]
+
+
+@dataclass
+class RecomputeResult:
+    state: Dict[str, Any]
+    changed: List[str] = field(default_factory=list)        # state fields edited or derived anew
+    nodes: List[str] = field(default_factory=list)          # graph nodes re-run
+    deliverables: Dict[str, Any] = field(default_factory=dict)
+    rerendered: List[str] = field(default_factory=list)
+
+
+def plan_recompute(changed: Iterable[str]) -> RecomputePlan:
+    """Nodes to re-run and deliverables to re-render when `changed` fields change."""
+    dirty: Set[str] = set(changed)
+    nodes = []
+    for node, (_, inputs, outputs) in DERIVED_NODES.items():
+        if dirty.intersection(inputs):
+            nodes.append(node)
+            dirty.update(outputs)
+    deliverables = [name for name, (_, inputs) in DELIVERABLES.items() if dirty.intersection(inputs)]
+    return RecomputePlan(nodes, deliverables)
+
+
+def render_deliverables(
+    state: Dict[str, Any],
+    previous: Optional[Dict[str, Any]] = None,
+    only: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """Render the deliverables of `state`.
+
+    With `only`, the other deliverables are taken from `previous` when it
+    has them.
+    """
+    previous = previous or {}
+    only = set(DELIVERABLES if only is None else only)
+    return {
+        name: render(state) if name in only or name not in previous else previous[name]
+        for name, (render, _) in DELIVERABLES.items()
+    }
+
+
+def merge_overrides(current: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Accumulate override sets: a later edit of an item replaces the earlier one."""
+    merged = {name: dict(edits) for name, edits in (current or {}).items()}
+    for name, edits in new.items():
+        merged.setdefault(name, {}).update(edits)
+    return merged
+
+
+def recompute_with_overrides(
+    audit_id: str,
+    overrides: Dict[str, Any],
+    *,
+    graph=None,
+    base_state: Optional[Dict[str, Any]] = None,
+    previous_deliverables: Optional[Dict[str, Any]] = None,
+) -> RecomputeResult:
+    """Apply `overrides` to a finished audit and recompute only what they affect.
+
+    The audit is read from its checkpoint, or from `base_state` when it
+    has none (e.g. a result returned from the memo). Raises KeyError for
+    an unknown audit, ValueError for invalid overrides or an audit that
+    has not finished.
+    """
+    from src.orchestrator.runner import _thread_config, get_default_graph
+
+    graph = graph or get_default_graph()
+    config = _thread_config(audit_id)
+    snapshot = graph.get_state(config) if graph.checkpointer is not None else None
+    if snapshot is not None and snapshot.values:
+        if snapshot.next:
+            raise ValueError(f"Audit {audit_id} has not finished (next: {', '.join(snapshot.next)})")
+        state = dict(snapshot.values)
+    elif base_state is not None:
+        state = dict(base_state)
+    else:
+        raise KeyError(f"No state found for audit {audit_id}")
+
+    overrides = validate_overrides(overrides)
+    edited = {
+        name: value for name, value in apply_overrides(state, overrides).items()
+        if value != state.get(name)
+    }
+    plan = plan_recompute(edited)
+    logger.info(
+        f"Audit {audit_id}: overrides change {sorted(edited) or 'nothing'} — re-running "
+        f"{plan.nodes or 'no node'}, re-rendering {plan.deliverables or 'no deliverable'}"
+    )
+
+    started = datetime.now(timezone.utc).isoformat()
+    state.update(edited)
+    state["human_overrides"] = merge_overrides(state.get("human_overrides") or {}, overrides)
+    derived: Dict[str, Any] = {}
+    usage: Dict[str, Any] = {}
+    errors: List[str] = []
+    for node in plan.nodes:
+        function_name, _, outputs = DERIVED_NODES[node]
+        update = graph_module._node(node, getattr(graph_module, function_name)).invoke(state) or {}
+        for name in outputs:
+            if name in update:
+                derived[name] = state[name] = update[name]
+        usage = merge_usage(usage, update.get("token_usage") or {})
+        errors += update.get("errors", [])
+    timeline = [{
+        "agent_id": "human", "node": "overrides", "started_at": started,
+        "ended_at": datetime.now(timezone.utc).isoformat(), "status": "recomputed",
+        "recomputed": plan.nodes,
+    }]
+
+    if snapshot is not None and snapshot.values:
+        graph.update_state(config, {
+            **{name: Overwrite(value) for name, value in edited.items()},
+            **derived,
+            "human_overrides": state["human_overrides"],
+            "token_usage": usage,
+            "errors": errors,
+            "execution_timeline": timeline,
+        }, as_node="stitch_ui")
+        state = dict(graph.get_state(config).values)
+    else:
+        state["token_usage"] = merge_usage(state.get("token_usage") or {}, usage)
+        state["errors"] = list(state.get("errors") or []) + errors
+        state["execution_timeline"] = list(state.get("execution_timeline") or []) + timeline
+
+    previous = previous_deliverables or {}
+    rerendered = [name for name in DELIVERABLES if name in plan.deliverables or name not in previous]
+    return RecomputeResult(
+        state=state,
+        changed=sorted(set(edited) | set(derived)),
+        nodes=plan.nodes,
+        deliverables=render_deliverables(state, previous, rerendered),
+        rerendered=rerendered,
+    )
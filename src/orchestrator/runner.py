@@ -0,0 +1,337 @@
+"""Pipeline entry points — run or stream an audit through the graph.
+
+Identical submissions are memoized: before running a single node, the
+runner looks up a completed audit with the same input_hash, audit type
+and pipeline version, and returns its stored final state (deliverables
+included, re-stamped with the new audit_id). The pipeline version
+fingerprints every agent prompt plus the settings that shape results
+(model, token limits, map-reduce, validation mode), so changing any of
+them invalidates old results.
+
+When checkpointing is enabled, every audit runs on the checkpointed graph
+under thread_id = audit_id; `resume_audit(audit_id)` continues an
+interrupted audit from its last completed node. With
+HUMAN_VALIDATION=required the stream stops at the validation step (an
+"__interrupt__" update) and `resume_validation(audit_id, decision)`
+continues it with the consultant's overrides. Streams also carry
+"custom" chunks: agent findings, risks and recommendations published as
+soon as the LLM has written them (src.agents.streaming).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from langgraph.types import Command
+
+from src.config import settings
+from src.observability.tracing import get_tracer
+from src.orchestrator.state import AuditGraphState
+from src.storage.checkpoint import build_checkpointer
+from src.storage.result_store import AuditResultStore
+
+logger = logging.getLogger(__name__)
+
+# Bump when graph structure or state semantics change in a way that makes
+# stored results stale even with identical prompts.
+PIPELINE_VERSION = "4"
+
+StreamChunk = Tuple[str, Dict[str, Any]]
+# "custom" carries the agents' items as they stream in (src.agents.streaming)
+STREAM_MODES = ["updates", "values", "custom"]
+
+# Settings that change what an audit produces. human_validation matters
+# too: a result auto-approved must not skip a required consultant review.
+_FINGERPRINT_SETTINGS = (
+    "llm_provider", "llm_model", "llm_temperature", "token_budget_per_agent",
+    "max_repair_attempts", "prompt_context_tokens", "llm_context_window_tokens",
+    "map_reduce_lot_tokens", "map_reduce_fan_in", "human_validation",
+)
+_MOCK_FINGERPRINT_SETTINGS = (
+    "mock_llm_seed", "mock_llm_findings", "mock_llm_risks", "mock_llm_recommendations",
+    "mock_llm_maturity_scores",
+)
+
+_prompts_digest: Optional[str] = None
+_result_store: Optional[AuditResultStore] = None
+_checkpointed_graph = None
+
+
+def _prompts_fingerprint() -> str:
+    """Digest of every agent system prompt and prompt template (computed once)."""
+    global _prompts_digest
+    if _prompts_digest is None:
+        from src.agents.core import prompts
+        from src.agents.core.registry import _lazy_registry as core_registry
+        from src.agents.plugins.registry import _lazy_registry as plugin_registry
+
+        digest = hashlib.sha256()
+        for name in sorted(vars(prompts)):
+            if name.endswith(("_PROMPT", "_TEMPLATE")):
+                digest.update(getattr(prompts, name).encode())
+        agent_classes = set({**core_registry(), **plugin_registry()}.values())
+        for agent in sorted((cls() for cls in agent_classes), key=lambda a: a.agent_id):
+            digest.update(agent.agent_id.encode())
+            digest.update(agent.system_prompt.encode())
+        _prompts_digest = digest.hexdigest()
+    return _prompts_digest
+
+
+def get_pipeline_version() -> str:
+    """PIPELINE_VERSION + a fingerprint of all agent prompts and the settings that shape results."""
+    digest = hashlib.sha256(PIPELINE_VERSION.encode())
+    for name in _FINGERPRINT_SETTINGS:
+        digest.update(f"|{name}={getattr(settings, name)!r}".encode())
+    if settings.llm_provider == "mock":
+        for name in _MOCK_FINGERPRINT_SETTINGS:
+            digest.update(f"|{name}={getattr(settings, name)!r}".encode())
+    digest.update(_prompts_fingerprint().encode())
+    return f"{PIPELINE_VERSION}-{digest.hexdigest()[:12]}"
+
+
+def get_result_store() -> AuditResultStore:
+    global _result_store
+    if _result_store is None:
+        _result_store = AuditResultStore()
+    return _result_store
+
+
+def get_default_graph():
+    """The checkpointed graph when checkpointing is enabled, else `audit_graph`."""
+    global _checkpointed_graph
+    from src.orchestrator.graph import audit_graph, build_audit_graph
+
+    if not settings.checkpoint_enabled:
+        return audit_graph
+    if _checkpointed_graph is None:
+        _checkpointed_graph = build_audit_graph(checkpointer=build_checkpointer())
+    return _checkpointed_graph
+
+
+def _thread_config(audit_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": audit_id}}
+
+
+def _lookup(state: AuditGraphState, reuse_completed: bool, store: AuditResultStore):
+    if not (reuse_completed and settings.audit_memo_enabled and state.get("input_hash")):
+        return None
+    stored = store.find_completed(state["input_hash"], state["audit_type"], get_pipeline_version())
+    if stored is None:
+        return None
+    logger.info(
+        f"Audit {state['audit_id']}: identical inputs already audited "
+        f"as {stored.get('audit_id')} — returning stored result"
+    )
+    return {**stored, "audit_id": state["audit_id"]}
+
+
+def _remember(final_state: Optional[Dict[str, Any]], store: AuditResultStore) -> None:
+    # Only clean runs are reused; a run with errors deserves a retry.
+    if final_state and not final_state.get("errors"):
+        store.save_completed(final_state, get_pipeline_version())
+
+
+def is_interrupt(mode: str, chunk: Dict[str, Any]) -> bool:
+    """True for the update announcing that the graph paused on an interrupt."""
+    return mode == "updates" and "__interrupt__" in chunk
+
+
+def _stream_graph(graph, graph_input, config, store) -> Iterator[StreamChunk]:
+    final_state, paused = None, False
+    for mode, chunk in graph.stream(graph_input, config, stream_mode=STREAM_MODES):
+        if mode == "values":
+            final_state = chunk
+        paused = paused or is_interrupt(mode, chunk)
+        yield mode, chunk
+    if not paused:
+        _remember(final_state, store)
+    get_tracer().flush()
+
+
+async def _astream_graph(graph, graph_input, config, store) -> AsyncIterator[StreamChunk]:
+    final_state, paused = None, False
+    async for mode, chunk in graph.astream(graph_input, config, stream_mode=STREAM_MODES):
+        if mode == "values":
+            final_state = chunk
+        paused = paused or is_interrupt(mode, chunk)
+        yield mode, chunk
+    if not paused:
+        _remember(final_state, store)
+    get_tracer().flush()
+
+
+def stream_audit(
+    initial_state: AuditGraphState,
+    *,
+    reuse_completed: bool = True,
+    graph=None,
+    store: Optional[AuditResultStore] = None,
+) -> Iterator[StreamChunk]:
+    """Stream an audit as (mode, chunk) pairs, modes "updates", "values" and "custom".
+
+    On a memo hit a single ("values", stored_state) pair is yielded.
+    The audit starts from scratch: any checkpoint left under the same
+    audit_id is discarded (use `stream_resume_audit` to continue one).
+    """
+    graph = graph or get_default_graph()
+    store = store or get_result_store()
+
+    stored = _lookup(initial_state, reuse_completed, store)
+    if stored is not None:
+        yield "values", stored
+        return
+
+    config = _thread_config(initial_state["audit_id"])
+    if graph.checkpointer:
+        graph.checkpointer.delete_thread(initial_state["audit_id"])
+    yield from _stream_graph(graph, initial_state, config, store)
+
+
+async def astream_audit(
+    initial_state: AuditGraphState,
+    *,
+    reuse_completed: bool = True,
+    graph=None,
+    store: Optional[AuditResultStore] = None,
+) -> AsyncIterator[StreamChunk]:
+    """Async `stream_audit` built on `graph.astream`."""
+    graph = graph or get_default_graph()
+    store = store or get_result_store()
+
+    stored = _lookup(initial_state, reuse_completed, store)
+    if stored is not None:
+        yield "values", stored
+        return
+
+    config = _thread_config(initial_state["audit_id"])
+    if graph.checkpointer:
+        await graph.checkpointer.adelete_thread(initial_state["audit_id"])
+    async for chunk in _astream_graph(graph, initial_state, config, store):
+        yield chunk
+
+
+def _validation_interrupt(snapshot):
+    for intr in snapshot.interrupts:
+        if isinstance(intr.value, dict) and intr.value.get("type") == "human_validation":
+            return intr
+    return None
+
+
+def _resume_input(audit_id: str, snapshot, decision: Optional[Dict[str, Any]]):
+    """Graph input continuing `snapshot`: the decision if validation is pending."""
+    if decision is None:
+        return None
+    pending = _validation_interrupt(snapshot)
+    if pending is None:
+        # Already validated (e.g. a retry after a later failure): just continue
+        logger.info(f"Audit {audit_id}: no validation pending — resuming without the decision")
+        return None
+    return Command(resume={pending.id: decision})
+
+
+def pending_validation(audit_id: str, *, graph=None) -> Optional[Dict[str, Any]]:
+    """The review request an audit is waiting on, or None."""
+    graph = graph or get_default_graph()
+    pending = _validation_interrupt(graph.get_state(_thread_config(audit_id)))
+    return pending.value if pending is not None else None
+
+
+def stream_resume_audit(
+    audit_id: str,
+    *,
+    decision: Optional[Dict[str, Any]] = None,
+    graph=None,
+    store: Optional[AuditResultStore] = None,
+) -> Iterator[StreamChunk]:
+    """Continue an interrupted audit from its last checkpoint.
+
+    Nodes that already completed are not re-run; in a fan-out stage, only
+    the agents that had not finished are re-executed. An audit paused at
+    human validation needs the consultant's `decision` to go past it.
+    """
+    graph = graph or get_default_graph()
+    store = store or get_result_store()
+    config = _thread_config(audit_id)
+
+    snapshot = graph.get_state(config)
+    if not snapshot.values:
+        raise KeyError(f"No checkpoint found for audit {audit_id}")
+    if not snapshot.next:
+        logger.info(f"Audit {audit_id} already completed — nothing to resume")
+        yield "values", snapshot.values
+        return
+
+    logger.info(f"Resuming audit {audit_id} at {', '.join(snapshot.next)}")
+    yield from _stream_graph(graph, _resume_input(audit_id, snapshot, decision), config, store)
+
+
+async def astream_resume_audit(
+    audit_id: str,
+    *,
+    decision: Optional[Dict[str, Any]] = None,
+    graph=None,
+    store: Optional[AuditResultStore] = None,
+) -> AsyncIterator[StreamChunk]:
+    """Async `stream_resume_audit`."""
+    graph = graph or get_default_graph()
+    store = store or get_result_store()
+    config = _thread_config(audit_id)
+
+    snapshot = await graph.aget_state(config)
+    if not snapshot.values:
+        raise KeyError(f"No checkpoint found for audit {audit_id}")
+    if not snapshot.next:
+        logger.info(f"Audit {audit_id} already completed — nothing to resume")
+        yield "values", snapshot.values
+        return
+
+    logger.info(f"Resuming audit {audit_id} at {', '.join(snapshot.next)}")
+    graph_input = _resume_input(audit_id, snapshot, decision)
+    async for chunk in _astream_graph(graph, graph_input, config, store):
+        yield chunk
+
+
+def _final_state(chunks: Iterator[StreamChunk]) -> Dict[str, Any]:
+    final_state: Dict[str, Any] = {}
+    for mode, chunk in chunks:
+        if mode == "values":
+            final_state = chunk
+    return final_state
+
+
+async def _afinal_state(chunks: AsyncIterator[StreamChunk]) -> Dict[str, Any]:
+    final_state: Dict[str, Any] = {}
+    async for mode, chunk in chunks:
+        if mode == "values":
+            final_state = chunk
+    return final_state
+
+
+def run_audit(initial_state: AuditGraphState, **kwargs: Any) -> Dict[str, Any]:
+    """Run an audit to completion and return its final state."""
+    return _final_state(stream_audit(initial_state, **kwargs))
+
+
+async def arun_audit(initial_state: AuditGraphState, **kwargs: Any) -> Dict[str, Any]:
+    """Async `run_audit`."""
+    return await _afinal_state(astream_audit(initial_state, **kwargs))
+
+
+def resume_audit(audit_id: str, **kwargs: Any) -> Dict[str, Any]:
+    """Resume an interrupted audit to completion and return its final state."""
+    return _final_state(stream_resume_audit(audit_id, **kwargs))
+
+
+async def aresume_audit(audit_id: str, **kwargs: Any) -> Dict[str, Any]:
+    """Async `resume_audit`."""
+    return await _afinal_state(astream_resume_audit(audit_id, **kwargs))
+
+
+def resume_validation(audit_id: str, decision: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+    """Apply the consultant's decision to a paused audit and run it to completion.
+
+    `decision` = {"overrides": human_overrides, "validated_by": name}.
+    """
+    return _final_state(stream_resume_audit(audit_id, decision=decision, **kwargs))
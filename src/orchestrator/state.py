@@ -2,13 +2,115 @@
 
 Uses LangGraph's Annotated reducers so that parallel agent nodes can
 independently append findings/risks/recommendations which get merged
-automatically when the graph reconverges.
+automatically when the graph reconverges. Nodes return only their delta;
+list fields are `AppendLog` channels.
 """
 
 from __future__ import annotations
 
-import operator
-from typing import Annotated, Any, Dict, List, Optional, TypedDict
+from itertools import chain
+from typing import Annotated, Any, Dict, List, Optional, Sequence, Tuple, TypedDict
+
+from langgraph.channels.base import BaseChannel
+from langgraph.errors import InvalidUpdateError
+from langgraph.types import Overwrite
+
+from src.llm.ledger import merge_usage
+
+
+def merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for keyed fields written by parallel agents (right wins)."""
+    if not left:
+        return dict(right or {})
+    if not right:
+        return left
+    return {**left, **right}
+
+
+class AppendLog(BaseChannel[List[Any], List[Any], Dict[str, Any]]):
+    """Append-only list channel merging all writes of a super-step at once.
+
+    An `operator.add` reducer folds the writes of a fan-out one by one, and
+    each fold copies the whole list: k agents appending to n items cost
+    O(k·n + k²·delta). This channel keeps the log as a tuple of immutable
+    chunks instead. A super-step's writes become one new chunk, and the
+    trailing chunks that are not larger than it are merged into it, as in a
+    binary counter: there are O(log n) chunks, each item is copied O(log n)
+    times over the whole run, and a step costs amortized O(delta·log n)
+    whatever the size of the log. A super-step that adds no item costs
+    nothing.
+
+    Chunks are never mutated once built, so copies of the channel and
+    successive checkpoints share them. Checkpoints hold
+    `{"chunks": [...]}`; a plain list, as written by `operator.add` and
+    earlier versions of this channel, is still loaded as a single chunk.
+
+    `get()` returns a plain list, built from the chunks the first time a
+    version is read and shared by every reader of that version (nodes,
+    streamed snapshots): reading the log after a step that changed it is
+    the one O(n) operation. `Overwrite` replaces the log.
+    """
+
+    __slots__ = ("chunks", "_items")
+
+    def __init__(self, typ: Any = list, key: str = "") -> None:
+        super().__init__(typ, key)
+        self.chunks: Tuple[List[Any], ...] = ()
+        self._items: Optional[List[Any]] = []
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AppendLog)
+
+    @property
+    def ValueType(self) -> Any:
+        return list
+
+    @property
+    def UpdateType(self) -> Any:
+        return list
+
+    def copy(self) -> AppendLog:
+        log = self.__class__(self.typ, self.key)
+        log.chunks, log._items = self.chunks, self._items
+        return log
+
+    def from_checkpoint(self, checkpoint: Any) -> AppendLog:
+        log = self.__class__(self.typ, self.key)
+        if isinstance(checkpoint, dict):
+            log.chunks = tuple(chunk for chunk in checkpoint.get("chunks", ()) if chunk)
+            log._items = None if log.chunks else []
+        elif isinstance(checkpoint, list) and checkpoint:
+            log.chunks, log._items = (checkpoint,), checkpoint
+        return log
+
+    def update(self, values: Sequence[Any]) -> bool:
+        overwrites = [value.value for value in values if isinstance(value, Overwrite)]
+        if len(overwrites) > 1:
+            raise InvalidUpdateError(f"{self.key}: can receive only one Overwrite per super-step")
+        if overwrites:
+            items = list(overwrites[0] or [])
+            self.chunks, self._items = ((items,) if items else ()), items
+            return True
+        if not any(values):
+            return False
+        chunk = [item for value in values for item in value]
+        chunks = list(self.chunks)
+        while chunks and len(chunks[-1]) <= len(chunk):
+            chunk = chunks.pop() + chunk
+        chunks.append(chunk)
+        self.chunks, self._items = tuple(chunks), None
+        return True
+
+    def get(self) -> List[Any]:
+        if self._items is None:
+            self._items = list(chain.from_iterable(self.chunks))
+        return self._items
+
+    def is_available(self) -> bool:
+        return True
+
+    def checkpoint(self) -> Dict[str, Any]:
+        return {"chunks": list(self.chunks)}
 
 
 class AuditGraphState(TypedDict):
@@ -29,18 +131,20 @@ class AuditGraphState(TypedDict):
     # ── Pipeline Tracking ─────────────────────────────────────────────────
     current_phase: str                    # AuditPhase enum value
     active_agents: List[str]
-    errors: Annotated[List[str], operator.add]
-    token_usage: Dict[str, int]           # agent_id -> tokens consumed
-    execution_timeline: Annotated[List[Dict[str, Any]], operator.add]
+    rerun_agents: Optional[List[str]]     # incremental re-audit: agents to run (None = all)
+    errors: Annotated[List[str], AppendLog]
+    token_usage: Annotated[Dict[str, Any], merge_usage]
+    # {total, agents, nodes, models} -> {calls, input_tokens, output_tokens, cost_usd}
+    execution_timeline: Annotated[List[Dict[str, Any]], AppendLog]
     # Each entry: {agent_id, node, started_at, ended_at, status, tokens}
 
     # ── Agent Outputs (accumulated via reducer) ───────────────────────────
-    findings: Annotated[List[Dict[str, Any]], operator.add]
-    risks: Annotated[List[Dict[str, Any]], operator.add]
-    recommendations: Annotated[List[Dict[str, Any]], operator.add]
+    findings: Annotated[List[Dict[str, Any]], AppendLog]
+    risks: Annotated[List[Dict[str, Any]], AppendLog]
+    recommendations: Annotated[List[Dict[str, Any]], AppendLog]
 
     # ── Scoring ───────────────────────────────────────────────────────────
-    maturity_scores: Dict[str, Any]
+    maturity_scores: Annotated[Dict[str, Any], merge_dicts]
     # dimension -> {score: int, justification: str, gaps: list}
 
     # ── ROI ───────────────────────────────────────────────────────────────
@@ -63,6 +167,7 @@ class AuditGraphState(TypedDict):
     exec_summary: Optional[str]
     slides_content: Optional[List[Dict[str, Any]]]
     roadmap_content: Optional[Dict[str, Any]]
+    stitch_ui_result: Optional[Dict[str, Any]]
 
 
 def build_initial_state(
@@ -81,6 +186,7 @@ def build_initial_state(
         extracted_entities=[],
         current_phase="init",
         active_agents=[],
+        rerun_agents=None,
         errors=[],
         token_usage={},
         execution_timeline=[],
@@ -98,4 +204,11 @@ def build_initial_state(
         exec_summary=None,
         slides_content=None,
         roadmap_content=None,
+        stitch_ui_result=None,
     )
+
+
+class AgentTask(TypedDict):
+    """Payload sent to a fan-out worker node — one per agent to run."""
+    agent_id: str
+    state: AuditGraphState
@@ -2,6 +2,13 @@
 
 Every agent output, finding, risk, and recommendation flows through these
 Pydantic models to guarantee JSON-schema validation and traceability.
+
+Agent outputs are validated straight from the LLM's JSON with
+`AgentOutput.model_validate_json(raw, context={"agent_id": ..., "agent_name": ...})`:
+the context stamps the output with the agent's identity and fills the
+`agent_id` the model omitted on findings, risks and recommendations.
+List and dict defaults use `default_factory`, which pydantic does not
+deep-copy on every instance.
 """
 
 from __future__ import annotations
@@ -9,7 +16,8 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from pydantic_core import PydanticCustomError
 
 from .enums import (
     Effort,
@@ -22,6 +30,11 @@ from .enums import (
 )
 
 
+def _agent_field() -> Any:
+    """Agent identity field, filled from the validation context when omitted."""
+    return Field(default=None, validate_default=True)
+
+
 # ---------------------------------------------------------------------------
 # Traçabilité
 # ---------------------------------------------------------------------------
@@ -39,44 +52,54 @@ class SourceReference(BaseModel):
 # Constats & Risques
 # ---------------------------------------------------------------------------
 
-class Finding(BaseModel):
+class _AgentItem(BaseModel):
+    """Item produced by an agent — its agent_id may come from the validation context."""
     id: str
-    agent_id: str
+    agent_id: str = _agent_field()
+
+    @field_validator("agent_id", mode="before")
+    @classmethod
+    def _fill_agent_id(cls, value: Any, info: ValidationInfo) -> Any:
+        """An omitted agent_id is taken from the validation context."""
+        if value is None:
+            value = (info.context or {}).get("agent_id")
+        if value is None:
+            raise PydanticCustomError("missing", "Field required")
+        return value
+
+
+class Finding(_AgentItem):
     category: str
     description: str
     severity: Severity
     sources: List[SourceReference]
-    tags: List[str] = []
+    tags: List[str] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
-class Risk(BaseModel):
-    id: str
-    agent_id: str
+class Risk(_AgentItem):
     title: str
     description: str
     impact: Severity
     probability: Probability
     mitigations: List[str]
     sources: List[SourceReference]
-    dependencies: List[str] = []
+    dependencies: List[str] = Field(default_factory=list)
 
 
 # ---------------------------------------------------------------------------
 # Recommandations & Priorisation
 # ---------------------------------------------------------------------------
 
-class Recommendation(BaseModel):
-    id: str
-    agent_id: str
+class Recommendation(_AgentItem):
     title: str
     description: str
     effort: Effort
     impact: Impact
     timeframe: Timeframe
     priority_score: Optional[float] = None
-    dependencies: List[str] = []
-    sources: List[SourceReference] = []
+    dependencies: List[str] = Field(default_factory=list)
+    sources: List[SourceReference] = Field(default_factory=list)
 
 
 class QuickWin(BaseModel):
@@ -85,7 +108,7 @@ class QuickWin(BaseModel):
     description: str
     estimated_weeks: int = Field(ge=1, le=4)
     expected_impact: str
-    prerequisites: List[str] = []
+    prerequisites: List[str] = Field(default_factory=list)
 
 
 class RoadmapItem(BaseModel):
@@ -93,9 +116,9 @@ class RoadmapItem(BaseModel):
     title: str
     description: str
     phase: Timeframe
-    dependencies: List[str] = []
+    dependencies: List[str] = Field(default_factory=list)
     resources_needed: str = ""
-    kpis: List[str] = []
+    kpis: List[str] = Field(default_factory=list)
 
 
 # ---------------------------------------------------------------------------
@@ -107,7 +130,7 @@ class MaturityScore(BaseModel):
     score: MaturityLevel
     justification: str
     gaps: List[str]
-    sources: List[SourceReference] = []
+    sources: List[SourceReference] = Field(default_factory=list)
 
 
 # ---------------------------------------------------------------------------
@@ -128,7 +151,7 @@ class ROIModel(BaseModel):
     scenarios: List[ROIScenario]
     investment_horizon_months: int = 36
     discount_rate: float = 0.08
-    key_hypotheses: List[str] = []
+    key_hypotheses: List[str] = Field(default_factory=list)
 
 
 # ---------------------------------------------------------------------------
@@ -137,13 +160,22 @@ class ROIModel(BaseModel):
 
 class AgentOutput(BaseModel):
     """Schema commun que chaque agent DOIT retourner."""
-    agent_id: str
-    agent_name: str
-    findings: List[Finding] = []
-    risks: List[Risk] = []
-    recommendations: List[Recommendation] = []
-    maturity_scores: List[MaturityScore] = []
-    metadata: Dict[str, Any] = {}
+    agent_id: str = _agent_field()
+    agent_name: str = _agent_field()
+    findings: List[Finding] = Field(default_factory=list)
+    risks: List[Risk] = Field(default_factory=list)
+    recommendations: List[Recommendation] = Field(default_factory=list)
+    maturity_scores: List[MaturityScore] = Field(default_factory=list)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+    @field_validator("agent_id", "agent_name", mode="before")
+    @classmethod
+    def _from_context(cls, value: Any, info: ValidationInfo) -> Any:
+        """The running agent's identity (validation context) wins over the payload's."""
+        value = (info.context or {}).get(info.field_name, value)
+        if value is None:
+            raise PydanticCustomError("missing", "Field required")
+        return value
 
 
 # ---------------------------------------------------------------------------
@@ -152,6 +184,6 @@ class AgentOutput(BaseModel):
 
 class EvidenceMap(BaseModel):
     """Référence croisée : chaque constat/risque/reco → ses sources."""
-    finding_sources: Dict[str, List[SourceReference]] = {}
-    risk_sources: Dict[str, List[SourceReference]] = {}
-    recommendation_sources: Dict[str, List[SourceReference]] = {}
+    finding_sources: Dict[str, List[SourceReference]] = Field(default_factory=dict)
+    risk_sources: Dict[str, List[SourceReference]] = Field(default_factory=dict)
+    recommendation_sources: Dict[str, List[SourceReference]] = Field(default_factory=dict)
@@ -0,0 +1,2 @@
+from .queue import Job, JobQueue, build_job_queue
+from .worker import Worker, start_workers
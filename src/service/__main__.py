@@ -0,0 +1,51 @@
+"""Audit service — HTTP API + worker processes over the job queue.
+
+    python -m src.service                    # API + SERVICE_WORKERS workers
+    python -m src.service --workers 0        # API only (workers run elsewhere)
+    python -m src.service worker             # one worker, no API
+
+Workers on other machines share the queue with QUEUE_BACKEND=supabase.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from src.config import settings
+from src.service.api import build_server
+from src.service.queue import build_job_queue
+from src.service.worker import Worker, start_workers
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the audit job service.")
+    parser.add_argument("mode", nargs="?", choices=("serve", "worker"), default="serve")
+    parser.add_argument("--host", default=settings.service_host)
+    parser.add_argument("--port", type=int, default=settings.service_port)
+    parser.add_argument("--workers", type=int, default=settings.service_workers,
+                        help="Worker processes started next to the API.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.log_level, format="%(message)s")
+
+    if args.mode == "worker":
+        Worker().run_forever()
+        return
+
+    processes = start_workers(args.workers) if args.workers else []
+    server = build_server(build_job_queue(), args.host, args.port)
+    logger.info(f"Audit service on http://{args.host}:{server.server_port} ({len(processes)} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""HTTP API of the audit service (standard library only).
+
+    POST /jobs                      submit an audit (manifest row JSON) → 201 job
+    GET  /jobs?status=queued        list recent jobs
+    GET  /jobs/{job_id}             job status, phase, attempts, error
+    POST /jobs/{job_id}/cancel      cancel (immediate if queued, next node if running)
+    GET  /jobs/{job_id}/deliverables  exec summary, roadmap, slides (409 until succeeded)
+    GET  /jobs/{job_id}/state       audit state (final, or under review while awaiting_validation)
+    POST /jobs/{job_id}/validate    {"overrides": {...}, "validated_by": "..."} → requeued to finish
+    POST /jobs/{job_id}/overrides   {"overrides": {...}} on a succeeded job → 202, queued for recompute
+    GET  /health
+
+Requests only touch the job queue, so they return in milliseconds
+whatever the audits' duration; the work is done by the worker processes
+(src.service.worker). Overrides on a finished audit are checked here,
+then queued: the job turns "recompute" until a worker has re-run the
+nodes the edit affects (src.orchestrator.recompute) and put it back to
+"succeeded" with the new deliverables.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.orchestrator.campaign import deliverables, parse_entry
+from src.orchestrator.overrides import validate_overrides
+from src.service.queue import JOB_STATUSES, JobQueue
+
+logger = logging.getLogger(__name__)
+
+_JOB_PATH = re.compile(r"^/jobs/(?P<job_id>[\w-]+)(?:/(?P<action>cancel|deliverables|state|validate|overrides))?$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    queue: JobQueue                          # set on the per-server subclass
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send(self, status: HTTPStatus, body: Any) -> None:
+        data = json.dumps(body, ensure_ascii=False, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._send(status, {"error": message})
+
+    def _route(self) -> Tuple[str, Optional[str], Optional[str]]:
+        url = urlparse(self.path)
+        match = _JOB_PATH.match(url.path)
+        if match:
+            return "job", match["job_id"], match["action"]
+        return url.path.rstrip("/") or "/", None, None
+
+    def do_GET(self) -> None:
+        route, job_id, action = self._route()
+        if route == "/health":
+            return self._send(HTTPStatus.OK, {"status": "ok"})
+        if route == "/jobs":
+            status = parse_qs(urlparse(self.path).query).get("status", [None])[0]
+            if status is not None and status not in JOB_STATUSES:
+                return self._error(HTTPStatus.BAD_REQUEST, f"Unknown status {status!r}")
+            return self._send(HTTPStatus.OK, [job.summary() for job in self.queue.list(status)])
+        if route != "job" or action in ("cancel", "validate", "overrides"):
+            return self._error(HTTPStatus.NOT_FOUND, "Not found")
+
+        job = self.queue.get(job_id)
+        if job is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"Unknown job {job_id}")
+        if action is None:
+            return self._send(HTTPStatus.OK, job.summary())
+        if action == "state" and job.status == "awaiting_validation":
+            return self._send(HTTPStatus.OK, job.result)
+        if job.status != "succeeded":
+            return self._error(HTTPStatus.CONFLICT, f"Job {job_id} is {job.status}")
+        if action == "state":
+            return self._send(HTTPStatus.OK, job.result)
+        return self._send(HTTPStatus.OK, {"audit_id": job.audit_id, **deliverables(job.result or {})})
+
+    def _read_object(self) -> Optional[dict]:
+        """JSON object body, or None after answering 400."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError) as e:
+            self._error(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+            return None
+        if not isinstance(payload, dict):
+            self._error(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+            return None
+        return payload
+
+    def _validate(self, job_id: str) -> None:
+        decision = self._read_object()
+        if decision is None:
+            return
+        try:
+            decision["overrides"] = validate_overrides(decision.get("overrides"))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Invalid overrides: {e}")
+        job = self.queue.validate(job_id, decision)
+        if job is None:
+            job = self.queue.get(job_id)
+            if job is None:
+                return self._error(HTTPStatus.NOT_FOUND, f"Unknown job {job_id}")
+            return self._error(HTTPStatus.CONFLICT, f"Job {job_id} is {job.status}")
+        self._send(HTTPStatus.OK, job.summary())
+
+    def _override(self, job_id: str) -> None:
+        body = self._read_object()
+        if body is None:
+            return
+        try:
+            overrides = validate_overrides(body.get("overrides"))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Invalid overrides: {e}")
+        job = self.queue.request_recompute(job_id, overrides)
+        if job is None:
+            job = self.queue.get(job_id)
+            if job is None:
+                return self._error(HTTPStatus.NOT_FOUND, f"Unknown job {job_id}")
+            return self._error(HTTPStatus.CONFLICT, f"Job {job_id} is {job.status}")
+        self._send(HTTPStatus.ACCEPTED, job.summary())
+
+    def do_POST(self) -> None:
+        route, job_id, action = self._route()
+        if route == "job" and action == "cancel":
+            job = self.queue.cancel(job_id)
+            if job is None:
+                return self._error(HTTPStatus.NOT_FOUND, f"Unknown job {job_id}")
+            return self._send(HTTPStatus.OK, job.summary())
+        if route == "job" and action == "validate":
+            return self._validate(job_id)
+        if route == "job" and action == "overrides":
+            return self._override(job_id)
+        if route != "/jobs":
+            return self._error(HTTPStatus.NOT_FOUND, "Not found")
+
+        payload = self._read_object()
+        if payload is None:
+            return
+        entry = parse_entry(0, payload, "JOB")
+        if entry.error:
+            return self._error(HTTPStatus.BAD_REQUEST, entry.error)
+        job = self.queue.submit(payload)
+        self._send(HTTPStatus.CREATED, job.summary())
+
+
+def build_server(queue: JobQueue, host: str, port: int) -> ThreadingHTTPServer:
+    """HTTP server bound to `queue` (port 0 picks a free port)."""
+    handler = type("JobAPIHandler", (_Handler,), {"queue": queue})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,392 @@
+"""Persistent audit job queue with leases and heartbeats.
+
+A job is one audit request (the manifest row format of
+src.orchestrator.campaign). Its life cycle:
+
+    queued ──claim──▶ running ──complete──▶ succeeded
+       ▲                 │ ├──fail (attempts left)──▶ queued
+       │                 │ ├──fail (last attempt)───▶ failed
+       │                 │ ├──cancel requested──────▶ cancelled
+       └─lease expired───┘ └──paused for review─────▶ awaiting_validation
+                                                          │ validate
+                                                          ▼
+                                                        queued
+
+    succeeded ──request_recompute──▶ recompute ──claim──▶ running
+        ▲                                                    │
+        └──────────────complete_recompute────────────────────┘
+
+
+A worker that claims a job holds a lease on it and extends it with
+heartbeats. If the worker dies, the lease expires and the next claim
+hands the job to another worker, which resumes the audit from its last
+checkpoint (thread_id = audit_id). Cancelling a queued (or awaiting)
+job is immediate; a running job is flagged and its worker stops at the
+next graph node.
+
+A job paused at human validation holds no worker: its audit waits in the
+checkpointer until `validate` stores the consultant's decision and
+requeues it, with a fresh set of attempts, for any worker to finish.
+
+Consultant overrides on a succeeded job go through the queue the same
+way: `request_recompute` stores them and flags the job "recompute"; the
+worker that claims it re-runs only what they affect
+(src.orchestrator.recompute) and puts the job back to succeeded, with
+its previous result kept if the recompute fails.
+
+Backends:
+- "sqlite" (default): local file at settings.queue_path, shared by the
+  API and worker processes of one machine
+- "supabase": the Supabase Postgres database (settings.supabase_db_url),
+  for workers on several machines; requires `psycopg`
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = (
+    "queued", "running", "awaiting_validation", "recompute", "succeeded", "failed", "cancelled",
+)
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_jobs (
+    job_id           TEXT PRIMARY KEY,
+    audit_id         TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    payload_json     TEXT NOT NULL,
+    result_json      TEXT,
+    decision_json    TEXT,
+    error            TEXT,
+    phase            TEXT,
+    worker_id        TEXT,
+    lease_expires_at DOUBLE PRECISION,
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    max_attempts     INTEGER NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at       DOUBLE PRECISION NOT NULL,
+    started_at       DOUBLE PRECISION,
+    finished_at      DOUBLE PRECISION
+);
+CREATE INDEX IF NOT EXISTS audit_jobs_status ON audit_jobs (status, created_at);
+"""
+
+# Oldest queued job, or running job whose worker stopped heartbeating
+_CLAIM = """
+UPDATE audit_jobs
+SET status = 'running', worker_id = ?, lease_expires_at = ?, attempts = attempts + 1,
+    started_at = COALESCE(started_at, ?)
+WHERE job_id = (
+    SELECT job_id FROM audit_jobs
+    WHERE (status IN ('queued', 'recompute') OR (status = 'running' AND lease_expires_at < ?))
+      AND cancel_requested = 0
+    ORDER BY created_at
+    LIMIT 1 {lock}
+)
+RETURNING *
+"""
+
+
+@dataclass
+class Job:
+    job_id: str
+    audit_id: str
+    status: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+    max_attempts: int = 1
+    worker_id: Optional[str] = None
+    phase: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    decision: Optional[Dict[str, Any]] = None
+    cancel_requested: bool = False
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def is_recompute(self) -> bool:
+        """Whether the job carries overrides to apply to its finished audit."""
+        return bool(self.decision and self.decision.get("recompute"))
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> Job:
+        return cls(
+            job_id=row["job_id"],
+            audit_id=row["audit_id"],
+            status=row["status"],
+            payload=json.loads(row["payload_json"]),
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            worker_id=row["worker_id"],
+            phase=row["phase"],
+            error=row["error"],
+            result=json.loads(row["result_json"]) if row["result_json"] else None,
+            decision=json.loads(row["decision_json"]) if row["decision_json"] else None,
+            cancel_requested=bool(row["cancel_requested"]),
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Public view of the job (no payload / result)."""
+        return {
+            "job_id": self.job_id,
+            "audit_id": self.audit_id,
+            "status": self.status,
+            "phase": self.phase,
+            "attempts": self.attempts,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """SQLite job queue — safe across threads and processes (WAL, immediate txns)."""
+
+    _placeholder = "?"
+    _claim_lock = ""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.queue_path
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self._setup()
+
+    def _setup(self) -> None:
+        self._conn.executescript(_SCHEMA)
+
+    def _execute(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def _sql(self, query: str) -> str:
+        return query.replace("?", self._placeholder)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ── Producer side ─────────────────────────────────────────────────
+
+    def submit(self, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Job:
+        job_id = f"JOB-{uuid.uuid4().hex[:12]}"
+        audit_id = str(payload.get("audit_id") or job_id)
+        payload = {**payload, "audit_id": audit_id}
+        rows = self._execute(self._sql(
+            "INSERT INTO audit_jobs (job_id, audit_id, status, payload_json, max_attempts, created_at) "
+            "VALUES (?, ?, 'queued', ?, ?, ?) RETURNING *"
+        ), (job_id, audit_id, json.dumps(payload, ensure_ascii=False),
+            max_attempts or settings.job_max_attempts, time.time()))
+        return Job.from_row(rows[0])
+
+    def get(self, job_id: str) -> Optional[Job]:
+        rows = self._execute(self._sql("SELECT * FROM audit_jobs WHERE job_id = ?"), (job_id,))
+        return Job.from_row(rows[0]) if rows else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Job]:
+        if status:
+            rows = self._execute(self._sql(
+                "SELECT * FROM audit_jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?"
+            ), (status, limit))
+        else:
+            rows = self._execute(self._sql(
+                "SELECT * FROM audit_jobs ORDER BY created_at DESC LIMIT ?"
+            ), (limit,))
+        return [Job.from_row(row) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job now; flag a running one for its worker.
+
+        A pending recompute is dropped: the job stays succeeded.
+        """
+        now = time.time()
+        self._execute(self._sql(
+            "UPDATE audit_jobs SET status = 'cancelled', finished_at = ? "
+            "WHERE job_id = ? AND status IN ('queued', 'awaiting_validation')"
+        ), (now, job_id))
+        self._execute(self._sql(
+            "UPDATE audit_jobs SET status = 'succeeded', decision_json = NULL "
+            "WHERE job_id = ? AND status = 'recompute'"
+        ), (job_id,))
+        self._execute(self._sql(
+            "UPDATE audit_jobs SET cancel_requested = 1 WHERE job_id = ? AND status = 'running'"
+        ), (job_id,))
+        return self.get(job_id)
+
+    def validate(self, job_id: str, decision: Dict[str, Any]) -> Optional[Job]:
+        """Store the consultant's decision and requeue a job awaiting validation.
+
+        Returns None if the job is unknown or not awaiting validation.
+        """
+        rows = self._execute(self._sql(
+            "UPDATE audit_jobs SET status = 'queued', decision_json = ?, attempts = 0, error = NULL, "
+            "finished_at = NULL "
+            "WHERE job_id = ? AND status = 'awaiting_validation' RETURNING *"
+        ), (json.dumps(decision, ensure_ascii=False), job_id))
+        return Job.from_row(rows[0]) if rows else None
+
+    def request_recompute(self, job_id: str, overrides: Dict[str, Any]) -> Optional[Job]:
+        """Queue consultant overrides for a succeeded job's audit.
+
+        Returns None if the job is unknown or not succeeded.
+        """
+        decision = {"recompute": True, "overrides": overrides}
+        rows = self._execute(self._sql(
+            "UPDATE audit_jobs SET status = 'recompute', decision_json = ?, attempts = 0, error = NULL, "
+            "cancel_requested = 0, phase = 'Recompute' "
+            "WHERE job_id = ? AND status = 'succeeded' RETURNING *"
+        ), (json.dumps(decision, ensure_ascii=False), job_id))
+        return Job.from_row(rows[0]) if rows else None
+
+    # ── Worker side ───────────────────────────────────────────────────
+
+    def claim(self, worker_id: str, lease_seconds: Optional[float] = None) -> Optional[Job]:
+        """Lease the next job to `worker_id`, or None if there is none.
+
+        Jobs whose lease expired after their last attempt are failed
+        instead of being handed out again.
+        """
+        lease = settings.job_lease_seconds if lease_seconds is None else lease_seconds
+        now = time.time()
+        self._execute(self._sql(
+            "UPDATE audit_jobs SET status = 'failed', finished_at = ?, "
+            "error = COALESCE(error, 'worker lost (lease expired)') "
+            "WHERE status = 'running' AND lease_expires_at < ? AND attempts >= max_attempts"
+        ), (now, now))
+        self._execute(self._sql(
+            "UPDATE audit_jobs SET status = 'cancelled', finished_at = ? "
+            "WHERE status = 'running' AND lease_expires_at < ? AND cancel_requested = 1"
+        ), (now, now))
+        rows = self._execute(
+            self._sql(_CLAIM.format(lock=self._claim_lock)), (worker_id, now + lease, now, now)
+        )
+        if not rows:
+            return None
+        job = Job.from_row(rows[0])
+        logger.info(f"[{worker_id}] claimed {job.job_id} (attempt {job.attempts}/{job.max_attempts})")
+        return job
+
+    def heartbeat(
+        self, job_id: str, worker_id: str, lease_seconds: Optional[float] = None,
+        phase: Optional[str] = None,
+    ) -> str:
+        """Extend the lease; returns "ok", "cancel" (stop requested) or "lost"."""
+        lease = settings.job_lease_seconds if lease_seconds is None else lease_seconds
+        rows = self._execute(self._sql(
+            "UPDATE audit_jobs SET lease_expires_at = ?, phase = COALESCE(?, phase) "
+            "WHERE job_id = ? AND worker_id = ? AND status = 'running' RETURNING cancel_requested"
+        ), (time.time() + lease, phase, job_id, worker_id))
+        if not rows:
+            return "lost"
+        return "cancel" if rows[0]["cancel_requested"] else "ok"
+
+    def _finish(self, job_id: str, worker_id: str, status: str, **fields: Any) -> bool:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        rows = self._execute(self._sql(
+            f"UPDATE audit_jobs SET status = ?, finished_at = ?, lease_expires_at = NULL"
+            f"{', ' + assignments if assignments else ''} "
+            "WHERE job_id = ? AND worker_id = ? AND status = 'running' RETURNING job_id"
+        ), (status, time.time(), *fields.values(), job_id, worker_id))
+        return bool(rows)
+
+    def complete(self, job_id: str, worker_id: str, final_state: Dict[str, Any]) -> bool:
+        return self._finish(
+            job_id, worker_id, "succeeded", phase="Done", error=None,
+            result_json=json.dumps(final_state, ensure_ascii=False, default=str),
+        )
+
+    def complete_recompute(
+        self, job_id: str, worker_id: str, final_state: Dict[str, Any], error: Optional[str] = None,
+    ) -> bool:
+        """Put a recomputed job back to succeeded, with its new (or unchanged) state."""
+        return self._finish(
+            job_id, worker_id, "succeeded", phase="Done", error=error, decision_json=None,
+            result_json=json.dumps(final_state, ensure_ascii=False, default=str),
+        )
+
+    def await_validation(self, job_id: str, worker_id: str, state: Dict[str, Any]) -> bool:
+        """Release a job whose audit paused at human validation; `state` is kept for review."""
+        return self._finish(
+            job_id, worker_id, "awaiting_validation", phase="Validation",
+            result_json=json.dumps(state, ensure_ascii=False, default=str),
+        )
+
+    def mark_cancelled(self, job_id: str, worker_id: str) -> bool:
+        return self._finish(job_id, worker_id, "cancelled")
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Requeue the job if it has attempts left, else mark it failed."""
+        rows = self._execute(self._sql(
+            "UPDATE audit_jobs SET status = 'queued', error = ?, worker_id = NULL, "
+            "lease_expires_at = NULL "
+            "WHERE job_id = ? AND worker_id = ? AND status = 'running' AND attempts < max_attempts "
+            "AND cancel_requested = 0 RETURNING job_id"
+        ), (error, job_id, worker_id))
+        if rows:
+            return True
+        return self._finish(job_id, worker_id, "failed", error=error)
+
+
+class PostgresJobQueue(JobQueue):
+    """Same queue on Postgres (Supabase) — claims use FOR UPDATE SKIP LOCKED."""
+
+    _placeholder = "%s"
+    _claim_lock = "FOR UPDATE SKIP LOCKED"
+
+    def __init__(self, db_url: Optional[str] = None):
+        db_url = db_url or settings.supabase_db_url
+        if not db_url:
+            raise ValueError("QUEUE_BACKEND=supabase requires SUPABASE_DB_URL")
+        try:
+            from psycopg import Connection
+            from psycopg.rows import dict_row
+        except ImportError as e:
+            raise ImportError("The Supabase job queue needs `pip install psycopg`") from e
+        self.path = db_url
+        self._conn = Connection.connect(db_url, autocommit=True, prepare_threshold=0, row_factory=dict_row)
+        self._lock = threading.Lock()
+        self._setup()
+
+    def _setup(self) -> None:
+        with self._lock:
+            for statement in filter(str.strip, _SCHEMA.split(";")):
+                self._conn.execute(statement)
+
+    def _execute(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            return list(cursor.fetchall()) if cursor.description else []
+
+
+def build_job_queue(backend: Optional[str] = None) -> JobQueue:
+    """Build the job queue configured by settings.queue_backend."""
+    backend = backend or settings.queue_backend
+    if backend == "sqlite":
+        return JobQueue()
+    if backend == "supabase":
+        return PostgresJobQueue()
+    raise ValueError(f"Unknown queue backend: {backend}")
@@ -0,0 +1,201 @@
+"""Audit workers — pull jobs from the queue and run them on the graph.
+
+Each worker process loops: claim a job, run its audit on the
+checkpointed graph while a heartbeat thread keeps the lease alive (and
+reports the current phase), then store the final state. A job handed
+over after a lost lease, or retried after an error, resumes from its
+last checkpoint instead of starting again. An audit that pauses at human
+validation releases its worker; once the job is validated, whichever
+worker claims it resumes the audit with the consultant's decision.
+Overrides on a finished audit are queued too: the worker re-runs only
+the nodes they affect (src.orchestrator.recompute).
+
+Cancellation and lease loss are noticed by the heartbeat; the audit is
+stopped at the next graph node boundary.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.config import settings
+from src.orchestrator.campaign import initial_state, parse_entry
+from src.orchestrator.recompute import recompute_with_overrides
+from src.orchestrator.runner import (
+    _thread_config,
+    get_default_graph,
+    is_interrupt,
+    stream_audit,
+    stream_resume_audit,
+)
+from src.service.queue import Job, JobQueue, build_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+class JobStopped(Exception):
+    """The job was cancelled, or its lease was taken over by another worker."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Worker:
+    """Runs queued audits one at a time."""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        worker_id: Optional[str] = None,
+        graph=None,
+        lease_seconds: Optional[float] = None,
+        heartbeat_seconds: Optional[float] = None,
+    ):
+        self.queue = queue or build_job_queue()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.graph = graph
+        self.lease_seconds = settings.job_lease_seconds if lease_seconds is None else lease_seconds
+        self.heartbeat_seconds = (
+            settings.job_heartbeat_seconds if heartbeat_seconds is None else heartbeat_seconds
+        )
+
+    def _stream(self, job: Job):
+        graph = self.graph or get_default_graph()
+        entry = parse_entry(0, job.payload, job.job_id)
+        if entry.error:
+            raise ValueError(entry.error)
+        if job.decision is not None:
+            logger.info(f"[{self.worker_id}] {job.job_id}: resuming validated audit {job.audit_id}")
+            return stream_resume_audit(job.audit_id, decision=job.decision, graph=graph)
+        if job.attempts > 1 and graph.checkpointer is not None:
+            if graph.get_state(_thread_config(job.audit_id)).next:
+                logger.info(f"[{self.worker_id}] {job.job_id}: resuming audit {job.audit_id}")
+                return stream_resume_audit(job.audit_id, graph=graph)
+        return stream_audit(initial_state(entry, graph), graph=graph)
+
+    @contextmanager
+    def _leased(self, job: Job) -> Iterator[Dict[str, Any]]:
+        """Keep the job's lease alive while the block runs.
+
+        Yields the signal dict: set "phase" to report progress; "reason"
+        is set when the heartbeat learns the job was cancelled or lost.
+        """
+        stop = threading.Event()
+        signal = {"reason": None, "phase": None}
+
+        def heartbeat():
+            while not stop.wait(self.heartbeat_seconds):
+                status = self.queue.heartbeat(
+                    job.job_id, self.worker_id, self.lease_seconds, signal["phase"]
+                )
+                if status != "ok":
+                    signal["reason"] = status
+                    return
+
+        beat = threading.Thread(target=heartbeat, name=f"heartbeat-{job.job_id}", daemon=True)
+        beat.start()
+        try:
+            yield signal
+        finally:
+            stop.set()
+            beat.join()
+
+    def run_job(self, job: Job) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Run the job's audit under heartbeats.
+
+        Returns the last state and whether the audit paused at human validation.
+        """
+        final_state, paused = None, False
+        with self._leased(job) as signal:
+            chunks = self._stream(job)
+            for mode, chunk in chunks:
+                if mode == "values":
+                    final_state = chunk
+                    signal["phase"] = chunk.get("current_phase")
+                paused = paused or is_interrupt(mode, chunk)
+                if signal["reason"]:
+                    chunks.close()
+                    raise JobStopped(signal["reason"])
+        return final_state, paused
+
+    def run_recompute(self, job: Job) -> None:
+        """Apply the job's queued overrides to its finished audit.
+
+        On failure the job goes back to succeeded with its previous
+        result and the error.
+        """
+        graph = self.graph or get_default_graph()
+        try:
+            with self._leased(job):
+                result = recompute_with_overrides(
+                    job.audit_id, job.decision["overrides"], graph=graph, base_state=job.result,
+                )
+        except Exception as e:
+            logger.error(f"[{self.worker_id}] {job.job_id} recompute failed: {e}")
+            self.queue.complete_recompute(
+                job.job_id, self.worker_id, job.result or {}, error=f"{type(e).__name__}: {e}",
+            )
+            return
+        self.queue.complete_recompute(job.job_id, self.worker_id, result.state)
+        logger.info(
+            f"[{self.worker_id}] {job.job_id} recomputed "
+            f"({', '.join(result.nodes) or 'no node'} re-run)"
+        )
+
+    def run_once(self) -> Optional[Job]:
+        """Claim and run one job; returns it, or None if the queue was empty."""
+        job = self.queue.claim(self.worker_id, self.lease_seconds)
+        if job is None:
+            return None
+        if job.is_recompute:
+            self.run_recompute(job)
+            return job
+        try:
+            final_state, paused = self.run_job(job)
+        except JobStopped as e:
+            if e.reason == "cancel":
+                self.queue.mark_cancelled(job.job_id, self.worker_id)
+                logger.info(f"[{self.worker_id}] {job.job_id} cancelled")
+            else:
+                logger.warning(f"[{self.worker_id}] {job.job_id}: lease lost — dropping it")
+        except Exception as e:
+            logger.error(f"[{self.worker_id}] {job.job_id} failed: {e}")
+            self.queue.fail(job.job_id, self.worker_id, f"{type(e).__name__}: {e}")
+        else:
+            if paused:
+                self.queue.await_validation(job.job_id, self.worker_id, final_state or {})
+                logger.info(f"[{self.worker_id}] {job.job_id} awaiting human validation")
+            else:
+                self.queue.complete(job.job_id, self.worker_id, final_state or {})
+                logger.info(f"[{self.worker_id}] {job.job_id} succeeded")
+        return job
+
+    def run_forever(self, poll_seconds: float = 1.0, stop: Optional[threading.Event] = None) -> None:
+        logger.info(f"Worker {self.worker_id} started")
+        while stop is None or not stop.is_set():
+            if self.run_once() is None:
+                time.sleep(poll_seconds)
+
+
+def _worker_main(index: int) -> None:
+    logging.basicConfig(level=settings.log_level, format="%(message)s")
+    Worker(worker_id=f"{socket.gethostname()}-{os.getpid()}-w{index}").run_forever()
+
+
+def start_workers(count: Optional[int] = None) -> List[multiprocessing.Process]:
+    """Start `count` worker processes (settings.service_workers by default)."""
+    processes = []
+    count = settings.service_workers if count is None else count
+    for index in range(count):
+        process = multiprocessing.Process(target=_worker_main, args=(index,), daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
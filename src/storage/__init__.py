@@ -1,2 +1,4 @@
 from .supabase_client import SupabaseStorage
 from .vector_store import VectorStore
+from .result_store import AuditResultStore
+from .checkpoint import build_checkpointer
@@ -0,0 +1,97 @@
+"""LangGraph checkpointers — persist audit state after every node.
+
+With a checkpointer attached, each audit runs on its own thread
+(thread_id = audit_id) and a crashed or interrupted audit can continue
+from the last completed node instead of restarting from `intake`.
+
+Backends:
+- "sqlite" (default): local file at settings.checkpoint_path
+- "supabase": the Supabase Postgres database (settings.supabase_db_url),
+  requires the optional `langgraph-checkpoint-postgres` package
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _ThreadedAsyncMixin:
+    """Async checkpoint API for sync savers — each call runs in a worker thread.
+
+    Lets one saver serve both `invoke`/`stream` and `ainvoke`/`astream`
+    on the same compiled graph.
+    """
+
+    async def aget_tuple(self, config) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> Any:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+class LocalCheckpointSaver(_ThreadedAsyncMixin, SqliteSaver):
+    """SQLite checkpointer usable from both the sync and async graph paths."""
+
+    @classmethod
+    def from_path(cls, path: str) -> LocalCheckpointSaver:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return cls(conn)
+
+
+def _build_supabase_saver() -> BaseCheckpointSaver:
+    if not settings.supabase_db_url:
+        raise ValueError("CHECKPOINT_BACKEND=supabase requires SUPABASE_DB_URL")
+    try:
+        from langgraph.checkpoint.postgres import PostgresSaver
+        from psycopg import Connection
+        from psycopg.rows import dict_row
+    except ImportError as e:
+        raise ImportError(
+            "The Supabase checkpoint backend needs `pip install langgraph-checkpoint-postgres`"
+        ) from e
+
+    class SupabaseCheckpointSaver(_ThreadedAsyncMixin, PostgresSaver):
+        """Postgres checkpointer on the Supabase database."""
+
+    conn = Connection.connect(
+        settings.supabase_db_url, autocommit=True, prepare_threshold=0, row_factory=dict_row
+    )
+    saver = SupabaseCheckpointSaver(conn)
+    saver.setup()
+    return saver
+
+
+def build_checkpointer(backend: Optional[str] = None) -> BaseCheckpointSaver:
+    """Build the checkpointer configured by settings.checkpoint_backend."""
+    backend = backend or settings.checkpoint_backend
+    if backend == "sqlite":
+        return LocalCheckpointSaver.from_path(settings.checkpoint_path)
+    if backend == "supabase":
+        return _build_supabase_saver()
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
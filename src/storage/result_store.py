@@ -0,0 +1,83 @@
+"""Completed-audit store — memoizes whole audits on their inputs.
+
+An audit is looked up by (input_hash, audit_type, pipeline_version).
+Results are always written to a local SQLite file; when Supabase is
+configured they are also written to / looked up in the `audits` table.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import settings
+from src.storage.supabase_client import SupabaseStorage
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completed_audits (
+    input_hash       TEXT NOT NULL,
+    audit_type       TEXT NOT NULL,
+    pipeline_version TEXT NOT NULL,
+    audit_id         TEXT NOT NULL,
+    state_json       TEXT NOT NULL,
+    completed_at     REAL NOT NULL,
+    PRIMARY KEY (input_hash, audit_type, pipeline_version)
+);
+"""
+
+
+class AuditResultStore:
+    """Local (SQLite) + optional remote (Supabase) store of completed audits."""
+
+    def __init__(self, path: Optional[str] = None, remote: Optional[SupabaseStorage] = None):
+        self.path = path or settings.audit_store_path
+        self.remote = remote if remote is not None else SupabaseStorage()
+        self._lock = threading.Lock()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def find_completed(
+        self, input_hash: str, audit_type: str, pipeline_version: str
+    ) -> Optional[Dict[str, Any]]:
+        if not input_hash:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state_json FROM completed_audits "
+                "WHERE input_hash = ? AND audit_type = ? AND pipeline_version = ?",
+                (input_hash, audit_type, pipeline_version),
+            ).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        return self.remote.find_completed_audit(input_hash, audit_type, pipeline_version)
+
+    def save_completed(self, state: Dict[str, Any], pipeline_version: str) -> None:
+        if not state.get("input_hash"):
+            return
+        payload = json.dumps(state, default=str, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completed_audits "
+                "(input_hash, audit_type, pipeline_version, audit_id, state_json, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    state["input_hash"], state["audit_type"], pipeline_version,
+                    state["audit_id"], payload, time.time(),
+                ),
+            )
+        self.remote.save_completed_audit(state["audit_id"], json.loads(payload), pipeline_version)
+        logger.info(f"Stored completed audit {state['audit_id']} ({state['input_hash'][:12]})")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
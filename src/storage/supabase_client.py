@@ -1,7 +1,8 @@
 """Supabase client — structured storage for audits, clients, findings, etc.
 
 Tables expected:
-- audits: id, type, client_id, status, created_at, state_json
+- audits: id, type, client_id, status, created_at, state_json,
+          input_hash, pipeline_version
 - clients: id, name, industry, size, contact
 - sources: id, audit_id, doc_id, name, type, storage_path
 - findings: id, audit_id, agent_id, category, description, severity, sources_json
@@ -58,6 +59,43 @@ class SupabaseStorage:
             return result.data[0]["state_json"]
         return None
 
+    def save_completed_audit(
+        self, audit_id: str, state: Dict[str, Any], pipeline_version: str
+    ) -> bool:
+        client = self._get_client()
+        if client is None:
+            logger.info(f"[local mode] Would save completed audit {audit_id}")
+            return True
+        client.table("audits").upsert({
+            "id": audit_id,
+            "type": state.get("audit_type"),
+            "status": "complete",
+            "input_hash": state.get("input_hash"),
+            "pipeline_version": pipeline_version,
+            "state_json": state,
+        }).execute()
+        return True
+
+    def find_completed_audit(
+        self, input_hash: str, audit_type: str, pipeline_version: str
+    ) -> Optional[Dict[str, Any]]:
+        client = self._get_client()
+        if client is None:
+            return None
+        result = (
+            client.table("audits").select("state_json")
+            .eq("input_hash", input_hash)
+            .eq("type", audit_type)
+            .eq("pipeline_version", pipeline_version)
+            .eq("status", "complete")
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        if result.data:
+            return result.data[0]["state_json"]
+        return None
+
     def upload_file(self, bucket: str, path: str, file_bytes: bytes) -> str:
         client = self._get_client()
         if client is None:
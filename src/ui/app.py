@@ -7,8 +7,12 @@ import os
 # Ensure the src folder is in the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.orchestrator.graph import audit_graph
-from src.agents.plugins.ia_readiness import IAReadinessAgent
+from src.agents.streaming import describe_item, describe_retraction, is_item_event, is_report_chunk, is_retraction
+from src.llm.cache import bypass_llm_cache
+from src.connectors.local_upload import compute_input_hash
+from src.orchestrator.runner import is_interrupt, stream_audit
+from src.orchestrator.state import build_initial_state
+from src.schemas.enums import AUDIT_TYPE_LABELS
 
 st.set_page_config(page_title="IAG Audit Factory", page_icon="🏭", layout="wide")
 
@@ -16,13 +20,16 @@ st.title("🏭 IAG Audit Factory - MVP")
 st.markdown("Plateforme d'audits clients opérée par une armée d'agents IA.")
 
 st.sidebar.header("Lancement d'un Audit")
-audit_type = st.sidebar.selectbox(
+audit_type_enum = st.sidebar.selectbox(
     "Type d'Audit",
-    ["Audit IA Readiness", "Audit Stratégique Global", "Audit IT & Architecture"]
+    list(AUDIT_TYPE_LABELS),
+    format_func=AUDIT_TYPE_LABELS.get,
 )
+audit_type = AUDIT_TYPE_LABELS[audit_type_enum]
 
 client_name = st.sidebar.text_input("Nom du Client", "Acme Corp")
 uploaded_files = st.sidebar.file_uploader("Documents d'Architecture / Logs", accept_multiple_files=True)
+no_cache = st.sidebar.checkbox("Ignorer les caches (LLM & audits identiques)", value=False)
 
 start_button = st.sidebar.button("🚀 Lancer l'Audit Factory")
 
@@ -42,25 +49,21 @@ if start_button:
         st.subheader("Graph State (Données Consolidées)")
         state_container = st.empty()
 
+    # Executive summary, filled in as the report generator writes it
+    report_container = st.empty()
+
     # Initial mock state
     docs_list = [f.name for f in uploaded_files] if uploaded_files else ["it_arch_v1.pdf", "interviews_cdos.docx"]
-    initial_state = {
-        "audit_id": f"AUDIT-2026-{(hash(time.time()) % 10000):04d}",
-        "audit_type": audit_type,
-        "client_context": {
-            "name": client_name,
-            "docs_provided": docs_list
-        },
-        "current_phase": "Init",
-        "errors": [],
-        "findings": [],
-        "risks": [],
-        "recommendations": [],
-        "dependencies": [],
-        "scores": {},
-        "roi_model": None,
-        "exec_summary": None
+    client_context = {
+        "name": client_name,
+        "docs_provided": docs_list
     }
+    initial_state = build_initial_state(
+        audit_id=f"AUDIT-2026-{(hash(time.time()) % 10000):04d}",
+        audit_type=audit_type_enum.value,
+        client_context=client_context,
+        input_hash=compute_input_hash(client_context, docs_list),
+    )
 
     logs = []
     
@@ -91,24 +94,59 @@ if start_button:
     step_count = 0
     total_steps = 7
 
-    for event in audit_graph.stream(initial_state):
-        for node_name, state_data in event.items():
-            step_count += 1
-            progress = min(step_count / total_steps, 1.0)
+    # Nodes return partial updates; "values" carries the merged state.
+    state_data = initial_state
+    report_text, report_attempt = "", None
+    with bypass_llm_cache(no_cache):
+        for mode, chunk in stream_audit(initial_state, reuse_completed=not no_cache):
+            if mode == "values":
+                state_data = chunk
+                continue
+            if mode == "custom":
+                # Agent items arrive while the agents are still writing
+                if is_item_event(mode, chunk):
+                    logs.append(f"📝 *{chunk['agent_id']}* : {describe_item(chunk)}")
+                    console_container.markdown("\n\n".join(logs))
+                elif is_retraction(mode, chunk):
+                    logs.append(f"↩️ *{chunk['agent_id']}* : {describe_retraction(chunk)}")
+                    console_container.markdown("\n\n".join(logs))
+                elif is_report_chunk(mode, chunk):
+                    # A retried report starts over
+                    if chunk["attempt"] != report_attempt:
+                        report_text, report_attempt = "", chunk["attempt"]
+                    report_text += chunk["text"]
+                    report_container.markdown(report_text)
+                continue
+            if is_interrupt(mode, chunk):
+                st.warning(
+                    "Validation Humaine requise : audit en pause. Reprise via "
+                    f"`python -m src.main --resume {initial_state['audit_id']} --validate decision.json` "
+                    "ou POST /jobs/{job_id}/validate."
+                )
+                st.stop()
+            for node_name, node_update in chunk.items():
+                step_count += 1
+                progress = min(step_count / total_steps, 1.0)
             
-            # Sub-agent real injection
-            if node_name == "plugin_agents":
-                st.toast(f"🤖 Claude Agent Spécialisé activé", icon="🤖")
-                logs.append("🤖 *Agent IA Readiness* (Claude) analyse le contexte...")
-                agent = IAReadinessAgent()
-                plugin_result = agent.analyze(state_data["client_context"])
-                state_data["findings"].extend(plugin_result["findings"])
-                
-            if node_name == "validation":
-                st.warning("Validation Humaine requise. (Auto-approuvé)")
+                # Plugin agents stream their results one by one as they finish
+                if node_name == "plugin_agent":
+                    node_update = node_update or {}
+                    st.toast(f"🤖 Agent Spécialisé terminé", icon="🤖")
+                    logs.append(
+                        f"🤖 *Agent Spécialisé* : +{len(node_update.get('findings', []))} findings, "
+                        f"+{len(node_update.get('risks', []))} risques"
+                    )
+
+                if node_name == "validation":
+                    if (node_update or {}).get("human_validated"):
+                        st.success("Validation Humaine effectuée.")
+                    else:
+                        st.warning("Validation Humaine : auto-approuvé (HUMAN_VALIDATION=auto).")
                 
-            update_ui(state_data["current_phase"], progress, state_data)
+                update_ui(state_data.get("current_phase", node_name), progress, state_data)
 
+    # The final summary is shown with the deliverables below
+    report_container.empty()
     st.success("🎉 Audit terminé par Claude avec succès !")
     
     if state_data.get("stitch_ui_result"):
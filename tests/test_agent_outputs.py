@@ -1,5 +1,7 @@
 """Tests for agent output validation and router logic."""
 
+import json
+
 import pytest
 
 from src.orchestrator.router import (
@@ -61,8 +63,19 @@ class TestPluginRegistry:
 # ─── BaseAgent ────────────────────────────────────────────────────────────
 
 class TestBaseAgent:
+    def test_agent_without_user_message_cannot_be_built(self):
+        class IncompleteAgent(BaseAgent):
+            def run(self, state):
+                return AgentOutput(agent_id=self.agent_id, agent_name=self.agent_name)
+
+        with pytest.raises(TypeError, match="build_user_message"):
+            IncompleteAgent("test", "Test", "prompt")
+
     def test_parse_output_valid_json(self):
         class DummyAgent(BaseAgent):
+            def build_user_message(self, state):
+                return ""
+
             def run(self, state):
                 return AgentOutput(agent_id=self.agent_id, agent_name=self.agent_name)
 
@@ -73,6 +86,9 @@ class TestBaseAgent:
 
     def test_parse_output_invalid_json(self):
         class DummyAgent(BaseAgent):
+            def build_user_message(self, state):
+                return ""
+
             def run(self, state):
                 return AgentOutput(agent_id=self.agent_id, agent_name=self.agent_name)
 
@@ -80,3 +96,35 @@ class TestBaseAgent:
         output = agent.parse_output("not json at all")
         assert output.agent_id == "test"
         assert "parse_error" in output.metadata
+
+    def test_parse_output_fills_agent_ids(self):
+        class DummyAgent(BaseAgent):
+            def build_user_message(self, state):
+                return ""
+
+            def run(self, state):
+                return AgentOutput(agent_id=self.agent_id, agent_name=self.agent_name)
+
+        agent = DummyAgent("test", "Test", "prompt")
+        raw = json.dumps({
+            "agent_id": "spoofed",
+            "findings": [
+                {"id": "F1", "category": "c", "description": "d", "severity": "LOW", "sources": []},
+                {"id": "F2", "agent_id": "other", "category": "c", "description": "d",
+                 "severity": "LOW", "sources": []},
+            ],
+        })
+        output = agent.parse_output(raw)
+        assert (output.agent_id, output.agent_name) == ("test", "Test")
+        assert [f.agent_id for f in output.findings] == ["test", "other"]
+
+    def test_parse_output_non_object_json(self):
+        class DummyAgent(BaseAgent):
+            def build_user_message(self, state):
+                return ""
+
+            def run(self, state):
+                return AgentOutput(agent_id=self.agent_id, agent_name=self.agent_name)
+
+        output = DummyAgent("test", "Test", "prompt").parse_output("[1, 2]")
+        assert "parse_error" in output.metadata
@@ -0,0 +1,170 @@
+"""Tests for offline batch mode (provider batch APIs, phased runner)."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import pool as pool_module
+from src.llm.batch import (
+    AnthropicBatchBackend,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    build_request,
+    mock_response,
+)
+from src.llm.ledger import TokenLedger
+from src.observability import tracing as tracing_module
+from src.observability.tracing import Tracer
+from src.orchestrator.batch import run_batch
+from src.orchestrator.graph import build_audit_graph
+from src.orchestrator.state import build_initial_state
+from src.schemas.models import ROIModel
+from src.storage.checkpoint import LocalCheckpointSaver
+from src.storage.result_store import AuditResultStore
+
+
+async def _offline_cockpit(self, audit_data):
+    return {"status": "skipped", "message": "offline"}
+
+
+class _RecordingBackend(LocalBatchBackend):
+    """Local backend that keeps every submitted batch."""
+
+    def __init__(self, directory, responder=None):
+        super().__init__(directory, responder, polls_before_done=1)
+        self.batches = []
+
+    def submit(self, requests):
+        self.batches.append(requests)
+        return super().submit(requests)
+
+
+@pytest.fixture
+def batch_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_latency_ms", 0)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(pool_module, "_pool_instance", None)
+    monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", _offline_cockpit)
+    saver = LocalCheckpointSaver.from_path(str(tmp_path / "checkpoints.sqlite"))
+    store = AuditResultStore(str(tmp_path / "audits.sqlite"))
+    yield SimpleNamespace(graph=build_audit_graph(checkpointer=saver), store=store, tmp_path=tmp_path)
+    store.close()
+    saver.conn.close()
+
+
+def _states(n):
+    return [
+        build_initial_state(
+            audit_id=f"AUDIT-B{i}", audit_type="ia_readiness",
+            client_context={"name": f"Client {i}", "industry": "Retail"},
+        )
+        for i in range(n)
+    ]
+
+
+def _run(env, states, responder=None):
+    backend = _RecordingBackend(str(env.tmp_path / "batches"), responder)
+    finals = run_batch(states, backend=backend, graph=env.graph, store=env.store, poll_seconds=0)
+    return finals, backend
+
+
+# ─── Requests & provider payloads ─────────────────────────────────────────
+
+class TestRequests:
+    def test_request_is_serializable_and_stable(self):
+        messages = [("system", "Tu es un auditeur."), ("human", "Analyse")]
+        request = build_request(messages, "claude-sonnet-4-5", 0.2, 4000, ROIModel)
+        assert json.loads(json.dumps(request)) == request
+        assert request["schema_name"] == "ROIModel"
+        assert request == build_request(messages, "claude-sonnet-4-5", 0.2, 4000, ROIModel)
+        assert request["custom_id"] != build_request(messages, "claude-sonnet-4-5", 0.2, 4000)["custom_id"]
+
+    def test_anthropic_params_use_tool_and_cache_breakpoint(self):
+        request = build_request([("system", "S"), ("human", "U")], "claude-sonnet-4-5", 0.2, 100, ROIModel)
+        params = AnthropicBatchBackend.params(request)
+        assert params["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert params["tool_choice"] == {"type": "tool", "name": "ROIModel"}
+        assert params["messages"] == [{"role": "user", "content": "U"}]
+
+    def test_openai_body_uses_json_schema(self):
+        request = build_request([("system", "S"), ("human", "U")], "gpt-4o", 0.2, 100, ROIModel)
+        body = OpenAIBatchBackend.body(request)
+        assert body["messages"][0] == {"role": "system", "content": "S"}
+        assert body["response_format"]["json_schema"]["name"] == "ROIModel"
+
+    def test_anthropic_usage_includes_cache_tokens(self):
+        message = SimpleNamespace(
+            content=[SimpleNamespace(type="tool_use", input={"scenarios": []})],
+            usage=SimpleNamespace(input_tokens=100, output_tokens=20,
+                                  cache_read_input_tokens=1500, cache_creation_input_tokens=0),
+        )
+        result = AnthropicBatchBackend._result(message)
+        assert json.loads(result["content"]) == {"scenarios": []}
+        assert result["usage"]["input_tokens"] == 1600
+        assert result["usage"]["input_token_details"]["cache_read"] == 1500
+
+    def test_ledger_charges_replayed_request_once(self):
+        ledger = TokenLedger("A", budget_usd=0)
+        for _ in range(2):
+            delta, _ = ledger.record("claude-sonnet-4-5", 100, 10, "core_agent", "x", request_id="r1")
+            assert delta["total"]["calls"] == 1
+        assert ledger.usage["total"]["calls"] == 1
+
+    def test_batch_calls_billed_at_discount(self):
+        ledger = TokenLedger("A", budget_usd=0)
+        full, _ = ledger.record("claude-sonnet-4-5", 1000, 100, "n", "a")
+        batch, _ = ledger.record("claude-sonnet-4-5", 1000, 100, "n", "a", price_factor=0.5)
+        assert batch["total"]["cost_usd"] == pytest.approx(full["total"]["cost_usd"] / 2)
+
+
+# ─── Phased runner ────────────────────────────────────────────────────────
+
+class TestRunBatch:
+    def test_audits_complete_with_one_batch_per_llm_stage(self, batch_env):
+        finals, backend = _run(batch_env, _states(3))
+        assert set(finals) == {"AUDIT-B0", "AUDIT-B1", "AUDIT-B2"}
+        for final in finals.values():
+            assert not final["errors"]
+            assert final["findings"] and final["roi_model"]["scenarios"]
+            assert final["exec_summary"].startswith("# Executive Summary")
+            assert final["token_usage"]["total"]["calls"] == 7
+        # core agents, plugin agent, ROI, report
+        assert [len(batch) for batch in backend.batches] == [12, 3, 3, 3]
+        assert len({r["custom_id"] for r in backend.batches[0]}) == 12
+
+    def test_paused_calls_are_not_error_spans(self, batch_env, monkeypatch):
+        spans = []
+        exporter = SimpleNamespace(export=spans.append)
+        monkeypatch.setattr(tracing_module, "_tracer_instance", Tracer([exporter]))
+        _run(batch_env, _states(1))
+        assert not [s for s in spans if s.status == "error"]
+        interrupted = {(s.kind, s.name) for s in spans if s.status == "interrupted"}
+        assert ("node", "core_agent") in interrupted and ("llm", "data_scanner") in interrupted
+
+    def test_identical_requests_sent_once(self, batch_env):
+        states = _states(2)
+        states[1]["client_context"] = states[0]["client_context"]
+        finals, backend = _run(batch_env, states)
+        assert [len(batch) for batch in backend.batches] == [4, 1, 1, 1]
+        descriptions = [[f["description"] for f in finals[a]["findings"]] for a in finals]
+        assert descriptions[0] == descriptions[1]
+
+    def test_failed_request_becomes_agent_error(self, batch_env):
+        def responder(request):
+            if request["schema_name"] == "ROIModel":
+                return {"error": "expired"}
+            return mock_response(request)
+
+        finals, _ = _run(batch_env, _states(1), responder)
+        final = finals["AUDIT-B0"]
+        assert any("ROI Modeler Error" in e and "expired" in e for e in final["errors"])
+        assert final["exec_summary"].startswith("# Executive Summary")
+
+    def test_needs_checkpointer(self, batch_env):
+        with pytest.raises(ValueError):
+            run_batch(_states(1), backend=LocalBatchBackend(str(batch_env.tmp_path)),
+                      graph=build_audit_graph(), store=batch_env.store)
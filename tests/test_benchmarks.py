@@ -0,0 +1,55 @@
+"""Tests for the offline benchmark harness."""
+
+import json
+from pathlib import Path
+
+from benchmarks.run_benchmarks import DEFAULT_BASELINE, compare, main, synthetic_state
+from src.config import settings
+
+
+class TestCompare:
+    def test_regression_beyond_tolerance(self):
+        baseline = {"render.slides.10000": {"seconds": 0.010, "peak_kib": 200.0}}
+        results = {"render.slides.10000": {"seconds": 0.020, "peak_kib": 210.0}}
+        regressions = compare(results, baseline, tolerance=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("render.slides.10000.seconds")
+
+    def test_noise_floor_and_new_metrics_ignored(self):
+        baseline = {"graph.node.intake": {"seconds": 0.0001}}
+        results = {
+            "graph.node.intake": {"seconds": 0.0005},   # 5× but below 1 ms
+            "render.new.10": {"seconds": 1.0},          # not in baseline
+        }
+        assert compare(results, baseline, tolerance=0.25) == []
+
+    def test_committed_baseline_is_a_quick_run(self):
+        baseline = json.loads((Path(__file__).parent.parent / DEFAULT_BASELINE).read_text())
+        assert baseline["meta"]["sizes"] == [1000] and baseline["meta"]["audits"] == 1
+        assert {"graph.audit_total", "render.slides.1000", "parse_output.50"} <= set(baseline["results"])
+
+
+class TestSuite:
+    def test_synthetic_state_scales(self):
+        state = synthetic_state(1000)
+        assert len(state["findings"]) == 1000
+        assert len(state["roadmap"]) == 100
+        assert all("agent_id" in f for f in state["findings"])
+
+    def test_quick_run_writes_results_and_baseline(self, tmp_path, capsys):
+        output, baseline = tmp_path / "latest.json", tmp_path / "baseline.json"
+        args = ["--quick", "--mock-latency-ms", "1", "--repeat", "1",
+                "--output", str(output), "--baseline", str(baseline)]
+
+        assert main(args + ["--save-baseline"]) == 0
+        results = json.loads(output.read_text())["results"]
+        assert "graph.node.core_agent" in results
+        assert {"render.exec_summary.1000", "render.roadmap.1000", "render.slides.1000",
+                "reducer.findings_add.1000", "reducer.log_steps_append_log.1000", "parse_output.50",
+                "prompt.report_generator.1000"} <= set(results)
+        assert results["prompt.report_generator.1000"]["prompt_tokens"] <= settings.prompt_context_tokens
+        assert baseline.exists()
+        assert settings.llm_provider != "mock"  # settings restored
+
+        assert main(args + ["--tolerance", "100"]) == 0
+        assert "No regression" in capsys.readouterr().out
@@ -0,0 +1,163 @@
+"""Tests for manifest-driven audit campaigns."""
+
+import asyncio
+import json
+
+import pytest
+
+from src import campaign as campaign_cli
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import pool as pool_module
+from src.orchestrator import campaign as campaign_module
+from src.orchestrator.campaign import (
+    DirectoryOutput,
+    JsonlOutput,
+    read_manifest,
+    run_campaign,
+)
+from src.orchestrator import runner as runner_module
+from src.orchestrator.graph import build_audit_graph
+from src.storage.result_store import AuditResultStore
+
+
+async def _offline_cockpit(self, audit_data):
+    return {"status": "skipped", "message": "offline"}
+
+
+@pytest.fixture
+def mock_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_latency_ms", 0)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_input_tokens_per_minute", 0)
+    monkeypatch.setattr(settings, "llm_output_tokens_per_minute", 0)
+    monkeypatch.setattr(settings, "llm_requests_per_minute", 0)
+    monkeypatch.setattr(pool_module, "_pool_instance", None)
+    monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", _offline_cockpit)
+    store = AuditResultStore(str(tmp_path / "audits.sqlite"))
+    yield {"graph": build_audit_graph(), "store": store}
+    store.close()
+
+
+def _write_manifest(path, rows):
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _rows(n):
+    return [
+        {"audit_id": f"C-{i}", "audit_type": "ia_readiness",
+         "client_context": {"name": f"Client {i}", "industry": "Retail"}}
+        for i in range(n)
+    ]
+
+
+# ─── Manifest ─────────────────────────────────────────────────────────────
+
+class TestManifest:
+    def test_jsonl_rows_and_invalid_rows(self, tmp_path):
+        path = tmp_path / "m.jsonl"
+        path.write_text(
+            json.dumps({"audit_type": "smart_factory", "client_context": {"name": "A"},
+                        "documents": ["a.pdf", "b.pdf"]}) + "\n\n"
+            + json.dumps({"audit_type": "unknown"}) + "\n"
+            + "{broken\n",
+            encoding="utf-8",
+        )
+        entries = list(read_manifest(str(path), campaign_id="CAMP"))
+        assert [e.audit_id for e in entries] == ["CAMP-0001", "CAMP-0003", "CAMP-0004"]
+        assert entries[0].documents == ["a.pdf", "b.pdf"] and entries[0].error is None
+        assert "unknown" in entries[1].error and entries[2].line == 4
+
+    def test_csv_columns_become_client_context(self, tmp_path):
+        path = tmp_path / "m.csv"
+        path.write_text(
+            "audit_id,audit_type,name,industry,documents\n"
+            "X-1,it_architecture,Acme,Manufacturing,a.pdf; b.xlsx\n",
+            encoding="utf-8",
+        )
+        [entry] = read_manifest(str(path))
+        assert entry.audit_id == "X-1"
+        assert entry.client_context == {"name": "Acme", "industry": "Manufacturing"}
+        assert entry.documents == ["a.pdf", "b.xlsx"]
+
+
+# ─── Runner ───────────────────────────────────────────────────────────────
+
+class TestRunCampaign:
+    def test_outputs_written_per_audit(self, mock_pipeline, tmp_path):
+        rows = _rows(3) + [{"audit_id": "BAD", "audit_type": "nope"}]
+        manifest = _write_manifest(tmp_path / "m.jsonl", rows)
+        output = JsonlOutput(str(tmp_path / "out.jsonl"))
+        report = asyncio.run(run_campaign(read_manifest(manifest), output, concurrency=2,
+                                          **mock_pipeline))
+        output.close()
+
+        lines = [json.loads(l) for l in (tmp_path / "out.jsonl").read_text().splitlines()]
+        assert {l["audit_id"] for l in lines} == {"C-0", "C-1", "C-2", "BAD"}
+        done = [l for l in lines if l["status"] == "completed"]
+        assert len(done) == 3
+        assert done[0]["deliverables"]["exec_summary_md"] and done[0]["final_state"]["findings"]
+        assert report.finished == 3 and report.count("failed") == 1
+        assert report.tokens > 0 and report.audits_per_hour > 0
+
+    def test_concurrency_bounded(self, mock_pipeline, tmp_path, monkeypatch):
+        running, peak = 0, 0
+        original = campaign_module.astream_audit
+
+        async def counting(*args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            try:
+                async for chunk in original(*args, **kwargs):
+                    yield chunk
+            finally:
+                running -= 1
+
+        monkeypatch.setattr(campaign_module, "astream_audit", counting)
+        manifest = _write_manifest(tmp_path / "m.jsonl", _rows(5))
+        report = asyncio.run(run_campaign(read_manifest(manifest), DirectoryOutput(str(tmp_path / "out")),
+                                          concurrency=2, **mock_pipeline))
+        assert report.finished == 5 and peak == 2
+        assert (tmp_path / "out" / "C-4" / "exec_summary.md").exists()
+
+    def test_token_budget_stops_new_audits(self, mock_pipeline, tmp_path):
+        manifest = _write_manifest(tmp_path / "m.jsonl", _rows(3))
+        report = asyncio.run(run_campaign(read_manifest(manifest), DirectoryOutput(str(tmp_path / "out")),
+                                          concurrency=1, token_budget=1, **mock_pipeline))
+        assert [o.status for o in report.outcomes] == ["completed", "skipped", "skipped"]
+        assert "budget" in report.outcomes[1].errors[0]
+
+
+    def test_updated_document_is_not_served_from_memo(self, mock_pipeline, tmp_path):
+        doc = tmp_path / "architecture.txt"
+        doc.write_text("v1", encoding="utf-8")
+
+        def run(audit_id):
+            row = {**_rows(1)[0], "audit_id": audit_id, "documents": [str(doc)]}
+            output = JsonlOutput(str(tmp_path / f"{audit_id}.jsonl"))
+            asyncio.run(run_campaign(read_manifest(_write_manifest(tmp_path / "m.jsonl", [row])),
+                                     output, **mock_pipeline))
+            output.close()
+            final_state = json.loads((tmp_path / f"{audit_id}.jsonl").read_text())["final_state"]
+            assert final_state["audit_id"] == audit_id
+            return final_state["execution_timeline"]
+
+        first = run("C-1")
+        assert run("C-2") == first               # same inputs: stored audit reused
+        doc.write_text("v2", encoding="utf-8")
+        assert run("C-3") != first               # same path, new content: audited again
+
+
+class TestCli:
+    def test_main_prints_summary(self, mock_pipeline, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(settings, "checkpoint_enabled", False)
+        monkeypatch.setattr(runner_module, "_result_store", mock_pipeline["store"])
+        manifest = _write_manifest(tmp_path / "m.jsonl", _rows(1) + [{"audit_type": "nope"}])
+        code = campaign_cli.main([manifest, "--output", str(tmp_path / "out.jsonl")])
+        out = capsys.readouterr().out
+        assert code == 1
+        assert "audits/heure" in out and "'nope' is not a valid AuditType" in out
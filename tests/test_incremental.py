@@ -0,0 +1,156 @@
+"""Tests for incremental re-audits driven by source document changes."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.base import BaseAgent
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.llm import pool as pool_module
+from src.orchestrator.campaign import ManifestEntry, initial_state
+from src.orchestrator.graph import build_audit_graph
+from src.orchestrator.incremental import affected_agents, diff_sources, incremental_state
+from src.orchestrator.runner import run_audit
+from src.storage.checkpoint import LocalCheckpointSaver
+from src.storage.result_store import AuditResultStore
+
+# Document each agent cites (by file name)
+CITATIONS = {
+    "data_scanner": "a.txt",
+    "process_mapper": "a.txt",
+    "benchmark": "b.txt",
+    "risk_compliance": "b.txt",
+    "ia_readiness": "a.txt",
+}
+
+
+class _FakeChatModel:
+    def with_structured_output(self, schema, include_raw=False):
+        return SimpleNamespace(invoke=lambda messages: {
+            "raw": None, "parsed": schema(scenarios=[]), "parsing_error": None,
+        })
+
+    def invoke(self, messages):
+        return SimpleNamespace(content="# Executive Summary", usage_metadata=None)
+
+    def stream(self, messages):
+        yield self.invoke(messages)
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """Offline graph whose agents cite one document each, with a call counter."""
+    docs = {name: tmp_path / name for name in ("a.txt", "b.txt")}
+    for name, path in docs.items():
+        path.write_text(f"{name} v1", encoding="utf-8")
+    doc_ids = {}
+    calls = []
+
+    def fake_invoke_llm(self, user_message, system_prompt=None, publisher=None):
+        calls.append(self.agent_id)
+        doc_id = doc_ids[CITATIONS[self.agent_id]]
+        return json.dumps({
+            "findings": [{
+                "id": f"{self.agent_id}-001", "category": "c", "severity": "HIGH",
+                "description": f"{self.agent_id} on {doc_id}",
+                "sources": [{"doc_id": doc_id, "snippet": "s"}],
+            }],
+            "maturity_scores": [{
+                "dimension": f"{self.agent_id}_dim", "score": 3, "justification": "j", "gaps": [],
+                "sources": [{"doc_id": doc_id, "snippet": "s"}],
+            }],
+        })
+
+    async def offline_cockpit(self, audit_data):
+        return {"status": "skipped", "message": "offline"}
+
+    monkeypatch.setattr(BaseAgent, "invoke_llm", fake_invoke_llm)
+    monkeypatch.setattr(pool_module, "_build_client", lambda *args: _FakeChatModel())
+    monkeypatch.setattr(pool_module, "_pool_instance", None)
+    monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", offline_cockpit)
+
+    saver = LocalCheckpointSaver.from_path(str(tmp_path / "checkpoints.sqlite"))
+    store = AuditResultStore(str(tmp_path / "audits.sqlite"))
+    graph = build_audit_graph(checkpointer=saver)
+
+    def run(audit_id, previous_audit_id=None):
+        entry = ManifestEntry(0, audit_id, "ia_readiness", {"name": "Acme"},
+                              [str(p) for p in docs.values()], previous_audit_id=previous_audit_id)
+        state = initial_state(entry, graph)
+        doc_ids.update({meta["name"]: doc_id for doc_id, meta in state["sources_index"].items()})
+        return run_audit(state, graph=graph, store=store)
+
+    yield SimpleNamespace(run=run, docs=docs, calls=calls)
+    store.close()
+    saver.conn.close()
+
+
+# ─── Source diff ──────────────────────────────────────────────────────────
+
+class TestSourceDiff:
+    def test_changed_added_removed(self):
+        previous = {"a_1": {"path": "/d/a", "hash": "1"}, "b_1": {"path": "/d/b", "hash": "1"},
+                    "c_1": {"path": "/d/c", "hash": "1"}}
+        current = {"a_1": {"path": "/d/a", "hash": "1"}, "b_2": {"path": "/d/b", "hash": "2"},
+                   "d_1": {"path": "/d/d", "hash": "1"}}
+        diff = diff_sources(previous, current)
+        assert diff.unchanged == ["a_1"] and diff.changed == {"b_1": "b_2"}
+        assert diff.added == ["d_1"] and diff.removed == ["c_1"]
+        assert diff.stale == {"b_1", "c_1"}
+
+    def test_only_citing_agents_rerun_for_a_changed_document(self):
+        previous = {
+            "audit_type": "ia_readiness",
+            "findings": [{"id": "F", "agent_id": "benchmark", "sources": [{"doc_id": "b_1"}]},
+                         {"id": "G", "agent_id": "process_mapper", "sources": [{"doc_id": "a_1"}]}],
+        }
+        diff = diff_sources({"a_1": {"path": "a", "hash": "1"}, "b_1": {"path": "b", "hash": "1"}},
+                            {"a_1": {"path": "a", "hash": "1"}, "b_2": {"path": "b", "hash": "2"}})
+        assert affected_agents(previous, diff) == ["data_scanner", "benchmark"]
+        assert affected_agents(previous, diff_sources({}, {"x": {"path": "x"}})) == [
+            "data_scanner", "process_mapper", "benchmark", "risk_compliance", "ia_readiness",
+        ]
+
+
+# ─── Incremental runs ─────────────────────────────────────────────────────
+
+class TestIncrementalRun:
+    def test_one_changed_document_reruns_citing_agents_only(self, pipeline):
+        first = pipeline.run("AUDIT-1")
+        assert sorted(pipeline.calls) == sorted(CITATIONS)
+        pipeline.calls.clear()
+
+        pipeline.docs["b.txt"].write_text("b.txt v2", encoding="utf-8")
+        second = pipeline.run("AUDIT-2", previous_audit_id="AUDIT-1")
+        assert sorted(pipeline.calls) == ["benchmark", "data_scanner", "risk_compliance"]
+
+        by_agent = {f["agent_id"]: f for f in second["findings"]}
+        assert len(second["findings"]) == len(first["findings"]) == 5
+        assert by_agent["process_mapper"] == {f["agent_id"]: f for f in first["findings"]}["process_mapper"]
+        new_b = next(d for d, m in second["sources_index"].items() if m["name"] == "b.txt")
+        assert by_agent["benchmark"]["sources"][0]["doc_id"] == new_b
+        assert second["maturity_scores"]["benchmark_dim"]["sources"][0]["doc_id"] == new_b
+        assert second["exec_summary"] == "# Executive Summary"
+        reuse = next(e for e in second["execution_timeline"] if e["agent_id"] == "incremental")
+        assert reuse["previous_audit_id"] == "AUDIT-1" and reuse["superseded"]["findings"] == 3
+
+    def test_unchanged_documents_rerun_no_agent(self, pipeline):
+        pipeline.run("AUDIT-1")
+        pipeline.calls.clear()
+        second = pipeline.run("AUDIT-2", previous_audit_id="AUDIT-1")
+        assert pipeline.calls == [] and len(second["findings"]) == 5
+
+    def test_unknown_previous_audit_runs_in_full(self, pipeline):
+        pipeline.run("AUDIT-2", previous_audit_id="AUDIT-MISSING")
+        assert len(pipeline.calls) == len(CITATIONS)
+
+    def test_superseded_outputs_dropped(self):
+        previous = {
+            "audit_id": "P", "audit_type": "ia_readiness",
+            "sources_index": {"a_1": {"path": "a", "hash": "1"}},
+            "findings": [{"id": "F", "agent_id": "ia_readiness", "sources": [{"doc_id": "a_1"}]}],
+            "risks": [], "recommendations": [], "maturity_scores": {},
+        }
+        state = incremental_state(previous, {"audit_id": "N", "sources_index": {}})
+        assert state["findings"] == [] and "ia_readiness" in state["rerun_agents"]
@@ -0,0 +1,153 @@
+"""Tests for the persistent LLM response cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.agents import base as base_module
+from src.agents.base import BaseAgent
+from src.config import settings
+from src.llm import cache as cache_module
+from src.llm.cache import LLMResponseCache, bypass_llm_cache, get_llm_cache
+
+
+class _CountingLLM:
+    """Stands in for the LangChain chat client and counts provider calls."""
+
+    model = "claude-test"
+    max_tokens = 4096
+
+    def __init__(self):
+        self.calls = 0
+        self.content = '{"findings": []}'
+
+    def _respond(self, messages):
+        self.calls += 1
+
+        class _Response:
+            content = self.content
+            usage_metadata = {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+
+        return _Response()
+
+    def invoke(self, messages):
+        return self._respond(messages)
+
+    async def ainvoke(self, messages):
+        return self._respond(messages)
+
+
+class _DummyAgent(BaseAgent):
+    def build_user_message(self, state):
+        return f"Analyse {state['name']}"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = LLMResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=1024, ttl_seconds=60)
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def cached_agent(tmp_path, monkeypatch):
+    llm = _CountingLLM()
+    monkeypatch.setattr(base_module, "get_chat_model", lambda: llm)
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(settings, "llm_cache_path", str(tmp_path / "agent_cache.sqlite"))
+    monkeypatch.setattr(cache_module, "_cache_instance", None)
+    yield _DummyAgent("dummy", "Dummy", "system"), llm
+    get_llm_cache().close()
+
+
+# ─── LLMResponseCache ─────────────────────────────────────────────────────
+
+class TestLLMResponseCache:
+    def test_key_depends_on_every_input(self):
+        base = LLMResponseCache.make_key("anthropic", "m", 0.2, 4096, "sys", "user")
+        assert base == LLMResponseCache.make_key("anthropic", "m", 0.2, 4096, "sys", "user")
+        assert base != LLMResponseCache.make_key("openai", "m", 0.2, 4096, "sys", "user")
+        assert base != LLMResponseCache.make_key("anthropic", "m", 0.3, 4096, "sys", "user")
+        assert base != LLMResponseCache.make_key("anthropic", "m", 0.2, 8192, "sys", "user")
+        assert base != LLMResponseCache.make_key("anthropic", "m", 0.2, 4096, "sys2", "user")
+
+    def test_hit_and_miss_counters(self, cache):
+        assert cache.get("k") is None
+        cache.put("k", "value")
+        assert cache.get("k") == "value"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_ttl_expiry(self, cache):
+        cache.ttl_seconds = 0.05
+        cache.put("k", "value")
+        time.sleep(0.1)
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_by_size(self, cache):
+        cache.put("old", "x" * 400)
+        cache.put("recent", "y" * 400)
+        cache.get("old")  # "old" becomes most recently used
+        cache.put("new", "z" * 400)
+        assert cache.get("recent") is None
+        assert cache.get("old") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_store_measured_once_per_check_bytes(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / "c.sqlite"), max_bytes=2000, ttl_seconds=60)
+        scans = []
+        evict = cache._evict
+        cache._evict = lambda: (scans.append(1), evict())
+        for i in range(20):
+            cache.put(f"k{i}", "x" * 10)                 # 200 bytes, check every 100
+        assert len(scans) == 2
+        cache.close()
+
+
+# ─── BaseAgent integration ────────────────────────────────────────────────
+
+class TestAgentCaching:
+    def test_rerun_served_from_cache(self, cached_agent):
+        agent, llm = cached_agent
+        first = agent.run({"name": "Acme"})
+        second = agent.run({"name": "Acme"})
+        assert llm.calls == 1
+        assert first.findings == second.findings
+        assert agent._last_token_usage == 0
+
+    def test_async_path_shares_cache(self, cached_agent):
+        agent, llm = cached_agent
+        agent.run({"name": "Acme"})
+        asyncio.run(agent.arun({"name": "Acme"}))
+        assert llm.calls == 1
+
+    def test_different_input_misses(self, cached_agent):
+        agent, llm = cached_agent
+        agent.run({"name": "Acme"})
+        agent.run({"name": "Globex"})
+        assert llm.calls == 2
+
+    def test_bypass_per_run(self, cached_agent):
+        agent, llm = cached_agent
+        agent.run({"name": "Acme"})
+        with bypass_llm_cache():
+            agent.run({"name": "Acme"})
+        assert llm.calls == 2
+
+    def test_broken_response_not_cached(self, cached_agent, monkeypatch):
+        agent, llm = cached_agent
+        monkeypatch.setattr(settings, "max_repair_attempts", 1)
+        llm.content = "pas du JSON"
+        agent.run({"name": "Acme"})
+        assert llm.calls == 2                            # call + repair reprompt
+        agent.run({"name": "Acme"})
+        assert llm.calls == 4                            # nothing replayed from the cache
+
+    def test_max_tokens_in_key(self, cached_agent):
+        agent, llm = cached_agent
+        agent.run({"name": "Acme"})
+        llm.max_tokens = 8192
+        agent.run({"name": "Acme"})
+        assert llm.calls == 2
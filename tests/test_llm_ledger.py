@@ -0,0 +1,168 @@
+"""Tests for the token / cost ledger and per-audit budgets."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import ledger as ledger_module
+from src.llm import pool as pool_module
+from src.llm.ledger import (
+    BudgetExceededError,
+    TokenLedger,
+    call_cost,
+    ledger_scope,
+    merge_usage,
+)
+from src.llm.pool import RateLimitedChatModel, RateLimiter
+from src.orchestrator.graph import build_audit_graph
+from src.orchestrator.state import build_initial_state
+
+
+class _Client:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return SimpleNamespace(
+            content="ok", usage_metadata={"input_tokens": 1000, "output_tokens": 500}
+        )
+
+
+# ─── Prices & reducer ─────────────────────────────────────────────────────
+
+class TestPricing:
+    def test_longest_prefix_wins(self):
+        assert call_cost("claude-sonnet-4-5-20250929", 1_000_000, 0) == pytest.approx(3.0)
+        assert call_cost("gpt-4o-mini-2024-07-18", 0, 1_000_000) == pytest.approx(0.6)
+        assert call_cost("gpt-4o-2024-08-06", 0, 1_000_000) == pytest.approx(10.0)
+
+    def test_override_and_unknown_model(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_prices", '{"in-house": {"input": 1, "output": 2}}')
+        assert call_cost("in-house-7b", 1_000_000, 1_000_000) == pytest.approx(3.0)
+        assert call_cost("unknown-model", 1_000_000, 1_000_000) == 0.0
+
+    def test_merge_usage_sums_nested_counters(self):
+        left = {"total": {"calls": 1, "cost_usd": 0.1}, "agents": {"a": {"calls": 1}}}
+        right = {"total": {"calls": 2, "cost_usd": 0.2}, "agents": {"b": {"calls": 1}}}
+        merged = merge_usage(left, right)
+        assert merged == {
+            "total": {"calls": 3, "cost_usd": pytest.approx(0.3)},
+            "agents": {"a": {"calls": 1}, "b": {"calls": 1}},
+        }
+        assert left["total"]["calls"] == 1
+
+
+# ─── TokenLedger ──────────────────────────────────────────────────────────
+
+class TestTokenLedger:
+    def test_record_attributes_usage(self):
+        ledger = TokenLedger("A", budget_usd=0)
+        ledger.record("claude-sonnet-4-5", 1000, 500, node="core_agent", agent="data_scanner")
+        ledger.record("claude-sonnet-4-5", 1000, 500, node="reporting", agent="report_generator")
+        assert ledger.usage["total"]["calls"] == 2
+        assert ledger.usage["nodes"]["core_agent"]["input_tokens"] == 1000
+        assert ledger.usage["agents"]["report_generator"]["cost_usd"] == pytest.approx(0.0105)
+        assert ledger.spent_tokens == 3000
+
+    def test_hard_budget_checked_before_the_call(self):
+        ledger = TokenLedger("A", budget_usd=0, budget_tokens=2000)
+        ledger.check("claude-sonnet-4-5", 1500)
+        ledger.record("claude-sonnet-4-5", 1500, 300, node="n", agent="a")
+        with pytest.raises(BudgetExceededError):
+            ledger.check("claude-sonnet-4-5", 500)
+
+    def test_degrade_policy_switches_model(self, monkeypatch):
+        monkeypatch.setattr(settings, "llm_provider", "anthropic")
+        ledger = TokenLedger("A", budget_tokens=1000, policy="degrade", soft_limit=0.5)
+        _, notice = ledger.record("claude-sonnet-4-5", 300, 100, node="n", agent="a")
+        assert notice is None and ledger.model_for("claude-sonnet-4-5") == "claude-sonnet-4-5"
+        _, notice = ledger.record("claude-sonnet-4-5", 100, 100, node="n", agent="a")
+        assert "claude-haiku" in notice
+        assert ledger.model_for("claude-sonnet-4-5").startswith("claude-haiku")
+
+    def test_seeded_from_state_usage(self):
+        usage = {"total": {"calls": 3, "input_tokens": 900, "output_tokens": 0, "cost_usd": 0.0}}
+        ledger = TokenLedger("A", budget_tokens=1000, policy="skip_plugins", soft_limit=0.8, usage=usage)
+        assert ledger.plugins_skipped
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            TokenLedger("A", policy="spend_anyway")
+
+
+class TestPoolCharging:
+    def test_calls_charged_to_current_scope(self):
+        client = _Client()
+        model = RateLimitedChatModel(client, RateLimiter(), model="claude-sonnet-4-5")
+        ledger = TokenLedger("A", budget_tokens=2000)
+        with ledger_scope(ledger, "core_agent", "data_scanner") as scope:
+            model.invoke("hello")
+            with pytest.raises(BudgetExceededError):
+                model.invoke("x" * 4000)
+        assert client.calls == 1
+        assert scope.usage["agents"]["data_scanner"]["output_tokens"] == 500
+        assert ledger.usage == scope.usage
+
+    def test_no_scope_no_charge(self):
+        model = RateLimitedChatModel(_Client(), RateLimiter(), model="claude-sonnet-4-5")
+        assert model.invoke("hello").content == "ok"
+
+
+# ─── Pipeline budgets ─────────────────────────────────────────────────────
+
+class TestPipelineBudget:
+    @pytest.fixture
+    def run_audit(self, monkeypatch):
+        async def offline_cockpit(self, audit_data):
+            return {"status": "skipped", "message": "offline"}
+
+        monkeypatch.setattr(settings, "llm_provider", "mock")
+        monkeypatch.setattr(settings, "mock_llm_latency_ms", 1)
+        monkeypatch.setattr(settings, "llm_cache_enabled", False)
+        monkeypatch.setattr(pool_module, "_pool_instance", None)
+        monkeypatch.setattr(ledger_module, "_ledgers", ledger_module.OrderedDict())
+        monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", offline_cockpit)
+
+        def run(**budget):
+            for key, value in budget.items():
+                monkeypatch.setattr(settings, key, value)
+            state = build_initial_state(
+                audit_id="AUDIT-BUDGET", audit_type="ia_readiness", client_context={"name": "Acme"},
+            )
+            return build_audit_graph().invoke(state)
+
+        return run
+
+    def test_token_usage_populated(self, run_audit):
+        usage = run_audit()["token_usage"]
+        assert usage["total"]["calls"] == 7
+        assert set(usage["agents"]) == {
+            "data_scanner", "process_mapper", "benchmark", "risk_compliance",
+            "ia_readiness", "roi_modeler", "report_generator",
+        }
+        assert sum(a["cost_usd"] for a in usage["agents"].values()) == pytest.approx(
+            usage["total"]["cost_usd"]
+        )
+        assert usage["nodes"]["core_agent"]["calls"] == 4
+
+    def test_abort_stops_the_audit(self, run_audit):
+        with pytest.raises(BudgetExceededError):
+            run_audit(audit_budget_tokens=4000, budget_policy="abort")
+
+    def test_skip_plugins(self, run_audit):
+        final = run_audit(audit_budget_tokens=100_000, budget_policy="skip_plugins",
+                          budget_soft_limit=0.01)
+        assert "ia_readiness" not in final["token_usage"]["agents"]
+        assert any(e.startswith("Budget: plugins skipped") for e in final["errors"])
+        assert final["exec_summary"]
+
+    def test_degrade_to_cheaper_model(self, run_audit):
+        final = run_audit(audit_budget_tokens=100_000, budget_policy="degrade",
+                          budget_soft_limit=0.01)
+        assert set(final["token_usage"]["models"]) == {
+            settings.llm_model, ledger_module.DEGRADE_MODELS["mock"],
+        }
+        assert any("remaining calls use" in e for e in final["errors"])
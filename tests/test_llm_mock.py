@@ -0,0 +1,99 @@
+"""Tests for the deterministic mock LLM backend."""
+
+import json
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.agents.core.data_scanner import DataScannerAgent
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import pool as pool_module
+from src.llm.mock import MockChatModel
+from src.orchestrator.graph import build_audit_graph
+from src.orchestrator.state import build_initial_state
+from src.schemas.models import ROIModel
+
+AGENT_MESSAGES = [
+    SystemMessage(content="Agent prompt\n\nIMPORTANT: Tu DOIS répondre UNIQUEMENT avec du JSON valide"),
+    HumanMessage(content="Client : Acme"),
+]
+
+
+def _model(**kwargs):
+    kwargs.setdefault("latency_ms", 0)
+    return MockChatModel(seed=7, findings=4, risks=2, recommendations=3, maturity_scores=2, **kwargs)
+
+
+# ─── MockChatModel ────────────────────────────────────────────────────────
+
+class TestMockChatModel:
+    def test_agent_payload_is_schema_valid_and_sized(self):
+        raw = _model().invoke(AGENT_MESSAGES).content
+        output = DataScannerAgent().parse_output(raw)
+        assert "parse_error" not in output.metadata
+        assert (len(output.findings), len(output.risks), len(output.recommendations),
+                len(output.maturity_scores)) == (4, 2, 3, 2)
+        assert all(f.sources for f in output.findings)
+
+    def test_seeded_and_deterministic(self):
+        first = _model().invoke(AGENT_MESSAGES)
+        assert first.content == _model().invoke(AGENT_MESSAGES).content
+        other_seed = MockChatModel(seed=8, latency_ms=0).invoke(AGENT_MESSAGES)
+        assert other_seed.content != first.content
+
+    def test_token_counts_reported(self):
+        usage = _model().invoke(AGENT_MESSAGES).usage_metadata
+        assert usage["input_tokens"] > 0
+        assert usage["output_tokens"] == len(_model().invoke(AGENT_MESSAGES).content) // 4 + 1
+        assert usage["total_tokens"] == usage["input_tokens"] + usage["output_tokens"]
+
+    def test_simulated_latency(self):
+        model = _model(latency_ms=50, latency_sigma=0.0)
+        started = time.perf_counter()
+        model.invoke(AGENT_MESSAGES)
+        assert 0.045 < time.perf_counter() - started < 0.5
+
+    def test_structured_roi_output(self):
+        result = _model().with_structured_output(ROIModel, include_raw=True).invoke(
+            [("system", "ROI"), ("human", "Findings")]
+        )
+        assert isinstance(result["parsed"], ROIModel)
+        assert len(result["parsed"].scenarios) == 3
+        assert result["raw"].usage_metadata["output_tokens"] > 0
+
+    def test_free_text_gets_markdown(self):
+        content = _model().invoke([("system", "Report"), ("human", "Data")]).content
+        assert content.startswith("# Executive Summary")
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(content)
+
+
+# ─── LLM_PROVIDER=mock end to end ─────────────────────────────────────────
+
+class TestMockProvider:
+    @pytest.fixture
+    def mock_provider(self, monkeypatch):
+        async def offline_cockpit(self, audit_data):
+            return {"status": "skipped", "message": "offline"}
+
+        monkeypatch.setattr(settings, "llm_provider", "mock")
+        monkeypatch.setattr(settings, "mock_llm_latency_ms", 5)
+        monkeypatch.setattr(settings, "mock_llm_findings", 10)
+        monkeypatch.setattr(settings, "llm_cache_enabled", False)
+        monkeypatch.setattr(pool_module, "_pool_instance", None)
+        monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", offline_cockpit)
+
+    def test_full_audit_offline(self, mock_provider):
+        state = build_initial_state(
+            audit_id="AUDIT-MOCK", audit_type="ia_readiness",
+            client_context={"name": "Acme", "industry": "Manufacturing"},
+        )
+        final = build_audit_graph().invoke(state)
+        assert final["errors"] == []
+        assert len(final["findings"]) == 5 * 10
+        assert len({f["id"] for f in final["findings"]}) == 5 * 10
+        assert len(final["roi_model"]["scenarios"]) == 3
+        assert final["exec_summary"].startswith("# Executive Summary")
+        assert all(t["tokens"] > 0 for t in final["execution_timeline"])
@@ -0,0 +1,142 @@
+"""Tests for the shared, rate-limited LLM client pool."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm import pool as pool_module
+from src.llm.pool import LLMClientPool, RateLimitedChatModel, RateLimiter, estimate_tokens
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+
+
+class _Client:
+    """Chat client stand-in tracking how many calls overlap."""
+
+    def __init__(self, latency=0.05, fail_first=None):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            if self.fail_first is not None and self.calls == 1:
+                self.active -= 1
+                raise self.fail_first
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+        return SimpleNamespace(
+            content="ok", usage_metadata={"input_tokens": 10, "output_tokens": 20, "total_tokens": 30}
+        )
+
+    def invoke(self, messages):
+        self._enter()
+        time.sleep(self.latency)
+        return self._exit()
+
+    async def ainvoke(self, messages):
+        self._enter()
+        await asyncio.sleep(self.latency)
+        return self._exit()
+
+
+# ─── RateLimiter ──────────────────────────────────────────────────────────
+
+class TestRateLimiter:
+    def test_requests_per_minute_bucket(self):
+        limiter = RateLimiter(requests_per_minute=600)  # 10 requests / s, burst 600
+        limiter._requests.level = 0
+        waited = limiter.acquire(1)
+        assert 0.05 < waited < 0.3
+
+    def test_output_tokens_charged_after_call(self):
+        limiter = RateLimiter(output_tokens_per_minute=60)
+        limiter.acquire(1)
+        limiter.release(1, {"input_tokens": 1, "output_tokens": 90})  # 30 tokens of debt
+        assert limiter._try_acquire(1) > 0
+
+    def test_rate_limit_halves_concurrency_and_pauses(self):
+        limiter = RateLimiter(max_concurrency=8)
+        limiter.acquire(1)
+        limiter.release(1, error=_RateLimitError(retry_after=0.2))
+        assert limiter.concurrency_limit == 4
+        assert limiter.stats()["rate_limited"] == 1
+        assert limiter.acquire(1) >= 0.15
+
+    def test_success_restores_concurrency(self):
+        limiter = RateLimiter(max_concurrency=4)
+        limiter.concurrency_limit = 1
+        for _ in range(5):
+            limiter.acquire(1)
+            limiter.release(1, {"input_tokens": 1, "output_tokens": 1})
+        assert limiter.concurrency_limit == 4
+
+
+# ─── Pooled clients ───────────────────────────────────────────────────────
+
+class TestRateLimitedChatModel:
+    def test_concurrency_cap_across_threads(self):
+        client = _Client()
+        model = RateLimitedChatModel(client, RateLimiter(max_concurrency=2))
+        threads = [threading.Thread(target=model.invoke, args=("hi",)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert client.calls == 6
+        assert client.peak == 2
+
+    def test_sync_and_async_share_limiter(self):
+        client = _Client()
+        model = RateLimitedChatModel(client, RateLimiter(max_concurrency=1))
+
+        async def mixed():
+            await asyncio.gather(
+                model.ainvoke("a"), model.ainvoke("b"), asyncio.to_thread(model.invoke, "c")
+            )
+
+        asyncio.run(mixed())
+        assert client.peak == 1
+
+    def test_429_is_reraised_and_recorded(self):
+        limiter = RateLimiter(max_concurrency=4)
+        model = RateLimitedChatModel(_Client(fail_first=_RateLimitError(0.01)), limiter)
+        with pytest.raises(_RateLimitError):
+            model.invoke("hi")
+        assert limiter.concurrency_limit == 2
+        assert model.invoke("hi").content == "ok"
+
+
+class TestLLMClientPool:
+    def test_clients_reused_per_settings(self, monkeypatch):
+        built = []
+        monkeypatch.setattr(pool_module, "_build_client", lambda *key: built.append(key) or _Client())
+        pool = LLMClientPool(RateLimiter())
+        assert pool.get() is pool.get()
+        assert pool.get(temperature=0.0) is not pool.get()
+        assert len(built) == 2
+        assert pool.get().limiter is pool.get(temperature=0.0).limiter
+
+    def test_mock_mode_without_key(self, monkeypatch):
+        monkeypatch.setattr(pool_module, "_build_client", lambda *key: None)
+        assert LLMClientPool(RateLimiter()).get() is None
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens([("system", "x" * 400), ("human", "y" * 400)]) == 201
@@ -0,0 +1,168 @@
+"""Tests for LLM retries with backoff and the JSON repair reprompt."""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents import base as base_module
+from src.agents.base import BaseAgent
+from src.config import settings
+from src.llm.retry import backoff_delay, call_with_retries, is_transient_error
+from src.orchestrator.graph import _run_with_timeout
+
+VALID = json.dumps({"findings": [{
+    "id": "F-1", "category": "c", "description": "d", "severity": "LOW",
+    "sources": [{"doc_id": "d1", "snippet": "s"}],
+}]})
+
+
+class APIConnectionError(Exception):
+    """Named like the Anthropic / OpenAI SDK network error."""
+
+
+class _BadRequestError(Exception):
+    status_code = 400
+
+
+class _ScriptedLLM:
+    """Replays a script of responses; exceptions in the script are raised."""
+
+    model = "claude-test"
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.messages = []
+
+    def _next(self, messages):
+        self.messages.append(messages)
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return SimpleNamespace(content=item, usage_metadata=None)
+
+    def invoke(self, messages):
+        return self._next(messages)
+
+    async def ainvoke(self, messages):
+        return self._next(messages)
+
+
+class _DummyAgent(BaseAgent):
+    def build_user_message(self, state):
+        return f"Contexte client complet : {state['name']}"
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "retry_backoff_seconds", 0.001)
+    monkeypatch.setattr(settings, "max_retries", 2)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+
+
+def _agent_with(monkeypatch, llm):
+    monkeypatch.setattr(base_module, "get_chat_model", lambda: llm)
+    return _DummyAgent("dummy", "Dummy", "system")
+
+
+# ─── Retry helpers ────────────────────────────────────────────────────────
+
+class TestCallWithRetries:
+    def test_transient_errors_retried(self):
+        outcomes = iter([TimeoutError("t"), APIConnectionError("c"), "ok"])
+
+        def call():
+            item = next(outcomes)
+            if isinstance(item, Exception):
+                raise item
+            return item
+
+        attempts = []
+        assert call_with_retries(call, label="t", attempts=attempts) == "ok"
+        assert [a["outcome"] for a in attempts] == ["TimeoutError", "APIConnectionError", "ok"]
+        assert all(a["latency_ms"] >= 0 for a in attempts)
+
+    def test_gives_up_after_max_retries(self):
+        attempts = []
+        with pytest.raises(TimeoutError):
+            call_with_retries(lambda: (_ for _ in ()).throw(TimeoutError()), label="t", attempts=attempts)
+        assert len(attempts) == settings.max_retries + 1
+
+    def test_client_errors_not_retried(self):
+        assert not is_transient_error(_BadRequestError())
+        assert is_transient_error(SimpleNamespace(status_code=529))
+
+    def test_backoff_is_capped_and_honours_retry_after(self, monkeypatch):
+        monkeypatch.setattr(settings, "retry_backoff_seconds", 1.0)
+        monkeypatch.setattr(settings, "retry_backoff_max_seconds", 4.0)
+        assert all(0 <= backoff_delay(10) <= 4.0 for _ in range(50))
+        error = SimpleNamespace(response=SimpleNamespace(headers={"retry-after": "7"}))
+        assert backoff_delay(0, error) == 7.0
+
+
+# ─── Agent integration ────────────────────────────────────────────────────
+
+class TestAgentRetries:
+    def test_transport_error_retried_and_timed(self, monkeypatch):
+        agent = _agent_with(monkeypatch, _ScriptedLLM(TimeoutError("read timeout"), VALID))
+        output = agent.run({"name": "Acme"})
+        assert len(output.findings) == 1
+        timeline = output.metadata["timeline"]
+        assert timeline["attempts"] == 2
+        assert timeline["attempt_outcomes"] == ["TimeoutError", "ok"]
+        assert len(timeline["attempt_latencies_ms"]) == 2
+
+    def test_exhausted_retries_raise(self, monkeypatch):
+        agent = _agent_with(monkeypatch, _ScriptedLLM(*[TimeoutError()] * 3))
+        with pytest.raises(TimeoutError):
+            agent.run({"name": "Acme"})
+        assert agent.build_timeline_entry(base_module.datetime.now())["attempts"] == 3
+
+
+class TestRepairReprompt:
+    def test_invalid_json_repaired(self, monkeypatch):
+        llm = _ScriptedLLM('{"findings": [', VALID)
+        agent = _agent_with(monkeypatch, llm)
+        output = agent.run({"name": "Acme"})
+        assert len(output.findings) == 1
+        assert "parse_error" not in output.metadata
+        assert output.metadata["timeline"]["repairs"] == 1
+
+        repair_prompt = llm.messages[1][1].content
+        assert '{"findings": [' in repair_prompt
+        assert "Acme" not in repair_prompt  # the audit context is not resent
+
+    def test_repair_budget_respected(self, monkeypatch):
+        monkeypatch.setattr(settings, "max_repair_attempts", 1)
+        agent = _agent_with(monkeypatch, _ScriptedLLM("not json", "still not json"))
+        output = agent.run({"name": "Acme"})
+        assert "parse_error" in output.metadata
+        assert output.metadata["timeline"]["repairs"] == 1
+
+    def test_async_repair(self, monkeypatch):
+        agent = _agent_with(monkeypatch, _ScriptedLLM('{"findings": [{"id": 1}]}', VALID))
+        output = asyncio.run(agent.arun({"name": "Acme"}))
+        assert len(output.findings) == 1
+        assert output.metadata["timeline"]["repairs"] == 1
+
+
+class TestTimeoutCancellation:
+    def test_timed_out_agent_makes_no_further_call(self, monkeypatch):
+        released = threading.Event()
+
+        class _SlowLLM(_ScriptedLLM):
+            def invoke(self, messages):
+                released.wait(5)
+                return self._next(messages)
+
+        llm = _SlowLLM("not json", VALID)
+        agent = _agent_with(monkeypatch, llm)
+        with pytest.raises(FutureTimeoutError):
+            _run_with_timeout(agent, {"name": "Acme"}, timeout=0.05)
+        released.set()                         # the call in flight completes...
+        time.sleep(0.2)
+        assert len(llm.messages) == 1          # ...but no repair reprompt follows
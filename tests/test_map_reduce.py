@@ -0,0 +1,180 @@
+"""Tests for the map-reduce analysis of large document sets."""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.base import BaseAgent
+from src.agents.core.data_scanner import DataScannerAgent
+from src.agents.map_reduce import DocumentPart, plan_lots, reduce_outputs
+from src.agents.streaming import ItemPublisher
+from src.config import settings
+from src.connectors.local_upload import ingest_local_files
+from src.orchestrator.graph import agent_output_to_update
+from src.schemas.models import AgentOutput
+
+_DOC_HEADER = re.compile(r"^### \[([^\]]+)\]", re.MULTILINE)
+
+
+def _source(doc_id):
+    return {"doc_id": doc_id, "snippet": f"extrait de {doc_id}"}
+
+
+def _output(findings=(), risks=(), recommendations=(), maturity_scores=(), **metadata):
+    return AgentOutput.model_validate(
+        {"findings": list(findings), "risks": list(risks), "recommendations": list(recommendations),
+         "maturity_scores": list(maturity_scores), "metadata": metadata},
+        context={"agent_id": "data_scanner", "agent_name": "Data Scanner"},
+    )
+
+
+def _finding(id, description, doc_id, severity="MEDIUM"):
+    return {"id": id, "category": "architecture", "description": description,
+            "severity": severity, "sources": [_source(doc_id)]}
+
+
+# ─── Lots ─────────────────────────────────────────────────────────────────
+
+class TestPlanLots:
+    def test_documents_packed_in_order_and_large_ones_split(self):
+        documents = [DocumentPart("a", "a.txt", "x" * 200), DocumentPart("b", "b.txt", "ligne\n" * 300),
+                     DocumentPart("c", "c.pdf", None), DocumentPart("d", "d.txt", "y" * 200)]
+        lots = plan_lots(documents, max_tokens=200)
+        assert all(sum(part.tokens for part in lot) <= 200 for lot in lots)
+        parts = [part for lot in lots for part in lot]
+        assert [p.doc_id for p in parts if p.doc_id != "b"] == ["a", "c", "d"]
+        b_parts = [p for p in parts if p.doc_id == "b"]
+        assert len(b_parts) > 1 and "".join(p.text for p in b_parts) == "ligne\n" * 300
+        assert all(p.text.endswith("\n") for p in b_parts)        # cut at line breaks
+        assert "(partie 1/" in b_parts[0].render()
+
+
+# ─── Reduce ───────────────────────────────────────────────────────────────
+
+class TestReduceOutputs:
+    def test_duplicates_merged_with_all_their_sources(self):
+        outputs = [
+            _output([_finding("DS-001", "ERP monolithique", "doc1"), _finding("DS-002", "Pas de MDM", "doc1")],
+                    maturity_scores=[{"dimension": "data", "score": 2, "justification": "j", "gaps": ["g1"],
+                                      "sources": [_source("doc1")]}]),
+            _output([_finding("DS-001", "ERP  Monolithique.", "doc2", severity="CRITICAL")],
+                    maturity_scores=[{"dimension": "data", "score": 4, "justification": "j", "gaps": ["g2"],
+                                      "sources": [_source("doc2"), _source("doc3")]}]),
+            _output([_finding("DS-001", "Flux FTP non chiffrés", "doc3")]),
+        ]
+        output = reduce_outputs(outputs, fan_in=2)
+        assert [f.id for f in output.findings] == ["DS-001", "DS-002", "DS-003"]
+        erp = output.findings[0]
+        assert erp.severity.value == "CRITICAL"
+        assert [s.doc_id for s in erp.sources] == ["doc1", "doc2"]
+        score = output.maturity_scores[0]
+        assert score.score == 3 and score.gaps == ["g1", "g2"] and len(score.sources) == 3
+        assert output.metadata["map_reduce"] == {
+            "lots": 3, "levels": 2, "merged": {"findings": 1, "maturity_scores": 1}, "failed_lots": [],
+        }
+
+    def test_dependencies_follow_merged_and_renumbered_ids(self):
+        def rec(id, title, deps=()):
+            return {"id": id, "title": title, "description": "d", "effort": "LOW", "impact": "HIGH",
+                    "timeframe": "QUICK_WIN", "dependencies": list(deps), "sources": []}
+
+        outputs = [
+            _output(recommendations=[rec("REC-1", "Cartographier les flux")]),
+            _output(recommendations=[rec("REC-1", "Déployer un MDM", ["REC-2"]),
+                                     rec("REC-2", "Cartographier les flux")]),
+        ]
+        output = reduce_outputs(outputs)
+        assert [(r.id, r.title, r.dependencies) for r in output.recommendations] == [
+            ("REC-1", "Cartographier les flux", []), ("REC-2", "Déployer un MDM", ["REC-1"]),
+        ]
+
+    def test_failed_lots_reported_others_kept(self):
+        outputs = [_output([_finding("DS-001", "ERP", "doc1")], systems_found=3),
+                   _output(map_error="timeout"), _output(systems_found=2)]
+        output = reduce_outputs(outputs)
+        assert len(output.findings) == 1 and output.metadata["systems_found"] == 5
+        assert agent_output_to_update(output)["errors"] == ["Data Scanner Lot 2 Error: timeout"]
+
+
+# ─── Data Scanner ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def scanner(monkeypatch, tmp_path):
+    """Data Scanner over 12 text documents, with an offline LLM citing every document it is shown."""
+    paths = []
+    for i in range(12):
+        path = tmp_path / f"doc{i:02d}.txt"
+        path.write_text(f"Serveur srv-{i} sous Windows 2008.\n" * 40, encoding="utf-8")
+        paths.append(str(path))
+    state = {"client_context": {"name": "Acme", "industry": "Industrie"},
+             "sources_index": ingest_local_files(paths)}
+    calls, publishers = [], []
+
+    def answer(user_message, publisher):
+        publishers.append(publisher)
+        doc_ids = _DOC_HEADER.findall(user_message)
+        calls.append(doc_ids)
+        return json.dumps({
+            "findings": [_finding("DS-001", "Windows Server 2008 hors support", doc_ids[0], "HIGH")] + [
+                _finding(f"DS-{n:03d}", f"Serveur de {doc_id}", doc_id)
+                for n, doc_id in enumerate(doc_ids, 2)
+            ],
+            "metadata": {"systems_found": len(doc_ids)},
+        })
+
+    def invoke_llm(self, user_message, system_prompt=None, publisher=None):
+        return answer(user_message, publisher)
+
+    async def ainvoke_llm(self, user_message, system_prompt=None, publisher=None):
+        return answer(user_message, publisher)
+
+    monkeypatch.setattr(BaseAgent, "invoke_llm", invoke_llm)
+    monkeypatch.setattr(BaseAgent, "ainvoke_llm", ainvoke_llm)
+    monkeypatch.setattr(settings, "token_budget_per_agent", 500)
+    return SimpleNamespace(state=state, calls=calls, publishers=publishers)
+
+
+class TestDataScannerMapReduce:
+    def test_small_document_set_is_one_call(self, scanner):
+        output = DataScannerAgent().run(scanner.state)
+        assert len(scanner.calls) == 1 and len(scanner.calls[0]) == 12
+        assert "map_reduce" not in output.metadata
+
+    @pytest.mark.parametrize("mode", ["sync", "async"])
+    def test_large_document_set_is_mapped_and_reduced(self, scanner, monkeypatch, mode):
+        monkeypatch.setattr(settings, "llm_context_window_tokens", 4000)
+        monkeypatch.setattr(settings, "map_reduce_lot_tokens", 1000)
+        agent = DataScannerAgent()
+        output = agent.run(scanner.state) if mode == "sync" else asyncio.run(agent.arun(scanner.state))
+
+        lots = scanner.calls
+        assert len(lots) > 1
+        assert sorted(d for lot in lots for d in lot) == sorted(scanner.state["sources_index"])
+        # One finding per document, plus the shared one citing the first document of every lot
+        assert len(output.findings) == 13
+        shared = output.findings[0]
+        assert shared.severity.value == "HIGH"
+        assert [s.doc_id for s in shared.sources] == [lot[0] for lot in lots]
+        cited = {s.doc_id for f in output.findings[1:] for s in f.sources}
+        assert cited == set(scanner.state["sources_index"])
+        assert len({f.id for f in output.findings}) == 13
+        assert output.metadata["systems_found"] == 12
+        assert output.metadata["map_reduce"]["lots"] == len(lots)
+        assert "timeline" in output.metadata
+
+    @pytest.mark.parametrize("mode", ["sync", "async"])
+    def test_only_the_reduced_items_are_published(self, scanner, monkeypatch, mode):
+        monkeypatch.setattr(settings, "llm_context_window_tokens", 4000)
+        monkeypatch.setattr(settings, "map_reduce_lot_tokens", 1000)
+        events = []
+        monkeypatch.setattr(BaseAgent, "_item_publisher",
+                            lambda self: ItemPublisher(self.agent_id, self.agent_name, events.append))
+        agent = DataScannerAgent()
+        output = agent.run(scanner.state) if mode == "sync" else asyncio.run(agent.arun(scanner.state))
+
+        assert len(scanner.publishers) > 1 and not any(scanner.publishers)
+        assert [e["type"] for e in events] == ["agent_item"] * len(output.findings)
+        assert [e["item"]["id"] for e in events] == [f.id for f in output.findings]
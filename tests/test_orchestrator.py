@@ -0,0 +1,452 @@
+"""Tests for the LangGraph pipeline — agent fan-out and state merging."""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from langgraph.errors import InvalidUpdateError
+from langgraph.types import Overwrite
+
+from src.agents.base import BaseAgent
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import pool as pool_module
+from src.orchestrator import graph as graph_module
+from src.orchestrator.graph import (
+    build_audit_graph,
+    dispatch_core_agents,
+    dispatch_plugin_agents,
+)
+from src.orchestrator import runner as runner_module
+from src.orchestrator.overrides import validate_overrides
+from src.orchestrator.router import CORE_AGENT_IDS
+from src.orchestrator.runner import (
+    aresume_audit,
+    astream_audit,
+    pending_validation,
+    resume_audit,
+    resume_validation,
+    run_audit,
+    stream_audit,
+)
+from src.orchestrator.state import AppendLog, build_initial_state
+from src.schemas.enums import AuditType
+from src.storage.checkpoint import LocalCheckpointSaver
+from src.storage.result_store import AuditResultStore
+
+LLM_LATENCY = 0.3
+
+
+def _fake_response(agent_id):
+    return json.dumps({
+        "findings": [{
+            "id": f"{agent_id}-001", "category": "arch",
+            "description": f"Finding from {agent_id}", "severity": "HIGH",
+            "sources": [{"doc_id": "d1", "snippet": "s"}],
+        }],
+        "maturity_scores": [{
+            "dimension": f"{agent_id}_dim", "score": 3,
+            "justification": "j", "gaps": [],
+        }],
+    })
+
+
+def _fake_invoke_llm(self, user_message, system_prompt=None, publisher=None):
+    time.sleep(LLM_LATENCY)
+    return _fake_response(self.agent_id)
+
+
+async def _fake_ainvoke_llm(self, user_message, system_prompt=None, publisher=None):
+    await asyncio.sleep(LLM_LATENCY)
+    return _fake_response(self.agent_id)
+
+
+async def _fake_generate_cockpit(self, audit_data):
+    return {"status": "skipped", "message": "offline"}
+
+
+class _FakeChatModel:
+    """Offline stand-in for the pooled chat client (ROI + report nodes)."""
+
+    def __init__(self, schema=None):
+        self.schema = schema
+
+    def with_structured_output(self, schema, include_raw=False):
+        return _FakeChatModel(schema)
+
+    def invoke(self, messages):
+        if self.schema is not None:
+            return {"raw": None, "parsed": self.schema(scenarios=[]), "parsing_error": None}
+        return SimpleNamespace(content="# Executive Summary", usage_metadata=None)
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+    def stream(self, messages):
+        yield self.invoke(messages)
+
+    async def astream(self, messages):
+        yield self.invoke(messages)
+
+
+@pytest.fixture
+def offline_graph(monkeypatch):
+    monkeypatch.setattr(BaseAgent, "invoke_llm", _fake_invoke_llm)
+    monkeypatch.setattr(BaseAgent, "ainvoke_llm", _fake_ainvoke_llm)
+    monkeypatch.setattr(pool_module, "_build_client", lambda *args: _FakeChatModel())
+    monkeypatch.setattr(pool_module, "_pool_instance", None)
+    monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", _fake_generate_cockpit)
+    return build_audit_graph()
+
+
+@pytest.fixture
+def result_store(tmp_path):
+    store = AuditResultStore(str(tmp_path / "audits.sqlite"))
+    yield store
+    store.close()
+
+
+def _initial_state(audit_type=AuditType.IA_READINESS, input_hash=""):
+    return build_initial_state(
+        audit_id="AUDIT-TEST",
+        audit_type=audit_type.value,
+        client_context={"name": "Acme", "industry": "Manufacturing", "docs_provided": ["a.pdf"]},
+        input_hash=input_hash,
+    )
+
+
+# ─── Core fan-out ─────────────────────────────────────────────────────────
+
+class TestCoreFanOut:
+    def test_dispatch_one_send_per_core_agent(self):
+        sends = dispatch_core_agents(_initial_state())
+        assert [s.arg["agent_id"] for s in sends] == CORE_AGENT_IDS
+        assert all(s.node == "core_agent" for s in sends)
+
+    def test_outputs_merged_through_reducers(self, offline_graph):
+        final = offline_graph.invoke(_initial_state())
+        agent_ids = CORE_AGENT_IDS + ["ia_readiness"]
+        assert sorted(f["agent_id"] for f in final["findings"]) == sorted(agent_ids)
+        assert set(final["maturity_scores"]) == {f"{a}_dim" for a in agent_ids}
+        assert len(final["execution_timeline"]) == len(agent_ids)
+
+    def test_core_agents_run_concurrently(self, offline_graph):
+        started = time.perf_counter()
+        offline_graph.invoke(_initial_state())
+        elapsed = time.perf_counter() - started
+        # Core stage + plugin stage; sequential would take 5 × LLM_LATENCY
+        assert elapsed < 3 * LLM_LATENCY
+
+
+# ─── State channels ───────────────────────────────────────────────────────
+
+class TestAppendLog:
+    def test_step_writes_appended_in_order_without_mutation(self):
+        log = AppendLog()
+        log.update([[1, 2]])
+        before = log.get()
+        assert log.update([[3], [], [4, 5]])
+        assert log.get() == [1, 2, 3, 4, 5]
+        assert before == [1, 2] and log.copy().get() is log.get()
+        before_empty_step = log.get()
+        assert not log.update([])
+        assert not log.update([[], []]) and log.get() is before_empty_step
+
+    def test_overwrite_replaces_the_list(self):
+        log = AppendLog().from_checkpoint([1, 2])
+        log.update([[3], Overwrite([9])])
+        assert log.get() == [9]
+        with pytest.raises(InvalidUpdateError):
+            log.update([Overwrite([]), Overwrite([1])])
+
+    def test_chunks_shared_between_checkpoints(self):
+        log = AppendLog()
+        for step in range(1000):
+            log.update([[step]])
+        assert log.get() == list(range(1000)) and len(log.chunks) <= 10
+        before = log.checkpoint()
+        log.update([[1000]])
+        after = log.checkpoint()
+        assert after["chunks"][0] is before["chunks"][0]
+        assert AppendLog().from_checkpoint(after).get() == list(range(1001))
+        assert AppendLog().from_checkpoint(before).get() == list(range(1000))
+
+    def test_plain_list_checkpoint_still_loads(self):
+        log = AppendLog().from_checkpoint([1, 2])
+        log.update([[3]])
+        assert log.get() == [1, 2, 3]
+        assert AppendLog().from_checkpoint(log.checkpoint()).get() == [1, 2, 3]
+
+    def test_nodes_return_only_their_delta(self, offline_graph):
+        updates = [
+            (node, update)
+            for chunk in offline_graph.stream(_initial_state(), stream_mode="updates")
+            for node, update in chunk.items()
+        ]
+        for node, update in updates:
+            assert len((update or {}).get("findings", [])) <= 1, node
+            assert "audit_id" not in (update or {}), node
+        assert [node for node, _ in updates].count("core_agent") == len(CORE_AGENT_IDS)
+
+
+# ─── Plugin fan-out ───────────────────────────────────────────────────────
+
+class TestPluginFanOut:
+    def test_dispatch_deduplicates_plugin_classes(self):
+        sends = dispatch_plugin_agents(_initial_state(AuditType.IA_READINESS))
+        assert [s.arg["agent_id"] for s in sends] == ["ia_readiness"]
+
+    def test_dispatch_multiple_plugins(self):
+        sends = dispatch_plugin_agents(_initial_state(AuditType.STRATEGIC_DATA_IA))
+        assert [s.arg["agent_id"] for s in sends] == ["ia_readiness", "iot_readiness_evaluator"]
+
+    def test_plugin_updates_streamed_individually(self, offline_graph):
+        updates = [
+            chunk["plugin_agent"]
+            for chunk in offline_graph.stream(_initial_state(AuditType.STRATEGIC_DATA_IA))
+            if "plugin_agent" in chunk
+        ]
+        assert sorted(u["findings"][0]["agent_id"] for u in updates) == ["ia_readiness", "smart_factory"]
+
+    def test_plugin_timeout_recorded_as_error(self, offline_graph, monkeypatch):
+        monkeypatch.setattr(settings, "plugin_timeout_seconds", LLM_LATENCY / 3)
+        final = offline_graph.invoke(_initial_state())
+        assert any("Timeout" in e for e in final["errors"])
+        statuses = {t["agent_id"]: t["status"] for t in final["execution_timeline"]}
+        assert statuses["ia_readiness"] == "timeout"
+        assert statuses["data_scanner"] == "success"
+
+
+# ─── Async pipeline ───────────────────────────────────────────────────────
+
+class TestAsyncPipeline:
+    def test_ainvoke_matches_sync_result(self, offline_graph):
+        sync_final = offline_graph.invoke(_initial_state())
+        async_final = asyncio.run(offline_graph.ainvoke(_initial_state()))
+        assert len(async_final["findings"]) == len(sync_final["findings"])
+        assert async_final["stitch_ui_result"] == {"status": "skipped", "message": "offline"}
+
+    def test_many_audits_share_one_event_loop(self, offline_graph):
+        async def run_batch():
+            return await asyncio.gather(*(offline_graph.ainvoke(_initial_state()) for _ in range(3)))
+
+        started = time.perf_counter()
+        finals = asyncio.run(run_batch())
+        elapsed = time.perf_counter() - started
+        assert all(len(f["findings"]) == 5 for f in finals)
+        # Three audits overlap instead of queueing behind each other
+        assert elapsed < 3 * LLM_LATENCY
+
+    def test_sync_stitch_node_inside_running_loop(self, offline_graph):
+        async def run_sync_from_loop():
+            return offline_graph.invoke(_initial_state())
+
+        final = asyncio.run(run_sync_from_loop())
+        assert final["stitch_ui_result"]["status"] == "skipped"
+
+
+# ─── Whole-audit memoization ──────────────────────────────────────────────
+
+class TestAuditMemoization:
+    def _stream(self, graph, store, **kwargs):
+        state = _initial_state(input_hash="hash-1")
+        return list(stream_audit(state, graph=graph, store=store, **kwargs))
+
+    def test_identical_resubmission_runs_no_node(self, offline_graph, result_store):
+        first = self._stream(offline_graph, result_store)
+        second = self._stream(offline_graph, result_store)
+        assert len(first) > 1
+        assert [mode for mode, _ in second] == ["values"]
+        assert second[0][1]["exec_summary"] == first[-1][1]["exec_summary"]
+        assert len(second[0][1]["findings"]) == len(first[-1][1]["findings"])
+
+    def test_force_rerun(self, offline_graph, result_store):
+        self._stream(offline_graph, result_store)
+        rerun = self._stream(offline_graph, result_store, reuse_completed=False)
+        assert len(rerun) > 1
+
+    def test_pipeline_version_change_invalidates(self, offline_graph, result_store, monkeypatch):
+        self._stream(offline_graph, result_store)
+        monkeypatch.setattr(runner_module, "PIPELINE_VERSION", "other-version")
+        assert len(self._stream(offline_graph, result_store)) > 1
+
+    @pytest.mark.parametrize("name, value", [
+        ("human_validation", "required"), ("token_budget_per_agent", 2000), ("map_reduce_lot_tokens", 1000),
+    ])
+    def test_result_shaping_settings_invalidate(self, offline_graph, result_store, monkeypatch, name, value):
+        self._stream(offline_graph, result_store)
+        monkeypatch.setattr(settings, name, value)
+        assert result_store.find_completed("hash-1", "ia_readiness", runner_module.get_pipeline_version()) is None
+
+    def test_memo_hit_carries_the_new_audit_id(self, offline_graph, result_store):
+        self._stream(offline_graph, result_store)
+        state = {**_initial_state(input_hash="hash-1"), "audit_id": "AUDIT-AGAIN"}
+        chunks = list(stream_audit(state, graph=offline_graph, store=result_store))
+        assert [mode for mode, _ in chunks] == ["values"] and chunks[0][1]["audit_id"] == "AUDIT-AGAIN"
+
+    def test_failed_audit_not_memoized(self, offline_graph, result_store, monkeypatch):
+        monkeypatch.setattr(settings, "plugin_timeout_seconds", LLM_LATENCY / 3)
+        self._stream(offline_graph, result_store)
+        assert result_store.find_completed("hash-1", "ia_readiness", runner_module.get_pipeline_version()) is None
+
+    def test_async_entry_point_uses_memo(self, offline_graph, result_store):
+        self._stream(offline_graph, result_store)
+
+        async def collect():
+            state = _initial_state(input_hash="hash-1")
+            return [c async for c in astream_audit(state, graph=offline_graph, store=result_store)]
+
+        assert [mode for mode, _ in asyncio.run(collect())] == ["values"]
+
+
+# ─── Checkpointing & resume ───────────────────────────────────────────────
+
+class _Crash(RuntimeError):
+    pass
+
+
+@pytest.fixture
+def crashing_graph(offline_graph, monkeypatch, tmp_path):
+    """Checkpointed graph whose report node fails on its first call only,
+    with a counter of agent LLM calls."""
+    calls = {"llm": 0, "report": 0}
+
+    def counting_invoke_llm(self, user_message, system_prompt=None, publisher=None):
+        calls["llm"] += 1
+        return _fake_response(self.agent_id)
+
+    async def counting_ainvoke_llm(self, user_message, system_prompt=None, publisher=None):
+        return counting_invoke_llm(self, user_message, system_prompt)
+
+    original, aoriginal = graph_module.node_report_generator, graph_module.anode_report_generator
+
+    def flaky_report(state):
+        calls["report"] += 1
+        if calls["report"] == 1:
+            raise _Crash("process killed")
+        return original(state)
+
+    async def aflaky_report(state):
+        calls["report"] += 1
+        if calls["report"] == 1:
+            raise _Crash("process killed")
+        return await aoriginal(state)
+
+    monkeypatch.setattr(BaseAgent, "invoke_llm", counting_invoke_llm)
+    monkeypatch.setattr(BaseAgent, "ainvoke_llm", counting_ainvoke_llm)
+    monkeypatch.setattr(graph_module, "node_report_generator", flaky_report)
+    monkeypatch.setattr(graph_module, "anode_report_generator", aflaky_report)
+
+    saver = LocalCheckpointSaver.from_path(str(tmp_path / "checkpoints.sqlite"))
+    yield build_audit_graph(checkpointer=saver), calls
+    saver.conn.close()
+
+
+class TestCheckpointResume:
+    def test_resume_skips_completed_nodes(self, crashing_graph, result_store):
+        graph, calls = crashing_graph
+        with pytest.raises(_Crash):
+            run_audit(_initial_state(), graph=graph, store=result_store)
+        assert calls["llm"] == 5
+        assert graph.get_state({"configurable": {"thread_id": "AUDIT-TEST"}}).next == ("reporting",)
+
+        final = resume_audit("AUDIT-TEST", graph=graph, store=result_store)
+        assert calls["llm"] == 5  # no agent re-ran
+        assert final["exec_summary"] == "# Executive Summary"
+        assert len(final["findings"]) == 5
+
+    def test_async_resume(self, crashing_graph, result_store):
+        graph, calls = crashing_graph
+        with pytest.raises(_Crash):
+            run_audit(_initial_state(), graph=graph, store=result_store)
+        final = asyncio.run(aresume_audit("AUDIT-TEST", graph=graph, store=result_store))
+        assert calls["llm"] == 5
+        assert final["stitch_ui_result"]["status"] == "skipped"
+
+    def test_resume_completed_audit_is_noop(self, crashing_graph, result_store):
+        graph, calls = crashing_graph
+        calls["report"] = 1  # no crash
+        run_audit(_initial_state(), graph=graph, store=result_store)
+        final = resume_audit("AUDIT-TEST", graph=graph, store=result_store)
+        assert calls["llm"] == 5
+        assert final["exec_summary"] == "# Executive Summary"
+
+    def test_fresh_run_discards_old_checkpoint(self, crashing_graph, result_store):
+        graph, calls = crashing_graph
+        with pytest.raises(_Crash):
+            run_audit(_initial_state(), graph=graph, store=result_store)
+        final = run_audit(_initial_state(), graph=graph, store=result_store)
+        assert calls["llm"] == 10
+        assert len(final["findings"]) == 5
+
+    def test_unknown_audit_raises(self, crashing_graph, result_store):
+        graph, _ = crashing_graph
+        with pytest.raises(KeyError):
+            resume_audit("AUDIT-MISSING", graph=graph, store=result_store)
+
+
+# ─── Human validation ─────────────────────────────────────────────────────
+
+@pytest.fixture
+def validation_graph(offline_graph, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "human_validation", "required")
+    saver = LocalCheckpointSaver.from_path(str(tmp_path / "checkpoints.sqlite"))
+    yield build_audit_graph(checkpointer=saver)
+    saver.conn.close()
+
+
+class TestHumanValidation:
+    def test_audit_pauses_before_roi_and_is_not_memoized(self, validation_graph, result_store):
+        paused = run_audit(_initial_state(input_hash="h"), graph=validation_graph, store=result_store)
+        assert paused["exec_summary"] is None and paused["roi_model"] is None
+        request = pending_validation("AUDIT-TEST", graph=validation_graph)
+        assert request["type"] == "human_validation" and request["findings"] == 5
+        assert result_store.find_completed("h", "ia_readiness", runner_module.get_pipeline_version()) is None
+
+    def test_decision_applies_overrides_and_finishes(self, validation_graph, result_store):
+        run_audit(_initial_state(), graph=validation_graph, store=result_store)
+        first, second = CORE_AGENT_IDS[0], CORE_AGENT_IDS[1]
+        decision = {
+            "validated_by": "consultant@iag",
+            "overrides": {
+                "findings": {f"{first}-001": {"severity": "LOW"}, f"{second}-001": None},
+                "maturity_scores": {f"{first}_dim": None},
+            },
+        }
+        final = resume_validation("AUDIT-TEST", decision, graph=validation_graph, store=result_store)
+        assert final["human_validated"] and final["exec_summary"] == "# Executive Summary"
+        findings = {f["id"]: f for f in final["findings"]}
+        assert len(findings) == 4 and findings[f"{first}-001"]["severity"] == "LOW"
+        assert f"{first}_dim" not in final["maturity_scores"] and len(final["maturity_scores"]) == 4
+        assert final["human_overrides"]["findings"][f"{second}-001"] is None
+        assert any(e.get("validated_by") == "consultant@iag" for e in final["execution_timeline"])
+        assert pending_validation("AUDIT-TEST", graph=validation_graph) is None
+
+    def test_resume_without_decision_stays_paused(self, validation_graph, result_store):
+        run_audit(_initial_state(), graph=validation_graph, store=result_store)
+        resume_audit("AUDIT-TEST", graph=validation_graph, store=result_store)
+        assert pending_validation("AUDIT-TEST", graph=validation_graph) is not None
+
+    def test_auto_mode_validates_submitted_overrides(self, offline_graph, result_store, monkeypatch):
+        monkeypatch.setattr(settings, "human_validation", "auto")
+        first = CORE_AGENT_IDS[0]
+        state = {**_initial_state(), "human_overrides": {"findings": {f"{first}-001": {"severity": "LOW"}}}}
+        final = run_audit(state, graph=offline_graph, store=result_store, reuse_completed=False)
+        assert {f["id"]: f for f in final["findings"]}[f"{first}-001"]["severity"] == "LOW"
+
+        state["human_overrides"] = {"findings": {f"{first}-001": {"id": "F-X", "severity": "HUGE"}}}
+        final = run_audit(state, graph=offline_graph, store=result_store, reuse_completed=False)
+        assert all(f["id"] != "F-X" for f in final["findings"])
+        assert any(e.startswith("Human Validation Error: findings.") for e in final["errors"])
+
+    @pytest.mark.parametrize("overrides, message", [
+        ({"quick_wins": {}}, "Unknown override field"),
+        ({"findings": {"F-1": {"severity": "HUGE"}}}, "findings.F-1.severity"),
+        ({"findings": {"F-1": {"id": "F-2"}}}, "cannot be overridden"),
+        ({"risks": ["R-1"]}, "expected an object"),
+    ])
+    def test_invalid_overrides_rejected(self, overrides, message):
+        with pytest.raises(ValueError, match=message):
+            validate_overrides(overrides)
@@ -0,0 +1,103 @@
+"""Tests for provider prompt caching (breakpoints, usage, ledger pricing)."""
+
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.config import settings
+from src.llm import mock as mock_module
+from src.llm.ledger import TokenLedger, call_cost, ledger_scope
+from src.llm.mock import MockChatModel
+from src.llm.pool import RateLimitedChatModel, RateLimiter
+from src.llm.prompt_cache import CACHE_CONTROL, cache_token_counts, with_cache_breakpoint
+
+LONG_SYSTEM = "Tu es un auditeur. " * 400      # ~1900 tokens
+
+
+@pytest.fixture(autouse=True)
+def fresh_mock_cache(monkeypatch):
+    monkeypatch.setattr(mock_module, "_cached_prefixes", set())
+
+
+class _CapturingClient:
+    def __init__(self):
+        self.messages = None
+
+    def invoke(self, messages):
+        self.messages = messages
+        return SimpleNamespace(
+            content="ok",
+            usage_metadata={
+                "input_tokens": 2000,
+                "output_tokens": 100,
+                "input_token_details": {"cache_read": 1800, "cache_creation": 0},
+            },
+        )
+
+
+# ─── Breakpoints ──────────────────────────────────────────────────────────
+
+class TestBreakpoint:
+    def test_anthropic_system_message_marked(self):
+        messages = [SystemMessage(content="static"), HumanMessage(content="audit tail")]
+        marked = with_cache_breakpoint(messages, "anthropic")
+        assert marked[0].content == [{"type": "text", "text": "static", "cache_control": CACHE_CONTROL}]
+        assert marked[1] is messages[1]
+        assert messages[0].content == "static"
+
+    def test_tuple_messages_marked(self):
+        marked = with_cache_breakpoint([("system", "static"), ("human", "tail")], "anthropic")
+        assert isinstance(marked[0], SystemMessage)
+        assert marked[0].content[0]["cache_control"] == CACHE_CONTROL
+
+    def test_openai_and_disabled_untouched(self, monkeypatch):
+        messages = [("system", "static"), ("human", "tail")]
+        assert with_cache_breakpoint(messages, "openai") is messages
+        monkeypatch.setattr(settings, "prompt_caching_enabled", False)
+        assert with_cache_breakpoint(messages, "anthropic") is messages
+
+    def test_pool_sends_breakpoint_and_charges_cache_reads(self):
+        client = _CapturingClient()
+        model = RateLimitedChatModel(client, RateLimiter(), model="claude-sonnet-4-5",
+                                     provider="anthropic")
+        ledger = TokenLedger("A", budget_usd=0)
+        with ledger_scope(ledger, "core_agent", "data_scanner"):
+            model.invoke([("system", LONG_SYSTEM), ("human", "tail")])
+        assert client.messages[0].content[0]["cache_control"] == CACHE_CONTROL
+        total = ledger.usage["total"]
+        assert total["cache_read_tokens"] == 1800
+        assert total["cost_usd"] == pytest.approx(call_cost("claude-sonnet-4-5", 2000, 100, 1800))
+
+
+# ─── Usage & pricing ──────────────────────────────────────────────────────
+
+class TestCachePricing:
+    def test_cache_token_counts(self):
+        usage = {"input_tokens": 10, "input_token_details": {"cache_read": 7, "cache_creation": 2}}
+        assert cache_token_counts(usage) == (7, 2)
+        assert cache_token_counts({"input_tokens": 10}) == (0, 0)
+
+    def test_reads_discounted_writes_surcharged(self):
+        plain = call_cost("claude-sonnet-4-5", 1_000_000)
+        assert call_cost("claude-sonnet-4-5", 1_000_000, cache_read_tokens=1_000_000) == pytest.approx(plain / 10)
+        assert call_cost("claude-sonnet-4-5", 1_000_000, cache_write_tokens=1_000_000) == pytest.approx(plain * 1.25)
+        # No cache_read price: cached tokens cost the plain input price
+        assert call_cost("gpt-4o-mini", 1_000_000, cache_read_tokens=1_000_000) == pytest.approx(0.075)
+
+
+class TestMockPromptCache:
+    def _usage(self, system):
+        messages = with_cache_breakpoint([("system", system), ("human", "Analyse")], "mock")
+        return MockChatModel(latency_ms=0).invoke(messages).usage_metadata
+
+    def test_write_then_read(self):
+        first, second = self._usage(LONG_SYSTEM), self._usage(LONG_SYSTEM)
+        assert first["input_token_details"]["cache_creation"] > 1024
+        assert second["input_token_details"] == {
+            "cache_read": first["input_token_details"]["cache_creation"], "cache_creation": 0,
+        }
+        assert first["input_tokens"] == second["input_tokens"]
+
+    def test_short_prefix_not_cached(self):
+        assert "input_token_details" not in self._usage("Court.")
@@ -0,0 +1,99 @@
+"""Tests for the compact prompt-context builder."""
+
+import json
+
+from benchmarks.run_benchmarks import synthetic_state
+from src.agents.context import build_context, project_item
+from src.agents.core.prioritization import PrioritizationAgent
+from src.agents.core.report_generator import ReportGeneratorAgent
+from src.agents.core.roi_modeler import ROIModelerAgent
+from src.llm.pool import estimate_tokens
+from src.orchestrator.graph import _report_messages
+
+
+def _finding(i, severity, description="Constat"):
+    return {
+        "id": f"F{i}",
+        "agent_id": "data_scanner",
+        "category": "data",
+        "description": description,
+        "severity": severity,
+        "sources": [{"doc_id": "archi.pdf", "page": 3, "snippet": "long extrait " * 20}],
+        "tags": [],
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+def _lines(context, title):
+    """JSON items listed under the section whose header starts with `title`."""
+    block = next(b for b in context.split("\n\n") if b.startswith(f"### {title}"))
+    return [json.loads(line) for line in block.splitlines()[1:]]
+
+
+# ─── Projection & serialization ───────────────────────────────────────────
+
+class TestProjection:
+    def test_drops_empty_and_internal_fields(self):
+        item = project_item("findings", _finding(1, "HIGH"))
+        assert item == {
+            "id": "F1", "severity": "HIGH", "category": "data",
+            "description": "Constat", "sources": ["archi.pdf p.3"],
+        }
+
+    def test_long_text_clipped(self):
+        item = project_item("findings", _finding(1, "LOW", description="x" * 5000))
+        assert len(item["description"]) == 400
+
+    def test_minified_json_lines(self):
+        context = build_context({"findings": [_finding(1, "LOW")]}, "prioritization")
+        assert context.startswith("### Findings consolidés (1)\n")
+        assert ", " not in context.splitlines()[1]
+        assert "'" not in context
+
+
+# ─── Ranked truncation ────────────────────────────────────────────────────
+
+class TestTruncation:
+    def test_keeps_highest_severity_first(self):
+        findings = [_finding(i, s) for i, s in enumerate(["LOW", "CRITICAL", "MEDIUM", "HIGH"] * 50)]
+        context = build_context({"findings": findings}, "prioritization", max_tokens=500)
+        kept = _lines(context, "Findings")
+        assert 0 < len(kept) < 200
+        assert "/200 — tri par sévérité" in context
+        order = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+        ranks = [order.index(f["severity"]) for f in kept]
+        assert ranks == sorted(ranks) and ranks[0] == 0
+
+    def test_recommendations_ranked_by_priority(self):
+        recos = [
+            {"id": f"R{i}", "title": "t", "priority_score": score, "impact": "LOW", "effort": "LOW"}
+            for i, score in enumerate([1.0, 9.5, 4.0])
+        ]
+        kept = _lines(build_context({"recommendations": recos}, "roi_modeler"), "Recommandations")
+        assert [r["id"] for r in kept] == ["R1", "R2", "R0"]
+
+    def test_big_audit_fits_budget(self):
+        state = synthetic_state(10_000)
+        for agent_id in ("report_generator", "prioritization", "roi_modeler"):
+            context = build_context(state, agent_id, max_tokens=8000)
+            assert estimate_tokens(context) <= 8000
+        assert len(repr(state)) // 4 > 100 * 8000
+
+
+# ─── Consumers ────────────────────────────────────────────────────────────
+
+class TestConsumers:
+    def test_agents_and_report_node_use_compact_context(self):
+        state = synthetic_state(200)
+        state["client_context"] = {"name": "Acme", "industry": "Manufacturing"}
+        messages = [
+            ReportGeneratorAgent().build_user_message(state),
+            PrioritizationAgent().build_user_message(state),
+            ROIModelerAgent().build_user_message(state),
+            _report_messages(state)[1][1],
+        ]
+        for message in messages:
+            assert "{'" not in message and "created_at" not in message
+            assert "### " in message
+        assert "Acme" in messages[-1]
+        assert len(messages[-1]) < len(f"Data: {state}") / 2
@@ -0,0 +1,118 @@
+"""Tests for override-driven partial recomputation of finished audits."""
+
+import pytest
+
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import pool as pool_module
+from src.orchestrator import graph as graph_module
+from src.orchestrator.graph import build_audit_graph
+from src.orchestrator.recompute import plan_recompute, recompute_with_overrides, render_deliverables
+from src.orchestrator.runner import run_audit
+from src.orchestrator.state import build_initial_state
+from src.storage.checkpoint import LocalCheckpointSaver
+from src.storage.result_store import AuditResultStore
+
+
+async def _offline_cockpit(self, audit_data):
+    return {"status": "skipped", "message": "offline"}
+
+
+@pytest.fixture
+def finished_audit(monkeypatch, tmp_path):
+    """A mock audit run to completion on a checkpointed graph, with counters
+    of the derived nodes re-run afterwards."""
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_latency_ms", 0)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_input_tokens_per_minute", 0)
+    monkeypatch.setattr(settings, "llm_output_tokens_per_minute", 0)
+    monkeypatch.setattr(pool_module, "_pool_instance", None)
+    monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", _offline_cockpit)
+
+    saver = LocalCheckpointSaver.from_path(str(tmp_path / "checkpoints.sqlite"))
+    store = AuditResultStore(str(tmp_path / "audits.sqlite"))
+    graph = build_audit_graph(checkpointer=saver)
+    state = build_initial_state("AUDIT-R", "ia_readiness", {"name": "Acme", "industry": "Retail"})
+    final = run_audit(state, graph=graph, store=store)
+
+    calls = {}
+    for name in ("node_roi_prioritization", "node_report_generator", "node_stitch_ui_generator"):
+        original = getattr(graph_module, name)
+
+        def counting(state, _original=original, _name=name):
+            calls[_name] = calls.get(_name, 0) + 1
+            return _original(state)
+
+        monkeypatch.setattr(graph_module, name, counting)
+    yield graph, final, calls
+    store.close()
+    saver.conn.close()
+
+
+# ─── Dependency plan ──────────────────────────────────────────────────────
+
+class TestPlan:
+    def test_maturity_edit_reruns_report_only(self):
+        plan = plan_recompute({"maturity_scores"})
+        assert plan.nodes == ["reporting"]
+        assert plan.deliverables == ["exec_summary_md", "slides"]
+
+    def test_recommendation_edit_propagates_through_roi(self):
+        plan = plan_recompute({"recommendations"})
+        assert plan.nodes == ["roi_priority", "reporting", "stitch_ui"]
+        assert "roadmap_md" not in plan.deliverables
+
+    def test_nothing_changed(self):
+        plan = plan_recompute(set())
+        assert plan.nodes == [] and plan.deliverables == []
+
+
+# ─── Recompute ────────────────────────────────────────────────────────────
+
+class TestRecompute:
+    def test_maturity_override_keeps_roi(self, finished_audit):
+        graph, final, calls = finished_audit
+        dimension = next(iter(final["maturity_scores"]))
+        previous = render_deliverables(final)
+        result = recompute_with_overrides(
+            "AUDIT-R", {"maturity_scores": {dimension: {"score": 1}}},
+            graph=graph, previous_deliverables=previous,
+        )
+        assert calls == {"node_report_generator": 1}
+        assert result.state["roi_model"] == final["roi_model"]
+        assert result.state["maturity_scores"][dimension]["score"] == 1
+        assert result.rerendered == ["exec_summary_md", "slides"]
+        assert result.deliverables["roadmap_md"] is previous["roadmap_md"]
+
+        snapshot = graph.get_state({"configurable": {"thread_id": "AUDIT-R"}})
+        assert snapshot.next == () and snapshot.values["maturity_scores"][dimension]["score"] == 1
+
+    def test_rejected_recommendation_reruns_roi_and_accumulates(self, finished_audit):
+        graph, final, calls = finished_audit
+        first, second = [r["id"] for r in final["recommendations"][:2]]
+        recompute_with_overrides("AUDIT-R", {"recommendations": {first: None}}, graph=graph)
+        result = recompute_with_overrides(
+            "AUDIT-R", {"recommendations": {second: {"effort": "LOW"}}}, graph=graph
+        )
+        assert calls["node_roi_prioritization"] == 2 and calls["node_report_generator"] == 2
+        ids = [r["id"] for r in result.state["recommendations"]]
+        assert first not in ids and len(ids) == len(final["recommendations"]) - 1
+        assert set(result.state["human_overrides"]["recommendations"]) == {first, second}
+        assert result.state["token_usage"]["total"]["calls"] > final["token_usage"]["total"]["calls"]
+
+    def test_unmatched_override_recomputes_nothing(self, finished_audit):
+        graph, final, calls = finished_audit
+        result = recompute_with_overrides("AUDIT-R", {"findings": {"NOPE": None}}, graph=graph)
+        assert calls == {} and result.nodes == [] and result.changed == []
+        assert result.state["findings"] == final["findings"]
+
+    def test_unfinished_or_unknown_audit(self, finished_audit, monkeypatch):
+        graph, _, _ = finished_audit
+        with pytest.raises(KeyError):
+            recompute_with_overrides("AUDIT-MISSING", {}, graph=graph)
+        monkeypatch.setattr(settings, "human_validation", "required")
+        run_audit(build_initial_state("AUDIT-P", "ia_readiness", {"name": "B"}), graph=graph,
+                  store=AuditResultStore(":memory:"))
+        with pytest.raises(ValueError, match="not finished"):
+            recompute_with_overrides("AUDIT-P", {}, graph=graph)
@@ -0,0 +1,90 @@
+"""Tests for the partial salvage of broken agent responses."""
+
+import json
+
+from src.agents.base import BaseAgent
+from src.agents.salvage import repair_json, salvage_output
+from src.orchestrator.graph import agent_output_to_update
+
+
+def _finding(i, **overrides):
+    return {"id": f"F-{i:03d}", "category": "data", "description": f"Constat {i}",
+            "severity": "HIGH", "sources": [{"doc_id": "d1", "snippet": "s"}], **overrides}
+
+
+class _Agent(BaseAgent):
+    def build_user_message(self, state):
+        return ""
+
+
+# ─── Syntax repair ────────────────────────────────────────────────────────
+
+class TestRepairJson:
+    def test_prose_fences_and_trailing_commas(self):
+        value, repairs = repair_json('Voici :\n```json\n{"a": [1, 2,],}\n```\nBonne lecture')
+        assert value == {"a": [1, 2]}
+        assert repairs == ["leading_text", "trailing_comma", "trailing_text"]
+
+    def test_unescaped_quotes(self):
+        value, repairs = repair_json('{"a": "le "data lake" central", "b": "x"}')
+        assert value == {"a": 'le "data lake" central', "b": "x"}
+        assert repairs == ["unescaped_quote"]
+
+    def test_truncated_cut_back_to_last_complete_value(self):
+        value, repairs = repair_json('{"findings": [{"id": "F1"}, {"id": "F2", "description": "coup')
+        assert value == {"findings": [{"id": "F1"}, {"id": "F2"}]}
+        assert repairs == ["truncated"]
+
+    def test_nothing_to_recover(self):
+        assert repair_json("Je ne peux pas répondre.") == (None, [])
+
+
+# ─── Item-level salvage ───────────────────────────────────────────────────
+
+class TestSalvageOutput:
+    def test_invalid_items_rejected_valid_kept(self):
+        raw = json.dumps({
+            "findings": [_finding(1), _finding(2, severity="HUGE"), _finding(3)],
+            "maturity_scores": [{"dimension": "data", "score": 9, "justification": "j", "gaps": []}],
+        })
+        output = salvage_output(raw, "ds", "Data Scanner")
+        assert [f.id for f in output.findings] == ["F-001", "F-003"]
+        assert output.findings[0].agent_id == "ds" and output.maturity_scores == []
+        rejected = output.metadata["salvage"]["rejected"]
+        assert [(r["field"], r["index"], r["id"]) for r in rejected] == [
+            ("findings", 1, "F-002"), ("maturity_scores", 0, "data"),
+        ]
+        assert rejected[0]["error"].startswith("severity:")
+
+    def test_truncated_response_keeps_complete_items(self):
+        raw = json.dumps({"findings": [_finding(i) for i in range(1, 6)]})
+        output = salvage_output(raw[: len(raw) - 40], "ds", "Data Scanner")
+        assert [f.id for f in output.findings] == ["F-001", "F-002", "F-003", "F-004"]
+        salvage = output.metadata["salvage"]
+        assert salvage["repairs"] == ["truncated"]
+        assert [r["id"] for r in salvage["rejected"]] == ["F-005"]
+
+    def test_no_valid_item_is_not_salvaged(self):
+        assert salvage_output(json.dumps({"findings": [{"id": "F-1"}]}), "ds", "DS") is None
+        assert salvage_output("not json", "ds", "DS") is None
+
+
+# ─── Agent integration ────────────────────────────────────────────────────
+
+class TestParseOutput:
+    def test_salvaged_output_skips_repair_and_reports_rejections(self):
+        agent = _Agent("ds", "Data Scanner", "prompt")
+        raw = json.dumps({"findings": [_finding(1), _finding(2, sources="none")]}) + "\nFin."
+        output = agent.parse_output(raw)
+        assert "parse_error" not in output.metadata
+        assert not agent._needs_repair(output)
+        update = agent_output_to_update(output)
+        assert len(update["findings"]) == 1
+        assert update["errors"] == [
+            "Data Scanner Rejected findings[1] (F-002): sources: Input should be a valid list"
+        ]
+
+    def test_unrecoverable_output_still_requests_repair(self):
+        agent = _Agent("ds", "Data Scanner", "prompt")
+        output = agent.parse_output('{"findings": [')
+        assert "parse_error" in output.metadata
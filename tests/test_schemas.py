@@ -61,6 +61,19 @@ class TestFinding:
         assert f2.id == f.id
         assert f2.tags == ["security", "urgent"]
 
+    def test_agent_id_required_without_context(self):
+        data = {"id": "DS-003", "category": "c", "description": "d", "severity": "LOW", "sources": []}
+        with pytest.raises(ValueError, match="Field required"):
+            Finding(**data)
+        assert Finding.model_validate(data, context={"agent_id": "ds"}).agent_id == "ds"
+
+    def test_list_defaults_not_shared(self):
+        data = {"id": "DS-004", "agent_id": "ds", "category": "c", "description": "d",
+                "severity": "LOW", "sources": []}
+        first, second = Finding(**data), Finding(**data)
+        first.tags.append("x")
+        assert second.tags == []
+
 
 # ─── Risk ─────────────────────────────────────────────────────────────────
 
@@ -0,0 +1,275 @@
+"""Tests for the audit job queue, workers and HTTP API."""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import pool as pool_module
+from src.orchestrator import graph as graph_module
+from src.orchestrator import runner as runner_module
+from src.orchestrator.graph import build_audit_graph
+from src.service import worker as worker_module
+from src.service.api import build_server
+from src.service.queue import JobQueue
+from src.service.worker import Worker
+from src.storage.checkpoint import LocalCheckpointSaver
+from src.storage.result_store import AuditResultStore
+
+PAYLOAD = {"audit_type": "ia_readiness", "client_context": {"name": "Acme"}}
+
+
+async def _offline_cockpit(self, audit_data):
+    return {"status": "skipped", "message": "offline"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.sqlite"))
+    yield q
+    q.close()
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = LocalCheckpointSaver.from_path(str(tmp_path / "checkpoints.sqlite"))
+    yield saver
+    saver.conn.close()
+
+
+@pytest.fixture
+def mock_graph(monkeypatch, tmp_path, saver):
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_latency_ms", 0)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_input_tokens_per_minute", 0)
+    monkeypatch.setattr(settings, "llm_output_tokens_per_minute", 0)
+    monkeypatch.setattr(pool_module, "_pool_instance", None)
+    monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", _offline_cockpit)
+    store = AuditResultStore(str(tmp_path / "audits.sqlite"))
+    monkeypatch.setattr(runner_module, "_result_store", store)
+    yield build_audit_graph(checkpointer=saver)
+    store.close()
+
+
+# ─── Queue ────────────────────────────────────────────────────────────────
+
+class TestQueue:
+    def test_claims_are_fifo_and_exclusive(self, queue):
+        first, second = queue.submit(PAYLOAD), queue.submit(PAYLOAD)
+        assert queue.claim("w1").job_id == first.job_id
+        assert queue.claim("w2").job_id == second.job_id
+        assert queue.claim("w3") is None
+        assert queue.get(first.job_id).status == "running"
+
+    def test_expired_lease_is_reclaimed_then_failed(self, queue):
+        job = queue.submit(PAYLOAD, max_attempts=2)
+        queue.claim("w1", lease_seconds=-1)
+        reclaimed = queue.claim("w2", lease_seconds=-1)
+        assert reclaimed.job_id == job.job_id and reclaimed.attempts == 2
+        assert queue.heartbeat(job.job_id, "w1") == "lost"
+        assert queue.claim("w3") is None
+        assert queue.get(job.job_id).status == "failed"
+
+    def test_fail_requeues_until_last_attempt(self, queue):
+        job = queue.submit(PAYLOAD, max_attempts=2)
+        queue.claim("w1")
+        queue.fail(job.job_id, "w1", "boom")
+        assert queue.get(job.job_id).status == "queued"
+        queue.claim("w1")
+        queue.fail(job.job_id, "w1", "boom again")
+        failed = queue.get(job.job_id)
+        assert failed.status == "failed" and failed.error == "boom again"
+
+    def test_cancel_queued_and_running(self, queue):
+        queued, running = queue.submit(PAYLOAD), queue.submit(PAYLOAD)
+        assert queue.cancel(queued.job_id).status == "cancelled"
+        assert queue.claim("w1").job_id == running.job_id
+        assert queue.cancel(running.job_id).cancel_requested
+        assert queue.heartbeat(running.job_id, "w1", phase="Core Analysis") == "cancel"
+        assert queue.get(running.job_id).phase == "Core Analysis"
+
+
+# ─── Worker ───────────────────────────────────────────────────────────────
+
+class TestWorker:
+    def test_runs_job_to_completion(self, queue, mock_graph):
+        job = queue.submit(PAYLOAD)
+        Worker(queue, "w1", graph=mock_graph, heartbeat_seconds=0.01).run_once()
+        done = queue.get(job.job_id)
+        assert done.status == "succeeded" and done.attempts == 1
+        assert done.result["audit_id"] == job.audit_id and done.result["exec_summary"]
+
+    def test_cancel_stops_running_audit(self, queue, mock_graph, monkeypatch):
+        job = queue.submit(PAYLOAD)
+        worker = Worker(queue, "w1", graph=mock_graph, heartbeat_seconds=0.01)
+        original = worker._stream
+
+        def slow_stream(claimed):
+            queue.cancel(claimed.job_id)
+            for chunk in original(claimed):
+                time.sleep(0.02)
+                yield chunk
+
+        monkeypatch.setattr(worker, "_stream", slow_stream)
+        worker.run_once()
+        assert queue.get(job.job_id).status == "cancelled"
+
+    def test_retry_resumes_from_checkpoint(self, queue, mock_graph, saver, monkeypatch):
+        calls = {"report": 0, "roi": 0}
+        original_report, original_roi = graph_module.node_report_generator, graph_module.node_roi_prioritization
+
+        def flaky_report(state):
+            calls["report"] += 1
+            if calls["report"] == 1:
+                raise RuntimeError("worker crashed")
+            return original_report(state)
+
+        def counting_roi(state):
+            calls["roi"] += 1
+            return original_roi(state)
+
+        monkeypatch.setattr(graph_module, "node_report_generator", flaky_report)
+        monkeypatch.setattr(graph_module, "node_roi_prioritization", counting_roi)
+        worker = Worker(queue, "w1", graph=build_audit_graph(checkpointer=saver), heartbeat_seconds=0.01)
+        job = queue.submit(PAYLOAD)
+        worker.run_once()
+        assert queue.get(job.job_id).status == "queued"
+        worker.run_once()
+        done = queue.get(job.job_id)
+        assert done.status == "succeeded" and done.attempts == 2
+        assert done.result["exec_summary"] and calls["roi"] == 1
+
+    def test_validation_releases_worker_then_resumes(self, queue, mock_graph, monkeypatch):
+        monkeypatch.setattr(settings, "human_validation", "required")
+        job = queue.submit(PAYLOAD)
+        Worker(queue, "w1", graph=mock_graph, heartbeat_seconds=0.01).run_once()
+        paused = queue.get(job.job_id)
+        assert paused.status == "awaiting_validation" and paused.phase == "Validation"
+        assert paused.result["findings"] and not paused.result.get("exec_summary")
+        assert queue.claim("w2") is None
+
+        finding_id = paused.result["findings"][0]["id"]
+        queue.validate(job.job_id, {"overrides": {"findings": {finding_id: None}}, "validated_by": "NC"})
+        Worker(queue, "w2", graph=mock_graph, heartbeat_seconds=0.01).run_once()
+        done = queue.get(job.job_id)
+        assert done.status == "succeeded" and done.result["human_validated"]
+        assert finding_id not in {f["id"] for f in done.result["findings"]}
+        assert done.result["exec_summary"]
+
+
+# ─── HTTP API ─────────────────────────────────────────────────────────────
+
+def _serve(queue):
+    server = build_server(queue, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def api(queue):
+    server = _serve(queue)
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def _call(url, method="GET", body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestApi:
+    def test_submit_poll_deliverables(self, api, queue):
+        status, job = _call(f"{api}/jobs", "POST", PAYLOAD)
+        assert status == 201 and job["status"] == "queued"
+        assert _call(f"{api}/jobs/{job['job_id']}")[1]["status"] == "queued"
+        assert _call(f"{api}/jobs/{job['job_id']}/deliverables")[0] == 409
+
+        queue.claim("w1")
+        queue.complete(job["job_id"], "w1", {"audit_id": job["audit_id"], "audit_type": "ia_readiness"})
+        status, body = _call(f"{api}/jobs/{job['job_id']}/deliverables")
+        assert status == 200 and "exec_summary_md" in body and "slides" in body
+        assert [j["job_id"] for j in _call(f"{api}/jobs?status=succeeded")[1]] == [job["job_id"]]
+
+    def test_cancel_and_errors(self, api):
+        _, job = _call(f"{api}/jobs", "POST", PAYLOAD)
+        assert _call(f"{api}/jobs/{job['job_id']}/cancel", "POST")[1]["status"] == "cancelled"
+        assert _call(f"{api}/jobs", "POST", {"audit_type": "nope"})[0] == 400
+        assert _call(f"{api}/jobs/JOB-missing")[0] == 404
+        assert _call(f"{api}/health") == (200, {"status": "ok"})
+
+    def test_validate_requeues_awaiting_job(self, api, queue):
+        _, job = _call(f"{api}/jobs", "POST", PAYLOAD)
+        url = f"{api}/jobs/{job['job_id']}"
+        assert _call(f"{url}/validate", "POST", {})[0] == 409
+        queue.claim("w1")
+        queue.await_validation(job["job_id"], "w1", {"audit_id": job["audit_id"], "findings": []})
+        assert _call(f"{url}/state")[1]["findings"] == []
+
+        bad = {"overrides": {"findings": {"F-1": {"severity": "HUGE"}}}}
+        assert _call(f"{url}/validate", "POST", bad)[0] == 400
+        status, body = _call(f"{url}/validate", "POST", {"overrides": {"findings": {"F-1": None}}})
+        assert status == 200 and body["status"] == "queued" and body["attempts"] == 0
+        assert queue.get(job["job_id"]).decision["overrides"] == {"findings": {"F-1": None}}
+
+    def test_overrides_queued_then_recomputed_by_a_worker(self, api, queue, mock_graph):
+        job = queue.submit(PAYLOAD)
+        worker = Worker(queue, "w1", graph=mock_graph, heartbeat_seconds=0.01)
+        worker.run_once()
+        finding = queue.get(job.job_id).result["findings"][0]["id"]
+        url = f"{api}/jobs/{job.job_id}/overrides"
+        for bad in ({"findings": {finding: {"severity": "NOPE"}}}, ["findings"], {"findings": [finding]}):
+            status, body = _call(url, "POST", {"overrides": bad})
+            assert status == 400 and body["error"].startswith("Invalid overrides")
+
+        status, body = _call(url, "POST", {"overrides": {"findings": {finding: None}}})
+        assert status == 202 and body["status"] == "recompute"
+        assert _call(f"{api}/jobs/{job.job_id}/deliverables")[0] == 409
+        assert _call(url, "POST", {"overrides": {}})[0] == 409
+
+        worker.run_once()
+        done = queue.get(job.job_id)
+        assert done.status == "succeeded" and done.error is None and done.decision is None
+        assert finding not in {f["id"] for f in done.result["findings"]}
+        overrides = [e for e in done.result["execution_timeline"] if e["node"] == "overrides"]
+        assert overrides[-1]["recomputed"] == ["roi_priority", "reporting", "stitch_ui"]
+        assert _call(f"{api}/jobs/{job.job_id}/deliverables")[1]["slides"]
+
+
+class TestRecompute:
+    def _succeeded(self, queue):
+        job = queue.submit(PAYLOAD)
+        queue.claim("w1")
+        queue.complete(job.job_id, "w1", {"audit_id": job.audit_id, "findings": []})
+        return job
+
+    def test_cancel_drops_pending_recompute(self, queue):
+        job = self._succeeded(queue)
+        assert queue.request_recompute(job.job_id, {"findings": {}}).status == "recompute"
+        cancelled = queue.cancel(job.job_id)
+        assert cancelled.status == "succeeded" and cancelled.decision is None
+        assert queue.claim("w1") is None
+
+    def test_failed_recompute_keeps_previous_result(self, queue, mock_graph, monkeypatch):
+        job = self._succeeded(queue)
+        queue.request_recompute(job.job_id, {"findings": {}})
+
+        def broken(*args, **kwargs):
+            raise KeyError("no state")
+
+        monkeypatch.setattr(worker_module, "recompute_with_overrides", broken)
+        Worker(queue, "w1", graph=mock_graph, heartbeat_seconds=0.01).run_once()
+        done = queue.get(job.job_id)
+        assert done.status == "succeeded" and done.result == {"audit_id": job.audit_id, "findings": []}
+        assert done.error.startswith("KeyError")
@@ -0,0 +1,211 @@
+"""Tests for streamed agent responses and live item events."""
+
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from src.agents import base as base_module
+from src.agents.base import BaseAgent
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.agents.streaming import (
+    ItemPublisher,
+    ItemStreamParser,
+    is_item_event,
+    is_report_chunk,
+    is_retraction,
+)
+from src.config import settings
+from src.llm import pool as pool_module
+from src.llm.mock import MockChatModel
+from src.main import _print_stream
+from src.orchestrator.graph import build_audit_graph
+from src.orchestrator.runner import stream_audit
+from src.orchestrator.state import build_initial_state
+from src.storage.result_store import AuditResultStore
+
+
+def _payload():
+    model = MockChatModel(seed=3, findings=4, risks=2, recommendations=2, maturity_scores=2, latency_ms=0)
+    return model.agent_payload(random.Random(0), "S")
+
+
+# ─── Incremental parser ───────────────────────────────────────────────────
+
+class TestItemStreamParser:
+    def test_items_returned_as_soon_as_they_close(self):
+        payload = _payload()
+        text = "```json\n" + json.dumps(payload, ensure_ascii=False) + "\n```"
+        parser = ItemStreamParser()
+        seen = []
+        for position, char in enumerate(text):
+            for field, index, item in parser.feed(char):
+                seen.append((field, index, item))
+                # The item's closing brace is the character just fed
+                assert text[position] == "}"
+        assert [(f, i) for f, i, _ in seen] == [
+            (field, index) for field in ("findings", "risks", "recommendations", "maturity_scores")
+            for index in range(len(payload[field]))
+        ]
+        assert [item for f, _, item in seen if f == "findings"] == payload["findings"]
+
+    def test_braces_and_quotes_inside_strings(self):
+        text = json.dumps({"summary": "{not [an item", "findings": [
+            {"id": "F1", "description": 'le "cloud" {hybride}'}, {"id": "F2", "tags": [{"x": 1}]},
+        ]})
+        parser = ItemStreamParser()
+        items = parser.feed(text[:40]) + parser.feed(text[40:])
+        assert [item["id"] for _, _, item in items] == ["F1", "F2"]
+        assert items[0][2]["description"] == 'le "cloud" {hybride}'
+        assert parser._buffer == ""               # consumed text is released
+
+
+# ─── Attempts and retractions ─────────────────────────────────────────────
+
+class _StreamingLLM:
+    """Streams a script of (text, error) attempts in 16-char chunks; the error cuts the stream."""
+
+    model = "claude-test"
+
+    def __init__(self, *script):
+        self.script = list(script)
+
+    def stream(self, messages):
+        text, error = self.script.pop(0)
+        for start in range(0, len(text), 16):
+            yield AIMessageChunk(content=text[start:start + 16])
+        if error is not None:
+            raise error
+
+
+class _Agent(BaseAgent):
+    def build_user_message(self, state):
+        return "analyse"
+
+
+def _response(*ids):
+    return json.dumps({"findings": [
+        {"id": i, "category": "c", "description": f"constat {i}", "severity": "LOW",
+         "sources": [{"doc_id": "d1", "snippet": "s"}]} for i in ids
+    ]})
+
+
+@pytest.fixture
+def streaming_agent(monkeypatch):
+    """Agent over a scripted streaming LLM, with its item events collected."""
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "retry_backoff_seconds", 0.001)
+    monkeypatch.setattr(settings, "max_retries", 1)
+    events = []
+    monkeypatch.setattr(BaseAgent, "_item_publisher",
+                        lambda self: ItemPublisher(self.agent_id, self.agent_name, events.append))
+
+    def build(*script):
+        monkeypatch.setattr(base_module, "get_chat_model", lambda: _StreamingLLM(*script))
+        return _Agent("ds", "Data Scanner", "prompt")
+
+    return SimpleNamespace(build=build, events=events)
+
+
+def _shown(events):
+    """Items a console still shows once retractions are applied."""
+    shown = {}
+    for event in events:
+        if is_item_event("custom", event):
+            shown[(event["attempt"], event["field"], event["index"])] = event["item"]["id"]
+        elif is_retraction("custom", event):
+            for item in event["items"]:
+                shown.pop((event["attempt"], item["field"], item["index"]))
+    return sorted(shown.values())
+
+
+class TestAttempts:
+    def test_retried_stream_retracts_the_aborted_attempt(self, streaming_agent):
+        first = _response("OLD-1", "OLD-2", "OLD-3")
+        agent = streaming_agent.build((first[:len(first) * 2 // 3], TimeoutError("cut")),
+                                      (_response("NEW-1", "NEW-2"), None))
+        output = agent.run({})
+        events = streaming_agent.events
+        retraction = next(e for e in events if is_retraction("custom", e))
+        assert retraction["attempt"] == 1 and retraction["items"][0] == {"field": "findings", "index": 0}
+        assert [e["item"]["id"] for e in events if is_item_event("custom", e) and e["attempt"] == 2] == [
+            "NEW-1", "NEW-2",
+        ]
+        assert _shown(events) == sorted(f.id for f in output.findings) == ["NEW-1", "NEW-2"]
+
+    def test_failed_call_retracts_everything(self, streaming_agent):
+        partial = _response("A-1", "A-2")[:-20]
+        agent = streaming_agent.build((partial, TimeoutError()), (partial, TimeoutError()))
+        with pytest.raises(TimeoutError):
+            agent.run({})
+        assert sum(is_retraction("custom", e) for e in streaming_agent.events) == 2
+        assert _shown(streaming_agent.events) == []
+
+
+# ─── Live events through the graph ────────────────────────────────────────
+
+@pytest.fixture
+def mock_provider(monkeypatch):
+    async def offline_cockpit(self, audit_data):
+        return {"status": "skipped", "message": "offline"}
+
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_latency_ms", 0)
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_input_tokens_per_minute", 0)
+    monkeypatch.setattr(settings, "llm_output_tokens_per_minute", 0)
+    monkeypatch.setattr(pool_module, "_pool_instance", None)
+    monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", offline_cockpit)
+
+
+def _chunks(audit_id):
+    state = build_initial_state(audit_id, "ia_readiness", {"name": "Acme"})
+    return list(stream_audit(state, graph=build_audit_graph(), store=AuditResultStore(":memory:")))
+
+
+class TestLiveItems:
+    def test_items_streamed_before_the_agent_update(self, mock_provider):
+        chunks = _chunks("AUDIT-S1")
+        final = [chunk for mode, chunk in chunks if mode == "values"][-1]
+        events = [chunk for mode, chunk in chunks if is_item_event(mode, chunk)]
+        streamed = sorted(e["item"]["id"] for e in events if e["field"] == "findings")
+        assert streamed == sorted(f["id"] for f in final["findings"])
+
+        first_item = next(i for i, (mode, chunk) in enumerate(chunks) if is_item_event(mode, chunk))
+        first_update = next(
+            i for i, (mode, chunk) in enumerate(chunks) if mode == "updates" and "core_agent" in chunk
+        )
+        assert first_item < first_update
+
+    def test_streaming_matches_a_plain_call(self, mock_provider, monkeypatch):
+        streamed = [c for m, c in _chunks("AUDIT-S2") if m == "values"][-1]
+        monkeypatch.setattr(settings, "llm_streaming", False)
+        chunks = _chunks("AUDIT-S2")
+        plain = [c for m, c in chunks if m == "values"][-1]
+        assert not any(m == "custom" for m, _ in chunks)
+        assert [f["id"] for f in streamed["findings"]] == [f["id"] for f in plain["findings"]]
+        assert streamed["token_usage"]["total"] == plain["token_usage"]["total"]
+
+    def test_cli_prints_items_live(self, mock_provider, capsys):
+        final_state, paused = _print_stream(iter(_chunks("AUDIT-S3")))
+        out = capsys.readouterr().out
+        assert not paused and final_state["findings"]
+        assert out.count("· data_scanner: constat [") == settings.mock_llm_findings
+
+    def test_report_streamed_before_its_update(self, mock_provider):
+        chunks = _chunks("AUDIT-S4")
+        final = [chunk for mode, chunk in chunks if mode == "values"][-1]
+        events = [(i, chunk) for i, (mode, chunk) in enumerate(chunks) if is_report_chunk(mode, chunk)]
+        assert events and {e["attempt"] for _, e in events} == {1}
+        assert "".join(e["text"] for _, e in events) == final["exec_summary"]
+        report_update = next(
+            i for i, (mode, chunk) in enumerate(chunks) if mode == "updates" and "reporting" in chunk
+        )
+        assert events[-1][0] < report_update
+
+    def test_cli_prints_report_live(self, mock_provider, capsys):
+        final_state, _ = _print_stream(iter(_chunks("AUDIT-S5")))
+        out = capsys.readouterr().out
+        assert f"--- Executive Summary ---\n{final_state['exec_summary']}\n" in out
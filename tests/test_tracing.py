@@ -0,0 +1,132 @@
+"""Tests for tracing spans and their exporters."""
+
+import json
+
+import pytest
+from langgraph.errors import GraphInterrupt
+
+from src.agents.core.stitch_designer import StitchDesignerAgent
+from src.config import settings
+from src.llm import pool as pool_module
+from src.observability import tracing as tracing_module
+from src.observability.exporters import JsonlSpanExporter, PrometheusFileExporter
+from src.observability.tracing import Tracer, record
+from src.orchestrator.graph import build_audit_graph
+from src.orchestrator.state import build_initial_state
+
+
+class _Collector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def collector():
+    return _Collector()
+
+
+# ─── Tracer ───────────────────────────────────────────────────────────────
+
+class TestTracer:
+    def test_spans_nest_and_inherit_trace_id(self, collector):
+        tracer = Tracer([collector])
+        with tracer.span("outer", "node", trace_id="AUDIT-1") as outer:
+            with tracer.span("inner", "llm"):
+                record(input_tokens=10)
+                record(input_tokens=5, cache_hit=False)
+        inner, outer_done = collector.spans
+        assert inner.parent_id == outer.span_id
+        assert inner.trace_id == "AUDIT-1"
+        assert inner.attributes == {"input_tokens": 15, "cache_hit": False}
+        assert "input_tokens" not in outer_done.attributes
+        assert outer_done.wall_ms >= inner.wall_ms
+
+    def test_error_recorded_and_reraised(self, collector):
+        with pytest.raises(ValueError):
+            with Tracer([collector]).span("boom", "node"):
+                raise ValueError("bad")
+        assert collector.spans[0].status == "error"
+        assert collector.spans[0].error == "ValueError: bad"
+
+    def test_interrupt_is_not_an_error(self, collector):
+        with pytest.raises(GraphInterrupt):
+            with Tracer([collector]).span("pause", "node"):
+                raise GraphInterrupt()
+        assert collector.spans[0].status == "interrupted"
+        assert collector.spans[0].error is None
+
+
+class TestExporters:
+    def test_jsonl_and_prometheus(self, tmp_path):
+        jsonl = JsonlSpanExporter(str(tmp_path / "spans.jsonl"))
+        prom = PrometheusFileExporter(str(tmp_path / "metrics.prom"))
+        tracer = Tracer([jsonl, prom])
+        for tokens in (100, 50):
+            with tracer.span("data_scanner", "llm", input_tokens=tokens, retries=1):
+                pass
+        tracer.flush()
+
+        lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+        assert [json.loads(line)["attributes"]["input_tokens"] for line in lines] == [100, 50]
+
+        metrics = (tmp_path / "metrics.prom").read_text()
+        assert 'audit_spans_total{kind="llm",name="data_scanner"} 2' in metrics
+        assert 'audit_llm_input_tokens_total{kind="llm",name="data_scanner"} 150' in metrics
+        assert 'audit_llm_retries_total{kind="llm",name="data_scanner"} 2' in metrics
+        assert "# TYPE audit_span_wall_seconds_total counter" in metrics
+
+
+# ─── Pipeline instrumentation ─────────────────────────────────────────────
+
+class TestPipelineSpans:
+    @pytest.fixture
+    def traced_run(self, monkeypatch, collector):
+        async def offline_cockpit(self, audit_data):
+            return {"status": "skipped", "message": "offline"}
+
+        monkeypatch.setattr(settings, "llm_provider", "mock")
+        monkeypatch.setattr(settings, "mock_llm_latency_ms", 1)
+        monkeypatch.setattr(settings, "llm_cache_enabled", False)
+        monkeypatch.setattr(pool_module, "_pool_instance", None)
+        monkeypatch.setattr(tracing_module, "_tracer_instance", Tracer([collector]))
+        monkeypatch.setattr(StitchDesignerAgent, "generate_cockpit", offline_cockpit)
+
+        state = build_initial_state(
+            audit_id="AUDIT-TRACE", audit_type="ia_readiness", client_context={"name": "Acme"},
+        )
+        build_audit_graph().invoke(state)
+        return collector.spans
+
+    def test_every_node_has_a_span(self, traced_run):
+        nodes = {s.name for s in traced_run if s.kind == "node"}
+        assert nodes == {"intake", "core_agents", "core_agent", "plugin_agents", "plugin_agent",
+                         "consolidation", "roi_priority", "validation", "reporting", "stitch_ui"}
+        assert all(s.trace_id == "AUDIT-TRACE" for s in traced_run)
+
+    def test_llm_spans_nested_under_agent_nodes(self, traced_run):
+        by_id = {s.span_id: s for s in traced_run}
+        llm_spans = [s for s in traced_run if s.kind == "llm"]
+        assert len(llm_spans) == 5
+        for span in llm_spans:
+            parent = by_id[span.parent_id]
+            assert parent.name in ("core_agent", "plugin_agent")
+            assert parent.attributes["agent_id"] in (span.name, "ia_readiness_plugin", "ia_readiness")
+            assert span.attributes["input_tokens"] > 0
+            assert span.attributes["output_tokens"] > 0
+            assert span.attributes["prompt_bytes"] > 0
+            assert span.attributes["cache_hit"] is False
+            assert span.attributes["retries"] == 0
+            assert "queue_wait_ms" in span.attributes
+
+    def test_state_sizes_and_direct_llm_nodes(self, traced_run):
+        consolidation = next(s for s in traced_run if s.name == "consolidation")
+        assert consolidation.attributes["state_sizes"]["findings"] == 25
+        core = next(s for s in traced_run if s.name == "core_agent")
+        assert core.attributes["update_sizes"]["findings"] == settings.mock_llm_findings
+        plugin = next(s for s in traced_run if s.name == "plugin_agent")
+        assert "queue_wait_ms" in plugin.attributes
+        reporting = next(s for s in traced_run if s.name == "reporting")
+        assert reporting.attributes["output_tokens"] > 0